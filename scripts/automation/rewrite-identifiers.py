@@ -0,0 +1,557 @@
+#!/usr/bin/env python3
+"""
+rewrite-identifiers.py - Single-pass SQL Server → PostgreSQL identifier rewriter
+
+Purpose:
+    Rewrite every SQL Server identifier listed in the naming conversion map
+    (docs/naming-conversion-map.csv) to its PostgreSQL name, in a single SQL
+    file or a whole directory tree of files (e.g. AWS SCT output).
+
+    All map entries are compiled into one Aho-Corasick automaton, so each file
+    is scanned exactly once regardless of how many identifiers are mapped.
+    Chaining one re.sub() per identifier costs O(patterns x text) and breaks on
+    substring collisions (GetUpStream inside GetUpStreamFamily); here matches
+    are resolved leftmost-longest and only accepted on token boundaries.
+
+Usage:
+    # Report what would change (default, nothing is written)
+    python scripts/automation/rewrite-identifiers.py source/original/pgsql-aws-sct-converted
+
+    # Write a full copy to another directory: every scanned file (--ext), rewritten
+    # where needed; files with other extensions are not copied
+    python scripts/automation/rewrite-identifiers.py source/original/pgsql-aws-sct-converted \
+        --output-dir /tmp/sct-renamed
+
+    # Rewrite in place, with the index naming map added on top
+    python scripts/automation/rewrite-identifiers.py path/to/file.sql --in-place \
+        --map docs/naming-conversion-map.csv \
+        --map source/building/pgsql/refactored/16.create-index/index-naming-map.csv
+
+Lexical rules:
+    - Matching is case-insensitive (T-SQL identifiers are case-insensitive)
+    - Bare, [bracketed] and "quoted" identifiers are rewritten to bare names
+    - Schema-qualified forms (dbo.X, [dbo].[X], perseus_dbo.X) are rewritten
+      to the PostgreSQL schema (perseus.x); longest match wins
+    - '...' string literals, -- line comments and /* */ comments are never
+      touched
+    - $tag$ ... $tag$ bodies are treated as code (function/procedure bodies)
+
+Exit Codes:
+    0 = Success
+    1 = One or more files could not be processed
+    2 = Invalid arguments
+    3 = File not found
+
+Author: Pierre Ribeiro (DBA/DBRE)
+Created: 2026-10-19
+Version: 1.0
+"""
+
+import argparse
+import csv
+import json
+import shutil
+import sys
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+# ============================================================================
+# CONSTANTS & CONFIGURATION
+# ============================================================================
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+DEFAULT_MAP = REPO_ROOT / 'docs' / 'naming-conversion-map.csv'
+
+# Schema renames applied on top of the map (SCT emits <db>_<schema>)
+DEFAULT_SCHEMA_MAP = {
+    'dbo': 'perseus',
+    'perseus_dbo': 'perseus',
+}
+
+# When two map rows claim the same SQL Server name, the first type wins
+OBJECT_TYPE_PRIORITY = ['table', 'view', 'procedure', 'function', 'type', 'index']
+
+IDENT_CHARS = frozenset('abcdefghijklmnopqrstuvwxyz'
+                        'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+                        '0123456789_@#$')
+
+# Lexer states
+CODE, LINE_COMMENT, BLOCK_COMMENT, STRING, QUOTED_IDENT = range(5)
+
+
+# ============================================================================
+# DATA STRUCTURES
+# ============================================================================
+
+@dataclass
+class MapEntry:
+    """One SQL Server → PostgreSQL name mapping"""
+    sqlserver_name: str
+    postgresql_name: str
+    object_type: str = ''
+    schema_sqlserver: str = 'dbo'
+    schema_postgresql: str = 'perseus'
+
+
+@dataclass
+class RewriteResult:
+    """Outcome of rewriting one file"""
+    path: Path
+    text: str
+    replacements: Counter = field(default_factory=Counter)
+
+    @property
+    def changed(self) -> bool:
+        return sum(self.replacements.values()) > 0
+
+
+# ============================================================================
+# AHO-CORASICK AUTOMATON
+# ============================================================================
+
+class AhoCorasick:
+    """
+    Multi-pattern matcher over lowercase patterns.
+
+    Each node stores the index of the longest pattern ending at it (`out`)
+    and a dictionary-suffix link (`dict_link`) to the next node on its failure
+    chain that also ends a pattern, so every match ending at a position is
+    enumerated in O(1 + matches).
+    """
+
+    def __init__(self):
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.out: List[int] = [-1]
+        self.dict_link: List[int] = [0]
+        self.patterns: List[str] = []
+        self.values: List[str] = []
+
+    def add(self, pattern: str, value: str) -> bool:
+        """Add a pattern; returns False if it was already present."""
+        node = 0
+        for ch in pattern:
+            nxt = self.goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto[node][ch] = nxt
+                self.goto.append({})
+                self.fail.append(0)
+                self.out.append(-1)
+                self.dict_link.append(0)
+            node = nxt
+        if self.out[node] != -1:
+            return False
+        self.out[node] = len(self.patterns)
+        self.patterns.append(pattern)
+        self.values.append(value)
+        return True
+
+    def build(self) -> None:
+        """Compute failure and dictionary-suffix links (BFS over the trie)."""
+        queue = list(self.goto[0].values())
+        for node in queue:
+            self.fail[node] = 0
+        head = 0
+        while head < len(queue):
+            node = queue[head]
+            head += 1
+            for ch, child in self.goto[node].items():
+                queue.append(child)
+                f = self.fail[node]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[child] = self.goto[f].get(ch, 0)
+                link = self.fail[child]
+                self.dict_link[child] = link if self.out[link] != -1 else self.dict_link[link]
+
+    def step(self, node: int, ch: str) -> int:
+        """Advance one character from `node`."""
+        while node and ch not in self.goto[node]:
+            node = self.fail[node]
+        return self.goto[node].get(ch, 0)
+
+    def matches_at(self, node: int) -> Iterable[int]:
+        """Yield pattern indexes ending at `node`, longest first."""
+        if self.out[node] != -1:
+            yield self.out[node]
+        node = self.dict_link[node]
+        while node:
+            yield self.out[node]
+            node = self.dict_link[node]
+
+
+# ============================================================================
+# NAMING MAP
+# ============================================================================
+
+def load_naming_map(path: Path) -> List[MapEntry]:
+    """
+    Load a naming map CSV.
+
+    Accepts docs/naming-conversion-map.csv (postgresql_name) and the index
+    naming maps (postgres_name). Rows whose names are not plain identifiers
+    are skipped.
+    """
+    entries = []
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        for row in csv.DictReader(f):
+            ss_name = (row.get('sqlserver_name') or '').strip()
+            pg_name = (row.get('postgresql_name') or row.get('postgres_name') or '').strip()
+            if not ss_name or not pg_name:
+                continue
+            if not (set(ss_name) <= IDENT_CHARS and set(pg_name) <= IDENT_CHARS):
+                print(f"Warning: {path.name}: skipping non-identifier mapping "
+                      f"{ss_name!r} -> {pg_name!r}", file=sys.stderr)
+                continue
+            entries.append(MapEntry(
+                sqlserver_name=ss_name,
+                postgresql_name=pg_name,
+                object_type=(row.get('object_type') or ('index' if 'postgres_name' in row else '')).strip(),
+                schema_sqlserver=(row.get('schema_sqlserver') or 'dbo').strip(),
+                schema_postgresql=(row.get('schema_postgresql') or 'perseus').strip(),
+            ))
+    return entries
+
+
+def _quoted_forms(name: str) -> List[str]:
+    return [name, f'[{name}]', f'"{name}"']
+
+
+class IdentifierRewriter:
+    """Compiles naming map entries into one automaton and rewrites SQL text."""
+
+    def __init__(self, entries: List[MapEntry], schema_map: Optional[Dict[str, str]] = None):
+        self.automaton = AhoCorasick()
+        self.collisions: List[Tuple[str, str, str]] = []
+        schema_map = dict(DEFAULT_SCHEMA_MAP if schema_map is None else schema_map)
+
+        def priority(entry: MapEntry) -> int:
+            if entry.object_type in OBJECT_TYPE_PRIORITY:
+                return OBJECT_TYPE_PRIORITY.index(entry.object_type)
+            return len(OBJECT_TYPE_PRIORITY)
+
+        seen: Dict[str, str] = {}
+        for entry in sorted(entries, key=priority):
+            key = entry.sqlserver_name.lower()
+            if key in seen:
+                if seen[key] != entry.postgresql_name:
+                    self.collisions.append((entry.sqlserver_name, seen[key], entry.postgresql_name))
+                continue
+            seen[key] = entry.postgresql_name
+            schema_map.setdefault(entry.schema_sqlserver.lower(), entry.schema_postgresql)
+
+            for form in _quoted_forms(entry.sqlserver_name):
+                self._add(form, entry.postgresql_name)
+            qualified = f'{entry.schema_postgresql}.{entry.postgresql_name}'
+            for ss_schema, pg_schema in schema_map.items():
+                if pg_schema != entry.schema_postgresql:
+                    continue
+                for schema_form in _quoted_forms(ss_schema):
+                    for name_form in _quoted_forms(entry.sqlserver_name):
+                        self._add(f'{schema_form}.{name_form}', qualified)
+
+        # Bare schema qualifiers for objects not in the map (dbo.Foo → perseus.Foo)
+        for ss_schema, pg_schema in schema_map.items():
+            for schema_form in _quoted_forms(ss_schema):
+                self._add(f'{schema_form}.', f'{pg_schema}.')
+
+        self.automaton.build()
+
+    def _add(self, pattern: str, value: str) -> None:
+        self.automaton.add(pattern.lower(), value)
+
+    @property
+    def pattern_count(self) -> int:
+        return len(self.automaton.patterns)
+
+    def _find_matches(self, text: str) -> List[Tuple[int, int, int]]:
+        """
+        Scan `text` once, returning (start, end, pattern_index) candidates that
+        lie in code and on token boundaries.
+        """
+        ac = self.automaton
+        patterns = ac.patterns
+        candidates = []
+        n = len(text)
+        state = CODE
+        quote_char = ''
+        quote_start = -1
+        block_depth = 0
+        node = 0
+        i = 0
+
+        while i < n:
+            ch = text[i]
+
+            if state == LINE_COMMENT:
+                if ch == '\n':
+                    state = CODE
+                i += 1
+                continue
+            if state == BLOCK_COMMENT:
+                if ch == '*' and i + 1 < n and text[i + 1] == '/':
+                    block_depth -= 1
+                    i += 2
+                    if block_depth == 0:
+                        state = CODE
+                    continue
+                if ch == '/' and i + 1 < n and text[i + 1] == '*':
+                    block_depth += 1
+                    i += 2
+                    continue
+                i += 1
+                continue
+            if state == STRING:
+                if ch == "'":
+                    if i + 1 < n and text[i + 1] == "'":
+                        i += 2
+                        continue
+                    state = CODE
+                i += 1
+                continue
+
+            if state == CODE:
+                if ch == '-' and i + 1 < n and text[i + 1] == '-':
+                    state, node = LINE_COMMENT, 0
+                    i += 2
+                    continue
+                if ch == '/' and i + 1 < n and text[i + 1] == '*':
+                    state, node, block_depth = BLOCK_COMMENT, 0, 1
+                    i += 2
+                    continue
+                if ch == "'":
+                    state, node = STRING, 0
+                    i += 1
+                    continue
+                if ch in '["':
+                    state, quote_start = QUOTED_IDENT, i
+                    quote_char = ']' if ch == '[' else '"'
+            elif state == QUOTED_IDENT and ch == quote_char:
+                if quote_char == '"' and i + 1 < n and text[i + 1] == '"':
+                    # Escaped "" inside a quoted identifier: never a mapped name
+                    node = 0
+                    i += 2
+                    continue
+                state = CODE
+
+            lower = ch.lower()
+            node = ac.step(node, lower if len(lower) == 1 else ch)
+            for idx in ac.matches_at(node):
+                pattern = patterns[idx]
+                start = i - len(pattern) + 1
+                if state == QUOTED_IDENT and start > quote_start:
+                    # Substring of an unterminated [..]/".." identifier
+                    continue
+                if pattern[0] in IDENT_CHARS and start > 0 and text[start - 1] in IDENT_CHARS:
+                    continue
+                if pattern[-1] in IDENT_CHARS and i + 1 < n and text[i + 1] in IDENT_CHARS:
+                    continue
+                candidates.append((start, i + 1, idx))
+            i += 1
+
+        return candidates
+
+    def rewrite(self, text: str) -> Tuple[str, Counter]:
+        """Rewrite `text`, returning (new_text, Counter of replacements)."""
+        candidates = self._find_matches(text)
+        # Leftmost-longest, non-overlapping selection
+        candidates.sort(key=lambda c: (c[0], -(c[1] - c[0])))
+        out = []
+        counts: Counter = Counter()
+        pos = 0
+        values = self.automaton.values
+        for start, end, idx in candidates:
+            if start < pos:
+                continue
+            original = text[start:end]
+            replacement = values[idx]
+            out.append(text[pos:start])
+            out.append(replacement)
+            if original != replacement:
+                counts[f'{original} -> {replacement}'] += 1
+            pos = end
+        out.append(text[pos:])
+        return ''.join(out), counts
+
+
+# ============================================================================
+# FILE PROCESSING
+# ============================================================================
+
+def collect_files(paths: List[Path], extensions: List[str]) -> List[Tuple[Path, Path]]:
+    """Return (file, base_dir) pairs; base_dir is used to mirror the tree."""
+    files = []
+    for path in paths:
+        if path.is_dir():
+            for f in sorted(path.rglob('*')):
+                if f.is_file() and f.suffix.lower() in extensions:
+                    files.append((f, path))
+        else:
+            files.append((path, path.parent))
+    return files
+
+
+def rewrite_file(rewriter: IdentifierRewriter, path: Path) -> RewriteResult:
+    text = path.read_text(encoding='utf-8-sig')
+    new_text, counts = rewriter.rewrite(text)
+    return RewriteResult(path=path, text=new_text, replacements=counts)
+
+
+def parse_schema_map(values: List[str]) -> Dict[str, str]:
+    schema_map = dict(DEFAULT_SCHEMA_MAP)
+    for value in values or []:
+        if '=' not in value:
+            raise ValueError(f"invalid --schema value {value!r} (expected FROM=TO)")
+        src, dst = value.split('=', 1)
+        schema_map[src.strip().lower()] = dst.strip()
+    return schema_map
+
+
+def parse_arguments() -> argparse.Namespace:
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(
+        description='Rewrite SQL Server identifiers to PostgreSQL names in one pass',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Dry run over a directory (report only)
+  python rewrite-identifiers.py source/original/pgsql-aws-sct-converted
+
+  # Mirror rewritten files into another directory
+  python rewrite-identifiers.py source/original/pgsql-aws-sct-converted --output-dir /tmp/out
+
+  # Extra schema rename
+  python rewrite-identifiers.py file.sql --in-place --schema hermes=hermes
+
+Exit Codes:
+  0 = Success
+  1 = One or more files failed
+  2 = Invalid arguments
+  3 = File not found
+        """
+    )
+    parser.add_argument('paths', nargs='+', type=Path,
+                        help='SQL files or directories to rewrite')
+    parser.add_argument('--map', action='append', type=Path, dest='maps',
+                        help=f'Naming map CSV (repeatable, default: {DEFAULT_MAP.relative_to(REPO_ROOT)})')
+    parser.add_argument('--schema', action='append', default=[],
+                        help='Extra schema rename FROM=TO (repeatable)')
+    parser.add_argument('--ext', action='append', dest='extensions',
+                        help='File extensions to process in directories (default: .sql)')
+    output = parser.add_mutually_exclusive_group()
+    output.add_argument('--output-dir', type=Path,
+                        help='Copy every scanned file here, rewritten where needed (mirrors the input tree)')
+    output.add_argument('--in-place', action='store_true',
+                        help='Overwrite input files that changed')
+    parser.add_argument('--report', type=Path,
+                        help='Write a JSON report of all replacements')
+    parser.add_argument('--verbose', '-v', action='store_true',
+                        help='Print per-file replacement counts')
+    return parser.parse_args()
+
+
+def main() -> int:
+    """Main entry point"""
+    args = parse_arguments()
+
+    maps = args.maps or [DEFAULT_MAP]
+    for map_path in maps:
+        if not map_path.exists():
+            print(f"Error: Naming map not found: {map_path}", file=sys.stderr)
+            return 3
+    for path in args.paths:
+        if not path.exists():
+            print(f"Error: Path not found: {path}", file=sys.stderr)
+            return 3
+
+    try:
+        schema_map = parse_schema_map(args.schema)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+
+    extensions = [e if e.startswith('.') else f'.{e}' for e in (args.extensions or ['.sql'])]
+
+    entries = []
+    for map_path in maps:
+        entries.extend(load_naming_map(map_path))
+    rewriter = IdentifierRewriter(entries, schema_map)
+
+    for ss_name, kept, dropped in rewriter.collisions:
+        print(f"Warning: {ss_name} maps to both {kept} and {dropped}; using {kept}", file=sys.stderr)
+
+    files = collect_files(args.paths, extensions)
+    started = time.perf_counter()
+    total_bytes = 0
+    totals: Counter = Counter()
+    changed_files = []
+    failed = 0
+
+    for path, base in files:
+        try:
+            result = rewrite_file(rewriter, path)
+        except (OSError, UnicodeDecodeError) as e:
+            print(f"Error: {path}: {e}", file=sys.stderr)
+            failed += 1
+            continue
+
+        total_bytes += len(result.text)
+        totals.update(result.replacements)
+        if not result.changed:
+            # --output-dir mirrors every scanned file, unchanged ones byte for byte
+            if args.output_dir:
+                target = args.output_dir / path.relative_to(base)
+                target.parent.mkdir(parents=True, exist_ok=True)
+                shutil.copy2(path, target)
+            continue
+        changed_files.append({
+            'file': str(path),
+            'replacements': sum(result.replacements.values()),
+            'detail': dict(result.replacements),
+        })
+        if args.verbose:
+            print(f"  {path}: {sum(result.replacements.values())} replacement(s)")
+
+        if args.in_place:
+            path.write_text(result.text, encoding='utf-8')
+        elif args.output_dir:
+            target = args.output_dir / path.relative_to(base)
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_text(result.text, encoding='utf-8')
+
+    elapsed = time.perf_counter() - started
+    mode = 'in-place' if args.in_place else (f'output -> {args.output_dir}' if args.output_dir else 'dry run')
+
+    print(f"\n{'=' * 70}")
+    print(f"IDENTIFIER REWRITE ({mode})")
+    print(f"{'=' * 70}")
+    print(f"Map entries:      {len(entries)} ({rewriter.pattern_count} patterns)")
+    print(f"Files scanned:    {len(files)}")
+    print(f"Files changed:    {len(changed_files)}")
+    print(f"Replacements:     {sum(totals.values())}")
+    print(f"Elapsed:          {elapsed:.2f}s ({total_bytes / 1024 / 1024 / max(elapsed, 1e-9):.1f} MB/s)")
+    if totals:
+        print(f"\nTop replacements:")
+        for change, count in totals.most_common(15):
+            print(f"  {count:>6}  {change}")
+
+    if args.report:
+        args.report.write_text(json.dumps({
+            'mode': mode,
+            'files_scanned': len(files),
+            'files_changed': changed_files,
+            'totals': dict(totals),
+            'collisions': [list(c) for c in rewriter.collisions],
+        }, indent=2))
+        print(f"\nReport written: {args.report}")
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
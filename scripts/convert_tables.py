@@ -1,8 +1,17 @@
 #!/usr/bin/env python3
 """
 Convert SQL Server table DDL to PostgreSQL 17.
-Reads from source/original/sqlserver/8. create-table/
-Writes to source/building/pgsql/refactored/14. create-table/
+Reads from source/original/sqlserver/8.create-table/
+Writes to source/building/pgsql/generated/14.create-table/ (not tracked; the
+hand-refactored DDL in refactored/14.create-table is never the default target)
+
+An existing output that differs from what the previous run generated (e.g. a
+file edited by hand, or any file in a --target-dir this tool did not write) is
+kept and reported; --overwrite replaces it. --manifests-only writes just the
+loader manifests below (no DDL), for load-data.sh and the data-migration tools.
+
+Incremental: a manifest keyed by source hash and converter version skips
+tables whose output is already current. Use --jobs N for a process pool.
 
 Conversion rules:
 - Column names: PascalCase → snake_case (only transformation allowed)
@@ -16,17 +25,148 @@ Conversion rules:
 - Remove ON [PRIMARY]
 - Schema-qualify to perseus.*
 - FDW tables → CREATE FOREIGN TABLE
+
+With --size-aware, storage options are chosen from source volume
+(docs/data-assessments/all_perseus_rowcount_table_size.csv):
+- INTEGER identity keys close to INT4 overflow → BIGINT, judged by the key's
+  current maximum (--key-max: MAX(id) / IDENT_CURRENT per table, or a range
+  partition's 'max'; the row count is only a lower bound), and every INTEGER
+  FK column referencing a widened key with it
+- fillfactor for update-heavy tables
+- COMPRESSION lz4 on TEXT/BYTEA/XML columns of large tables
+- autovacuum scale factors tightened for the largest tables
+
+With --partition, the largest tables (PARTITION_CONFIG) are declared
+PARTITION BY HASH/RANGE with their child partitions; per-partition index
+DDL goes to partition-indexes/ and partition-load-manifest.json tells
+load-data.sh how many parallel COPY streams to use. The RANGE tables
+(RANGE_PARTITION_TABLES) are opt-in: name them in --partition-config with
+their key's actual MIN..MAX, which the bounds split.
+
+With --optimize-layout, columns are ordered by alignment (8/4/2/1-byte fixed
+width, then varlena) to avoid padding; column-layout.json keeps the source
+column order so COPY still matches the bcp files.
+
+Every non-FDW table also gets copy-manifests/<table>.json: bcp field order,
+target names and types, identity/generated columns and per-column transforms,
+from which load-data.sh builds an explicit COPY column list.
 """
 
+import argparse
+import hashlib
 import os
 import re
 import json
 import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from fk_graph import SQLSERVER_FK_DIR, load_fk_constraints
 
-SOURCE_DIR = "source/original/sqlserver/8. create-table"
-TARGET_DIR = "source/building/pgsql/refactored/14. create-table"
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SOURCE_DIR = os.path.join(REPO_ROOT, "source/original/sqlserver/8.create-table")
+TARGET_DIR = os.path.join(REPO_ROOT, "source/building/pgsql/generated/14.create-table")
 FDW_SCHEMAS = {"hermes", "demeter"}
 
+# Bump when conversion rules change in a way the module hash would not show
+# (e.g. behaviour moved into a helper module). The manifest is also keyed by
+# a hash of this file, so any rule tweak invalidates previous outputs.
+CONVERTER_VERSION = "1.1"
+MANIFEST_NAME = ".conversion-manifest.json"
+RESULTS_NAME = "table_conversion_results.json"
+
+# Size-aware physical design (--size-aware)
+SIZE_CSV = os.path.join(REPO_ROOT, "docs/data-assessments/all_perseus_rowcount_table_size.csv")
+INT4_MAX = 2147483647
+BIGINT_KEY_FRACTION = 0.25          # promote INTEGER identity keys once their max passes 25% of INT4_MAX
+LZ4_TABLE_MB = 1024                 # lz4 TOAST compression on TEXT/BYTEA/XML above 1 GB
+LARGE_TABLE_ROWS = 10_000_000       # tighter autovacuum above 10M rows
+HUGE_TABLE_ROWS = 100_000_000       # tighter still above 100M rows
+FILLFACTOR_MIN_ROWS = 100_000       # fillfactor is pointless on small tables
+
+# Tables with frequent in-place UPDATEs (status flags, nested-set bounds,
+# updated_on stamps); leaving page free space keeps those updates HOT.
+UPDATE_HEAVY_TABLES = {
+    'goo': 90,              # updated_on, container_id moves
+    'fatsmurf': 90,         # run status, updated_on
+    'container': 85,        # MoveContainer rewrites left_id/right_id/depth
+    'material_inventory': 90,
+    'robot_log': 90,        # loaded/loaded_on flags set after ingest
+    'scraper': 90,          # scraping_status lifecycle
+}
+
+# Declarative partitioning (--partition). The partition key must be part of
+# every PRIMARY KEY/UNIQUE constraint, so tables referenced by FKs on `id`
+# (robot_log) are partitioned on `id`. poll is not partitioned: poll_history
+# references poll(id), which forces the key to `id`, and then
+# UNIQUE (fatsmurf_reading_id, smurf_property_id) could not be enforced.
+# Override per table with --partition-config (JSON, same shape; null
+# disables a table).
+PARTITION_CONFIG = {
+    'm_upstream': {
+        'method': 'hash', 'key': 'start_point', 'partitions': 32,
+        'primary_key': ['start_point', 'end_point', 'path'],
+    },
+    'm_downstream': {
+        'method': 'hash', 'key': 'start_point', 'partitions': 8,
+        'primary_key': ['start_point', 'end_point', 'path'],
+    },
+}
+# RANGE partitioning needs bounds from the key's actual values, which only the
+# source has, so these tables are partitioned only when --partition-config
+# names them with 'min' and 'max' (SELECT MIN(key), MAX(key)), an 'interval'
+# or explicit 'bounds'; the rest of the spec comes from here.
+RANGE_PARTITION_TABLES = {
+    'history_value': {
+        'method': 'range', 'key': 'id', 'partitions': 8,
+        'primary_key': ['id'], 'indexes': [['history_id']],
+    },
+    'robot_log': {
+        'method': 'range', 'key': 'id', 'partitions': 8,
+        'primary_key': ['id'], 'indexes': [['robot_run_id']],
+    },
+}
+PARTITION_INDEX_DIR = "partition-indexes"
+PARTITION_LOAD_MANIFEST = "partition-load-manifest.json"
+
+# Column layout optimization (--optimize-layout). PostgreSQL pads each
+# fixed-width value to its type alignment, so ordering columns 8/4/2/1-byte
+# aligned first and varlena last removes the padding. (typlen, typalign) per
+# base type; anything not listed is varlena (VARCHAR, TEXT, NUMERIC, CHAR, ...).
+TYPE_STORAGE = {
+    'BIGINT': (8, 8),
+    'DOUBLE PRECISION': (8, 8),
+    'TIMESTAMP': (8, 8),
+    'TIMESTAMPTZ': (8, 8),
+    'TIME': (8, 8),
+    'INTEGER': (4, 4),
+    'REAL': (4, 4),
+    'DATE': (4, 4),
+    'SMALLINT': (2, 2),
+    'BOOLEAN': (1, 1),
+    'UUID': (16, 1),
+}
+COLUMN_LAYOUT_MANIFEST = "column-layout.json"
+
+# Per-table COPY manifests (always written for non-FDW tables). Transforms
+# describe how a bcp -c value reaches the column; 'native' ones are accepted
+# by PostgreSQL's input functions as-is, the rest must be rewritten by the loader.
+COPY_MANIFEST_DIR = "copy-manifests"
+COPY_TRANSFORMS = {
+    'bit_to_boolean': {'native': True, 'note': "bcp writes 0/1; boolean input accepts both"},
+    'datetime_to_timestamp': {'native': True,
+                              'note': "bcp writes YYYY-MM-DD hh:mm:ss[.fffffff]; extra digits round to microseconds"},
+    'tinyint_to_smallint': {'native': True, 'note': "0-255 fits SMALLINT"},
+    'money_to_numeric': {'native': True, 'note': "bcp writes plain decimal, no currency symbol"},
+    'hex_to_bytea': {'native': False, 'note': "bcp writes bare hex digits; prefix with \\x for bytea hex input"},
+}
+SOURCE_TYPE_TRANSFORMS = [
+    (r'bit$', 'bit_to_boolean'),
+    (r'(small)?datetime2?$', 'datetime_to_timestamp'),
+    (r'tinyint$', 'tinyint_to_smallint'),
+    (r'(small)?money$', 'money_to_numeric'),
+    (r'(var)?binary\b|image$', 'hex_to_bytea'),
+]
+
 
 def to_snake_case(name):
     """Convert PascalCase/camelCase to snake_case. Already-lowercase names pass through."""
@@ -303,6 +443,7 @@ def parse_table_file(filepath):
             expr = convert_computed_column_expr(comp_match.group(2))
             columns.append({
                 'name': col_name,
+                'source_name': comp_match.group(1),
                 'computed': True,
                 'expression': expr
             })
@@ -367,6 +508,8 @@ def parse_table_file(filepath):
 
         columns.append({
             'name': col_name,
+            'source_name': col_match.group(1),
+            'source_type': type_str,
             'type': pg_type,
             'not_null': not_null,
             'nullable': nullable and not not_null,
@@ -383,8 +526,406 @@ def parse_table_file(filepath):
     }
 
 
-def generate_pg_ddl(table_info):
-    """Generate PostgreSQL CREATE TABLE DDL."""
+def load_table_sizes(csv_path=SIZE_CSV):
+    """
+    Read the SQL Server row-count/size assessment (TableName;RowCounts;DataSizeMB).
+    Returns {table_snake: {'rows': int, 'data_mb': float}}.
+    """
+    sizes = {}
+    with open(csv_path, 'r', encoding='utf-8-sig') as f:
+        for line in f:
+            parts = line.strip().split(';')
+            if len(parts) < 3 or parts[0] == 'TableName':
+                continue
+            try:
+                sizes[to_snake_case(parts[0])] = {
+                    'rows': int(parts[1]),
+                    'data_mb': float(parts[2])
+                }
+            except ValueError:
+                continue
+    return sizes
+
+
+def load_key_max(path):
+    """
+    Read current key maxima (SELECT MAX(id) / IDENT_CURRENT on the source):
+    JSON {table: value} for the identity column, or {table: {column: value}}.
+    Returns {table: {column or None: int}}.
+    """
+    with open(path, 'r') as f:
+        raw = json.load(f)
+    return {table: (dict(value) if isinstance(value, dict) else {None: value})
+            for table, value in raw.items()}
+
+
+def plan_bigint_columns(tables, sizes, key_max, fks):
+    """
+    INTEGER columns to widen to BIGINT: identity keys whose current maximum
+    (key_max, else at least the row count) passes BIGINT_KEY_FRACTION of
+    INT4_MAX, then every INTEGER FK column referencing a widened column,
+    transitively. Returns {table: {column: note}}.
+    """
+    widened = {}
+    for table, info in tables.items():
+        known = key_max.get(table, {})
+        rows = (sizes.get(table) or {}).get('rows', 0)
+        for col in info['columns']:
+            if not col.get('type', '').startswith("INTEGER GENERATED ALWAYS AS IDENTITY"):
+                continue
+            value = known.get(col['name'], known.get(None))
+            highest = max(int(value or 0), rows)
+            if highest >= INT4_MAX * BIGINT_KEY_FRACTION:
+                basis = f"max key {highest:,}" if value is not None and int(value) >= rows else f"{rows:,} rows"
+                widened.setdefault(table, {})[col['name']] = (
+                    f"{col['name']}: INTEGER → BIGINT ({basis}, {highest / INT4_MAX:.0%} of INTEGER range)")
+
+    integer_columns = {(t, c['name']) for t, info in tables.items() for c in info['columns']
+                       if c.get('type', '').split(' ')[0] == 'INTEGER'}
+    changed = True
+    while changed:
+        changed = False
+        for fk in fks:
+            child, parent = to_snake_case(fk['child_table']), to_snake_case(fk['parent_table'])
+            for child_col, parent_col in zip(fk['child_cols'], fk['parent_cols']):
+                if (parent_col not in widened.get(parent, {}) or child_col in widened.get(child, {})
+                        or (child, child_col) not in integer_columns):
+                    continue
+                widened.setdefault(child, {})[child_col] = (
+                    f"{child_col}: INTEGER → BIGINT (references {parent}.{parent_col}, widened)")
+                changed = True
+    return widened
+
+
+def physical_design(table_info, size, bigint=None):
+    """
+    Derive storage choices for a table from its source volume; `bigint` is its
+    entry from plan_bigint_columns.
+    Returns {'bigint_columns', 'lz4_columns', 'storage_params', 'notes'}.
+    """
+    design = {'bigint_columns': set(bigint or ()), 'lz4_columns': set(), 'storage_params': [],
+              'notes': list((bigint or {}).values())}
+    if not size:
+        return design
+    rows = size['rows']
+    table = table_info['table_snake']
+
+    # Large TOASTed payloads → lz4 (cheaper CPU than pglz at similar ratio)
+    if size['data_mb'] >= LZ4_TABLE_MB:
+        for col in table_info['columns']:
+            if col.get('type') in ('TEXT', 'BYTEA', 'XML'):
+                design['lz4_columns'].add(col['name'])
+
+    if table in UPDATE_HEAVY_TABLES and rows >= FILLFACTOR_MIN_ROWS:
+        design['storage_params'].append(f"fillfactor = {UPDATE_HEAVY_TABLES[table]}")
+
+    # Default scale factors (20% / 10%) mean vacuum waits for millions of dead tuples
+    if rows >= HUGE_TABLE_ROWS:
+        design['storage_params'] += [
+            "autovacuum_vacuum_scale_factor = 0.002",
+            "autovacuum_vacuum_insert_scale_factor = 0.002",
+            "autovacuum_analyze_scale_factor = 0.001",
+        ]
+    elif rows >= LARGE_TABLE_ROWS:
+        design['storage_params'] += [
+            "autovacuum_vacuum_scale_factor = 0.01",
+            "autovacuum_vacuum_insert_scale_factor = 0.01",
+            "autovacuum_analyze_scale_factor = 0.005",
+        ]
+
+    return design
+
+
+def load_partition_config(path=None):
+    """
+    Return PARTITION_CONFIG merged with an optional JSON override file; a
+    table of RANGE_PARTITION_TABLES named there starts from that spec.
+    """
+    config = {t: dict(spec) for t, spec in PARTITION_CONFIG.items()}
+    if path:
+        with open(path, 'r') as f:
+            for table, spec in json.load(f).items():
+                if spec is None:
+                    config.pop(table, None)
+                else:
+                    config[table] = {**(config.get(table) or RANGE_PARTITION_TABLES.get(table, {})), **spec}
+    return config
+
+
+def plan_partitions(table_info, spec):
+    """
+    Expand a partition spec into concrete child partitions.
+    Returns {'method', 'key', 'partitions': [{'name', 'bound'}], ...spec}.
+    Range bounds: 'bounds' (count - 1 inner bounds, e.g. key quantiles), or
+    an even split of the key range from 'min' and 'max' (or 'interval').
+    """
+    table = table_info['table_snake']
+    method = spec.get('method', 'hash').lower()
+    key = spec['key']
+    count = int(spec.get('partitions', 8))
+    column_names = {c['name'] for c in table_info['columns']}
+    if key not in column_names:
+        raise ValueError(f"partition key '{key}' is not a column of {table}")
+    if method not in ('hash', 'range'):
+        raise ValueError(f"unsupported partition method '{method}' for {table}")
+
+    width = len(str(count - 1))
+    partitions = []
+    if method == 'hash':
+        for i in range(count):
+            partitions.append({
+                'name': f"{table}_p{i:0{width}d}",
+                'bound': f"FOR VALUES WITH (MODULUS {count}, REMAINDER {i})"
+            })
+    else:
+        inner = spec.get('bounds')
+        if inner is None:
+            low = int(spec.get('min', 0))
+            interval = spec.get('interval')
+            if not interval:
+                if spec.get('max') is None:
+                    raise ValueError(f"range partitioning of {table} needs the key's 'min' and 'max' "
+                                     f"(SELECT MIN({key}), MAX({key})), an 'interval' or 'bounds'")
+                span = int(spec['max']) - low + 1
+                # Round up to two significant digits so bounds stay readable
+                step = -(-span // count)
+                magnitude = 10 ** max(len(str(step)) - 2, 0)
+                interval = -(-step // magnitude) * magnitude
+            inner = [low + int(interval) * i for i in range(1, count)]
+        if len(inner) != count - 1 or list(inner) != sorted(set(inner)):
+            raise ValueError(f"range partitioning of {table} needs {count - 1} increasing bounds")
+        bounds = ['MINVALUE'] + [str(b) for b in inner] + ['MAXVALUE']
+        for i in range(count):
+            partitions.append({
+                'name': f"{table}_p{i:0{width}d}",
+                'bound': f"FOR VALUES FROM ({bounds[i]}) TO ({bounds[i + 1]})"
+            })
+
+    return {**spec, 'method': method, 'key': key, 'partitions': partitions}
+
+
+def generate_partition_index_ddl(table_info, plan):
+    """
+    Generate PK/UNIQUE/index DDL for a partitioned table.
+
+    Each index is created ON ONLY the parent, built per partition (so the
+    partition builds can run in parallel sessions, CONCURRENTLY for plain
+    indexes) and then attached, which validates the parent index. Every
+    statement is idempotent and uses PostgreSQL's default partition index
+    names, so keys or indexes of the same name already created from
+    16.create-index / 17.create-constraint are adopted, not duplicated.
+    """
+    table = table_info['table_snake']
+    key = plan['key']
+    lines = []
+    lines.append(f"-- Partition indexes: perseus.{table}")
+    lines.append(f"-- Partitioning: {plan['method'].upper()} ({key}), {len(plan['partitions'])} partitions")
+    lines.append(f"-- Deploy after 17.create-constraint PRIMARY KEYs and before the FKs")
+    lines.append(f"-- (deploy-batch.sh --all does); best run after the data load. Supersedes")
+    lines.append(f"-- the PK/indexes for {table} in 17.create-constraint and 16.create-index.")
+    lines.append("")
+
+    def guarded(relation, name, body):
+        # ADD CONSTRAINT has no IF NOT EXISTS
+        return (f"DO $$ BEGIN IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conrelid = "
+                f"'perseus.{relation}'::regclass AND conname = '{name}') THEN "
+                f"ALTER TABLE {body}; END IF; END $$;")
+
+    def add_constraint(name, kind, cols):
+        col_list = ", ".join(cols)
+        lines.append(guarded(table, name, f"ONLY perseus.{table} ADD CONSTRAINT {name} {kind} ({col_list})"))
+        for part in plan['partitions']:
+            # PostgreSQL's default naming: <table>_pkey / <table>_<cols>_key
+            suffix = "pkey" if kind == "PRIMARY KEY" else f"{'_'.join(cols)}_key"
+            child = f"{part['name']}_{suffix}"
+            lines.append(guarded(part['name'], child,
+                                 f"perseus.{part['name']} ADD CONSTRAINT {child} {kind} ({col_list})"))
+            lines.append(f"ALTER INDEX perseus.{name} ATTACH PARTITION perseus.{child};")
+        lines.append("")
+
+    def add_index(name, cols):
+        col_list = ", ".join(cols)
+        lines.append(f"CREATE INDEX IF NOT EXISTS {name} ON ONLY perseus.{table} ({col_list});")
+        for part in plan['partitions']:
+            lines.append(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {part['name']}_{'_'.join(cols)}_idx "
+                         f"ON perseus.{part['name']} ({col_list});")
+            lines.append(f"ALTER INDEX perseus.{name} ATTACH PARTITION perseus.{part['name']}_{'_'.join(cols)}_idx;")
+        lines.append("")
+
+    if plan.get('primary_key'):
+        pk = list(plan['primary_key'])
+        if key not in pk:
+            pk.append(key)
+            lines.append(f"-- Partition key '{key}' appended: PRIMARY KEY must include it")
+        add_constraint(f"pk_{table}", "PRIMARY KEY", pk)
+
+    for cols in plan.get('unique', []):
+        if key not in cols:
+            # A plain index would silently drop the uniqueness guarantee
+            raise ValueError(f"UNIQUE ({', '.join(cols)}) on {table} cannot be enforced when "
+                             f"partitioning on '{key}'; choose a key it contains or do not partition {table}")
+        add_constraint(f"uq_{table}_{'_'.join(cols)}", "UNIQUE", cols)
+
+    for cols in plan.get('indexes', []):
+        add_index(f"idx_{table}_{'_'.join(cols)}", cols)
+
+    return "\n".join(lines)
+
+
+def is_volatile_expression(expr):
+    """True if a computed column expression cannot be GENERATED ... STORED."""
+    return bool(re.search(r'\bCURRENT_TIMESTAMP\b|\bnow\(\)', expr, re.IGNORECASE))
+
+
+def column_storage(col, bigint_columns=()):
+    """Return (typlen, typalign) of a column as generated; typlen -1 = varlena."""
+    if col.get('computed'):
+        pg_type = "TIMESTAMP" if is_volatile_expression(col['expression']) else "DOUBLE PRECISION"
+    else:
+        pg_type = col['type'].replace(" GENERATED ALWAYS AS IDENTITY", "")
+        if col['name'] in bigint_columns:
+            pg_type = pg_type.replace("INTEGER", "BIGINT", 1)
+    base = re.sub(r'\(.*', '', pg_type).strip()
+    return TYPE_STORAGE.get(base, (-1, 1))
+
+
+def alignment_padding(storage):
+    """
+    Expected inter-column padding (bytes) for a sequence of (typlen, typalign),
+    assuming non-null values. Short varlena values are unaligned, so after one
+    the offset is unknown and the next aligned column pays the average pad.
+    """
+    padding = 0.0
+    offset = 0
+    known = 8       # the data area starts MAXALIGNed
+    for length, align in storage:
+        if length < 0:
+            offset, known = 0, 1
+            continue
+        if align > known:
+            padding += (align - known) / 2
+            offset, known = 0, align
+        else:
+            pad = -offset % align
+            padding += pad
+            offset += pad
+        offset = (offset + length) % known
+    return padding
+
+
+def plan_column_layout(table_info, bigint_columns=(), row_count=None):
+    """
+    Order columns by alignment and width (8, 4, 2, 1-byte fixed, then
+    varlena), keeping source order within each group. Returns None when the
+    source order already has no avoidable padding, else
+    {'source_order', 'target_order', 'padding_before', 'padding_after',
+     'saved_per_row', 'rows', 'saved_bytes'}.
+    """
+    columns = table_info['columns']
+    storage = [column_storage(c, bigint_columns) for c in columns]
+
+    def rank(i):
+        length, align = storage[i]
+        return (1, 0) if length < 0 else (0, -align)
+
+    order = sorted(range(len(columns)), key=rank)
+    before = alignment_padding(storage)
+    after = alignment_padding([storage[i] for i in order])
+    if before - after <= 0:
+        return None
+
+    rows = row_count or 0
+    return {
+        'source_order': [c['name'] for c in columns],
+        'target_order': [columns[i]['name'] for i in order],
+        'padding_before': before,
+        'padding_after': after,
+        'saved_per_row': before - after,
+        'rows': rows,
+        'saved_bytes': int((before - after) * rows),
+    }
+
+
+def column_transform(source_type):
+    """Name of the COPY_TRANSFORMS entry for a SQL Server type, or None."""
+    t = re.sub(r'\s+identity.*', '', (source_type or '').strip().lower())
+    for pattern, name in SOURCE_TYPE_TRANSFORMS:
+        if re.match(pattern, t):
+            return name
+    return None
+
+
+def build_copy_manifest(table_info, bigint_columns=(), layout=None):
+    """
+    Describe how a bcp -c export of the table maps onto the PostgreSQL table:
+    fields in source order, target names/types, fields COPY cannot write
+    (GENERATED ... STORED columns) and per-column transforms.
+    """
+    table = table_info['table_snake']
+    fields = []
+    for position, col in enumerate(table_info['columns'], 1):
+        field = {
+            'position': position,
+            'source_name': col['source_name'],
+            'source_type': col.get('source_type'),
+            'target_name': col['name'],
+            'target_type': None,
+            'identity': "GENERATED ALWAYS AS IDENTITY" in col.get('type', ''),
+            'generated': False,
+            'skip': False,
+            'transform': None,
+        }
+        if col.get('computed'):
+            field['source_type'] = f"AS {col['expression']}"
+            if is_volatile_expression(col['expression']):
+                # Emitted as a plain TIMESTAMP column; keep the exported value
+                field['target_type'] = "TIMESTAMP"
+            else:
+                field['target_type'] = "DOUBLE PRECISION"
+                field['generated'] = True
+                field['skip'] = True
+        else:
+            pg_type = col['type'].replace(" GENERATED ALWAYS AS IDENTITY", "")
+            if col['name'] in bigint_columns:
+                pg_type = pg_type.replace("INTEGER", "BIGINT", 1)
+            field['target_type'] = pg_type
+            field['transform'] = column_transform(col.get('source_type'))
+        fields.append(field)
+
+    copy_columns = [f['target_name'] for f in fields if not f['skip']]
+    transforms = {f['target_name']: f['transform'] for f in fields if f['transform']}
+    # COPY keeps the source identity values (FKs point at them), so the
+    # identity sequence must be moved past them once the load is done
+    post_load = [
+        f"SELECT setval(pg_get_serial_sequence('perseus.{table}', '{f['target_name']}'), "
+        f"COALESCE(MAX({f['target_name']}), 0) + 1, false) FROM perseus.{table};"
+        for f in fields if f['identity']
+    ]
+    return {
+        'table': f"perseus.{table}",
+        'source': f"[{table_info['schema']}].[{table_info['table']}]",
+        'format': {'type': 'csv', 'delimiter': ',', 'header': False},
+        'column_order_differs': bool(layout),
+        'fields': fields,
+        'copy_columns': copy_columns,
+        'skip_positions': [f['position'] for f in fields if f['skip']],
+        'rewrite': {name: t for name, t in transforms.items() if not COPY_TRANSFORMS[t]['native']},
+        'transforms': {name: COPY_TRANSFORMS[t]['note'] for name, t in transforms.items()},
+        'copy_sql': (f"COPY perseus.{table} ({', '.join(copy_columns)}) FROM STDIN "
+                     f"WITH (FORMAT CSV, HEADER false, DELIMITER ',');"),
+        'post_load_sql': post_load,
+    }
+
+
+def generate_pg_ddl(table_info, sizes=None, partition=None, layout=None, bigint=None):
+    """
+    Generate PostgreSQL CREATE TABLE DDL.
+    With `sizes` (see load_table_sizes) storage options are chosen by volume,
+    and `bigint` (see plan_bigint_columns) widens INTEGER columns.
+    With `partition` (see plan_partitions) the table is declared partitioned
+    and its child partitions follow; storage parameters go on the children.
+    With `layout` (see plan_column_layout) columns follow its target order.
+    """
     schema = table_info['schema']
     table_snake = table_info['table_snake']
     columns = table_info['columns']
@@ -393,10 +934,25 @@ def generate_pg_ddl(table_info):
     if is_fdw:
         return generate_fdw_ddl(table_info)
 
+    size = (sizes or {}).get(table_snake)
+    design = physical_design(table_info, size, bigint)
+
     lines = []
     lines.append(f"-- Table: perseus.{table_snake}")
     lines.append(f"-- Source: SQL Server [{schema}].[{table_info['table']}]")
     lines.append(f"-- Columns: {len(columns)}")
+    if size:
+        lines.append(f"-- Source volume: {size['rows']:,} rows, {size['data_mb']:,.2f} MB")
+    for note in design['notes']:
+        lines.append(f"-- Storage: {note}")
+    if layout:
+        by_name = {c['name']: c for c in columns}
+        columns = [by_name[name] for name in layout['target_order']]
+        saved = f"{layout['saved_per_row']:g} bytes/row"
+        if layout['rows']:
+            saved += f", ~{layout['saved_bytes'] / 1048576:,.1f} MB over {layout['rows']:,} rows"
+        lines.append(f"-- Layout: columns reordered by alignment ({saved})")
+        lines.append(f"-- Layout: source column order is in {COLUMN_LAYOUT_MANIFEST}; COPY must list it")
     lines.append("")
     lines.append(f"CREATE TABLE IF NOT EXISTS perseus.{table_snake} (")
 
@@ -406,7 +962,7 @@ def generate_pg_ddl(table_info):
             expr = col['expression']
             # Check if expression uses volatile functions (CURRENT_TIMESTAMP, etc.)
             # PostgreSQL GENERATED ALWAYS AS ... STORED requires immutable expressions
-            if re.search(r'\bCURRENT_TIMESTAMP\b|\bnow\(\)', expr, re.IGNORECASE):
+            if is_volatile_expression(expr):
                 col_lines.append(f"    -- NOTE: Computed column uses volatile function, cannot be GENERATED STORED")
                 col_lines.append(f"    -- Original expression: {expr}")
                 col_lines.append(f"    -- Consider using a trigger or view to compute this value")
@@ -415,7 +971,12 @@ def generate_pg_ddl(table_info):
                 col_lines.append(f"    {col['name']} DOUBLE PRECISION GENERATED ALWAYS AS ({expr}) STORED")
             continue
 
-        parts = [f"    {col['name']}", col['type']]
+        pg_type = col['type']
+        if col['name'] in design['bigint_columns']:
+            pg_type = pg_type.replace("INTEGER", "BIGINT", 1)
+        parts = [f"    {col['name']}", pg_type]
+        if col['name'] in design['lz4_columns']:
+            parts.append("COMPRESSION lz4")
 
         if col.get('not_null') and "GENERATED ALWAYS AS IDENTITY" not in col['type']:
             parts.append("NOT NULL")
@@ -435,7 +996,19 @@ def generate_pg_ddl(table_info):
         col_lines.append(" ".join(parts))
 
     lines.append(",\n".join(col_lines))
-    lines.append(");")
+    with_clause = f" WITH ({', '.join(design['storage_params'])})" if design['storage_params'] else ""
+    if partition:
+        lines.append(f") PARTITION BY {partition['method'].upper()} ({partition['key']});")
+        lines.append("")
+        lines.append(f"-- Partitions: {len(partition['partitions'])} ({partition['method']} on {partition['key']})")
+        for part in partition['partitions']:
+            lines.append(f"CREATE TABLE IF NOT EXISTS perseus.{part['name']}")
+            lines.append(f"    PARTITION OF perseus.{table_snake} {part['bound']}{with_clause};")
+    elif with_clause:
+        lines.append(")")
+        lines.append(f"{with_clause.strip()};")
+    else:
+        lines.append(");")
     lines.append("")
 
     return "\n".join(lines)
@@ -486,58 +1059,363 @@ def generate_fdw_ddl(table_info):
     return "\n".join(lines)
 
 
-def main():
-    source_dir = SOURCE_DIR
-    target_dir = TARGET_DIR
+def sha256_file(path):
+    """Return the hex SHA-256 of a file's bytes."""
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+def converter_fingerprint(settings=None):
+    """
+    Identify the conversion rules: CONVERTER_VERSION plus a hash of this module
+    and of any run settings that change the generated DDL.
+    """
+    fingerprint = f"{CONVERTER_VERSION}+{sha256_file(os.path.abspath(__file__))[:12]}"
+    if settings:
+        blob = json.dumps(settings, sort_keys=True).encode('utf-8')
+        fingerprint += f"+{hashlib.sha256(blob).hexdigest()[:12]}"
+    return fingerprint
+
+
+def load_manifest(path, fingerprint):
+    """Load the incremental manifest; entries from other converter versions are dropped."""
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, 'r') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if manifest.get('converter_version') != fingerprint:
+        return {}
+    return manifest.get('tables', {})
+
+
+def load_generated_hashes(path):
+    """
+    Map output path -> SHA-256 of what the last run generated, from the
+    manifest at `path` whatever converter version wrote it.
+    """
+    try:
+        with open(path, 'r') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    generated = {}
+    for entry in manifest.get('tables', {}).values():
+        generated.update(entry.get('outputs', {}))
+    return generated
+
+
+def is_up_to_date(entry, source_hash, target_dir):
+    """True if a manifest entry matches the source hash and all its outputs are intact."""
+    if not entry or entry.get('source_sha256') != source_hash:
+        return False
+    for rel_path, digest in entry.get('outputs', {}).items():
+        out_path = os.path.join(target_dir, rel_path)
+        if not os.path.exists(out_path) or sha256_file(out_path) != digest:
+            return False
+    return bool(entry.get('outputs'))
+
+
+def write_if_changed(path, content, generated_hash=None, overwrite=False):
+    """
+    Write `content` unless the file already holds it. Returns True if written,
+    False if unchanged, None if kept: an existing file whose hash is not
+    `generated_hash` (edited since this tool wrote it) is only replaced when
+    `overwrite` is set.
+    """
+    if os.path.exists(path):
+        with open(path, 'r') as f:
+            if f.read() == content:
+                return False
+        if not overwrite and sha256_file(path) != generated_hash:
+            return None
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        f.write(content)
+    return True
+
+
+def convert_file(filepath, target_dir, options=None):
+    """
+    Convert one SQL Server table file and write its PostgreSQL DDL.
+    Runs in worker processes, so it returns plain dicts and never raises.
+    `options` carries run-wide settings ('sizes' for --size-aware, 'bigint'
+    from plan_bigint_columns, 'partitions' for --partition, 'layout' and
+    'row_counts' for --optimize-layout, 'generated' and 'overwrite' for the
+    hand-edit guard, 'manifests_only' to write the copy manifest without DDL).
+    """
+    options = options or {}
+    filename = os.path.basename(filepath)
+    try:
+        info = parse_table_file(filepath)
+        if info is None:
+            return {'source': filename, 'error': f"SKIP: {filename} - could not parse"}
+
+        table = info['table_snake']
+        spec = (options.get('partitions') or {}).get(table)
+        plan = None
+        if spec and not info['is_fdw']:
+            plan = plan_partitions(info, spec)
+        bigint = (options.get('bigint') or {}).get(table)
+        bigint_columns = set(bigint or ())
+        layout = None
+        if options.get('layout') and not info['is_fdw']:
+            layout = plan_column_layout(info, bigint_columns, (options.get('row_counts') or {}).get(table))
+
+        outputs = {}
+
+        # Determine output filename
+        if info['is_fdw']:
+            out_name = f"{info['schema']}_{table}.sql"
+        else:
+            out_name = f"{table}.sql"
+        if not options.get('manifests_only'):
+            outputs[out_name] = generate_pg_ddl(info, options.get('sizes'), plan, layout, bigint)
+            if plan:
+                outputs[os.path.join(PARTITION_INDEX_DIR, out_name)] = generate_partition_index_ddl(info, plan)
+        if not info['is_fdw']:
+            copy_manifest = build_copy_manifest(info, bigint_columns, layout)
+            outputs[os.path.join(COPY_MANIFEST_DIR, f"{table}.json")] = \
+                json.dumps(copy_manifest, indent=2) + "\n"
+
+        # Only touch outputs whose content actually changes; keep hand-edited DDL
+        # (the JSON manifests are machine-read and always regenerated)
+        written = False
+        kept = []
+        generated = options.get('generated') or {}
+        for rel_path, content in outputs.items():
+            overwrite = options.get('overwrite', False) or not rel_path.endswith('.sql')
+            status = write_if_changed(os.path.join(target_dir, rel_path), content,
+                                      generated.get(rel_path), overwrite)
+            if status is None:
+                kept.append(rel_path)
+            written = bool(status) or written
+
+        result = {
+            'source': filename,
+            'output': out_name,
+            'schema': info['schema'],
+            'table': info['table'],
+            'table_pg': table,
+            'columns': len(info['columns']),
+            'is_fdw': info['is_fdw']
+        }
+        if plan:
+            result['partitioning'] = {
+                'method': plan['method'],
+                'key': plan['key'],
+                'partitions': [p['name'] for p in plan['partitions']]
+            }
+        if layout:
+            result['layout'] = layout
+
+        return {
+            'source': filename,
+            'written': written,
+            'kept': kept,
+            'outputs': {rel: hashlib.sha256(c.encode('utf-8')).hexdigest() for rel, c in outputs.items()},
+            'result': result
+        }
+
+    except Exception as e:
+        return {'source': filename, 'error': f"ERROR: {filename} - {str(e)}"}
+
+
+def write_partition_load_manifest(path, results):
+    """
+    Describe partitioned tables for load-data.sh: COPY goes to the parent
+    (tuple routing) split across `parallel_streams` concurrent sessions.
+    """
+    tables = {}
+    for r in results:
+        part = r.get('partitioning')
+        if not part:
+            continue
+        tables[r['table_pg']] = {
+            'copy_target': f"perseus.{r['table_pg']}",
+            'method': part['method'],
+            'key': part['key'],
+            'parallel_streams': len(part['partitions']),
+            'partitions': [f"perseus.{name}" for name in part['partitions']]
+        }
+    with open(path, 'w') as f:
+        json.dump({'tables': tables}, f, indent=2, sort_keys=True)
+    return tables
+
+
+def write_column_layout_manifest(path, results):
+    """
+    Record source (bcp) vs. table column order for reordered tables so the
+    loader can COPY with an explicit column list in source order.
+    """
+    tables = {}
+    for r in results:
+        layout = r.get('layout')
+        if not layout:
+            continue
+        tables[r['table_pg']] = {
+            'copy_columns': layout['source_order'],
+            'table_columns': layout['target_order'],
+            'saved_per_row': layout['saved_per_row'],
+            'saved_bytes': layout['saved_bytes'],
+        }
+    with open(path, 'w') as f:
+        json.dump({'tables': tables}, f, indent=2, sort_keys=True)
+    return tables
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Convert SQL Server table DDL to PostgreSQL 17 (incremental, optionally parallel).")
+    parser.add_argument('--source-dir', default=SOURCE_DIR,
+                        help="SQL Server CREATE TABLE files (default: %(default)s)")
+    parser.add_argument('--target-dir', default=TARGET_DIR,
+                        help="Output directory for PostgreSQL DDL (default: %(default)s)")
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help="Worker processes; 0 = one per CPU (default: 1, serial)")
+    parser.add_argument('--force', action='store_true',
+                        help="Ignore the manifest and reconvert every table")
+    parser.add_argument('--overwrite', action='store_true',
+                        help="Replace outputs that differ from what the last run generated "
+                             "(hand edits are lost)")
+    parser.add_argument('--manifests-only', action='store_true',
+                        help=f"Write only {COPY_MANIFEST_DIR}/ (plus {PARTITION_LOAD_MANIFEST} / "
+                             f"{COLUMN_LAYOUT_MANIFEST} with --partition / --optimize-layout); "
+                             "no DDL, no incremental manifest")
+    parser.add_argument('--manifest',
+                        help=f"Incremental manifest path (default: <target-dir>/{MANIFEST_NAME})")
+    parser.add_argument('--results',
+                        help=f"Results JSON path (default: <target-dir>/{RESULTS_NAME})")
+    parser.add_argument('--size-aware', action='store_true',
+                        help="Choose BIGINT keys, fillfactor, lz4 TOAST and autovacuum settings "
+                             "from source row counts")
+    parser.add_argument('--size-csv', default=SIZE_CSV,
+                        help="Row count / size assessment CSV for --size-aware and "
+                             "--optimize-layout (default: %(default)s)")
+    parser.add_argument('--key-max',
+                        help="JSON of current key maxima from the source ({table: MAX(id) or IDENT_CURRENT} "
+                             "or {table: {column: max}}): INTEGER identity keys past "
+                             f"{BIGINT_KEY_FRACTION:.0%} of the INTEGER range become BIGINT, with their FK columns")
+    parser.add_argument('--fk-ddl', default=SQLSERVER_FK_DIR,
+                        help="SQL Server FK DDL used to widen referencing columns (default: %(default)s)")
+    parser.add_argument('--partition', action='store_true',
+                        help="Emit declarative partitioning for the tables in PARTITION_CONFIG "
+                             f"plus {PARTITION_INDEX_DIR}/ index DDL and {PARTITION_LOAD_MANIFEST}")
+    parser.add_argument('--partition-config',
+                        help="JSON overrides for PARTITION_CONFIG ({table: {method, key, partitions, "
+                             "min, max, ...}}); RANGE_PARTITION_TABLES (history_value, robot_log) are "
+                             "partitioned when named here with their key's min/max")
+    parser.add_argument('--optimize-layout', action='store_true',
+                        help="Reorder columns to minimize alignment padding and write "
+                             f"{COLUMN_LAYOUT_MANIFEST} with the source column order for COPY")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    source_dir = args.source_dir
+    target_dir = args.target_dir
+    manifest_path = args.manifest or os.path.join(target_dir, MANIFEST_NAME)
+    results_path = args.results or os.path.join(target_dir, RESULTS_NAME)
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
 
     os.makedirs(target_dir, exist_ok=True)
 
     # Process all SQL files
     files = sorted([f for f in os.listdir(source_dir) if f.endswith('.sql')])
 
+    options = {}
+    settings = {}
+    if args.size_aware:
+        options['sizes'] = load_table_sizes(args.size_csv)
+        settings['size_csv_sha256'] = sha256_file(args.size_csv)
+    if args.partition or args.partition_config:
+        options['partitions'] = load_partition_config(args.partition_config)
+        settings['partitions'] = options['partitions']
+    if args.size_aware or args.key_max:
+        key_max = load_key_max(args.key_max) if args.key_max else {}
+        # A range partition's 'max' is the same SELECT MAX(key)
+        for table, spec in (options.get('partitions') or {}).items():
+            if spec.get('method') == 'range' and spec.get('max') is not None:
+                key_max.setdefault(table, {}).setdefault(spec['key'], spec['max'])
+        tables = {}
+        for filename in files:
+            try:
+                info = parse_table_file(os.path.join(source_dir, filename))
+            except Exception:
+                continue                    # reported by convert_file
+            if info and not info['is_fdw']:
+                tables[info['table_snake']] = info
+        options['bigint'] = plan_bigint_columns(tables, options.get('sizes') or {}, key_max,
+                                                load_fk_constraints(args.fk_ddl))
+        settings['bigint'] = {t: sorted(cols) for t, cols in options['bigint'].items()}
+    if args.optimize_layout:
+        options['layout'] = True
+        options['row_counts'] = {t: v['rows'] for t, v in load_table_sizes(args.size_csv).items()}
+        settings['layout'] = True
+        settings['size_csv_sha256'] = sha256_file(args.size_csv)
+
+    fingerprint = converter_fingerprint(settings)
+    # --manifests-only always regenerates and leaves the DDL manifest alone, so a
+    # later full run still knows which DDL it generated
+    options['manifests_only'] = args.manifests_only
+    previous = {} if args.force or args.manifests_only else load_manifest(manifest_path, fingerprint)
+    options['generated'] = load_generated_hashes(manifest_path)
+    options['overwrite'] = args.overwrite
+
     results = []
     errors = []
+    manifest = {}
+    pending = []
+    source_hashes = {}
+    skipped = 0
 
     for filename in files:
-        filepath = os.path.join(source_dir, filename)
-
-        try:
-            info = parse_table_file(filepath)
-            if info is None:
-                errors.append(f"SKIP: {filename} - could not parse")
-                continue
-
-            ddl = generate_pg_ddl(info)
-
-            # Determine output filename
-            if info['is_fdw']:
-                out_name = f"{info['schema']}_{info['table_snake']}.sql"
-            else:
-                out_name = f"{info['table_snake']}.sql"
-
-            out_path = os.path.join(target_dir, out_name)
-            with open(out_path, 'w') as f:
-                f.write(ddl)
-
-            orig_col_count = len(info['columns'])
-            results.append({
-                'source': filename,
-                'output': out_name,
-                'schema': info['schema'],
-                'table': info['table'],
-                'table_pg': info['table_snake'],
-                'columns': orig_col_count,
-                'is_fdw': info['is_fdw']
-            })
-
-        except Exception as e:
-            errors.append(f"ERROR: {filename} - {str(e)}")
+        source_hash = sha256_file(os.path.join(source_dir, filename))
+        source_hashes[filename] = source_hash
+        entry = previous.get(filename)
+        if is_up_to_date(entry, source_hash, target_dir):
+            manifest[filename] = entry
+            results.append(entry['result'])
+            skipped += 1
+        else:
+            pending.append(filename)
+
+    paths = [os.path.join(source_dir, f) for f in pending]
+    if jobs > 1 and len(paths) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            outcomes = list(pool.map(convert_file, paths, [target_dir] * len(paths),
+                                     [options] * len(paths)))
+    else:
+        outcomes = [convert_file(p, target_dir, options) for p in paths]
+
+    written = 0
+    kept = []
+    for outcome in outcomes:
+        if 'error' in outcome:
+            errors.append(outcome['error'])
+            continue
+        written += 1 if outcome['written'] else 0
+        kept.extend(outcome['kept'])
+        results.append(outcome['result'])
+        manifest[outcome['source']] = {
+            'source_sha256': source_hashes[outcome['source']],
+            'outputs': outcome['outputs'],
+            'result': outcome['result']
+        }
 
     # Print summary
     print(f"\n{'='*60}")
     print(f"CONVERSION COMPLETE")
     print(f"{'='*60}")
     print(f"Tables converted: {len(results)}")
+    print(f"  Unchanged (skipped): {skipped}")
+    print(f"  Reconverted: {len(pending) - len(errors)} ({written} written, jobs={jobs})")
     print(f"Errors: {len(errors)}")
 
     dbo_count = sum(1 for r in results if not r['is_fdw'])
@@ -545,6 +1423,11 @@ def main():
     print(f"  DBO tables: {dbo_count}")
     print(f"  FDW tables: {fdw_count}")
 
+    if kept:
+        print(f"\nKEPT (differs from the last generated output; --overwrite replaces): {len(kept)}")
+        for rel_path in sorted(kept):
+            print(f"  {rel_path}")
+
     if errors:
         print(f"\nERRORS:")
         for e in errors:
@@ -564,8 +1447,29 @@ def main():
     print(f"{'-'*45} {'-'*5}")
     print(f"{'TOTAL':<45} {total_cols:>5}")
 
+    # Save manifest for incremental reruns
+    if not args.manifests_only:
+        with open(manifest_path, 'w') as f:
+            json.dump({'converter_version': fingerprint, 'tables': manifest}, f, indent=2, sort_keys=True)
+
+    if options.get('partitions'):
+        partitioned = write_partition_load_manifest(
+            os.path.join(target_dir, PARTITION_LOAD_MANIFEST), results)
+        print(f"\nPartitioned tables: {len(partitioned)} "
+              f"({', '.join(sorted(partitioned)) or 'none'})")
+
+    if options.get('layout'):
+        reordered = write_column_layout_manifest(
+            os.path.join(target_dir, COLUMN_LAYOUT_MANIFEST), results)
+        saved = sum(t['saved_bytes'] for t in reordered.values())
+        print(f"\nLayout: {len(reordered)} tables reordered, "
+              f"~{saved / 1048576:,.1f} MB of alignment padding saved")
+        for table, t in sorted(reordered.items(), key=lambda kv: -kv[1]['saved_bytes'])[:10]:
+            print(f"  {table:<43} {t['saved_per_row']:>5g} B/row  {t['saved_bytes'] / 1048576:>10,.1f} MB")
+
     # Save results as JSON for report generation
-    with open('table_conversion_results.json', 'w') as f:
+    results.sort(key=lambda r: r['source'])
+    with open(results_path, 'w') as f:
         json.dump({'results': results, 'errors': errors}, f, indent=2)
 
     return len(errors)
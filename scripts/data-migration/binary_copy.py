@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+"""
+bcp → Binary COPY Writer - convert a bcp -c export into PostgreSQL binary COPY
+
+With FORMAT CSV the server parses every timestamp, numeric and integer from
+text; on narrow, hot tables (fatsmurf_reading, poll_history,
+robot_log_container_sequence) that parsing is a large share of the COPY CPU.
+This stage does the conversion on the client instead: records are read and
+validated exactly as transcode_csv.py does (same manifests, rejects, NUL /
+encoding / delimiter repairs), then each value is written in the type's
+binary send format, using the column types of the refactored DDL
+(14.create-table):
+
+- SMALLINT / INTEGER / BIGINT → int2 / int4 / int8 (out of range → reject)
+- REAL / DOUBLE PRECISION → float4 / float8; NUMERIC → base-10000 digits
+  with the scale of the source text
+- TIMESTAMP / TIMESTAMPTZ / DATE → microseconds / days since 2000-01-01;
+  TIMESTAMPTZ values without an offset are read in --timezone (the server's
+  TimeZone in the text path)
+- BOOLEAN, UUID, BYTEA (hex) and text types (UTF-8, VARCHAR(n) checked)
+
+Load the output with `COPY ... (cols) FROM STDIN WITH (FORMAT binary)`
+(load-data.sh / pg_loader.py --binary TABLES). Types without a binary
+encoding here (MONEY, JSON, INTERVAL, ...) make the table ineligible:
+--check reports them and the loaders fall back to CSV.
+
+Usage:
+    python3 scripts/data-migration/binary_copy.py CSV --table poll_history > poll_history.bin
+    python3 scripts/data-migration/binary_copy.py CSV --byte-range 0:1048576 --rejects R
+    python3 scripts/data-migration/binary_copy.py CSV --split 4 --output-dir DIR
+    python3 scripts/data-migration/binary_copy.py --check --table fatsmurf_reading
+
+Output columns are the manifest's copy_columns in order. --split deals
+records round-robin into DIR/part-0..N-1, each a complete binary COPY
+stream; --byte-range and rejects work as in transcode_csv.py.
+
+Exit Codes:
+    0 - File converted (or --check: every column has a binary encoding)
+    2 - Invalid arguments / unknown table / unsupported column type / unreadable input /
+        any other failure
+    3 - Some records rejected (see *.rejects); every other record was written
+
+Author: Pierre Ribeiro (DBA/DBRE)
+Created: 2026-10-19
+Version: 1.0
+"""
+
+import argparse
+import json
+import os
+import struct
+import sys
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal, InvalidOperation
+from typing import Callable, List, Optional, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SCRIPTS_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from schema_model import PGSQL_TABLE_DIR, load_model  # noqa: E402
+from transcode_csv import (DEFAULT_FALLBACK_ENCODING, DEFAULT_MANIFEST_DIR, EXIT_REJECTS, TEXT_TYPES,  # noqa: E402
+                           Reject, Transcoder, _base_type, make_converter, parse_byte_range,
+                           read_range, table_from_path, table_spec)
+
+# ============================================================================
+# CONSTANTS
+# ============================================================================
+
+DEFAULT_TIMEZONE = os.environ.get('PGTZ', 'UTC')
+COPY_HEADER = b'PGCOPY\n\xff\r\n\x00' + struct.pack('>ii', 0, 0)   # signature, flags, no extension
+COPY_TRAILER = struct.pack('>h', -1)
+NULL_FIELD = struct.pack('>i', -1)
+PG_EPOCH = datetime(2000, 1, 1)
+PG_EPOCH_TZ = datetime(2000, 1, 1, tzinfo=timezone.utc)
+PG_EPOCH_DATE = date(2000, 1, 1)
+MICROSECOND = timedelta(microseconds=1)
+NUMERIC_POS, NUMERIC_NEG, NUMERIC_NAN = 0x0000, 0x4000, 0xC000
+
+INTEGER_FORMATS = {'SMALLINT': 'h', 'INT2': 'h', 'INTEGER': 'i', 'INT': 'i', 'INT4': 'i',
+                   'BIGINT': 'q', 'INT8': 'q'}
+FLOAT_FORMATS = {'REAL': 'f', 'FLOAT4': 'f', 'DOUBLE PRECISION': 'd', 'FLOAT': 'd', 'FLOAT8': 'd'}
+TIMESTAMP_TYPES = ('TIMESTAMP', 'TIMESTAMP WITHOUT TIME ZONE')
+TIMESTAMPTZ_TYPES = ('TIMESTAMPTZ', 'TIMESTAMP WITH TIME ZONE')
+
+
+# ============================================================================
+# BINARY ENCODING
+# ============================================================================
+
+def encode_numeric(text: str) -> bytes:
+    """numeric_send: ndigits, weight, sign, dscale, then base-10000 digits."""
+    try:
+        value = Decimal(text)
+    except InvalidOperation:
+        raise Reject(f"not a number: {text!r}") from None
+    if value.is_nan():
+        return struct.pack('>hhHh', 0, 0, NUMERIC_NAN, 0)
+    if value.is_infinite():
+        raise Reject(f"not a finite number: {text!r}")
+    sign = NUMERIC_NEG if value.is_signed() and value != 0 else NUMERIC_POS
+    integer, _, fraction = format(abs(value), 'f').partition('.')
+    dscale = len(fraction)
+    integer = integer.lstrip('0')
+    integer = integer.zfill(-(-len(integer) // 4) * 4)
+    fraction = fraction.ljust(-(-len(fraction) // 4) * 4, '0')
+    digits = [int(integer[i:i + 4]) for i in range(0, len(integer), 4)] + \
+             [int(fraction[i:i + 4]) for i in range(0, len(fraction), 4)]
+    weight = len(integer) // 4 - 1
+    while digits and digits[0] == 0:
+        digits.pop(0)
+        weight -= 1
+    while digits and digits[-1] == 0:
+        digits.pop()
+    if not digits:
+        weight = 0
+    return struct.pack(f'>hhHh{len(digits)}h', len(digits), weight, sign, dscale, *digits)
+
+
+def make_encoder(pg_type: str, transform: Optional[str], zone) -> Callable[[str], bytes]:
+    """
+    Return value → binary field (raises Reject) for one column: the text
+    converter of transcode_csv.py followed by the type's send format.
+    Raises ValueError for types without a binary encoding here.
+    """
+    base = _base_type(pg_type)
+    convert = make_converter(pg_type, transform) or (lambda v: v)
+
+    if transform == 'hex_to_bytea' or base == 'BYTEA':
+        def bytea(v):
+            try:
+                return bytes.fromhex(convert(v)[2:])
+            except ValueError:
+                raise Reject(f"odd-length hex: {v[:40]!r}") from None
+        return bytea
+    if base == 'BOOLEAN':
+        return lambda v: b'\x01' if convert(v) == 't' else b'\x00'
+    if base in INTEGER_FORMATS:
+        packer = struct.Struct('>' + INTEGER_FORMATS[base]).pack
+
+        def integer(v):
+            try:
+                return packer(int(convert(v)))
+            except struct.error:
+                raise Reject(f"out of range for {base}: {v.strip()!r}") from None
+        return integer
+    if base in FLOAT_FORMATS:
+        packer = struct.Struct('>' + FLOAT_FORMATS[base]).pack
+
+        def floating(v):
+            try:
+                return packer(float(convert(v)))
+            except (OverflowError, struct.error):
+                raise Reject(f"out of range for {base}: {v.strip()!r}") from None
+        return floating
+    if base in ('NUMERIC', 'DECIMAL'):
+        return lambda v: encode_numeric(convert(v))
+    if base in TIMESTAMP_TYPES:
+        def timestamp(v):
+            dt = datetime.fromisoformat(convert(v)).replace(tzinfo=None)
+            return struct.pack('>q', (dt - PG_EPOCH) // MICROSECOND)
+        return timestamp
+    if base in TIMESTAMPTZ_TYPES:
+        def timestamptz(v):
+            dt = datetime.fromisoformat(convert(v))
+            if dt.tzinfo is None:
+                dt = dt.replace(tzinfo=zone)
+            return struct.pack('>q', (dt - PG_EPOCH_TZ) // MICROSECOND)
+        return timestamptz
+    if base == 'DATE':
+        return lambda v: struct.pack('>i', (date.fromisoformat(convert(v)) - PG_EPOCH_DATE).days)
+    if base == 'UUID':
+        return lambda v: uuid.UUID(convert(v)).bytes
+    if base in TEXT_TYPES:
+        return lambda v: convert(v).encode('utf-8')
+    raise ValueError(f"no binary COPY encoding for type {pg_type}")
+
+
+def unsupported_columns(fields: List[dict]) -> List[str]:
+    """'name TYPE' of every loaded column without a binary encoding."""
+    missing = []
+    for fld in fields:
+        if fld['skip']:
+            continue
+        try:
+            make_encoder(fld['type'], fld['transform'], timezone.utc)
+        except ValueError:
+            missing.append(f"{fld['name']} {fld['type']}")
+    return missing
+
+
+def binary_tuple(values: List[Optional[bytes]]) -> bytes:
+    parts = [struct.pack('>h', len(values))]
+    for v in values:
+        if v is None:
+            parts.append(NULL_FIELD)
+        else:
+            parts.append(struct.pack('>i', len(v)))
+            parts.append(v)
+    return b''.join(parts)
+
+
+# ============================================================================
+# STREAMING
+# ============================================================================
+
+class BinaryTranscoder(Transcoder):
+    """Transcoder whose converters produce binary fields instead of CSV text."""
+
+    def __init__(self, fields: List[dict], delimiter: str = ',',
+                 fallback_encoding: str = DEFAULT_FALLBACK_ENCODING, zone=timezone.utc):
+        super().__init__(fields, delimiter, fallback_encoding)
+        self.converters = [None if f['skip'] else self._guard(make_encoder(f['type'], f['transform'], zone))
+                           for f in fields]
+
+    @staticmethod
+    def _guard(encode):
+        """Any conversion error is a Reject, so delimiter repair and rejects still apply."""
+        def guarded(v):
+            try:
+                return encode(v)
+            except Reject:
+                raise
+            except (ValueError, OverflowError) as e:
+                raise Reject(str(e)) from None
+        return guarded
+
+
+def convert_file(csv_path: str, output: Optional[str], table: Optional[str], split: int,
+                 manifest_dir: str, delimiter: str, fallback_encoding: str, zone,
+                 byte_range: Tuple[int, Optional[int]] = (0, None),
+                 reject_path: Optional[str] = None) -> dict:
+    """Write one file as binary COPY to `output` (file, directory for --split, or None = stdout)."""
+    table = table or table_from_path(csv_path)
+    if not table:
+        raise KeyError(f"cannot tell the table from {os.path.basename(csv_path)} (use --table)")
+    fields = table_spec(table, load_model([PGSQL_TABLE_DIR]), manifest_dir)
+    coder = BinaryTranscoder(fields, delimiter, fallback_encoding, zone)
+
+    if split > 1:
+        os.makedirs(output, exist_ok=True)
+        outs = [open(os.path.join(output, f"part-{i}"), 'wb') for i in range(split)]
+        reject_path = reject_path or os.path.join(output, 'rejects')
+    elif output:
+        outs = [open(output, 'wb')]
+        reject_path = reject_path or output + '.rejects'
+    else:
+        outs = [sys.stdout.buffer]
+        reject_path = reject_path or csv_path + '.rejects'
+
+    try:
+        for out in outs:
+            out.write(COPY_HEADER)
+        with open(csv_path, 'rb') as src, open(reject_path, 'w', encoding='utf-8') as rejects:
+            for n, record in enumerate(coder.records(read_range(src, *byte_range), rejects)):
+                outs[n % len(outs)].write(binary_tuple(record))
+                coder.stats['written'] += 1
+        for out in outs:
+            out.write(COPY_TRAILER)
+    finally:
+        for out in outs:
+            if out is sys.stdout.buffer:
+                out.flush()
+            else:
+                out.close()
+    if coder.stats['rejected'] == 0:
+        os.remove(reject_path)
+        reject_path = None
+    return {'table': table, 'input': csv_path, 'output': output, 'rejects': reject_path, **coder.stats}
+
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Convert a bcp -c CSV export into PostgreSQL binary COPY.")
+    parser.add_argument('csv', nargs='?', help="bcp CSV file (/dev/stdin for a decompressed stream)")
+    parser.add_argument('-o', '--output', help="Output file (default: stdout)")
+    parser.add_argument('--output-dir', help="Directory for --split part files")
+    parser.add_argument('--table', help="Target table when the file name is not ##perseus_tier_N_<table>.csv")
+    parser.add_argument('--split', type=int, default=1,
+                        help="Deal records round-robin into N binary COPY files in --output-dir")
+    parser.add_argument('--manifest-dir', default=DEFAULT_MANIFEST_DIR,
+                        help="copy-manifests directory from convert_tables.py (default: %(default)s)")
+    parser.add_argument('--delimiter', default=',', help="bcp field terminator (default: ',')")
+    parser.add_argument('--fallback-encoding', default=DEFAULT_FALLBACK_ENCODING,
+                        help="Decoding for values that are not valid UTF-8 (default: %(default)s)")
+    parser.add_argument('--timezone', default=DEFAULT_TIMEZONE,
+                        help="Zone of TIMESTAMPTZ values without an offset (default: PGTZ or %(default)s)")
+    parser.add_argument('--byte-range', metavar='OFFSET:LENGTH',
+                        help="Only convert LENGTH bytes from OFFSET (one chunk)")
+    parser.add_argument('--rejects', help="Rejects file (default: <output>.rejects, or <csv>.rejects on stdout)")
+    parser.add_argument('--check', action='store_true',
+                        help="Only check that every column of --table has a binary encoding")
+    parser.add_argument('--summary', help="Write statistics as JSON to this file")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    if args.check:
+        if not args.table:
+            print("ERROR: --check needs --table", file=sys.stderr)
+            return 2
+        try:
+            missing = unsupported_columns(table_spec(args.table, load_model([PGSQL_TABLE_DIR]), args.manifest_dir))
+        except KeyError as e:
+            print(f"ERROR: {e}", file=sys.stderr)
+            return 2
+        if missing:
+            print(f"ERROR: {args.table}: no binary encoding for {', '.join(missing)}", file=sys.stderr)
+            return 2
+        return 0
+    if not args.csv:
+        print("ERROR: a CSV file is required (or --check --table T)", file=sys.stderr)
+        return 2
+    if args.split > 1 and not args.output_dir:
+        print("ERROR: --split needs --output-dir", file=sys.stderr)
+        return 2
+    try:
+        byte_range = parse_byte_range(args.byte_range)
+    except ValueError:
+        print(f"ERROR: --byte-range must be OFFSET:LENGTH, got {args.byte_range!r}", file=sys.stderr)
+        return 2
+    try:
+        zone = ZoneInfo(args.timezone)
+    except (ZoneInfoNotFoundError, ValueError):
+        print(f"ERROR: unknown --timezone {args.timezone!r}", file=sys.stderr)
+        return 2
+
+    output = args.output_dir if args.split > 1 else args.output
+    try:
+        r = convert_file(args.csv, output, args.table, args.split, args.manifest_dir, args.delimiter,
+                         args.fallback_encoding, zone, byte_range, args.rejects)
+    except (KeyError, ValueError, OSError) as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 2
+    except Exception as e:
+        print(f"ERROR: {type(e).__name__}: {e}", file=sys.stderr)
+        return 2
+
+    print(f"{r['table']}: {r['written']:,}/{r['records']:,} records as binary COPY, {r['rejected']:,} rejected, "
+          f"{r['merged_lines']:,} newline merges, {r['repaired_delimiters']:,} delimiter repairs", file=sys.stderr)
+    if r['rejects']:
+        print(f"  rejects: {r['rejects']}", file=sys.stderr)
+    if args.summary:
+        with open(args.summary, 'w') as f:
+            json.dump(r, f, indent=2)
+    return EXIT_REJECTS if r['rejected'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
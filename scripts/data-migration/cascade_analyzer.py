@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Cascade Blast-Radius Analyzer - what TRUNCATE ... CASCADE really touches
+
+TRUNCATE perseus.<t> CASCADE empties every table that references <t>,
+transitively, whatever the FK's ON DELETE action. ON DELETE CASCADE follows
+only CASCADE FKs. This tool computes both closures per table, weighted by
+source row counts, and replays a load order (by default the TIER lists in
+load-data.sh) to find reload storms: a table loaded after one of its
+descendants wipes that descendant, which then has to be reloaded - or stays
+empty if nothing reloads it.
+
+The recommended plan truncates the whole load set in a single statement
+before the first COPY and loads parents before children, so nothing loaded
+is ever truncated again (zero rework). Tables outside the load set that the
+CASCADE would still empty are listed as collateral.
+
+Usage:
+    python3 scripts/data-migration/cascade_analyzer.py [--order FILE] [--top N]
+                                                      [--format text|json|sql]
+
+    text  blast radius ranking, storms in the current order, recommended order
+    json  everything above, machine-readable
+    sql   the single pre-load TRUNCATE statement
+
+Exit Codes:
+    0 - Current order is storm-free
+    1 - Current order wipes already-loaded tables
+    2 - Invalid arguments / unreadable inputs
+
+Author: Pierre Ribeiro (DBA/DBRE)
+Created: 2026-10-19
+Version: 1.0
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+from collections import deque
+from typing import Dict, List, Optional, Set, Tuple
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SCRIPTS_DIR)
+
+from convert_tables import SIZE_CSV, load_table_sizes  # noqa: E402
+from fk_graph import PGSQL_FK_FILE, FKGraph, load_fk_constraints  # noqa: E402
+
+# ============================================================================
+# CONSTANTS
+# ============================================================================
+
+LOAD_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'load-data.sh')
+TIER_ARRAY = re.compile(r'^TIER(\d+)_TABLES=\((.*?)^\)', re.MULTILINE | re.DOTALL)
+
+
+# ============================================================================
+# CLOSURES
+# ============================================================================
+
+def truncate_closure(graph: FKGraph, table: str) -> Set[str]:
+    """Tables emptied by TRUNCATE <table> CASCADE (excluding <table>)."""
+    return graph.descendants(table)
+
+
+def delete_cascade_closure(graph: FKGraph, table: str) -> Set[str]:
+    """Tables reached by DELETE FROM <table> through ON DELETE CASCADE FKs only."""
+    seen = set()
+    queue = deque([table])
+    while queue:
+        for fk in graph.children.get(queue.popleft(), []):
+            child = fk['child_table']
+            if fk.get('on_delete') == 'CASCADE' and child != table and child not in seen:
+                seen.add(child)
+                queue.append(child)
+    return seen
+
+
+def blast_radius(graph: FKGraph, rows: Dict[str, int]) -> Dict[str, dict]:
+    """Per table: truncate/delete closures and the rows they hold."""
+    report = {}
+    for table in sorted(graph.tables):
+        trunc = truncate_closure(graph, table)
+        delete = delete_cascade_closure(graph, table)
+        report[table] = {
+            'truncate_cascade': sorted(trunc),
+            'truncate_rows': sum(rows.get(t, 0) for t in trunc),
+            'delete_cascade': sorted(delete),
+            'delete_rows': sum(rows.get(t, 0) for t in delete),
+        }
+    return report
+
+
+# ============================================================================
+# LOAD ORDER REPLAY
+# ============================================================================
+
+def tier_tables(load_script: str = LOAD_SCRIPT) -> List[Tuple[int, List[str]]]:
+    """[(tier, [tables])] from the TIERn_TABLES arrays in load-data.sh, by tier."""
+    with open(load_script, 'r') as f:
+        content = f.read()
+    tiers = sorted(((int(n), body) for n, body in TIER_ARRAY.findall(content)), key=lambda x: x[0])
+    return [(n, re.findall(r'^\s*"(\w+)"', body, re.MULTILINE)) for n, body in tiers]
+
+
+def tier_order(load_script: str = LOAD_SCRIPT) -> List[str]:
+    """Tables in the order load-data.sh loads them (TIER0_TABLES, TIER1_TABLES, ...)."""
+    return [t for _, tables in tier_tables(load_script) for t in tables]
+
+
+def replay(graph: FKGraph, order: List[str], rows: Dict[str, int]) -> List[dict]:
+    """Storms: each TRUNCATE CASCADE that empties tables loaded earlier in `order`."""
+    loaded = set()
+    storms = []
+    for table in order:
+        wiped = truncate_closure(graph, table) & loaded
+        if wiped:
+            storms.append({
+                'table': table,
+                'wiped': sorted(wiped),
+                'wiped_rows': sum(rows.get(t, 0) for t in wiped),
+            })
+        loaded.add(table)
+    return storms
+
+
+def recommended_order(graph: FKGraph, tables: List[str]) -> List[str]:
+    """Load set in FK topological order (parents first); ties keep input order."""
+    position = {t: i for i, t in enumerate(graph.topological_order())}
+    given = {t: i for i, t in enumerate(tables)}
+    return sorted(tables, key=lambda t: (position.get(t, -1), given[t]))
+
+
+def collateral(graph: FKGraph, tables: List[str]) -> List[str]:
+    """Tables outside the load set that a TRUNCATE CASCADE of the set still empties."""
+    load_set = set(tables)
+    reached = set()
+    for t in tables:
+        reached |= truncate_closure(graph, t)
+    return sorted(reached - load_set)
+
+
+def truncate_statement(tables: List[str]) -> str:
+    return "TRUNCATE " + ", ".join(f"perseus.{t}" for t in tables) + " CASCADE;"
+
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Analyze TRUNCATE/DELETE CASCADE blast radius.")
+    parser.add_argument('--fk-ddl', default=PGSQL_FK_FILE,
+                        help="FK DDL file or directory (default: %(default)s)")
+    parser.add_argument('--size-csv', default=SIZE_CSV,
+                        help="Row count / size assessment CSV (default: %(default)s)")
+    parser.add_argument('--order',
+                        help="File with one table per line to replay (default: load-data.sh tiers)")
+    parser.add_argument('--top', type=int, default=15,
+                        help="Tables to list in the blast radius ranking (default: %(default)s)")
+    parser.add_argument('--format', choices=('text', 'json', 'sql'), default='text')
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    try:
+        graph = FKGraph(load_fk_constraints(args.fk_ddl), qualified=False)
+        if args.order:
+            with open(args.order, 'r') as f:
+                order = [line.strip() for line in f if line.strip() and not line.startswith('#')]
+        else:
+            order = tier_order()
+    except OSError as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 2
+    rows = {t: v['rows'] for t, v in load_table_sizes(args.size_csv).items()} \
+        if os.path.exists(args.size_csv) else {}
+
+    radius = blast_radius(graph, rows)
+    storms = replay(graph, order, rows)
+    better = recommended_order(graph, order)
+    outside = collateral(graph, order)
+
+    if args.format == 'sql':
+        print(truncate_statement(better))
+        return 1 if storms else 0
+    if args.format == 'json':
+        print(json.dumps({
+            'blast_radius': radius,
+            'current_order': order,
+            'storms': storms,
+            'recommended_order': better,
+            'truncate_statement': truncate_statement(better),
+            'collateral': outside,
+        }, indent=2))
+        return 1 if storms else 0
+
+    print(f"{'Table':<40} {'TRUNCATE CASCADE':>18} {'rows':>14} {'DELETE CASCADE':>16} {'rows':>14}")
+    print(f"{'-' * 40} {'-' * 18} {'-' * 14} {'-' * 16} {'-' * 14}")
+    ranked = sorted(radius.items(), key=lambda kv: (-kv[1]['truncate_rows'], -len(kv[1]['truncate_cascade'])))
+    for table, r in ranked[:args.top]:
+        print(f"{table:<40} {len(r['truncate_cascade']):>12} tables {r['truncate_rows']:>14,} "
+              f"{len(r['delete_cascade']):>10} tables {r['delete_rows']:>14,}")
+
+    print()
+    print(f"Current order: {len(order)} tables, {len(storms)} reload storms, "
+          f"{sum(s['wiped_rows'] for s in storms):,} source rows wiped after load")
+    for s in storms:
+        print(f"  WARNING: loading {s['table']} truncates already-loaded "
+              f"{', '.join(s['wiped'])} ({s['wiped_rows']:,} rows)")
+
+    print()
+    print("Recommended: truncate once, then load parents first with --no-truncate (0 rework)")
+    print(f"  {truncate_statement(better)}")
+    if outside:
+        print(f"  Collateral (emptied, not reloaded): {', '.join(outside)}")
+    print(f"  Order: {' → '.join(better)}")
+    return 1 if storms else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
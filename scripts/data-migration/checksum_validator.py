@@ -0,0 +1,529 @@
+#!/usr/bin/env python3
+"""
+Bucketed Checksum Validator - full-table, order-independent row checksums on both ends
+
+validate-checksums.sql hashes 100 sample rows per table with
+MD5(STRING_AGG(... ORDER BY id)): most rows are never compared and the
+aggregate needs a global sort. This validator covers every row:
+
+1. each row is rendered as canonical text - one field per column joined by
+   CHR(31), NULL as \\N, values formatted the same way in PostgreSQL and
+   T-SQL (integers, NUMERIC at its scale, floats at 6 decimals, datetime at
+   milliseconds, datetime2 at microseconds, bit as 0/1, uuid/hex lower case,
+   CHAR without trailing blanks) - and hashed with MD5 over its UTF-8 bytes
+2. the 128-bit hash is split into two signed 64-bit halves; a bucket's
+   checksum is (COUNT, SUM(h1), SUM(h2)). Sums do not depend on row order,
+   so no sort is needed, and partial sums add up: any key range can be
+   scanned by any session and merged afterwards
+3. buckets are key ranges (key / width) for tables with a single integer
+   key, else MD5(key) modulo a bucket count; the width / count comes from
+   the PostgreSQL row count and is used verbatim on SQL Server
+4. key ranges run on --jobs PostgreSQL sessions and --jobs sqlcmd processes
+   at once; buckets that differ are re-read row by row (key hash + row hash)
+   on both ends and reported as missing, extra or changed rows
+
+The SQL Server side needs 2019+ (UTF-8 collation for the hash input). Both
+queries can be printed with --print-sql to run by hand; the output columns
+are bucket, rows, sum_h1, sum_h2 on both engines.
+
+Column mapping (source names/types → PostgreSQL names/types) comes from
+copy-manifests/<table>.json, or from the SQL Server DDL through
+convert_tables.py when no manifest was written. Computed columns are not
+hashed. TIMESTAMPTZ values are rendered in the session TimeZone, which must
+be the one the data was loaded with (--timezone).
+
+Usage:
+    python3 scripts/data-migration/checksum_validator.py [--table T ...] [--jobs N]
+                                                        [--bucket-rows N] [--dsn DSN]
+    python3 scripts/data-migration/checksum_validator.py --table goo --print-sql sqlserver
+
+Connection: --dsn / PGHOST / DB_NAME / DB_USER as pg_loader.py (psycopg or
+psycopg2); SQL Server from .env (SQL_SERVER, SQL_USER, SQL_PASSWORD,
+SQL_DATABASE, SQLCMD_CMD) as extract-data.sh. --mssql-source points the
+SQL Server side at another object, e.g. a staging copy of the extract.
+
+Exit Codes:
+    0 - Every bucket matches (or --print-sql printed)
+    1 - Mismatching buckets (see the report)
+    2 - Invalid arguments / unknown table / no driver / cannot connect
+
+Author: Pierre Ribeiro (DBA/DBRE)
+Created: 2026-10-19
+Version: 1.0
+"""
+
+import argparse
+import glob
+import json
+import math
+import os
+import re
+import subprocess
+import sys
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SCRIPTS_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from convert_tables import FDW_SCHEMAS, SOURCE_DIR, build_copy_manifest, parse_table_file  # noqa: E402
+from pg_loader import SessionPool, build_dsn, import_driver  # noqa: E402
+from schema_model import load_model  # noqa: E402
+from transcode_csv import DEFAULT_MANIFEST_DIR, _base_type  # noqa: E402
+
+# ============================================================================
+# CONSTANTS
+# ============================================================================
+
+DEFAULT_ENV_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.env')
+DEFAULT_JOBS = 4
+DEFAULT_BUCKET_ROWS = 100000
+DEFAULT_DRILL_BUCKETS = 10
+DEFAULT_MAX_ROWS = 20
+DEFAULT_MSSQL_SOURCE = '[{schema}].[{table}]'
+TASKS_PER_JOB = 4                    # key ranges per session, so slow ranges even out
+ENV_KEYS = ('SQL_SERVER', 'SQL_USER', 'SQL_PASSWORD', 'SQL_DATABASE', 'SQL_TIMEOUT', 'SQLCMD_CMD')
+UTF8_COLLATION = 'Latin1_General_100_BIN2_UTF8'
+INTEGER_KEY_TYPES = ('SMALLINT', 'INTEGER', 'BIGINT', 'INT', 'INT2', 'INT4', 'INT8')
+FLOAT_SCALE = 6
+
+# Source type → canonical text: (PostgreSQL expression, T-SQL expression)
+CANONICAL = {
+    'integer':   ("{c}::text", "CONVERT(NVARCHAR(20), {c})"),
+    'bit':       ("CASE WHEN {c} THEN '1' ELSE '0' END", "CONVERT(NVARCHAR(1), {c})"),
+    'decimal':   ("{c}::text", "CONVERT(NVARCHAR(48), {c})"),
+    'money':     ("{c}::numeric(19, 4)::text", "CONVERT(NVARCHAR(48), CAST({c} AS DECIMAL(19, 4)))"),
+    'float':     (f"round({{c}}::float8::numeric, {FLOAT_SCALE})::text",
+                  f"CONVERT(NVARCHAR(48), CAST({{c}} AS DECIMAL(38, {FLOAT_SCALE})))"),
+    'datetime':  ("to_char({c}::timestamp, 'YYYY-MM-DD HH24:MI:SS.MS')",
+                  "CONVERT(NVARCHAR(23), CAST({c} AS DATETIME), 121)"),
+    'datetime2': ("to_char({c}::timestamp, 'YYYY-MM-DD HH24:MI:SS.US')",
+                  "CONVERT(NVARCHAR(26), CAST({c} AS DATETIME2(6)), 121)"),
+    'datetimeoffset': ("to_char({c} AT TIME ZONE 'UTC', 'YYYY-MM-DD HH24:MI:SS.US')",
+                       "CONVERT(NVARCHAR(26), CAST(SWITCHOFFSET({c}, '+00:00') AS DATETIME2(6)), 121)"),
+    'date':      ("to_char({c}::date, 'YYYY-MM-DD')", "CONVERT(NVARCHAR(10), {c}, 23)"),
+    'char':      ("rtrim({c}::text, ' ')", "RTRIM(CONVERT(NVARCHAR(MAX), {c}))"),
+    'uuid':      ("lower({c}::text)", "LOWER(CONVERT(NVARCHAR(36), {c}))"),
+    'binary':    ("encode({c}, 'hex')", "LOWER(CONVERT(NVARCHAR(MAX), CONVERT(VARBINARY(MAX), {c}), 2))"),
+    'text':      ("{c}::text", "CONVERT(NVARCHAR(MAX), {c})"),
+}
+SOURCE_KINDS = [
+    (r'^(tinyint|smallint|int|bigint)$', 'integer'),
+    (r'^bit$', 'bit'),
+    (r'^(decimal|numeric)$', 'decimal'),
+    (r'^(money|smallmoney)$', 'money'),
+    (r'^(float|real)$', 'float'),
+    (r'^(datetime|smalldatetime)$', 'datetime'),
+    (r'^datetime2$', 'datetime2'),
+    (r'^datetimeoffset$', 'datetimeoffset'),
+    (r'^date$', 'date'),
+    (r'^n?char$', 'char'),
+    (r'^uniqueidentifier$', 'uuid'),
+    (r'^(varbinary|binary|image|timestamp|rowversion)$', 'binary'),
+]
+
+
+class MssqlError(RuntimeError):
+    """sqlcmd failed or returned unparseable output."""
+
+
+# ============================================================================
+# COLUMN MAPPING
+# ============================================================================
+
+def pg_ident(name: str) -> str:
+    """Quoted PostgreSQL identifier (columns such as "offset" are reserved words)."""
+    return '"' + name.replace('"', '""') + '"'
+
+
+def mssql_ident(name: str) -> str:
+    """Bracket-quoted T-SQL identifier."""
+    return '[' + name.replace(']', ']]') + ']'
+
+
+def source_kind(source_type: Optional[str]) -> str:
+    base = re.sub(r'\(.*|\s+identity.*', '', (source_type or '').strip().lower()).strip()
+    for pattern, kind in SOURCE_KINDS:
+        if re.match(pattern, base):
+            return kind
+    return 'text'
+
+
+def source_manifest(table: str, manifest_dir: str) -> Optional[dict]:
+    """copy-manifests/<table>.json, else the same manifest built from the SQL Server DDL."""
+    path = os.path.join(manifest_dir, f"{table}.json")
+    if os.path.exists(path):
+        with open(path) as f:
+            return json.load(f)
+    for ddl in glob.glob(os.path.join(SOURCE_DIR, '*.sql')):
+        if not ddl.lower().endswith(f".{table}.sql") and table.replace('_', '') not in ddl.lower():
+            continue
+        info = parse_table_file(ddl)
+        if info and info['table_snake'] == table and info['schema'] not in FDW_SCHEMAS:
+            return build_copy_manifest(info)
+    return None
+
+
+class TableCheck:
+    """Canonical row text, key and bucket expressions of one table on both engines."""
+
+    def __init__(self, table: str, model, manifest_dir: str, mssql_source: str):
+        info = model.table(table)
+        manifest = source_manifest(table, manifest_dir)
+        if info is None or manifest is None:
+            raise KeyError(f"table {table}: no refactored DDL or SQL Server mapping")
+        pg_types = {c['name'].lower(): c['type'] for c in info['columns']}
+        pg_names = {c['name'].lower(): c['name'] for c in info['columns']}
+        self.table = table
+        self.columns = [
+            {'name': f['target_name'], 'source_name': f['source_name'],
+             'pg_ident': pg_ident(pg_names[f['target_name'].lower()]), 'mssql_ident': mssql_ident(f['source_name']),
+             'pg_type': pg_types.get(f['target_name'].lower(), f.get('target_type')),
+             'kind': source_kind(f['source_type'])}
+            for f in manifest['fields']
+            if not f['skip'] and not (f['source_type'] or '').upper().startswith('AS ')
+            and f['target_name'].lower() in pg_types
+        ]
+        schema, _, source_table = manifest['source'].replace('[', '').replace(']', '').partition('.')
+        self.pg_source = f"perseus.{pg_ident(table)}"
+        self.mssql_source = mssql_source.format(schema=schema.replace(']', ']]'),
+                                                table=source_table.replace(']', ']]'), target=table)
+
+        by_name = {c['name']: c for c in self.columns}
+        pk = model.primary_key(table)
+        self.key = [by_name[k] for k in pk] if pk and all(k in by_name for k in pk) else list(self.columns)
+        self.integer_key = (len(self.key) == 1 and self.key != self.columns
+                            and _base_type(self.key[0]['pg_type']) in INTEGER_KEY_TYPES)
+        self.width = 1           # rows per bucket: key width, or number of hash buckets
+        self.buckets = 1
+
+    # -- canonical text -----------------------------------------------------
+
+    @staticmethod
+    def _pg_field(col: dict) -> str:
+        kind = col['kind']
+        if kind == 'binary' and _base_type(col['pg_type']) != 'BYTEA':
+            kind = 'text'
+        return f"COALESCE({CANONICAL[kind][0].format(c=col['pg_ident'])}, '\\N')"
+
+    @staticmethod
+    def _mssql_field(col: dict) -> str:
+        return f"ISNULL({CANONICAL[col['kind']][1].format(c=col['mssql_ident'])}, N'\\N')"
+
+    def _pg_text(self, cols: List[dict]) -> str:
+        if len(cols) == 1:
+            return self._pg_field(cols[0])
+        return "concat_ws(chr(31), " + ', '.join(self._pg_field(c) for c in cols) + ")"
+
+    def _mssql_text(self, cols: List[dict]) -> str:
+        text = (self._mssql_field(cols[0]) if len(cols) == 1 else
+                "CONCAT_WS(NCHAR(31), " + ', '.join(self._mssql_field(c) for c in cols) + ")")
+        return f"CONVERT(VARCHAR(MAX), {text} COLLATE {UTF8_COLLATION})"
+
+    # -- buckets ------------------------------------------------------------
+
+    def _pg_bucket(self) -> str:
+        if self.integer_key:
+            return f"{self.key[0]['pg_ident']}::bigint / {self.width}"
+        return (f"((('x' || substr(md5({self._pg_text(self.key)}), 1, 8))::bit(32)::int & 2147483647) "
+                f"% {self.buckets})")
+
+    def _mssql_bucket(self) -> str:
+        if self.integer_key:
+            return f"CAST({self.key[0]['mssql_ident']} AS BIGINT) / {self.width}"
+        return (f"((CAST(SUBSTRING(HASHBYTES('MD5', {self._mssql_text(self.key)}), 1, 4) AS INT) & 2147483647) "
+                f"% {self.buckets})")
+
+    def _range(self, engine: str, lo: Optional[int], hi: Optional[int]) -> str:
+        if not self.integer_key:
+            return ''
+        column = self.key[0]['pg_ident' if engine == 'postgres' else 'mssql_ident']
+        terms = ([f"{column} >= {lo}"] if lo is not None else []) + ([f"{column} < {hi}"] if hi is not None else [])
+        return ' WHERE ' + ' AND '.join(terms) if terms else ''
+
+    def bucket_sql(self, engine: str, lo: Optional[int] = None, hi: Optional[int] = None) -> str:
+        """bucket, rows, sum_h1, sum_h2 for the keys in [lo, hi)."""
+        if engine == 'postgres':
+            return (f"SELECT bucket, count(*), sum(('x' || substr(m, 1, 16))::bit(64)::bigint), "
+                    f"sum(('x' || substr(m, 17, 16))::bit(64)::bigint) "
+                    f"FROM (SELECT {self._pg_bucket()} AS bucket, md5({self._pg_text(self.columns)}) AS m "
+                    f"FROM {self.pg_source}{self._range(engine, lo, hi)}) h GROUP BY bucket ORDER BY bucket")
+        return (f"SET NOCOUNT ON; SELECT bucket, COUNT_BIG(*), "
+                f"SUM(CAST(CAST(SUBSTRING(m, 1, 8) AS BIGINT) AS DECIMAL(38, 0))), "
+                f"SUM(CAST(CAST(SUBSTRING(m, 9, 8) AS BIGINT) AS DECIMAL(38, 0))) "
+                f"FROM (SELECT {self._mssql_bucket()} AS bucket, "
+                f"HASHBYTES('MD5', {self._mssql_text(self.columns)}) AS m "
+                f"FROM {self.mssql_source}{self._range(engine, lo, hi)}) h GROUP BY bucket ORDER BY bucket;")
+
+    def _bucket_bounds(self, bucket: int) -> Tuple[int, int]:
+        """[lo, hi) of the keys with key / width = bucket (division truncates toward zero)."""
+        w = self.width
+        if bucket > 0:
+            return bucket * w, (bucket + 1) * w
+        if bucket < 0:
+            return (bucket - 1) * w + 1, bucket * w + 1
+        return -w + 1, w
+
+    def rows_sql(self, engine: str, bucket: int) -> str:
+        """key_hash, row_hash, key text (display) of the rows of one bucket."""
+        if engine == 'postgres':
+            where = (self._range(engine, *self._bucket_bounds(bucket)) if self.integer_key
+                     else f" WHERE {self._pg_bucket()} = {bucket}")
+            return (f"SELECT md5({self._pg_text(self.key)}), md5({self._pg_text(self.columns)}), "
+                    f"translate({self._pg_text(self.key)}, E'\\t\\n\\r' || chr(31), '   |') "
+                    f"FROM {self.pg_source}{where}")
+        where = (self._range(engine, *self._bucket_bounds(bucket)) if self.integer_key
+                 else f" WHERE {self._mssql_bucket()} = {bucket}")
+        display = self._mssql_text(self.key)
+        for ch, rep in (('CHAR(9)', "' '"), ('CHAR(10)', "' '"), ('CHAR(13)', "' '"), ('CHAR(31)', "'|'")):
+            display = f"REPLACE({display}, {ch}, {rep})"
+        return (f"SET NOCOUNT ON; SELECT LOWER(CONVERT(VARCHAR(32), HASHBYTES('MD5', {self._mssql_text(self.key)}), 2)), "
+                f"LOWER(CONVERT(VARCHAR(32), HASHBYTES('MD5', {self._mssql_text(self.columns)}), 2)), "
+                f"{display} FROM {self.mssql_source}{where};")
+
+    def plan(self, rows: int, lo: Optional[int], hi: Optional[int], bucket_rows: int, tasks: int) -> list:
+        """Set width / bucket count from the PostgreSQL row count; return the key ranges to scan."""
+        self.buckets = max(1, math.ceil(rows / bucket_rows))
+        if not self.integer_key or lo is None:
+            self.width = bucket_rows
+            return [(None, None)]
+        self.width = max(1, math.ceil((hi - lo + 1) / self.buckets))
+        step = max(self.width, math.ceil((hi - lo + 1) / tasks / self.width) * self.width)
+        bounds = list(range(lo - lo % self.width, hi + 1, step))[1:]
+        # first and last ranges are open: rows only SQL Server has are still counted
+        return list(zip([None] + bounds, bounds + [None]))
+
+
+# ============================================================================
+# ENGINES
+# ============================================================================
+
+def read_env_file(path: str) -> Dict[str, str]:
+    """KEY=VALUE lines of .env for the whitelisted SQL Server keys (extract-data.sh rules)."""
+    values = {}
+    if not os.path.exists(path):
+        return values
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#') or '=' not in line:
+                continue
+            key, _, value = line.partition('=')
+            value = re.sub(r'\s+#.*$', '', value).strip().strip('"').strip("'")
+            if key.strip() in ENV_KEYS:
+                values[key.strip()] = value
+    return values
+
+
+class Mssql:
+    """Runs T-SQL through sqlcmd (tab-separated, no headers, UTF-8)."""
+
+    def __init__(self, env: Dict[str, str]):
+        self.env = env
+
+    def query(self, sql: str) -> List[List[str]]:
+        command = [self.env.get('SQLCMD_CMD', 'sqlcmd'), '-S', self.env['SQL_SERVER'], '-U', self.env['SQL_USER'],
+                   '-P', self.env['SQL_PASSWORD'], '-d', self.env['SQL_DATABASE'], '-b', '-h', '-1', '-W',
+                   '-s', '\t', '-f', '65001', '-t', self.env.get('SQL_TIMEOUT', '0'), '-Q', sql]
+        proc = subprocess.run(command, capture_output=True)
+        if proc.returncode != 0:
+            raise MssqlError(f"sqlcmd failed ({proc.returncode}): "
+                             f"{(proc.stderr or proc.stdout).decode(errors='replace').strip()[:500]}")
+        return [line.split('\t') for line in proc.stdout.decode('utf-8', errors='replace').splitlines()
+                if line.strip()]
+
+
+class Postgres:
+    def __init__(self, pool: SessionPool):
+        self.pool = pool
+
+    def query(self, sql: str) -> List[list]:
+        with self.pool.session() as session:
+            return [list(row) for row in session.execute(sql)]
+
+
+def collect_buckets(engine, check: TableCheck, name: str, ranges: list, pool: ThreadPoolExecutor) -> dict:
+    """{bucket: [rows, sum_h1, sum_h2]} over all ranges, partial buckets added up."""
+    totals: Dict[int, List[int]] = defaultdict(lambda: [0, 0, 0])
+    for rows in pool.map(lambda r: engine.query(check.bucket_sql(name, *r)), ranges):
+        for bucket, count, h1, h2 in rows:
+            total = totals[int(bucket)]
+            total[0] += int(count)
+            total[1] += int(h1)
+            total[2] += int(h2)
+    return dict(totals)
+
+
+def row_differences(pg_rows: List[list], ms_rows: List[list]) -> List[dict]:
+    """Rows missing in PostgreSQL, extra in PostgreSQL, or changed (same key, other hash)."""
+    sides = []
+    for rows in (pg_rows, ms_rows):
+        by_key: Dict[str, Counter] = defaultdict(Counter)
+        shown = {}
+        for key_hash, row_hash, display in rows:
+            by_key[key_hash][row_hash] += 1
+            shown[key_hash] = display
+        sides.append((by_key, shown))
+    (pg, pg_shown), (ms, ms_shown) = sides
+    diffs = []
+    for key_hash in sorted(set(pg) | set(ms)):
+        if pg.get(key_hash) == ms.get(key_hash):
+            continue
+        key = pg_shown.get(key_hash, ms_shown.get(key_hash))
+        if key_hash not in pg:
+            diffs.append({'key': key, 'issue': 'missing', 'rows': sum(ms[key_hash].values())})
+        elif key_hash not in ms:
+            diffs.append({'key': key, 'issue': 'extra', 'rows': sum(pg[key_hash].values())})
+        else:
+            diffs.append({'key': key, 'issue': 'changed', 'rows': max(sum(pg[key_hash].values()),
+                                                                       sum(ms[key_hash].values()))})
+    return diffs
+
+
+def validate_table(check: TableCheck, pg: Postgres, ms: Mssql, args, pg_pool, ms_pool) -> dict:
+    if check.integer_key:
+        key = check.key[0]['pg_ident']
+        count, lo, hi = pg.query(f"SELECT count(*), min({key}), max({key}) FROM {check.pg_source}")[0]
+    else:
+        count, lo, hi = pg.query(f"SELECT count(*) FROM {check.pg_source}")[0][0], None, None
+    ranges = check.plan(int(count), lo, hi, args.bucket_rows, args.jobs * TASKS_PER_JOB)
+
+    with ThreadPoolExecutor(max_workers=2) as sides:
+        pg_future = sides.submit(collect_buckets, pg, check, 'postgres', ranges, pg_pool)
+        ms_future = sides.submit(collect_buckets, ms, check, 'sqlserver', ranges, ms_pool)
+        pg_buckets, ms_buckets = pg_future.result(), ms_future.result()
+
+    mismatched = sorted(b for b in set(pg_buckets) | set(ms_buckets) if pg_buckets.get(b) != ms_buckets.get(b))
+    result = {
+        'table': check.table, 'key': [c['name'] for c in check.key] if check.key != check.columns else None,
+        'bucketing': f"{check.key[0]['name']} / {check.width}" if check.integer_key else f"md5(key) % {check.buckets}",
+        'buckets': len(set(pg_buckets) | set(ms_buckets)), 'ranges': len(ranges),
+        'pg_rows': sum(v[0] for v in pg_buckets.values()), 'mssql_rows': sum(v[0] for v in ms_buckets.values()),
+        'mismatched_buckets': mismatched, 'rows': [],
+    }
+    for bucket in mismatched[:args.drill_buckets]:
+        pg_rows, ms_rows = pg_pool.submit(pg.query, check.rows_sql('postgres', bucket)), \
+            ms_pool.submit(ms.query, check.rows_sql('sqlserver', bucket))
+        for diff in row_differences(pg_rows.result(), ms_rows.result()):
+            result['rows'].append({'bucket': bucket, **diff})
+    return result
+
+
+def format_result(r: dict, max_rows: int) -> str:
+    status = '✓' if not r['mismatched_buckets'] else '✗'
+    lines = [f"{status} {r['table']}: {r['pg_rows']:,} rows in PostgreSQL, {r['mssql_rows']:,} in SQL Server; "
+             f"{r['buckets']:,} buckets ({r['bucketing']}), {len(r['mismatched_buckets']):,} mismatched"]
+    if r['mismatched_buckets']:
+        shown = ', '.join(str(b) for b in r['mismatched_buckets'][:20])
+        more = len(r['mismatched_buckets']) - 20
+        lines.append(f"    buckets: {shown}" + (f" (+{more} more)" if more > 0 else ''))
+    for row in r['rows'][:max_rows]:
+        lines.append(f"    bucket {row['bucket']}: {row['issue']:<8} {row['key'][:100]}"
+                     + (f" (x{row['rows']})" if row['rows'] > 1 else ''))
+    if len(r['rows']) > max_rows:
+        lines.append(f"    ... {len(r['rows']) - max_rows} more row differences (see --summary)")
+    return '\n'.join(lines)
+
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Full-table bucketed checksums, PostgreSQL vs SQL Server.")
+    parser.add_argument('--table', dest='tables', action='append',
+                        help="Table to validate (repeatable; default: every non-foreign table)")
+    parser.add_argument('-j', '--jobs', type=int, default=DEFAULT_JOBS,
+                        help="Concurrent sessions per engine (default: %(default)s)")
+    parser.add_argument('--bucket-rows', type=int, default=DEFAULT_BUCKET_ROWS,
+                        help="Target rows per bucket (default: %(default)s)")
+    parser.add_argument('--drill-buckets', type=int, default=DEFAULT_DRILL_BUCKETS,
+                        help="Mismatched buckets per table compared row by row (default: %(default)s)")
+    parser.add_argument('--max-rows', type=int, default=DEFAULT_MAX_ROWS,
+                        help="Row differences printed per table (default: %(default)s)")
+    parser.add_argument('--dsn', default='',
+                        help="libpq connection string (default: PGHOST/PGPORT, DB_NAME, DB_USER)")
+    parser.add_argument('--timezone', help="PostgreSQL session TimeZone (default: the server's)")
+    parser.add_argument('--env-file', default=DEFAULT_ENV_FILE, help="SQL Server settings (default: %(default)s)")
+    parser.add_argument('--mssql-source', default=DEFAULT_MSSQL_SOURCE,
+                        help="SQL Server object per table; {schema}, {table} (source name) and "
+                             "{target} are replaced (default: %(default)s)")
+    parser.add_argument('--manifest-dir', default=DEFAULT_MANIFEST_DIR,
+                        help="copy-manifests directory from convert_tables.py (default: %(default)s)")
+    parser.add_argument('--print-sql', choices=['postgres', 'sqlserver'],
+                        help="Print the bucket and row queries for one engine and exit")
+    parser.add_argument('--width', type=int,
+                        help="With --print-sql: key width for integer keys (default: --bucket-rows) or "
+                             "bucket count for the others (default: 1); a run prints the values it used")
+    parser.add_argument('--summary', help="Write per-table results as JSON to this file")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    if args.jobs < 1 or args.bucket_rows < 1:
+        print("ERROR: --jobs and --bucket-rows must be >= 1", file=sys.stderr)
+        return 2
+    model = load_model()            # tables plus the PRIMARY KEYs in 17.create-constraint
+    tables = args.tables or sorted(info['name'] for info in model.tables.values() if not info.get('foreign'))
+    checks = []
+    for table in tables:
+        try:
+            checks.append(TableCheck(table, model, args.manifest_dir, args.mssql_source))
+        except KeyError as e:
+            if args.tables:
+                print(f"ERROR: {e.args[0]}", file=sys.stderr)
+                return 2
+            print(f"  skipping {e.args[0]}", file=sys.stderr)
+
+    if args.print_sql:
+        for check in checks:
+            check.width = args.width or args.bucket_rows
+            check.buckets = args.width or 1
+            print(f"-- {check.table}: " + (f"bucket = {check.key[0]['name']} / {check.width}" if check.integer_key
+                                           else f"bucket = md5(key) % {check.buckets}"))
+            print(check.bucket_sql(args.print_sql) + (';' if args.print_sql == 'postgres' else ''))
+            print(f"-- rows of bucket 0:\n{check.rows_sql(args.print_sql, 0)}" +
+                  (';' if args.print_sql == 'postgres' else '') + '\n')
+        return 0
+
+    env = read_env_file(args.env_file)
+    missing = [k for k in ENV_KEYS[:4] if not env.get(k)]
+    if missing:
+        print(f"ERROR: {', '.join(missing)} not set in {args.env_file}", file=sys.stderr)
+        return 2
+    driver = import_driver()
+    if driver[0] is None:
+        print('ERROR: needs psycopg or psycopg2 (pip install "psycopg[binary]")', file=sys.stderr)
+        return 2
+    settings = [('TimeZone', args.timezone)] if args.timezone else []
+    session_pool = SessionPool(driver, build_dsn(args), settings, args.jobs)
+    pg, ms = Postgres(session_pool), Mssql(env)
+
+    results = []
+    try:
+        with ThreadPoolExecutor(max_workers=args.jobs) as pg_pool, \
+                ThreadPoolExecutor(max_workers=args.jobs) as ms_pool:
+            for check in checks:
+                result = validate_table(check, pg, ms, args, pg_pool, ms_pool)
+                print(format_result(result, args.max_rows), flush=True)
+                results.append(result)
+    except (MssqlError, driver[1].Error) as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 2
+    finally:
+        session_pool.close()
+
+    bad = [r for r in results if r['mismatched_buckets']]
+    print(f"\n{len(results) - len(bad)}/{len(results)} tables match"
+          + (f"; mismatches in: {', '.join(r['table'] for r in bad)}" if bad else ''))
+    if args.summary:
+        with open(args.summary, 'w') as f:
+            json.dump(results, f, indent=2)
+    return 1 if bad else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+COPY Format Benchmark - CSV vs binary ingest on generated data
+
+Generates a bcp -c style export for each table from its 14.create-table
+column types (random but type-correct values; datetime2 text with 7
+fractional digits, NUMERIC at the column's scale, NULLs in nullable
+columns), then measures both load paths:
+
+- client: transcode_csv.py → FORMAT CSV file vs binary_copy.py → FORMAT
+  binary file (seconds, output size)
+- server (with --dsn): COPY of each file into a TEMP table LIKE
+  perseus.<table> (columns only: no indexes, constraints or triggers, so
+  the time is parsing and tuple forming), best of --repeat runs
+
+Usage:
+    python3 scripts/data-migration/copy_format_bench.py [--table T ...] [--rows N]
+                                                       [--dsn DSN] [--repeat N]
+
+Defaults to fatsmurf_reading, poll_history and robot_log_container_sequence.
+The server stage needs psycopg (3) or psycopg2 and a database with the
+perseus schema; both paths run with TimeZone = UTC.
+
+Exit Codes:
+    0 - Benchmark finished
+    2 - Invalid arguments / unknown table / no database driver / cannot connect
+
+Author: Pierre Ribeiro (DBA/DBRE)
+Created: 2026-10-19
+Version: 1.0
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import shutil
+import string
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SCRIPTS_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from binary_copy import convert_file, unsupported_columns  # noqa: E402
+from pg_loader import (BINARY_COPY_OPTIONS, CSV_COPY_OPTIONS, MB, Session, import_driver,  # noqa: E402
+                       raw_blocks, rates, read_copy_manifest)
+from schema_model import PGSQL_TABLE_DIR, load_model  # noqa: E402
+from transcode_csv import (DEFAULT_FALLBACK_ENCODING, DEFAULT_MANIFEST_DIR, _base_type, table_spec,  # noqa: E402
+                           transcode_file)
+
+# ============================================================================
+# CONSTANTS
+# ============================================================================
+
+DEFAULT_TABLES = ['fatsmurf_reading', 'poll_history', 'robot_log_container_sequence']
+DEFAULT_ROWS = 200000
+DEFAULT_REPEAT = 3
+NULL_RATE = 0.05
+TIME_RANGE_START = datetime(2015, 1, 1)
+TIME_RANGE_SECONDS = 10 * 365 * 86400
+
+
+# ============================================================================
+# DATA GENERATION
+# ============================================================================
+
+def value_generator(field: dict, nullable: bool, rng: random.Random):
+    """Return () → bcp -c text for one column ('' is NULL)."""
+    base = _base_type(field['type'])
+    args = [int(a) for a in re.findall(r'\d+', re.sub(r'^[^(]*', '', field['type'] or ''))]
+
+    def moment() -> datetime:
+        return TIME_RANGE_START + timedelta(seconds=rng.randrange(TIME_RANGE_SECONDS),
+                                            microseconds=rng.randrange(1000000))
+
+    if field['transform'] == 'hex_to_bytea' or base == 'BYTEA':
+        gen = lambda: rng.randbytes(16).hex().upper()                       # noqa: E731
+    elif base == 'BOOLEAN':
+        gen = lambda: rng.choice('01')                                      # noqa: E731
+    elif base in ('SMALLINT', 'INT2'):
+        gen = lambda: str(rng.randrange(-32768, 32768))                     # noqa: E731
+    elif base in ('INTEGER', 'INT', 'INT4'):
+        gen = lambda: str(rng.randrange(1, 2 ** 31))                        # noqa: E731
+    elif base in ('BIGINT', 'INT8'):
+        gen = lambda: str(rng.randrange(1, 2 ** 63))                        # noqa: E731
+    elif base in ('NUMERIC', 'DECIMAL'):
+        precision = args[0] if args else 18
+        scale = args[1] if len(args) > 1 else (0 if args else 4)
+        digits = min(precision - scale, 9)
+        gen = lambda: f"{rng.randrange(10 ** digits) + rng.random():.{scale}f}"  # noqa: E731
+    elif base in ('REAL', 'DOUBLE PRECISION', 'FLOAT', 'FLOAT4', 'FLOAT8'):
+        gen = lambda: repr(rng.uniform(-1e6, 1e6))                          # noqa: E731
+    elif base.startswith('TIMESTAMP'):
+        gen = lambda: moment().strftime('%Y-%m-%d %H:%M:%S.%f') + '0'       # noqa: E731
+    elif base == 'DATE':
+        gen = lambda: moment().strftime('%Y-%m-%d')                         # noqa: E731
+    elif base == 'UUID':
+        gen = lambda: str(uuid.UUID(int=rng.getrandbits(128))).upper()      # noqa: E731
+    else:
+        limit = min(args[0], 40) if args else 40
+        letters = string.ascii_letters + ' '
+        gen = lambda: ''.join(rng.choices(letters, k=rng.randint(1, limit))).strip() or 'x'  # noqa: E731
+    if not nullable:
+        return gen
+    return lambda: '' if rng.random() < NULL_RATE else gen()
+
+
+def generate_csv(path: str, fields: List[dict], nullable: Dict[str, bool], rows: int, seed: int) -> None:
+    """Write `rows` bcp -c records (',' delimited, no quoting) in manifest field order."""
+    rng = random.Random(seed)
+    gens = [value_generator(f, nullable.get((f['name'] or '').lower(), True), rng) for f in fields]
+    with open(path, 'w', encoding='utf-8', newline='') as out:
+        for _ in range(rows):
+            out.write(','.join(g() for g in gens) + '\n')
+
+
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+
+def timed(func, *args):
+    started = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - started
+
+
+def server_copy(session: Session, table: str, columns: str, path: str, options: str, repeat: int) -> float:
+    """Best COPY time of `path` into a columns-only TEMP copy of perseus.<table>."""
+    bench = f"copy_bench_{table}"
+    session.execute(f"DROP TABLE IF EXISTS pg_temp.{bench}")
+    session.execute(f"CREATE TEMP TABLE {bench} (LIKE perseus.{table})")
+    best = None
+    size = os.path.getsize(path)
+    for _ in range(repeat):
+        session.execute(f"TRUNCATE pg_temp.{bench}")
+        started = time.perf_counter()
+        session.copy(f"COPY pg_temp.{bench}{columns} FROM STDIN WITH ({options})", raw_blocks(path, 0, size))
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    session.execute(f"DROP TABLE pg_temp.{bench}")
+    return best
+
+
+def bench_table(table: str, model, args: argparse.Namespace, work_dir: str,
+                session: Optional[Session]) -> dict:
+    info = model.table(table)
+    fields = table_spec(table, model, args.manifest_dir)
+    missing = unsupported_columns(fields)
+    if missing:
+        raise KeyError(f"{table}: no binary encoding for {', '.join(missing)}")
+    nullable = {c['name'].lower(): not c['not_null'] for c in info['columns']}
+    source = os.path.join(work_dir, f"##perseus_tier_0_{table}.csv")
+    generate_csv(source, fields, nullable, args.rows, args.seed)
+
+    csv_out = os.path.join(work_dir, f"{table}.pgcsv")
+    bin_out = os.path.join(work_dir, f"{table}.bin")
+    common = (args.manifest_dir, ',', DEFAULT_FALLBACK_ENCODING)
+    csv_stats, csv_seconds = timed(transcode_file, source, csv_out, table, 1, *common)
+    bin_stats, bin_seconds = timed(convert_file, source, bin_out, table, 1, *common, timezone.utc)
+    result = {
+        'table': table, 'rows': args.rows, 'source_bytes': os.path.getsize(source),
+        'csv': {'convert_s': csv_seconds, 'bytes': os.path.getsize(csv_out), 'rejected': csv_stats['rejected']},
+        'binary': {'convert_s': bin_seconds, 'bytes': os.path.getsize(bin_out), 'rejected': bin_stats['rejected']},
+    }
+    if session is not None:
+        columns = read_copy_manifest(args.manifest_dir, table)['columns']
+        result['csv']['copy_s'] = server_copy(session, table, columns, csv_out, CSV_COPY_OPTIONS, args.repeat)
+        result['binary']['copy_s'] = server_copy(session, table, columns, bin_out, BINARY_COPY_OPTIONS,
+                                                 args.repeat)
+    return result
+
+
+def format_results(results: List[dict]) -> str:
+    lines = [f"{'Table':<32} {'Format':<7} {'Convert s':>10} {'File MB':>9} {'COPY s':>8}  Server rate",
+             '-' * 100]
+    for r in results:
+        for fmt in ('csv', 'binary'):
+            s = r[fmt]
+            copy_s = s.get('copy_s')
+            lines.append(f"{r['table']:<32} {fmt:<7} {s['convert_s']:>10.2f} {s['bytes'] / MB:>9.1f} "
+                         f"{f'{copy_s:.3f}' if copy_s else '-':>8}  "
+                         f"{rates(r['rows'], s['bytes'], copy_s) if copy_s else '-'}")
+        if r['csv'].get('copy_s') and r['binary'].get('copy_s'):
+            lines.append(f"{'':<32} binary COPY is {r['csv']['copy_s'] / r['binary']['copy_s']:.2f}x "
+                         f"the CSV rate ({r['rows']:,} rows)")
+    if results and 'copy_s' not in results[0]['csv']:
+        lines.append("(client side only: pass --dsn to time COPY on a server)")
+    return '\n'.join(lines)
+
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Compare CSV and binary COPY ingest on generated data.")
+    parser.add_argument('--table', dest='tables', action='append',
+                        help="Table to benchmark (repeatable; default: %s)" % ', '.join(DEFAULT_TABLES))
+    parser.add_argument('--rows', type=int, default=DEFAULT_ROWS, help="Rows per table (default: %(default)s)")
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT,
+                        help="COPY runs per format; the best is kept (default: %(default)s)")
+    parser.add_argument('--seed', type=int, default=42, help="Random seed (default: %(default)s)")
+    parser.add_argument('--dsn', help="libpq connection string; without it only the client side is measured")
+    parser.add_argument('--manifest-dir', default=DEFAULT_MANIFEST_DIR,
+                        help="copy-manifests directory from convert_tables.py (default: %(default)s)")
+    parser.add_argument('--work-dir', help="Keep generated and converted files here (default: a temp dir)")
+    parser.add_argument('--summary', help="Write results as JSON to this file")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    if args.rows < 1 or args.repeat < 1:
+        print("ERROR: --rows and --repeat must be >= 1", file=sys.stderr)
+        return 2
+    tables = args.tables or DEFAULT_TABLES
+    model = load_model([PGSQL_TABLE_DIR])
+    unknown = [t for t in tables if model.table(t) is None]
+    if unknown:
+        print(f"ERROR: unknown table(s): {', '.join(unknown)}", file=sys.stderr)
+        return 2
+
+    session = None
+    if args.dsn:
+        driver = import_driver()
+        if driver[0] is None:
+            print('ERROR: --dsn needs psycopg or psycopg2 (pip install "psycopg[binary]")', file=sys.stderr)
+            return 2
+        session = Session(driver, args.dsn, [('TimeZone', 'UTC'), ('synchronous_commit', 'off')])
+        try:
+            session.open()
+        except Exception as e:
+            print(f"ERROR: cannot connect: {e}", file=sys.stderr)
+            return 2
+
+    work_dir = args.work_dir or tempfile.mkdtemp(prefix='copy-bench-')
+    os.makedirs(work_dir, exist_ok=True)
+    results = []
+    try:
+        for table in tables:
+            print(f"{table}: {args.rows:,} rows ...", file=sys.stderr, flush=True)
+            results.append(bench_table(table, model, args, work_dir, session))
+    except KeyError as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 2
+    finally:
+        if session is not None:
+            session.close()
+        if not args.work_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    print(format_results(results))
+    if args.summary:
+        with open(args.summary, 'w') as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
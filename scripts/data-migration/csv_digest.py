@@ -0,0 +1,622 @@
+#!/usr/bin/env python3
+"""
+CSV Digest - per-table and per-key-range row digests of the exported CSVs
+
+checksum_validator.py compares PostgreSQL with SQL Server, which costs a
+second full scan of the source. Once the export is on disk the CSVs are the
+reference: this tool streams them (constant memory, 100+ GB fine) and computes
+the same bucket digests checksum_validator.py computes in PostgreSQL, so the
+load can be checked against the export with no SQL Server round trip:
+
+1. each record is parsed and converted exactly as transcode_csv.py does for
+   COPY (bcp NULL / empty string, BIT → t/f, datetime → ISO 8601, hex → bytea);
+   records it would reject are counted and left out
+2. every value is rendered as the text the PostgreSQL expression of
+   checksum_validator.CANONICAL gives for the loaded column:
+
+   NULL                      \\N
+   bit → BOOLEAN             1 / 0
+   integers                  decimal digits, no sign for positive values
+   decimal / numeric         NUMERIC(p,s) text: exactly s decimals, rounded
+                             half away from zero (no exponent, no -0)
+   money / smallmoney        4 decimals
+   float / real              the float8 value at 15 significant digits,
+                             rounded to 6 decimals
+   datetime / smalldatetime  YYYY-MM-DD HH:MM:SS.mmm (truncated to ms)
+   datetime2                 YYYY-MM-DD HH:MM:SS.uuuuuu
+   datetimeoffset            the same in UTC
+   date                      YYYY-MM-DD
+   char / nchar              trailing blanks removed
+   uniqueidentifier          lower case
+   binary / varbinary        lower-case hex (no \\x)
+   anything else             the value as PostgreSQL prints the column type
+
+   fields are joined with CHR(31) and hashed with MD5 over the UTF-8 bytes
+3. a bucket's digest is (rows, SUM(h1), SUM(h2)) over the two signed 64-bit
+   halves of the row hashes; buckets are key / --key-width for a single
+   integer PRIMARY KEY, else MD5(key) modulo --hash-buckets. The table digest
+   is the sum over its buckets
+
+Large plain CSVs are cut into --split-mb byte ranges at record boundaries (the
+first line with the full field count, the rule transcode_csv.py uses after an
+embedded newline); chunked exports are read per extract-manifest chunk
+(compressed ones through gzip / zstd). Ranges run on --jobs processes and
+their partial buckets are added up.
+
+--compare runs checksum_validator's bucket query with the same width / count
+on PostgreSQL and reports the buckets that differ; --print-sql prints it to
+run by hand. Both need the TimeZone the data was loaded with (--timezone) for
+TIMESTAMPTZ columns.
+
+Usage:
+    python3 scripts/data-migration/csv_digest.py [CSV ...] [--data-dir DIR] [--table T ...]
+                                                [--jobs N] [--output digests.json]
+    python3 scripts/data-migration/csv_digest.py --compare [--from digests.json] [--dsn DSN]
+    python3 scripts/data-migration/csv_digest.py --table goo --print-sql
+
+Exit Codes:
+    0 - Digests written (and, with --compare, every bucket matches)
+    2 - Invalid arguments / unknown table / unreadable input / no driver / any failure
+    3 - Rejected records, or mismatching buckets with --compare
+
+Author: Pierre Ribeiro (DBA/DBRE)
+Created: 2026-10-19
+Version: 1.0
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import struct
+import sys
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Callable, Dict, List, Optional, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SCRIPTS_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from binary_copy import DEFAULT_TIMEZONE  # noqa: E402
+from checksum_validator import (DEFAULT_BUCKET_ROWS, DEFAULT_MSSQL_SOURCE, INTEGER_KEY_TYPES,  # noqa: E402
+                                TableCheck, collect_buckets, Postgres)
+from load_checkpoint import DEFAULT_DATA_DIR, chunk_layout, default_chunking  # noqa: E402
+from load_plan import discover_csvs  # noqa: E402
+from pg_loader import (MB, SessionPool, build_dsn, decompressed_blocks, import_driver,  # noqa: E402
+                       rates, raw_blocks)
+from schema_model import load_model  # noqa: E402
+from transcode_csv import (DEFAULT_FALLBACK_ENCODING, DEFAULT_MANIFEST_DIR, EXIT_REJECTS, MAX_MERGE_LINES,  # noqa: E402
+                           Reject, Transcoder, _base_type, read_range, table_from_path, table_spec)
+
+# ============================================================================
+# CONSTANTS
+# ============================================================================
+
+DEFAULT_JOBS = os.cpu_count() or 1
+DEFAULT_HASH_BUCKETS = 256
+DEFAULT_SPLIT_MB = 256
+FLOAT_DIGITS = 15                    # float8 → numeric keeps DBL_DIG significant digits
+FLOAT_QUANTUM = Decimal('0.000001')  # checksum_validator.FLOAT_SCALE
+MONEY_QUANTUM = Decimal('0.0001')
+NUMERIC_SCALE_RE = re.compile(r'\(\s*\d+\s*(?:,\s*(\d+)\s*)?\)')
+FLOAT_TYPES = ('REAL', 'FLOAT4', 'DOUBLE PRECISION', 'FLOAT8', 'FLOAT')
+TIMESTAMPTZ_TYPES = ('TIMESTAMPTZ', 'TIMESTAMP WITH TIME ZONE')
+COMPRESSED_SUFFIXES = ('.gz', '.zst')
+SEPARATOR = '\x1f'
+NULL = '\\N'
+
+
+# ============================================================================
+# CANONICAL TEXT
+# ============================================================================
+
+def _decimal_text(d: Decimal) -> str:
+    """NUMERIC text: plain digits, no negative zero."""
+    if d == 0:
+        d = abs(d)
+    return format(d, 'f')
+
+
+def _naive(v: str) -> bool:
+    """transcode_csv.py wrote no UTC offset (YYYY-MM-DD HH:MM:SS[.ffffff])."""
+    return len(v) <= 26 and not v.endswith('Z') and '+' not in v and '-' not in v[19:]
+
+
+def _wall(v: str, tz_column: bool, zone) -> str:
+    """YYYY-MM-DD HH:MM:SS.ffffff of `c::timestamp` (wall clock in the session zone)."""
+    if not _naive(v):
+        dt = datetime.fromisoformat(v)
+        dt = dt.astimezone(zone) if tz_column else dt
+        return dt.strftime('%Y-%m-%d %H:%M:%S') + f".{dt.microsecond:06d}"
+    if len(v) == 10:
+        return v + ' 00:00:00.000000'
+    return v[:19] + '.' + v[20:26].ljust(6, '0')
+
+
+def _utc(v: str, tz_column: bool, zone) -> str:
+    """YYYY-MM-DD HH:MM:SS.ffffff of to_char(c AT TIME ZONE 'UTC', ...)."""
+    dt = datetime.fromisoformat(v)
+    if tz_column:
+        dt = (dt if dt.tzinfo else dt.replace(tzinfo=zone)).astimezone(timezone.utc)
+    else:
+        # timestamp AT TIME ZONE 'UTC' is a timestamptz, printed in the session zone
+        dt = dt.replace(tzinfo=timezone.utc).astimezone(zone)
+    return dt.strftime('%Y-%m-%d %H:%M:%S') + f".{dt.microsecond:06d}"
+
+
+def make_pg_text(pg_type: str, zone) -> Optional[Callable[[str], str]]:
+    """`c::text` of a transcoded value loaded into a column of `pg_type` (None: the value itself)."""
+    base = _base_type(pg_type)
+    if base == 'BOOLEAN':
+        return lambda v: 'true' if v == 't' else 'false'
+    if base in INTEGER_KEY_TYPES:
+        return lambda v: str(int(v))
+    if base in ('NUMERIC', 'DECIMAL'):
+        m = NUMERIC_SCALE_RE.search(pg_type)
+        if not m:
+            return lambda v: _decimal_text(Decimal(v))
+        quantum = Decimal(1).scaleb(-int(m.group(1) or 0))
+        return lambda v: _decimal_text(Decimal(v).quantize(quantum, rounding=ROUND_HALF_UP))
+    if base in FLOAT_TYPES:
+        def floating(v):
+            text = repr(float(v))
+            return text[:-2] if text.endswith('.0') else text
+        return floating
+    if base == 'UUID':
+        return str.lower
+    if base == 'BYTEA':
+        return lambda v: '\\x' + v[2:].lower()
+    if base == 'DATE':
+        return lambda v: v[:10]
+    if base in TIMESTAMPTZ_TYPES:
+        def timestamptz(v):
+            dt = datetime.fromisoformat(v)
+            dt = (dt if dt.tzinfo else dt.replace(tzinfo=zone)).astimezone(zone)
+            minutes = int(dt.utcoffset().total_seconds()) // 60
+            sign, minutes = ('-', -minutes) if minutes < 0 else ('+', minutes)
+            fraction = f".{dt.microsecond:06d}".rstrip('0') if dt.microsecond else ''
+            return (dt.strftime('%Y-%m-%d %H:%M:%S') + fraction + f"{sign}{minutes // 60:02d}"
+                    + (f":{minutes % 60:02d}" if minutes % 60 else ''))
+        return timestamptz
+    if base.startswith('TIMESTAMP'):
+        return lambda v: v[:19] + v[19:26].rstrip('0').rstrip('.')
+    return None
+
+
+def make_canonical(col: dict, zone) -> Callable[[Optional[str]], str]:
+    """Transcoded value (None = NULL) → canonical text, as CANONICAL[kind][0] in PostgreSQL."""
+    kind, pg_type = col['kind'], col['pg_type'] or 'TEXT'
+    base = _base_type(pg_type)
+    tz_column = base in TIMESTAMPTZ_TYPES
+    as_text = make_pg_text(pg_type, zone)
+    text = as_text or (lambda v: v)
+
+    if kind == 'bit':
+        def canonical(v):
+            return '1' if v in ('t', 'true', '1') else '0'
+    elif kind == 'money':
+        def canonical(v):
+            return _decimal_text(Decimal(v).quantize(MONEY_QUANTUM, rounding=ROUND_HALF_UP))
+    elif kind == 'float':
+        single = base in ('REAL', 'FLOAT4')
+
+        def canonical(v):
+            f = float(v)
+            if single:
+                f = struct.unpack('<f', struct.pack('<f', f))[0]
+            d = Decimal(f"{f:.{FLOAT_DIGITS}g}").quantize(FLOAT_QUANTUM, rounding=ROUND_HALF_UP)
+            return _decimal_text(d)
+    elif kind == 'datetime':
+        def canonical(v):
+            return _wall(v, tz_column, zone)[:23]           # .MS truncates
+    elif kind == 'datetime2':
+        def canonical(v):
+            return _wall(v, tz_column, zone)
+    elif kind == 'datetimeoffset':
+        def canonical(v):
+            return _utc(v, tz_column, zone)
+    elif kind == 'date':
+        def canonical(v):
+            return v[:10] if base == 'DATE' else _wall(v, tz_column, zone)[:10]
+    elif kind == 'char':
+        def canonical(v):
+            return text(v).rstrip(' ')
+    elif kind == 'uuid':
+        def canonical(v):
+            return text(v).lower()
+    elif kind == 'binary' and base == 'BYTEA':
+        def canonical(v):
+            return v[2:].lower()
+    elif as_text is None:
+        return lambda v: NULL if v is None else v
+    else:
+        canonical = text
+
+    return lambda v: NULL if v is None else canonical(v)
+
+
+# ============================================================================
+# DIGESTS
+# ============================================================================
+
+def split_hash(digest: bytes) -> Tuple[int, int]:
+    """The two signed 64-bit halves, as ('x' || substr(m, ..., 16))::bit(64)::bigint."""
+    return int.from_bytes(digest[:8], 'big', signed=True), int.from_bytes(digest[8:], 'big', signed=True)
+
+
+class RowDigest:
+    """Buckets of (rows, sum_h1, sum_h2) for the records of one table, as TableCheck.bucket_sql."""
+
+    def __init__(self, check: TableCheck, fields: List[dict], zone):
+        loaded = [f['name'].lower() for f in fields if not f['skip']]
+        self.check = check
+        self.columns = [(loaded.index(c['name'].lower()), make_canonical(c, zone)) for c in check.columns]
+        by_name = {c['name']: pos for c, pos in zip(check.columns, self.columns)}
+        self.key = [by_name[c['name']] for c in check.key]
+        self.buckets: Dict[int, List[int]] = defaultdict(lambda: [0, 0, 0])
+
+    def bucket(self, record: List[Optional[str]]) -> int:
+        check = self.check
+        if check.integer_key:
+            if record[self.key[0][0]] is None:
+                raise Reject("NULL primary key")
+            key = int(record[self.key[0][0]])
+            q = abs(key) // check.width               # bigint division truncates toward zero
+            return -q if key < 0 else q
+        text = SEPARATOR.join(canonical(record[pos]) for pos, canonical in self.key)
+        head = int.from_bytes(hashlib.md5(text.encode('utf-8')).digest()[:4], 'big')
+        return (head & 0x7FFFFFFF) % check.buckets
+
+    def add(self, record: List[Optional[str]]) -> None:
+        text = SEPARATOR.join(canonical(record[pos]) for pos, canonical in self.columns)
+        h1, h2 = split_hash(hashlib.md5(text.encode('utf-8')).digest())
+        total = self.buckets[self.bucket(record)]
+        total[0] += 1
+        total[1] += h1
+        total[2] += h2
+
+
+def merge_buckets(into: Dict[int, List[int]], buckets: Dict[int, List[int]]) -> None:
+    for bucket, (rows, h1, h2) in buckets.items():
+        total = into.setdefault(bucket, [0, 0, 0])
+        total[0] += rows
+        total[1] += h1
+        total[2] += h2
+
+
+def table_digest(buckets: Dict[int, List[int]]) -> str:
+    """rows:h1h2 with both sums folded to 64 bits - one line per table to eyeball or diff."""
+    rows = sum(v[0] for v in buckets.values())
+    h1 = sum(v[1] for v in buckets.values()) & 0xFFFFFFFFFFFFFFFF
+    h2 = sum(v[2] for v in buckets.values()) & 0xFFFFFFFFFFFFFFFF
+    return f"{rows}:{h1:016x}{h2:016x}"
+
+
+# ============================================================================
+# INPUT RANGES
+# ============================================================================
+
+_MODEL = []
+_CHECKS: Dict[Tuple[str, str], Tuple[TableCheck, List[dict]]] = {}
+
+
+def table_check(table: str, manifest_dir: str, width: int, buckets: int) -> Tuple[TableCheck, List[dict]]:
+    """TableCheck and bcp field list of a table, parsed once per process."""
+    if (table, manifest_dir) not in _CHECKS:
+        if not _MODEL:
+            _MODEL.append(load_model())     # tables plus the PRIMARY KEYs in 17.create-constraint
+        model = _MODEL[0]
+        _CHECKS[(table, manifest_dir)] = (TableCheck(table, model, manifest_dir, DEFAULT_MSSQL_SOURCE),
+                                          table_spec(table, model, manifest_dir))
+    check, fields = _CHECKS[(table, manifest_dir)]
+    check.width, check.buckets = width, buckets
+    return check, fields
+
+
+def sync_offset(f, position: int, expected: int, delimiter: bytes) -> int:
+    """
+    Start of the first record at or after `position`: the first line with the
+    full field count (a continuation line of an embedded newline has fewer),
+    within MAX_MERGE_LINES lines; else the next line start.
+    """
+    f.seek(position - 1)
+    if f.read(1) != b'\n':
+        f.readline()
+    first = f.tell()
+    for _ in range(MAX_MERGE_LINES):
+        start = f.tell()
+        line = f.readline()
+        if not line:
+            return start
+        if len(line.rstrip(b'\r\n').split(delimiter)) == expected:
+            return start
+    return first
+
+
+def input_ranges(csv_path: str, expected: int, delimiter: bytes, split_bytes: int) -> List[Tuple[int, int]]:
+    """(offset, bytes) ranges to digest: extract-manifest chunks, large plain ones cut at records."""
+    layout = chunk_layout(csv_path, default_chunking(csv_path))
+    if csv_path.endswith(COMPRESSED_SUFFIXES) or split_bytes <= 0:
+        return layout
+    ranges = []
+    with open(csv_path, 'rb') as f:
+        for offset, length in layout:
+            end = offset + length
+            cuts = [offset]
+            for position in range(offset + split_bytes, end, split_bytes):
+                cut = sync_offset(f, position, expected, delimiter)
+                if cuts[-1] < cut < end:
+                    cuts.append(cut)
+            ranges.extend((a, b - a) for a, b in zip(cuts, cuts[1:] + [end]))
+    return ranges
+
+
+def block_lines(blocks):
+    """Lines (with their newline) of a stream of byte blocks."""
+    rest = b''
+    try:
+        for block in blocks:
+            lines = (rest + block).split(b'\n')
+            rest = lines.pop()
+            for line in lines:
+                yield line + b'\n'
+        if rest:
+            yield rest
+    finally:
+        blocks.close()
+
+
+def range_lines(csv_path: str, offset: int, length: int):
+    """Lines of one byte range of an export; a .gz / .zst chunk is decompressed on the way."""
+    if csv_path.endswith(COMPRESSED_SUFFIXES):
+        yield from block_lines(decompressed_blocks(csv_path, raw_blocks(csv_path, offset, length)))
+        return
+    with open(csv_path, 'rb') as src:
+        yield from read_range(src, offset, length)
+
+
+def digest_range(table: str, csv_path: str, offset: int, length: int, args: dict) -> dict:
+    """Digest one byte range of one export (runs in a worker process)."""
+    started = time.monotonic()
+    check, fields = table_check(table, args['manifest_dir'], args['width'], args['buckets'])
+    digest = RowDigest(check, fields, ZoneInfo(args['timezone']))
+    coder = Transcoder(fields, args['delimiter'], args['fallback_encoding'])
+    lines = range_lines(csv_path, offset, length)
+    with open(os.devnull, 'w') as rejects:
+        try:
+            for record in coder.records(lines, rejects):
+                try:
+                    digest.add(record)
+                except (Reject, ValueError, ArithmeticError):
+                    coder.stats['rejected'] += 1        # COPY would refuse it as well
+        finally:
+            lines.close()
+    return {'table': table, 'buckets': dict(digest.buckets), 'records': coder.stats['records'],
+            'rejected': coder.stats['rejected'], 'bytes': length, 'seconds': time.monotonic() - started}
+
+
+# ============================================================================
+# POSTGRESQL
+# ============================================================================
+
+def compare_table(pg: Postgres, entry: dict, manifest_dir: str, pool: ThreadPoolExecutor) -> dict:
+    check, _ = table_check(entry['table'], manifest_dir, entry['width'], entry['buckets'])
+    pg_buckets = collect_buckets(pg, check, 'postgres', [(None, None)], pool)
+    csv_buckets = {int(b): v for b, v in entry['digest'].items()}
+    mismatched = sorted(b for b in set(pg_buckets) | set(csv_buckets) if pg_buckets.get(b) != csv_buckets.get(b))
+    return {'table': entry['table'], 'bucketing': entry['bucketing'],
+            'csv_rows': entry['rows'], 'pg_rows': sum(v[0] for v in pg_buckets.values()),
+            'csv_digest': entry['table_digest'], 'pg_digest': table_digest(pg_buckets),
+            'mismatched_buckets': [{'bucket': b, 'csv_rows': csv_buckets.get(b, [0])[0],
+                                    'pg_rows': pg_buckets.get(b, [0])[0]} for b in mismatched]}
+
+
+def format_compare(r: dict, max_buckets: int = 20) -> str:
+    bad = r['mismatched_buckets']
+    lines = [f"{'✗' if bad else '✓'} {r['table']}: {r['csv_rows']:,} rows in the CSV, {r['pg_rows']:,} in "
+             f"PostgreSQL; {r['bucketing']}, {len(bad):,} mismatched buckets"]
+    for b in bad[:max_buckets]:
+        lines.append(f"    bucket {b['bucket']}: {b['csv_rows']:,} CSV rows, {b['pg_rows']:,} PostgreSQL rows")
+    if len(bad) > max_buckets:
+        lines.append(f"    ... {len(bad) - max_buckets} more (checksum_validator.py drills down to rows)")
+    return '\n'.join(lines)
+
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Row digests of the exported CSVs, comparable with PostgreSQL.")
+    parser.add_argument('csv', nargs='*', help="Exports to digest (default: every CSV in --data-dir)")
+    parser.add_argument('--data-dir', default=DEFAULT_DATA_DIR, help="Export directory (default: %(default)s)")
+    parser.add_argument('--table', dest='tables', action='append',
+                        help="Only this table (repeatable); names the table of a single CSV not called "
+                             "##perseus_tier_N_<table>.csv")
+    parser.add_argument('-j', '--jobs', type=int, default=DEFAULT_JOBS,
+                        help="Worker processes, and PostgreSQL sessions for --compare (default: %(default)s)")
+    parser.add_argument('--key-width', type=int, default=DEFAULT_BUCKET_ROWS,
+                        help="Key values per bucket for single integer keys (default: %(default)s)")
+    parser.add_argument('--hash-buckets', type=int, default=DEFAULT_HASH_BUCKETS,
+                        help="Buckets for the other tables, by MD5(key) (default: %(default)s)")
+    parser.add_argument('--split-mb', type=int, default=DEFAULT_SPLIT_MB,
+                        help="Cut plain CSVs into ranges of this size; 0 = one range per chunk "
+                             "(default: %(default)s)")
+    parser.add_argument('--manifest-dir', default=DEFAULT_MANIFEST_DIR,
+                        help="copy-manifests directory from convert_tables.py (default: %(default)s)")
+    parser.add_argument('--delimiter', default=',', help="bcp field terminator (default: ',')")
+    parser.add_argument('--fallback-encoding', default=DEFAULT_FALLBACK_ENCODING,
+                        help="Decoding for values that are not valid UTF-8 (default: %(default)s)")
+    parser.add_argument('--timezone', default=DEFAULT_TIMEZONE,
+                        help="TimeZone the data was loaded with, for TIMESTAMPTZ columns (default: %(default)s)")
+    parser.add_argument('-o', '--output', help="Write the digests as JSON to this file")
+    parser.add_argument('--compare', action='store_true', help="Compare the digests with PostgreSQL")
+    parser.add_argument('--from', dest='from_file',
+                        help="With --compare: digests written earlier by --output instead of reading the CSVs")
+    parser.add_argument('--dsn', default='',
+                        help="libpq connection string (default: PGHOST/PGPORT, DB_NAME, DB_USER)")
+    parser.add_argument('--print-sql', action='store_true',
+                        help="Print the PostgreSQL bucket query for each table and exit")
+    return parser.parse_args(argv)
+
+
+def select_inputs(args: argparse.Namespace) -> Dict[str, str]:
+    """table → export path."""
+    if args.csv:
+        if len(args.csv) == 1 and args.tables and len(args.tables) == 1:
+            return {args.tables[0]: args.csv[0]}
+        inputs = {}
+        for path in args.csv:
+            table = table_from_path(path)
+            if not table:
+                raise KeyError(f"cannot tell the table from {os.path.basename(path)} (use --table)")
+            inputs[table] = path
+    else:
+        inputs = {table: info['path'] for table, info in discover_csvs(args.data_dir).items()}
+    if args.tables:
+        unknown = [t for t in args.tables if t not in inputs]
+        if unknown and not args.print_sql:
+            raise KeyError(f"no export for {', '.join(unknown)}")
+        inputs = {t: inputs.get(t, '') for t in args.tables}
+    return inputs
+
+
+def bucketing(check: TableCheck) -> str:
+    return (f"{check.key[0]['name']} / {check.width}" if check.integer_key
+            else f"md5(key) % {check.buckets}")
+
+
+def digest_tables(inputs: Dict[str, str], args: argparse.Namespace) -> Tuple[Dict[str, dict], bool]:
+    """Digest every export on the worker pool; print per-table and overall throughput."""
+    options = {'manifest_dir': args.manifest_dir, 'width': args.key_width, 'buckets': args.hash_buckets,
+               'timezone': args.timezone, 'delimiter': args.delimiter,
+               'fallback_encoding': args.fallback_encoding}
+    tasks = []
+    entries: Dict[str, dict] = {}
+    for table, path in sorted(inputs.items()):
+        try:
+            check, fields = table_check(table, args.manifest_dir, args.key_width, args.hash_buckets)
+        except KeyError as e:
+            if args.tables:
+                raise
+            print(f"  skipping {e.args[0]}", file=sys.stderr)
+            continue
+        ranges = input_ranges(path, len(fields), args.delimiter.encode(), args.split_mb * MB)
+        entries[table] = {'table': table, 'csv': path, 'bucketing': bucketing(check),
+                          'width': args.key_width, 'buckets': args.hash_buckets, 'ranges': len(ranges),
+                          'records': 0, 'rows': 0, 'rejected': 0, 'bytes': 0, 'seconds': 0.0, 'digest': {}}
+        tasks.extend((table, path, offset, length) for offset, length in ranges)
+
+    started = time.monotonic()
+    pending = {table: entry['ranges'] for table, entry in entries.items()}
+    with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+        futures = [pool.submit(digest_range, *task, options) for task in tasks]
+        for future in as_completed(futures):
+            part = future.result()
+            entry = entries[part['table']]
+            merge_buckets(entry['digest'], part['buckets'])
+            for key in ('records', 'rejected', 'bytes', 'seconds'):
+                entry[key] += part[key]
+            pending[part['table']] -= 1
+            if pending[part['table']] == 0:
+                entry['rows'] = sum(v[0] for v in entry['digest'].values())
+                entry['table_digest'] = table_digest(entry['digest'])
+                rejected = f", {entry['rejected']:,} rejected" if entry['rejected'] else ''
+                print(f"  {entry['table']}: {entry['rows']:,} rows{rejected}, {entry['bytes'] / MB:,.1f} MB in "
+                      f"{entry['ranges']} range(s), {entry['seconds']:.1f}s of work "
+                      f"({rates(entry['rows'], entry['bytes'], entry['seconds'])}) "
+                      f"digest {entry['table_digest']}", flush=True)
+    elapsed = time.monotonic() - started
+
+    for entry in entries.values():
+        entry['digest'] = {str(b): v for b, v in sorted(entry['digest'].items())}
+    rows = sum(e['rows'] for e in entries.values())
+    nbytes = sum(e['bytes'] for e in entries.values())
+    print(f"\n{len(entries)} tables, {rows:,} rows, {nbytes / MB:,.1f} MB in {elapsed:.1f}s on {args.jobs} "
+          f"processes ({rates(rows, nbytes, elapsed)})")
+    return entries, any(e['rejected'] for e in entries.values())
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    try:
+        return run(parse_args(argv))
+    except Exception as e:
+        print(f"ERROR: {type(e).__name__}: {e}", file=sys.stderr)
+        return 2
+
+
+def run(args: argparse.Namespace) -> int:
+    if args.jobs < 1 or args.key_width < 1 or args.hash_buckets < 1 or args.split_mb < 0:
+        print("ERROR: --jobs, --key-width and --hash-buckets must be >= 1, --split-mb >= 0", file=sys.stderr)
+        return 2
+    if args.from_file and not args.compare:
+        print("ERROR: --from needs --compare", file=sys.stderr)
+        return 2
+    try:
+        ZoneInfo(args.timezone)
+    except (ZoneInfoNotFoundError, ValueError):
+        print(f"ERROR: unknown --timezone {args.timezone!r}", file=sys.stderr)
+        return 2
+
+    try:
+        if args.from_file:
+            with open(args.from_file) as f:
+                entries, rejected = json.load(f), False
+        else:
+            inputs = select_inputs(args)
+            if args.print_sql:
+                for table in inputs:
+                    check, _ = table_check(table, args.manifest_dir, args.key_width, args.hash_buckets)
+                    print(f"-- {table}: bucket = {bucketing(check)}\n{check.bucket_sql('postgres')};\n")
+                return 0
+            if not inputs:
+                print(f"ERROR: no exports found in {args.data_dir}", file=sys.stderr)
+                return 2
+            entries, rejected = digest_tables(inputs, args)
+    except (KeyError, OSError, ValueError) as e:
+        print(f"ERROR: {e.args[0] if isinstance(e, KeyError) else e}", file=sys.stderr)
+        return 2
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(entries, f, indent=2)
+    if rejected:
+        print("Rejected records are not in the digests (transcode_csv.py --rejects lists them)", file=sys.stderr)
+    if not args.compare:
+        return EXIT_REJECTS if rejected else 0
+
+    driver = import_driver()
+    if driver[0] is None:
+        print('ERROR: needs psycopg or psycopg2 (pip install "psycopg[binary]")', file=sys.stderr)
+        return 2
+    session_pool = SessionPool(driver, build_dsn(args), [('TimeZone', args.timezone)], args.jobs)
+    pg = Postgres(session_pool)
+    results = []
+    try:
+        with ThreadPoolExecutor(max_workers=args.jobs) as pool, ThreadPoolExecutor(max_workers=args.jobs) as tables:
+            futures = [tables.submit(compare_table, pg, entry, args.manifest_dir, pool)
+                       for _, entry in sorted(entries.items())]
+            for future in futures:
+                result = future.result()
+                print(format_compare(result), flush=True)
+                results.append(result)
+    except (KeyError, driver[1].Error) as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 2
+    finally:
+        session_pool.close()
+
+    bad = [r for r in results if r['mismatched_buckets']]
+    print(f"\n{len(results) - len(bad)}/{len(results)} tables match the export"
+          + (f"; mismatches in: {', '.join(r['table'] for r in bad)}" if bad else ''))
+    return EXIT_REJECTS if bad or rejected else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -17,6 +17,9 @@
 #   --tier START-END    Execute tier range (e.g., 0-2)
 #   --no-cleanup        Skip temp table cleanup on exit
 #   --timeout SECONDS   Query timeout in seconds (default: 1800)
+#   --streams N         Parallel bcp streams for large tables (default: 4, 1 = off)
+#   --compress CODEC    Compress CSVs as bcp writes them: gzip, zstd or none (default)
+#   --subset FILE       Run a subset_planner.py script instead of the tier scripts
 #   --help              Display this help message
 #
 # Configuration Precedence:
@@ -35,10 +38,21 @@
 #                       → Mapped to TIMEOUT variable in script
 #   DATA_DIR            CSV output directory (default: /tmp/perseus-data-export)
 #   LOG_DIR             Log output directory (default: ./logs)
+#   EXTRACT_STREAMS     Parallel bcp queryout streams per large table (default: 4)
+#   CHUNK_MIN_ROWS      Tables with at least this many rows are chunked (default: 5000000)
+#   CHUNK_ROWS          Target rows per chunk (default: 10000000)
+#   SQLCMD_CMD          sqlcmd executable (default: sqlcmd)
+#   BCP_CMD             bcp executable (default: bcp; a local stand-in works for tests)
+#   COMPRESS            gzip | zstd | none (default: none); bcp writes into a named
+#                       pipe, <table>.csv.gz / .csv.zst is written directly
+#   COMPRESS_LEVEL      Compression level (default: 3)
 #
 # CLI Flags (Override .env):
 #   --timeout SECONDS   Override SQL_TIMEOUT from .env
+#   --streams N         Override EXTRACT_STREAMS from .env
+#   --compress CODEC    Override COMPRESS from .env
 #   --tier N|START-END  Execute specific tier(s)
+#   --subset FILE       Extract an FK-closed subset (subset_planner.py output)
 #   --dry-run           Validate without executing
 #   --no-cleanup        Skip temp table cleanup
 #
@@ -62,6 +76,13 @@ readonly ENV_FILE="${SCRIPT_DIR}/.env"
 readonly DEFAULT_DATA_DIR="/tmp/perseus-data-export"
 readonly DEFAULT_LOG_DIR="${SCRIPT_DIR}/logs"
 readonly DEFAULT_TIMEOUT=3600
+readonly DEFAULT_EXTRACT_STREAMS=4
+readonly DEFAULT_CHUNK_MIN_ROWS=5000000
+readonly DEFAULT_CHUNK_ROWS=10000000
+readonly DEFAULT_SQLCMD_CMD="sqlcmd"
+readonly DEFAULT_BCP_CMD="bcp"
+readonly DEFAULT_COMPRESS="none"
+readonly DEFAULT_COMPRESS_LEVEL=3
 readonly MIN_DISK_SPACE_GB=3
 readonly MIN_TEMPDB_SPACE_GB=5
 
@@ -96,6 +117,13 @@ fi
 DATA_DIR=""
 LOG_DIR=""
 TIMEOUT=""
+EXTRACT_STREAMS=""
+CHUNK_MIN_ROWS=""
+CHUNK_ROWS=""
+SQLCMD_CMD=""
+BCP_CMD=""
+COMPRESS=""
+COMPRESS_LEVEL=""
 
 # LOG_FILE initialized early with default, then updated in load_environment() if needed
 LOG_FILE="${DEFAULT_LOG_DIR}/extract-data-${TIMESTAMP}.log"
@@ -103,9 +131,12 @@ DRY_RUN=0
 TIER_START=-1
 TIER_END=-1
 DO_CLEANUP=1
+SUBSET_SCRIPT=""
 SESSION_ID=""
 TEMP_TABLES=()
 
+COMPRESSION_REPORT=""
+
 # Connection parameters (loaded from .env)
 SQL_SERVER=""
 SQL_DATABASE=""
@@ -117,6 +148,8 @@ STATS_START_TIME=""
 STATS_TABLES_PROCESSED=0
 STATS_TOTAL_ROWS=0
 STATS_TOTAL_CSV_SIZE=0
+STATS_TOTAL_RAW_SIZE=0
+EXPORT_RAW_BYTES=""
 
 # -----------------------------------------------------------------------------
 # LOGGING FUNCTIONS
@@ -208,7 +241,7 @@ cleanup() {
         for table in "${TEMP_TABLES[@]}"; do
             if [[ -n "${table}" ]]; then
                 log_debug "Dropping table: ${table}"
-                sqlcmd -S "${SQL_SERVER}" -U "${SQL_USER}" -P "${SQL_PASSWORD}" \
+                "${SQLCMD_CMD}" -S "${SQL_SERVER}" -U "${SQL_USER}" -P "${SQL_PASSWORD}" \
                     -d "${SQL_DATABASE}" -b -t "${TIMEOUT}" \
                     -Q "IF OBJECT_ID('tempdb..${table}') IS NOT NULL DROP TABLE ${table};" \
                     >> "${LOG_FILE}" 2>&1 || log_warn "Failed to drop table: ${table}"
@@ -274,6 +307,10 @@ ${COLOR_BOLD}OPTIONS:${COLOR_RESET}
     --tier START-END       Execute tier range (e.g., 0-2)
     --no-cleanup           Skip temp table cleanup on exit
     --timeout SECONDS      Query timeout in seconds (default: ${DEFAULT_TIMEOUT})
+    --streams N            Parallel bcp streams for large tables (default: ${DEFAULT_EXTRACT_STREAMS}, 1 = off)
+    --compress CODEC       Compress CSVs while bcp writes them: gzip, zstd, none (default: ${DEFAULT_COMPRESS})
+    --subset FILE          Run FILE (from subset_planner.py) instead of the tier scripts:
+                           one FK-closed subset grown from seed rows, same ##perseus_tier_* output
     --help                 Display this help message
 
 ${COLOR_BOLD}CONFIGURATION PRECEDENCE:${COLOR_RESET}
@@ -294,13 +331,22 @@ ${COLOR_BOLD}.ENV CONFIGURATION:${COLOR_RESET}
       SQL_TIMEOUT          Query timeout (default: ${DEFAULT_TIMEOUT}s)
       DATA_DIR             CSV directory (default: ${DEFAULT_DATA_DIR})
       LOG_DIR              Log directory (default: ${DEFAULT_LOG_DIR})
+      EXTRACT_STREAMS      Parallel bcp streams (default: ${DEFAULT_EXTRACT_STREAMS})
+      CHUNK_MIN_ROWS       Chunk tables with at least this many rows (default: ${DEFAULT_CHUNK_MIN_ROWS})
+      CHUNK_ROWS           Target rows per chunk (default: ${DEFAULT_CHUNK_ROWS})
+      SQLCMD_CMD           sqlcmd executable (default: ${DEFAULT_SQLCMD_CMD})
+      BCP_CMD              bcp executable (default: ${DEFAULT_BCP_CMD})
+      COMPRESS             gzip | zstd | none (default: ${DEFAULT_COMPRESS})
+      COMPRESS_LEVEL       Compression level (default: ${DEFAULT_COMPRESS_LEVEL})
 
 ${COLOR_BOLD}CLI FLAGS (Override .env):${COLOR_RESET}
     --timeout SECONDS      Override SQL_TIMEOUT from .env
+    --streams N            Override EXTRACT_STREAMS from .env
+    --compress CODEC       Override COMPRESS from .env
 
 ${COLOR_BOLD}REQUIRED FILES:${COLOR_RESET}
     .env                   Database connection configuration
-    extract-tier-*.sql     Tier extraction scripts (0-4)
+    extract-tier-*.sql     Tier extraction scripts (0-4), unless --subset is given
 
 ${COLOR_BOLD}EXAMPLES:${COLOR_RESET}
     # Extract all tiers with defaults
@@ -318,6 +364,16 @@ ${COLOR_BOLD}EXAMPLES:${COLOR_RESET}
     # Custom timeout and no cleanup
     ${SCRIPT_NAME} --timeout 3600 --no-cleanup
 
+    # Export large tables with 8 parallel bcp streams
+    ${SCRIPT_NAME} --streams 8
+
+    # Write zstd-compressed CSVs (one frame per chunk) and a ratio report
+    ${SCRIPT_NAME} --compress zstd
+
+    # FK-closed dev subset about 50x smaller than production
+    python3 subset_planner.py --shrink 50 -o extract-subset.sql
+    ${SCRIPT_NAME} --subset extract-subset.sql
+
 ${COLOR_BOLD}EXIT CODES:${COLOR_RESET}
     0  Success
     1  Error (configuration, prerequisites, execution)
@@ -325,7 +381,9 @@ ${COLOR_BOLD}EXIT CODES:${COLOR_RESET}
 
 ${COLOR_BOLD}OUTPUT:${COLOR_RESET}
     Logs:  ${LOG_DIR}/extract-data-TIMESTAMP.log
-    CSVs:  ${DATA_DIR}/*.csv
+    CSVs:  ${DATA_DIR}/*.csv (*.csv.gz / *.csv.zst with --compress)
+    Chunk manifests (large tables): ${DATA_DIR}/*.manifest.json
+    Compression report: ${DATA_DIR}/compression-TIMESTAMP.tsv
 
 For more information, see: ${SCRIPT_DIR}/README.md
 EOF
@@ -382,6 +440,30 @@ parse_arguments() {
                 log_info "Query timeout set to ${TIMEOUT}s"
                 shift 2
                 ;;
+            --streams)
+                if [[ -z "${2:-}" || ! "$2" =~ ^[1-9][0-9]*$ ]]; then
+                    error_exit "Option --streams requires a positive integer"
+                fi
+                EXTRACT_STREAMS="$2"
+                log_info "Parallel bcp streams set to ${EXTRACT_STREAMS}"
+                shift 2
+                ;;
+            --compress)
+                if [[ ! "${2:-}" =~ ^(gzip|zstd|none)$ ]]; then
+                    error_exit "Option --compress requires gzip, zstd or none"
+                fi
+                COMPRESS="$2"
+                log_info "CSV compression set to ${COMPRESS}"
+                shift 2
+                ;;
+            --subset)
+                if [[ -z "${2:-}" ]]; then
+                    error_exit "Option --subset requires a script file (see subset_planner.py)"
+                fi
+                SUBSET_SCRIPT="$2"
+                log_info "Subset extraction script: ${SUBSET_SCRIPT}"
+                shift 2
+                ;;
             *)
                 error_exit "Unknown option: $1 (use --help for usage)"
                 ;;
@@ -456,6 +538,34 @@ load_environment() {
                 LOG_DIR="${value}"
                 loaded_from_env+=("LOG_DIR")
                 ;;
+            EXTRACT_STREAMS)
+                EXTRACT_STREAMS="${value}"
+                loaded_from_env+=("EXTRACT_STREAMS")
+                ;;
+            CHUNK_MIN_ROWS)
+                CHUNK_MIN_ROWS="${value}"
+                loaded_from_env+=("CHUNK_MIN_ROWS")
+                ;;
+            CHUNK_ROWS)
+                CHUNK_ROWS="${value}"
+                loaded_from_env+=("CHUNK_ROWS")
+                ;;
+            SQLCMD_CMD)
+                SQLCMD_CMD="${value}"
+                loaded_from_env+=("SQLCMD_CMD")
+                ;;
+            BCP_CMD)
+                BCP_CMD="${value}"
+                loaded_from_env+=("BCP_CMD")
+                ;;
+            COMPRESS)
+                COMPRESS="${value}"
+                loaded_from_env+=("COMPRESS")
+                ;;
+            COMPRESS_LEVEL)
+                COMPRESS_LEVEL="${value}"
+                loaded_from_env+=("COMPRESS_LEVEL")
+                ;;
             BCP_BATCH_SIZE|BCP_ERROR_FILE)
                 export "${key}=${value}"
                 loaded_from_env+=("${key}")
@@ -481,6 +591,24 @@ load_environment() {
         log_debug "SQL_TIMEOUT not in .env, using default: ${DEFAULT_TIMEOUT}s"
     fi
 
+    EXTRACT_STREAMS="${EXTRACT_STREAMS:-${DEFAULT_EXTRACT_STREAMS}}"
+    CHUNK_MIN_ROWS="${CHUNK_MIN_ROWS:-${DEFAULT_CHUNK_MIN_ROWS}}"
+    CHUNK_ROWS="${CHUNK_ROWS:-${DEFAULT_CHUNK_ROWS}}"
+    SQLCMD_CMD="${SQLCMD_CMD:-${DEFAULT_SQLCMD_CMD}}"
+    BCP_CMD="${BCP_CMD:-${DEFAULT_BCP_CMD}}"
+    COMPRESS="${COMPRESS:-${DEFAULT_COMPRESS}}"
+    COMPRESS_LEVEL="${COMPRESS_LEVEL:-${DEFAULT_COMPRESS_LEVEL}}"
+
+    local setting
+    for setting in EXTRACT_STREAMS CHUNK_MIN_ROWS CHUNK_ROWS COMPRESS_LEVEL; do
+        if [[ ! "${!setting}" =~ ^[1-9][0-9]*$ ]]; then
+            error_exit "${setting} must be a positive integer (got: ${!setting})"
+        fi
+    done
+    if [[ ! "${COMPRESS}" =~ ^(gzip|zstd|none)$ ]]; then
+        error_exit "COMPRESS must be gzip, zstd or none (got: ${COMPRESS})"
+    fi
+
     # -------------------------------------------------------------------------
     # Validate required connection parameters
     # -------------------------------------------------------------------------
@@ -509,6 +637,8 @@ load_environment() {
     log_info "  User:     ${SQL_USER}"
     log_info "  Password: $(printf '*%.0s' {1..8})"
     log_info "  Timeout:  ${TIMEOUT}s"
+    log_info "  Streams:  ${EXTRACT_STREAMS} (tables >= ${CHUNK_MIN_ROWS} rows, ~${CHUNK_ROWS} rows/chunk)"
+    log_info "  Compress: ${COMPRESS}$([[ "${COMPRESS}" == none ]] || echo " (level ${COMPRESS_LEVEL})")"
     log_info "  Data Dir: ${DATA_DIR}"
     log_info "  Log Dir:  ${LOG_DIR}"
 }
@@ -521,16 +651,27 @@ check_prerequisites() {
     print_section "Prerequisite Checks"
 
     # Check sqlcmd availability
-    if ! command -v sqlcmd &> /dev/null; then
-        error_exit "sqlcmd not found in PATH. Install SQL Server command-line tools."
+    if ! command -v "${SQLCMD_CMD}" &> /dev/null; then
+        error_exit "${SQLCMD_CMD} not found in PATH. Install SQL Server command-line tools."
     fi
-    log_success "sqlcmd found: $(command -v sqlcmd)"
+    log_success "sqlcmd found: $(command -v "${SQLCMD_CMD}")"
 
     # Check bcp availability
-    if ! command -v bcp &> /dev/null; then
-        error_exit "bcp not found in PATH. Install SQL Server command-line tools."
+    if ! command -v "${BCP_CMD}" &> /dev/null; then
+        error_exit "${BCP_CMD} not found in PATH. Install SQL Server command-line tools."
+    fi
+    log_success "bcp found: $(command -v "${BCP_CMD}")"
+
+    # Check compressor availability (--compress / COMPRESS)
+    if [[ "${COMPRESS}" != "none" ]]; then
+        if ! command -v "${COMPRESS}" &> /dev/null; then
+            error_exit "${COMPRESS} not found in PATH (needed for COMPRESS=${COMPRESS})"
+        fi
+        if ! command -v mkfifo &> /dev/null; then
+            error_exit "mkfifo not found in PATH (needed for COMPRESS=${COMPRESS})"
+        fi
+        log_success "${COMPRESS} found: $(command -v "${COMPRESS}")"
     fi
-    log_success "bcp found: $(command -v bcp)"
 
     # Create log directory
     if [[ ! -d "${LOG_DIR}" ]]; then
@@ -564,14 +705,14 @@ check_prerequisites() {
 
     # Test database connectivity
     log_info "Testing database connectivity..."
-    if ! sqlcmd -S "${SQL_SERVER}" -U "${SQL_USER}" -P "${SQL_PASSWORD}" \
+    if ! "${SQLCMD_CMD}" -S "${SQL_SERVER}" -U "${SQL_USER}" -P "${SQL_PASSWORD}" \
         -d "${SQL_DATABASE}" -Q "SELECT 1 AS test;" -b > /dev/null 2>> "${LOG_FILE}"; then
         error_exit "Database connectivity test failed. Check credentials and network."
     fi
     log_success "Database connectivity verified"
 
     # Get session ID
-    SESSION_ID=$(sqlcmd -S "${SQL_SERVER}" -U "${SQL_USER}" -P "${SQL_PASSWORD}" \
+    SESSION_ID=$("${SQLCMD_CMD}" -S "${SQL_SERVER}" -U "${SQL_USER}" -P "${SQL_PASSWORD}" \
         -d "${SQL_DATABASE}" -h -1 -W -b -m 1 \
         -Q "SET NOCOUNT ON; SELECT @@SPID AS session_id;" 2>> "${LOG_FILE}" | grep -E '^[0-9]+$' | head -1)
 
@@ -585,7 +726,7 @@ check_prerequisites() {
     # Check tempdb space
     log_info "Checking tempdb free space..."
     local tempdb_free_gb
-    tempdb_free_gb=$(sqlcmd -S "${SQL_SERVER}" -U "${SQL_USER}" -P "${SQL_PASSWORD}" \
+    tempdb_free_gb=$("${SQLCMD_CMD}" -S "${SQL_SERVER}" -U "${SQL_USER}" -P "${SQL_PASSWORD}" \
         -d tempdb -h -1 -W -b -m 1 \
         -Q "SET NOCOUNT ON; SELECT CAST(SUM(unallocated_extent_page_count) * 8.0 / 1024 / 1024 AS DECIMAL(10,2)) AS free_gb FROM sys.dm_db_file_space_usage;" \
         2>> "${LOG_FILE}" | grep -E '^[0-9.]+$' | head -1)
@@ -602,6 +743,18 @@ check_prerequisites() {
         log_warn "Could not verify tempdb space"
     fi
 
+    # A subset script replaces the tier scripts
+    if [[ -n "${SUBSET_SCRIPT}" ]]; then
+        if [[ ${TIER_START} -ne -1 ]]; then
+            error_exit "--subset and --tier cannot be combined (the subset script covers every tier)"
+        fi
+        if [[ ! -f "${SUBSET_SCRIPT}" ]]; then
+            error_exit "Missing subset script: ${SUBSET_SCRIPT}"
+        fi
+        log_success "Subset script found: ${SUBSET_SCRIPT}"
+        return 0
+    fi
+
     # Check tier scripts exist
     local tier_start="${TIER_START}"
     local tier_end="${TIER_END}"
@@ -631,7 +784,8 @@ backup_existing_csvs() {
     print_section "Backing Up Existing CSVs"
 
     local csv_count
-    csv_count=$(find "${DATA_DIR}" -maxdepth 1 -type f -name "*.csv" 2>/dev/null | wc -l)
+    csv_count=$(find "${DATA_DIR}" -maxdepth 1 -type f \( -name "*.csv" -o -name "*.csv.gz" -o -name "*.csv.zst" \) \
+        2>/dev/null | wc -l)
 
     if [[ ${csv_count} -eq 0 ]]; then
         log_info "No existing CSVs to backup"
@@ -643,11 +797,18 @@ backup_existing_csvs() {
 
     log_info "Backing up ${csv_count} CSV files to: ${backup_dir}"
 
-    if mv "${DATA_DIR}"/*.csv "${backup_dir}/" 2>> "${LOG_FILE}"; then
+    if find "${DATA_DIR}" -maxdepth 1 -type f \( -name "*.csv" -o -name "*.csv.gz" -o -name "*.csv.zst" \) \
+            -exec mv {} "${backup_dir}/" \; 2>> "${LOG_FILE}"; then
         log_success "CSVs backed up successfully"
     else
         log_warn "Some CSVs could not be backed up"
     fi
+
+    # Chunk manifests describe the CSVs they sit next to - move them along
+    if compgen -G "${DATA_DIR}/*.manifest.json" > /dev/null; then
+        mv "${DATA_DIR}"/*.manifest.json "${backup_dir}/" 2>> "${LOG_FILE}" \
+            || log_warn "Some chunk manifests could not be backed up"
+    fi
 }
 
 # -----------------------------------------------------------------------------
@@ -673,7 +834,7 @@ execute_tier() {
 
     # Execute tier script
     log_info "Executing SQL script..."
-    if ! sqlcmd -S "${SQL_SERVER}" -U "${SQL_USER}" -P "${SQL_PASSWORD}" \
+    if ! "${SQLCMD_CMD}" -S "${SQL_SERVER}" -U "${SQL_USER}" -P "${SQL_PASSWORD}" \
         -d "${SQL_DATABASE}" -b -t "${TIMEOUT}" \
         -i "${script_file}" >> "${LOG_FILE}" 2>&1; then
         error_exit "Tier ${tier} execution failed. Check log: ${LOG_FILE}"
@@ -688,20 +849,30 @@ execute_combined_tiers_sql() {
     local tier_end="$2"
     local combined_script="${SCRIPT_DIR}/.tmp-combined-tiers-${TIMESTAMP}.sql"
 
-    print_section "Executing Combined Tiers (${tier_start}-${tier_end}) in Single Session"
+    # The subset script (subset_planner.py) creates every tier's tables by itself
+    local scripts=()
+    if [[ -n "${SUBSET_SCRIPT}" ]]; then
+        scripts=("${SUBSET_SCRIPT}")
+        print_section "Executing Subset Extraction in Single Session"
+    else
+        for tier in $(seq "${tier_start}" "${tier_end}"); do
+            scripts+=("${SCRIPT_DIR}/extract-tier-${tier}.sql")
+        done
+        print_section "Executing Combined Tiers (${tier_start}-${tier_end}) in Single Session"
+    fi
 
     log_info "Strategy: Option A - Single SQL session for all tiers"
     log_info "Timeout: ${TIMEOUT}s"
 
     if [[ ${DRY_RUN} -eq 1 ]]; then
-        log_info "[DRY RUN] Would execute combined tiers ${tier_start}-${tier_end}"
+        log_info "[DRY RUN] Would execute combined: ${scripts[*]}"
         return 0
     fi
 
     # Validate all tier scripts exist
     log_info "Validating tier scripts..."
-    for tier in $(seq "${tier_start}" "${tier_end}"); do
-        local script_file="${SCRIPT_DIR}/extract-tier-${tier}.sql"
+    local script_file
+    for script_file in "${scripts[@]}"; do
         if [[ ! -f "${script_file}" ]]; then
             error_exit "Missing tier script: ${script_file}"
         fi
@@ -721,10 +892,9 @@ execute_combined_tiers_sql() {
         echo "GO"
         echo ""
 
-        for tier in $(seq "${tier_start}" "${tier_end}"); do
-            local script_file="${SCRIPT_DIR}/extract-tier-${tier}.sql"
+        for script_file in "${scripts[@]}"; do
             echo "-- ============================================================================="
-            echo "-- TIER ${tier}: ${script_file}"
+            echo "-- $(basename "${script_file}"): ${script_file}"
             echo "-- ============================================================================="
             echo ""
             cat "${script_file}"
@@ -779,7 +949,7 @@ execute_combined_tiers_sql() {
     # NOTE: Using ${TIMEOUT} from .env (SQL_TIMEOUT) to control session lifetime
     # Recommended: Set SQL_TIMEOUT=21600 (6 hours) in .env for large table exports
     # For development with TOP 5000 limit, SQL_TIMEOUT=3600 (1 hour) is sufficient
-    sqlcmd -S "${SQL_SERVER}" -U "${SQL_USER}" -P "${SQL_PASSWORD}" \
+    "${SQLCMD_CMD}" -S "${SQL_SERVER}" -U "${SQL_USER}" -P "${SQL_PASSWORD}" \
         -d "${SQL_DATABASE}" -b -t "${TIMEOUT}" \
         -i "${combined_script}" 2>&1 | tee -a "${LOG_FILE}" | {
         # Monitor output for "READY_FOR_EXPORT" signal
@@ -830,13 +1000,370 @@ execute_combined_tiers_sql() {
     fi
 }
 
+# -----------------------------------------------------------------------------
+# COMPRESSED OUTPUT
+# -----------------------------------------------------------------------------
+# With COMPRESS=gzip|zstd, bcp writes into a named pipe and the compressor
+# writes ${table}.csv.gz / .csv.zst, so the raw CSV never touches the disk.
+# Both formats decompress concatenated members / frames as one stream: a
+# chunked export stays one file per table, and each chunk's byte range in the
+# manifest is a complete member / frame that can be decompressed on its own.
+# Raw bytes are counted on the way through (<file>.raw) for the ratio report.
+# -----------------------------------------------------------------------------
+
+csv_extension() {
+    case "${COMPRESS}" in
+        gzip) echo ".csv.gz" ;;
+        zstd) echo ".csv.zst" ;;
+        *)    echo ".csv" ;;
+    esac
+}
+
+compress_stream() {
+    case "${COMPRESS}" in
+        gzip) gzip -c "-${COMPRESS_LEVEL}" ;;
+        zstd) zstd -q -c "-${COMPRESS_LEVEL}" ;;
+        *)    cat ;;
+    esac
+}
+
+decompress_file() {
+    local file="$1"
+
+    case "${file}" in
+        *.gz)  gzip -dc "${file}" ;;
+        *.zst) zstd -q -dc "${file}" ;;
+        *)     cat "${file}" ;;
+    esac
+}
+
+# bcp with its data file replaced by a named pipe feeding compress_stream.
+# Usage: bcp_compressed OUTPUT_FILE SOURCE out|queryout [bcp options...]
+bcp_compressed() {
+    local out_file="$1"
+    local source="$2"
+    local direction="$3"
+    shift 3
+    local fifo="${out_file}.fifo"
+    local count_fifo="${out_file}.count"
+
+    rm -f "${fifo}" "${count_fifo}" "${out_file}.raw"
+    mkfifo "${fifo}" "${count_fifo}" || return 1
+
+    wc -c < "${count_fifo}" | tr -d '[:space:]' > "${out_file}.raw" &
+    local count_pid=$!
+    tee "${count_fifo}" < "${fifo}" | compress_stream > "${out_file}" &
+    local compress_pid=$!
+
+    local rc=0
+    "${BCP_CMD}" "${source}" "${direction}" "${fifo}" "$@" || rc=$?
+    if [[ ${rc} -ne 0 ]]; then
+        # bcp may have failed before opening the pipe: unblock the reader
+        { exec 3<> "${fifo}"; exec 3>&-; } 2>/dev/null || true
+    fi
+    wait "${compress_pid}" || { [[ ${rc} -ne 0 ]] || rc=1; }
+    wait "${count_pid}" || true
+    rm -f "${fifo}" "${count_fifo}"
+
+    return ${rc}
+}
+
+# Append one table to the compression report (COMPRESSION_REPORT, TSV)
+record_compression() {
+    local table_name="$1"
+    local raw_bytes="$2"
+    local bytes="$3"
+
+    if [[ ! -f "${COMPRESSION_REPORT}" ]]; then
+        printf 'table\tcodec\tlevel\traw_bytes\tbytes\tratio\n' > "${COMPRESSION_REPORT}"
+    fi
+    printf '%s\t%s\t%s\t%d\t%d\t%s\n' "${table_name}" "${COMPRESS}" "${COMPRESS_LEVEL}" \
+        "${raw_bytes}" "${bytes}" "$(compression_ratio "${raw_bytes}" "${bytes}")" >> "${COMPRESSION_REPORT}"
+}
+
+compression_ratio() {
+    local raw_bytes="$1"
+    local bytes="$2"
+
+    if [[ ${bytes} -gt 0 ]]; then
+        echo "scale=2; ${raw_bytes} / ${bytes}" | bc
+    else
+        echo "0"
+    fi
+}
+
+# -----------------------------------------------------------------------------
+# CHUNKED EXPORT
+# -----------------------------------------------------------------------------
+# Tables with at least CHUNK_MIN_ROWS rows are exported by EXTRACT_STREAMS
+# parallel `bcp queryout` streams, one file per chunk:
+#   - key_range: ranges over an integer column (identity / "id" preferred),
+#     with boundaries taken from NTILE so skewed keys still split evenly
+#   - ntile:     tables without one are bucketed by NTILE over %%physloc%%;
+#     every stream re-reads the table, so this is the slower fallback
+# The chunk files are joined in order into the usual ${table}.csv so the
+# loader is unaffected: the first is renamed into place and the others are
+# appended, never re-read. ${table}.manifest.json records each chunk's
+# predicate, planned rows, rows copied (from the chunk's bcp log) and byte
+# range within that CSV (compressed bytes plus raw_bytes with COMPRESS; see
+# COMPRESSED OUTPUT).
+# -----------------------------------------------------------------------------
+
+tempdb_query() {
+    local query="$1"
+
+    "${SQLCMD_CMD}" -S "${SQL_SERVER}" -U "${SQL_USER}" -P "${SQL_PASSWORD}" \
+        -d tempdb -h -1 -W -b -m 1 -s '|' -t "${TIMEOUT}" \
+        -Q "SET NOCOUNT ON; ${query}" 2>> "${LOG_FILE}" | sed '/^$/d'
+}
+
+temp_table_row_count() {
+    local table_name="$1"
+    local rows
+
+    # Catalog row count - avoids a full scan just to decide whether to chunk
+    rows=$(tempdb_query "SELECT SUM(rows) FROM tempdb.sys.partitions
+        WHERE object_id = OBJECT_ID('tempdb..${table_name}') AND index_id IN (0, 1);" \
+        | grep -E '^[0-9]+$' | head -1 || true)
+
+    echo "${rows:-0}"
+}
+
+chunk_key_column() {
+    local table_name="$1"
+
+    tempdb_query "SELECT TOP 1 QUOTENAME(c.name)
+        FROM tempdb.sys.columns c
+        JOIN tempdb.sys.types t ON t.user_type_id = c.user_type_id
+        WHERE c.object_id = OBJECT_ID('tempdb..${table_name}')
+          AND t.name IN ('bigint', 'int', 'smallint')
+        ORDER BY c.is_identity DESC, CASE WHEN c.name = 'id' THEN 0 ELSE 1 END, c.column_id;" \
+        | head -1 || true
+}
+
+# Records bcp reports for one run ("N rows copied."); empty if it did not say
+bcp_rows_copied() {
+    local bcp_log="$1"
+
+    sed -n 's/^[[:space:]]*\([0-9][0-9]*\) rows copied\..*/\1/p' "${bcp_log}" 2>/dev/null | tail -1
+}
+
+json_escape() {
+    local value="$1"
+    value="${value//\\/\\\\}"
+    value="${value//\"/\\\"}"
+    printf '%s' "${value}"
+}
+
+export_chunked() {
+    local table_name="$1"
+    local source_rows="$2"
+    local ext
+    ext=$(csv_extension)
+    local csv_file="${DATA_DIR}/${table_name}${ext}"
+    local manifest_file="${DATA_DIR}/${table_name}.manifest.json"
+    local chunk_dir="${DATA_DIR}/.chunks-${table_name}"
+
+    local chunks=$(( (source_rows + CHUNK_ROWS - 1) / CHUNK_ROWS ))
+    [[ ${chunks} -lt ${EXTRACT_STREAMS} ]] && chunks=${EXTRACT_STREAMS}
+
+    # Explicit column list: the NTILE strategy adds a helper column
+    local select_list
+    select_list=$(tempdb_query "SELECT QUOTENAME(name) FROM tempdb.sys.columns
+        WHERE object_id = OBJECT_ID('tempdb..${table_name}') ORDER BY column_id;" | paste -sd, -)
+    if [[ -z "${select_list}" ]]; then
+        log_error "Could not read column list for ${table_name}"
+        return 1
+    fi
+
+    # -------------------------------------------------------------------------
+    # Plan: one predicate + planned row count per chunk
+    # -------------------------------------------------------------------------
+    local key_column strategy source_query
+    local predicates=()
+    local planned=()
+    key_column=$(chunk_key_column "${table_name}")
+
+    if [[ -n "${key_column}" ]]; then
+        strategy="key_range"
+        source_query="SELECT ${select_list} FROM tempdb..${table_name}"
+
+        local buckets=()
+        mapfile -t buckets < <(tempdb_query "SELECT MAX(k), COUNT_BIG(*)
+            FROM (SELECT ${key_column} AS k, NTILE(${chunks}) OVER (ORDER BY ${key_column}) AS b
+                  FROM tempdb..${table_name} WHERE ${key_column} IS NOT NULL) x
+            GROUP BY b ORDER BY b;" | grep -E '^-?[0-9]+\|[0-9]+$' || true)
+        if [[ ${#buckets[@]} -eq 0 ]]; then
+            log_error "Could not compute key ranges for ${table_name} on ${key_column}"
+            return 1
+        fi
+
+        # Upper bounds only: a key value never straddles two chunks, and a
+        # bucket made entirely of one repeated value folds into the previous one
+        local bounds=()
+        local line hi count
+        for line in "${buckets[@]}"; do
+            hi="${line%%|*}"
+            count="${line##*|}"
+            if [[ ${#bounds[@]} -gt 0 && "${hi}" == "${bounds[-1]}" ]]; then
+                planned[-1]=$(( planned[-1] + count ))
+            else
+                bounds+=("${hi}")
+                planned+=("${count}")
+            fi
+        done
+
+        local i last=$(( ${#bounds[@]} - 1 ))
+        for i in "${!bounds[@]}"; do
+            if [[ ${last} -eq 0 ]]; then
+                predicates+=("1 = 1")
+            elif [[ ${i} -eq 0 ]]; then
+                predicates+=("(${key_column} <= ${bounds[0]} OR ${key_column} IS NULL)")
+            elif [[ ${i} -eq ${last} ]]; then
+                predicates+=("${key_column} > ${bounds[i - 1]}")
+            else
+                predicates+=("${key_column} > ${bounds[i - 1]} AND ${key_column} <= ${bounds[i]}")
+            fi
+        done
+    else
+        strategy="ntile"
+        source_query="SELECT ${select_list} FROM (SELECT *, NTILE(${chunks}) OVER (ORDER BY %%physloc%%) AS perseus_chunk
+            FROM tempdb..${table_name}) s"
+
+        local i
+        for (( i = 1; i <= chunks; i++ )); do
+            predicates+=("perseus_chunk = ${i}")
+            planned+=($(( source_rows / chunks + (i <= source_rows % chunks ? 1 : 0) )))
+        done
+    fi
+
+    log_info "  Chunked export: ${#predicates[@]} chunks (${strategy}${key_column:+ on ${key_column}}), ${EXTRACT_STREAMS} streams"
+
+    # -------------------------------------------------------------------------
+    # Run: at most EXTRACT_STREAMS bcp queryout processes at a time
+    # -------------------------------------------------------------------------
+    rm -rf "${chunk_dir}"
+    mkdir -p "${chunk_dir}" || return 1
+
+    local pids=()
+    local pid_chunk=()
+    local failed=0
+    local n chunk_file
+    for n in "${!predicates[@]}"; do
+        if [[ ${#pids[@]} -ge ${EXTRACT_STREAMS} ]]; then
+            wait "${pids[0]}" || { log_error "  Chunk $(( pid_chunk[0] + 1 )) failed (see ${chunk_dir})"; failed=$((failed + 1)); }
+            pids=("${pids[@]:1}")
+            pid_chunk=("${pid_chunk[@]:1}")
+        fi
+
+        chunk_file=$(printf '%s/chunk-%04d%s' "${chunk_dir}" $(( n + 1 )) "${ext}")
+        if [[ "${COMPRESS}" == "none" ]]; then
+            "${BCP_CMD}" "${source_query} WHERE ${predicates[n]}" queryout "${chunk_file}" \
+                -S "${SQL_SERVER}" -U "${SQL_USER}" -P "${SQL_PASSWORD}" \
+                -c -t ',' -r '\n' -b 10000 > "${chunk_file%"${ext}"}.log" 2>&1 &
+        else
+            bcp_compressed "${chunk_file}" "${source_query} WHERE ${predicates[n]}" queryout \
+                -S "${SQL_SERVER}" -U "${SQL_USER}" -P "${SQL_PASSWORD}" \
+                -c -t ',' -r '\n' -b 10000 > "${chunk_file%"${ext}"}.log" 2>&1 &
+        fi
+        pids+=($!)
+        pid_chunk+=("${n}")
+    done
+    for n in "${!pids[@]}"; do
+        wait "${pids[n]}" || { log_error "  Chunk $(( pid_chunk[n] + 1 )) failed (see ${chunk_dir})"; failed=$((failed + 1)); }
+    done
+
+    cat "${chunk_dir}"/chunk-*.log >> "${LOG_FILE}" 2>/dev/null || true
+    if [[ ${failed} -gt 0 ]]; then
+        log_error "  ${failed} of ${#predicates[@]} chunks failed for ${table_name}; chunk files kept in ${chunk_dir}"
+        return 1
+    fi
+
+    # -------------------------------------------------------------------------
+    # Assemble: join in chunk order and write the manifest. The first chunk
+    # with data is renamed into place, the others appended once each; row
+    # counts come from bcp, so no chunk is read back.
+    # -------------------------------------------------------------------------
+    local chunk_rows=()
+    local rows
+    for n in "${!predicates[@]}"; do
+        chunk_file=$(printf '%s/chunk-%04d%s' "${chunk_dir}" $(( n + 1 )) "${ext}")
+        rows=0
+        if [[ -f "${chunk_file}" ]]; then
+            rows=$(bcp_rows_copied "${chunk_file%"${ext}"}.log")
+            if [[ -z "${rows}" ]]; then
+                log_error "  Chunk $(( n + 1 )) of ${table_name}: no 'rows copied' in its bcp log; chunk files kept in ${chunk_dir}"
+                return 1
+            fi
+        fi
+        chunk_rows+=("${rows}")
+    done
+
+    : > "${csv_file}"
+    local entries=()
+    local offset=0 total_rows=0 total_raw=0 bytes raw_bytes
+    for n in "${!predicates[@]}"; do
+        chunk_file=$(printf '%s/chunk-%04d%s' "${chunk_dir}" $(( n + 1 )) "${ext}")
+        rows=${chunk_rows[n]}
+        bytes=0
+        raw_bytes=0
+        if [[ -f "${chunk_file}" ]]; then
+            bytes=$(stat -f%z "${chunk_file}" 2>/dev/null || stat -c%s "${chunk_file}" 2>/dev/null || echo "0")
+            raw_bytes=$(cat "${chunk_file}.raw" 2>/dev/null || echo "${bytes}")
+            if [[ ${offset} -eq 0 ]]; then
+                mv -f "${chunk_file}" "${csv_file}" || return 1
+            else
+                cat "${chunk_file}" >> "${csv_file}" || return 1
+            fi
+            rm -f "${chunk_file}" "${chunk_file}.raw"
+        fi
+        entries+=("$(printf '    {"chunk": %d, "predicate": "%s", "planned_rows": %d, "rows": %d, "byte_offset": %d, "bytes": %d, "raw_bytes": %d}' \
+            $(( n + 1 )) "$(json_escape "${predicates[n]}")" "${planned[n]}" "${rows}" "${offset}" "${bytes}" "${raw_bytes}")")
+        offset=$((offset + bytes))
+        total_rows=$((total_rows + rows))
+        total_raw=$((total_raw + raw_bytes))
+    done
+    rm -rf "${chunk_dir}"
+    EXPORT_RAW_BYTES=${total_raw}
+
+    {
+        printf '{\n'
+        printf '  "table": "%s",\n' "$(json_escape "${table_name}")"
+        printf '  "csv": "%s",\n' "$(json_escape "${table_name}${ext}")"
+        printf '  "compression": "%s",\n' "${COMPRESS}"
+        printf '  "strategy": "%s",\n' "${strategy}"
+        printf '  "key": "%s",\n' "$(json_escape "${key_column}")"
+        printf '  "streams": %d,\n' "${EXTRACT_STREAMS}"
+        printf '  "source_rows": %d,\n' "${source_rows}"
+        printf '  "rows": %d,\n' "${total_rows}"
+        printf '  "bytes": %d,\n' "${offset}"
+        printf '  "raw_bytes": %d,\n' "${total_raw}"
+        printf '  "created": "%s",\n' "$(date -u '+%Y-%m-%dT%H:%M:%SZ')"
+        printf '  "chunks": [\n'
+        local last=$(( ${#entries[@]} - 1 ))
+        for n in "${!entries[@]}"; do
+            printf '%s%s\n' "${entries[n]}" "$([[ ${n} -lt ${last} ]] && echo ',')"
+        done
+        printf '  ]\n'
+        printf '}\n'
+    } > "${manifest_file}.tmp" && mv "${manifest_file}.tmp" "${manifest_file}"
+
+    # source_rows is the catalog count taken before the export
+    if [[ ${total_rows} -ne ${source_rows} ]]; then
+        log_warn "  ${table_name}: ${total_rows} rows copied vs ${source_rows} source rows"
+    fi
+    log_info "  Chunk manifest: ${manifest_file}"
+
+    return 0
+}
+
 # -----------------------------------------------------------------------------
 # CSV EXPORT
 # -----------------------------------------------------------------------------
 
 export_temp_table_to_csv() {
     local table_name="$1"
-    local csv_file="${DATA_DIR}/${table_name}.csv"
+    local csv_file="${DATA_DIR}/${table_name}$(csv_extension)"
 
     # Health check: Verify SQL session still alive (if background session exists)
     if [[ -n "${SQL_SESSION_PID}" ]] && ! ps -p ${SQL_SESSION_PID} > /dev/null 2>&1; then
@@ -851,12 +1378,42 @@ export_temp_table_to_csv() {
         return 0
     fi
 
-    # Export using bcp
-    if ! bcp "tempdb..${table_name}" out "${csv_file}" \
-        -S "${SQL_SERVER}" -U "${SQL_USER}" -P "${SQL_PASSWORD}" \
-        -c -t ',' -r '\n' -b 10000 >> "${LOG_FILE}" 2>&1; then
-        log_error "Failed to export ${table_name}"
-        return 1
+    # A table has one CSV: drop leftovers written with another COMPRESS setting
+    rm -f "${DATA_DIR}/${table_name}.csv" "${DATA_DIR}/${table_name}.csv.gz" "${DATA_DIR}/${table_name}.csv.zst"
+    EXPORT_RAW_BYTES=""
+
+    # Large tables: parallel chunked export (see CHUNKED EXPORT)
+    local source_rows=0
+    if [[ ${EXTRACT_STREAMS} -gt 1 ]]; then
+        source_rows=$(temp_table_row_count "${table_name}")
+    fi
+
+    if [[ ${EXTRACT_STREAMS} -gt 1 && ${source_rows} -ge ${CHUNK_MIN_ROWS} ]]; then
+        if ! export_chunked "${table_name}" "${source_rows}"; then
+            log_error "Failed to export ${table_name}"
+            return 1
+        fi
+    else
+        # Export using bcp
+        rm -f "${DATA_DIR}/${table_name}.manifest.json"
+        local bcp_rc=0
+        if [[ "${COMPRESS}" == "none" ]]; then
+            "${BCP_CMD}" "tempdb..${table_name}" out "${csv_file}" \
+                -S "${SQL_SERVER}" -U "${SQL_USER}" -P "${SQL_PASSWORD}" \
+                -c -t ',' -r '\n' -b 10000 >> "${LOG_FILE}" 2>&1 || bcp_rc=$?
+        else
+            bcp_compressed "${csv_file}" "tempdb..${table_name}" out \
+                -S "${SQL_SERVER}" -U "${SQL_USER}" -P "${SQL_PASSWORD}" \
+                -c -t ',' -r '\n' -b 10000 >> "${LOG_FILE}" 2>&1 || bcp_rc=$?
+            EXPORT_RAW_BYTES=$(cat "${csv_file}.raw" 2>/dev/null || echo "0")
+            rm -f "${csv_file}.raw"
+        fi
+        if [[ ${bcp_rc} -ne 0 ]]; then
+            # A compressed file is written even when bcp never opened the pipe
+            [[ "${COMPRESS}" == "none" ]] || rm -f "${csv_file}"
+            log_error "Failed to export ${table_name}"
+            return 1
+        fi
     fi
 
     # Validate CSV file
@@ -867,6 +1424,14 @@ export_temp_table_to_csv() {
 
     local file_size
     file_size=$(stat -f%z "${csv_file}" 2>/dev/null || stat -c%s "${csv_file}" 2>/dev/null || echo "0")
+    local raw_size="${EXPORT_RAW_BYTES:-${file_size}}"
+
+    # An empty compressed stream still has a header: keep the loader's
+    # "0 bytes = no data" rule
+    if [[ ${raw_size} -eq 0 && ${file_size} -gt 0 ]]; then
+        : > "${csv_file}"
+        file_size=0
+    fi
 
     if [[ ${file_size} -eq 0 ]]; then
         log_warn "CSV file is empty: ${csv_file} (0 rows in source table)"
@@ -878,13 +1443,20 @@ export_temp_table_to_csv() {
 
     # Count rows (approximate)
     local row_count
-    row_count=$(wc -l < "${csv_file}" | tr -d '[:space:]')
+    row_count=$(decompress_file "${csv_file}" | wc -l | tr -d '[:space:]')
 
     STATS_TABLES_PROCESSED=$((STATS_TABLES_PROCESSED + 1))
     STATS_TOTAL_ROWS=$((STATS_TOTAL_ROWS + row_count))
     STATS_TOTAL_CSV_SIZE=$((STATS_TOTAL_CSV_SIZE + file_size))
+    STATS_TOTAL_RAW_SIZE=$((STATS_TOTAL_RAW_SIZE + raw_size))
 
-    log_success "  Exported: ${row_count} rows, ${file_size_mb} MB"
+    if [[ "${COMPRESS}" == "none" ]]; then
+        log_success "  Exported: ${row_count} rows, ${file_size_mb} MB"
+    else
+        record_compression "${table_name}" "${raw_size}" "${file_size}"
+        log_success "  Exported: ${row_count} rows, ${file_size_mb} MB ${COMPRESS}" \
+            "(raw $(echo "scale=2; ${raw_size} / 1024 / 1024" | bc) MB, ratio $(compression_ratio "${raw_size}" "${file_size}"):1)"
+    fi
 
     return 0
 }
@@ -906,7 +1478,7 @@ export_tier_csvs() {
     "
 
     local tables
-    mapfile -t tables < <(sqlcmd -S "${SQL_SERVER}" -U "${SQL_USER}" -P "${SQL_PASSWORD}" \
+    mapfile -t tables < <("${SQLCMD_CMD}" -S "${SQL_SERVER}" -U "${SQL_USER}" -P "${SQL_PASSWORD}" \
         -d tempdb -h -1 -W -b -m 1 \
         -Q "${temp_tables_query}" 2>> "${LOG_FILE}" | grep -E '^##perseus_tier_' | sed '/^$/d')
 
@@ -955,7 +1527,7 @@ export_all_tiers_csvs() {
     "
 
     local tables
-    mapfile -t tables < <(sqlcmd -S "${SQL_SERVER}" -U "${SQL_USER}" -P "${SQL_PASSWORD}" \
+    mapfile -t tables < <("${SQLCMD_CMD}" -S "${SQL_SERVER}" -U "${SQL_USER}" -P "${SQL_PASSWORD}" \
         -d tempdb -h -1 -W -b -m 1 \
         -Q "${temp_tables_query}" 2>> "${LOG_FILE}" | grep -E '^##perseus_tier_' | sed '/^$/d')
 
@@ -1030,6 +1602,10 @@ generate_summary() {
     echo "  Tables Processed: ${STATS_TABLES_PROCESSED}"
     echo "  Total Rows:       ${STATS_TOTAL_ROWS}"
     echo "  Total CSV Size:   ${total_csv_size_mb} MB"
+    if [[ "${COMPRESS}" != "none" ]]; then
+        echo "  Raw CSV Size:     $(echo "scale=2; ${STATS_TOTAL_RAW_SIZE} / 1024 / 1024" | bc) MB (${COMPRESS} ratio $(compression_ratio "${STATS_TOTAL_RAW_SIZE}" "${STATS_TOTAL_CSV_SIZE}"):1)"
+        echo "  Ratio Report:     ${COMPRESSION_REPORT}"
+    fi
     echo ""
     echo -e "${COLOR_BOLD}Output Locations:${COLOR_RESET}"
     echo "  CSV Files:        ${DATA_DIR}/"
@@ -1048,6 +1624,9 @@ generate_summary() {
     log INFO "Tables: ${STATS_TABLES_PROCESSED}"
     log INFO "Rows: ${STATS_TOTAL_ROWS}"
     log INFO "CSV Size: ${total_csv_size_mb} MB"
+    if [[ "${COMPRESS}" != "none" ]]; then
+        log INFO "Raw CSV Size: ${STATS_TOTAL_RAW_SIZE} bytes (${COMPRESS}, report: ${COMPRESSION_REPORT})"
+    fi
 }
 
 # -----------------------------------------------------------------------------
@@ -1077,6 +1656,7 @@ main() {
     # Update LOG_FILE if LOG_DIR was changed by CLI flag
     # (Currently no --log-dir flag, but future-proofing)
     LOG_FILE="${LOG_DIR}/extract-data-${TIMESTAMP}.log"
+    COMPRESSION_REPORT="${DATA_DIR}/compression-${TIMESTAMP}.tsv"
 
     # Prerequisite checks
     check_prerequisites
@@ -1101,7 +1681,11 @@ main() {
     # Execute tiers
     # Use combined execution for full tier range (0-4) to preserve global temp tables
     # Use individual execution for partial ranges or single tiers
-    if [[ ${tier_start} -eq 0 && ${tier_end} -eq 4 ]]; then
+    if [[ -n "${SUBSET_SCRIPT}" ]]; then
+        log_info "Using combined execution strategy (Option A) for subset ${SUBSET_SCRIPT}"
+        execute_combined_tiers_sql 0 4
+        export_all_tiers_csvs 0 4
+    elif [[ ${tier_start} -eq 0 && ${tier_end} -eq 4 ]]; then
         log_info "Using combined execution strategy (Option A) for all tiers"
         execute_combined_tiers_sql "${tier_start}" "${tier_end}"
         export_all_tiers_csvs "${tier_start}" "${tier_end}"
@@ -1124,4 +1708,7 @@ main() {
 # SCRIPT ENTRY POINT
 # -----------------------------------------------------------------------------
 
-main "$@"
+# Sourced (tests/scripts/test_extract_chunked.py): define the functions only
+if [[ "${BASH_SOURCE[0]}" == "${0}" ]]; then
+    main "$@"
+fi
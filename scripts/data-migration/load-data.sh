@@ -5,12 +5,56 @@
 # Prerequisites: CSV files exported from SQL Server using extraction scripts
 #
 # Usage:
-#   ./load-data.sh [--validate-only] [--tier N] [--no-truncate]
+#   ./load-data.sh [--validate-only] [--tier N] [--no-truncate] [--schedule N] [--transcode]
+#                  [--parallel N] [--retries N] [--resume] [--defer-indexes] [--verify]
+#                  [--binary TABLES] [--check-orphans]
 #
 # Options:
 #   --validate-only  Only run validation queries, skip data loading
 #   --tier N         Load only specific tier (0-4), default: all tiers
 #   --no-truncate    Skip TRUNCATE before each table load (append mode, not idempotent)
+#   --schedule N     Ignore the tier lists: load every CSV in DATA_DIR on N parallel
+#                    workers, each table starting as soon as its FK parents are
+#                    loaded (plan from load_plan.py, critical path first)
+#   --transcode      Stream each CSV through transcode_csv.py (types, NULL/empty
+#                    strings, embedded delimiters/newlines, encoding); malformed
+#                    records go to <csv>.rejects instead of failing the COPY
+#   --parallel N     Load up to N tables of a tier at once (default: 1); largest
+#                    CSVs start first, per-table logs are appended when each ends
+#   --retries N      Retry a failed table N times with exponential backoff
+#                    (default: 2, first wait LOAD_RETRY_BACKOFF=10 seconds)
+#   --resume         Keep the checkpoints of the previous run: finished tables are
+#                    skipped, part-loaded ones continue at their first unloaded
+#                    chunk, tables whose CSV changed are reloaded from scratch
+#   --defer-indexes  Drop the load set's secondary indexes, PRIMARY KEY / UNIQUE
+#                    constraints and FKs before COPY; rebuild them afterwards on
+#                    REBUILD_JOBS sessions (default: 4), largest tables first, with
+#                    INDEX_MAINTENANCE_MEM (1GB) / INDEX_PARALLEL_WORKERS (2); FKs
+#                    come back NOT VALID and are validated concurrently (FKs of
+#                    partitioned tables come back valid)
+#   --verify         Skip loading: recount every table of the latest load in the
+#                    ledger with COUNT(*) on --parallel N sessions and report
+#                    mismatches against the rows COPY reported
+#   --binary TABLES  Comma-separated tables (or "all") converted on the client by
+#                    binary_copy.py and loaded with COPY ... (FORMAT binary): no
+#                    server-side text parsing of timestamps/numerics. Implies the
+#                    --transcode checks for those tables; tables with a column
+#                    type binary_copy.py cannot encode fall back to CSV
+#                    (default: BINARY_TABLES)
+#   --check-orphans  Before disabling the FK triggers, check every export (with
+#                    --tier N, that tier's exports) for child keys whose parent
+#                    row is not in the parent's export (orphan_check.py on
+#                    ORPHAN_CHECK_JOBS processes); stop without loading
+#                    anything when there are orphans
+#
+# Row counts come from the COPY command tags, not from COUNT(*) rescans, and
+# are recorded per run and table in perseus_migration.load_ledger.
+#
+# Every run records per-table / per-chunk checkpoints (source hash, byte range,
+# rows loaded, status) in CHECKPOINT_DIR (default: DATA_DIR/.checkpoints); see
+# load_checkpoint.py. Without --resume they are reset for the tables loaded.
+#
+# Exit status is 1 when any table failed to load.
 #
 
 set -euo pipefail
@@ -34,6 +78,20 @@ DB_NAME="${DB_NAME:-perseus_dev}"
 DB_USER="${DB_USER:-perseus_admin}"
 DATA_DIR="${DATA_DIR:-/tmp/perseus-data-export}"
 LOG_FILE="${SCRIPT_DIR}/load-data.log"
+# Written by convert_tables.py --partition: tables loaded over parallel COPY streams
+PARTITION_MANIFEST="${PARTITION_MANIFEST:-${PROJECT_ROOT}/source/building/pgsql/generated/14.create-table/partition-load-manifest.json}"
+# Written by convert_tables.py: per-table bcp field order, skips and transforms
+COPY_MANIFEST_DIR="${COPY_MANIFEST_DIR:-${PROJECT_ROOT}/source/building/pgsql/generated/14.create-table/copy-manifests}"
+# Per-table / per-chunk load checkpoints (load_checkpoint.py)
+CHECKPOINT_DIR="${CHECKPOINT_DIR:-${DATA_DIR}/.checkpoints}"
+# --defer-indexes: captured DDL, rebuild sessions and per-session build settings
+DEFERRED_DDL="${DEFERRED_DDL:-${DATA_DIR}/.deferred-ddl.tsv}"
+REBUILD_JOBS="${REBUILD_JOBS:-4}"
+INDEX_MAINTENANCE_MEM="${INDEX_MAINTENANCE_MEM:-1GB}"
+INDEX_PARALLEL_WORKERS="${INDEX_PARALLEL_WORKERS:-2}"
+# --check-orphans: worker processes and per-FK report
+ORPHAN_CHECK_JOBS="${ORPHAN_CHECK_JOBS:-$(nproc 2>/dev/null || echo 4)}"
+ORPHAN_REPORT="${ORPHAN_REPORT:-${DATA_DIR}/.orphans.json}"
 
 # Colors for output
 RED='\033[0;31m'
@@ -63,6 +121,23 @@ log_error() {
 VALIDATE_ONLY=false
 SPECIFIC_TIER=""
 NO_TRUNCATE=false
+SCHEDULE_WORKERS=""
+PRETRUNCATED=false
+TRANSCODE=false
+LOAD_WORKERS=1
+LOAD_RETRIES="${LOAD_RETRIES:-2}"
+LOAD_RETRY_BACKOFF="${LOAD_RETRY_BACKOFF:-10}"
+LOAD_FAILED=0
+RESUME=false
+COPY_ROWS=0
+DEFER_INDEXES=false
+REBUILD_FAILED=0
+VERIFY_ONLY=false
+BINARY_TABLES="${BINARY_TABLES:-}"
+BINARY_TIMEZONE=""
+COPY_BINARY=false
+CHECK_ORPHANS=false
+RUN_ID="${RUN_ID:-$(date +%Y%m%d_%H%M%S)}"
 
 while [[ $# -gt 0 ]]; do
     case $1 in
@@ -82,6 +157,58 @@ while [[ $# -gt 0 ]]; do
             NO_TRUNCATE=true
             shift
             ;;
+        --schedule)
+            if [[ $# -lt 2 ]] || ! [[ "$2" =~ ^[1-9][0-9]*$ ]]; then
+                log_error "--schedule requires a worker count (>= 1)"
+                exit 1
+            fi
+            SCHEDULE_WORKERS="$2"
+            shift 2
+            ;;
+        --transcode)
+            TRANSCODE=true
+            shift
+            ;;
+        --parallel)
+            if [[ $# -lt 2 ]] || ! [[ "$2" =~ ^[1-9][0-9]*$ ]]; then
+                log_error "--parallel requires a worker count (>= 1)"
+                exit 1
+            fi
+            LOAD_WORKERS="$2"
+            shift 2
+            ;;
+        --retries)
+            if [[ $# -lt 2 ]] || ! [[ "$2" =~ ^[0-9]+$ ]]; then
+                log_error "--retries requires a count (>= 0)"
+                exit 1
+            fi
+            LOAD_RETRIES="$2"
+            shift 2
+            ;;
+        --resume)
+            RESUME=true
+            shift
+            ;;
+        --defer-indexes)
+            DEFER_INDEXES=true
+            shift
+            ;;
+        --verify)
+            VERIFY_ONLY=true
+            shift
+            ;;
+        --binary)
+            if [[ $# -lt 2 ]] || [[ -z "$2" ]]; then
+                log_error "--binary requires a table list (t1,t2,... or all)"
+                exit 1
+            fi
+            BINARY_TABLES="$2"
+            shift 2
+            ;;
+        --check-orphans)
+            CHECK_ORPHANS=true
+            shift
+            ;;
         *)
             log_error "Unknown option: $1"
             exit 1
@@ -111,13 +238,362 @@ if [ ! -d "$DATA_DIR" ]; then
 fi
 log_success "Data directory found"
 
+# Path of a table's export: ##perseus_tier_{N}_{table}.csv, or .csv.zst /
+# .csv.gz from extract-data.sh --compress (plain .csv when none exists).
+# Args: $1=tier_number  $2=table_name
+csv_for() {
+    local base="${DATA_DIR}/##perseus_tier_${1}_${2}"
+    local suffix
+    for suffix in .csv .csv.zst .csv.gz; do
+        if [[ -f "${base}${suffix}" ]]; then
+            echo "${base}${suffix}"
+            return 0
+        fi
+    done
+    echo "${base}.csv"
+}
+
+# load_checkpoint.py with this run's checkpoint directory
+checkpoint() {
+    python3 "${SCRIPT_DIR}/load_checkpoint.py" --checkpoint-dir "$CHECKPOINT_DIR" "$@"
+}
+
+# TRUNCATE ... CASCADE. Tables it cascades to lose their committed chunks, so
+# their checkpoints are reset as well. Args: $1=comma-separated table list
+truncate_tables() {
+    local output rc=0
+    output=$(docker exec "$DB_CONTAINER" psql -U "$DB_USER" -d "$DB_NAME" -v ON_ERROR_STOP=1 \
+        -c "TRUNCATE $1 CASCADE;" 2>&1) || rc=$?
+    echo "$output" >> "$LOG_FILE"
+    local -a cascaded=()
+    mapfile -t cascaded < <(sed -n 's/.*truncate cascades to table "\([^"]*\)".*/\1/p' <<< "$output")
+    if [[ ${#cascaded[@]} -gt 0 ]]; then
+        checkpoint reset "${cascaded[@]}" 2>> "$LOG_FILE" || true
+    fi
+    return $rc
+}
+
+# Load ledger: one row per run and table with the rows COPY reported, so
+# reports never rescan the tables. verified_* are filled by --verify.
+ensure_ledger() {
+    docker exec -i "$DB_CONTAINER" psql -U "$DB_USER" -d "$DB_NAME" -v ON_ERROR_STOP=1 \
+        >> "$LOG_FILE" 2>&1 <<'SQLLEDGER'
+CREATE SCHEMA IF NOT EXISTS perseus_migration;
+CREATE TABLE IF NOT EXISTS perseus_migration.load_ledger (
+    run_id        TEXT        NOT NULL,
+    table_name    TEXT        NOT NULL,
+    tier          INTEGER,
+    csv_file      TEXT,
+    csv_bytes     BIGINT,
+    rows_loaded   BIGINT      NOT NULL DEFAULT 0,  -- committed by this run (COPY tags)
+    rows_total    BIGINT      NOT NULL DEFAULT 0,  -- all committed chunks, incl. resumed runs
+    rejected      BIGINT      NOT NULL DEFAULT 0,
+    attempts      INTEGER     NOT NULL DEFAULT 1,
+    status        TEXT        NOT NULL,
+    started_at    TIMESTAMPTZ NOT NULL,
+    finished_at   TIMESTAMPTZ NOT NULL DEFAULT now(),
+    verified_rows BIGINT,
+    verified_at   TIMESTAMPTZ,
+    PRIMARY KEY (run_id, table_name)
+);
+SQLLEDGER
+}
+
+# rows_loaded adds up over the attempts of one run (each resumes where the
+# last stopped) unless $8 is "replace": the table was cleared first, so the
+# earlier attempts' rows are gone.
+# Args: $1=tier  $2=table_name  $3=csv_file  $4=status  $5=rows_loaded  $6=rows_total  $7=started (epoch)
+#       [$8=add|replace]
+record_ledger() {
+    local rows_sql="l.rows_loaded + EXCLUDED.rows_loaded"
+    [[ "${8:-add}" != "replace" ]] || rows_sql="EXCLUDED.rows_loaded"
+    local rejected=0 bytes
+    [[ ! -s "${3}.rejects" ]] || rejected=$(wc -l < "${3}.rejects" | tr -d ' ')
+    bytes=$(stat -f%z "$3" 2>/dev/null || stat -c%s "$3" 2>/dev/null || echo 0)
+    docker exec "$DB_CONTAINER" psql -U "$DB_USER" -d "$DB_NAME" -v ON_ERROR_STOP=1 -c \
+        "INSERT INTO perseus_migration.load_ledger AS l
+             (run_id, table_name, tier, csv_file, csv_bytes, rows_loaded, rows_total, rejected, status, started_at)
+         VALUES ('${RUN_ID}', '$2', $1, '$(basename "$3")', ${bytes}, $5, $6, ${rejected}, '$4', to_timestamp($7))
+         ON CONFLICT (run_id, table_name) DO UPDATE SET
+             rows_loaded = ${rows_sql}, rows_total = EXCLUDED.rows_total,
+             rejected = EXCLUDED.rejected, attempts = l.attempts + 1, status = EXCLUDED.status,
+             finished_at = now();" >> "$LOG_FILE" 2>&1 || \
+        log_warning "  Could not record $2 in the load ledger"
+}
+
+# Number of parallel COPY streams for a partitioned table (1 = not partitioned)
+partition_streams() {
+    local table_name="$1"
+    if [[ ! -f "$PARTITION_MANIFEST" ]]; then
+        echo 1
+        return 0
+    fi
+    python3 - "$PARTITION_MANIFEST" "$table_name" <<'PYSTREAMS'
+import json, sys
+tables = json.load(open(sys.argv[1])).get('tables', {})
+print(tables.get(sys.argv[2], {}).get('parallel_streams', 1))
+PYSTREAMS
+}
+
+# True when --binary / BINARY_TABLES selects the table. Args: $1=table_name
+binary_table() {
+    [[ "$BINARY_TABLES" == "all" || ",${BINARY_TABLES// /}," == *",$1,"* ]]
+}
+
+# Read copy-manifests/<table>.json into COPY_COLUMNS (" (a, b, ...)" in bcp
+# field order), COPY_SKIP / COPY_HEX (1-based fields to drop / to prefix with
+# \x for bytea) and COPY_POST_LOAD (identity sequence resets).
+load_copy_manifest() {
+    local table_name="$1"
+    local manifest="${COPY_MANIFEST_DIR}/${table_name}.json"
+    COPY_COLUMNS=""
+    COPY_SKIP=""
+    COPY_HEX=""
+    COPY_POST_LOAD=""
+    if [[ ! -f "$manifest" ]]; then
+        log_warning "  No COPY manifest for $table_name (run convert_tables.py --manifests-only); assuming table column order"
+        return 0
+    fi
+    local spec
+    spec=$(python3 - "$manifest" <<'PYMANIFEST'
+import json, sys
+m = json.load(open(sys.argv[1]))
+hex_columns = {name for name, t in m['rewrite'].items() if t == 'hex_to_bytea'}
+print(' (' + ', '.join(m['copy_columns']) + ')')
+print(' '.join(str(p) for p in m['skip_positions']))
+print(' '.join(str(f['position']) for f in m['fields'] if f['target_name'] in hex_columns))
+print(' '.join(m['post_load_sql']))
+PYMANIFEST
+)
+    { IFS= read -r COPY_COLUMNS; IFS= read -r COPY_SKIP; IFS= read -r COPY_HEX; IFS= read -r COPY_POST_LOAD; } <<< "$spec" || true
+}
+
+# Print LENGTH bytes of a CSV from OFFSET (the whole file without a range).
+# Args: $1=csv_file  [$2=offset  $3=length]
+read_csv_range() {
+    local csv_file="$1"
+    local offset="${2:-0}"
+    local length="${3:-}"
+    local size
+    size=$(stat -f%z "$csv_file" 2>/dev/null || stat -c%s "$csv_file")
+    if [[ -z "$length" || ( "$offset" -eq 0 && "$length" -ge "$size" ) ]]; then
+        cat "$csv_file"
+        return
+    fi
+    # head stops reading early; tail's SIGPIPE is expected
+    { tail -c +$((offset + 1)) "$csv_file" || true; } | head -c "$length"
+}
+
+# Decompress stdin by the CSV's extension (a chunk's range of a .gz / .zst
+# export is a complete member / frame); plain CSVs pass through.
+# Args: $1=csv_file
+decompress_csv() {
+    case "$1" in
+        *.gz)  gzip -dc ;;
+        *.zst) zstd -q -dc ;;
+        *)     cat ;;
+    esac
+}
+
+# Run transcode_csv.py / binary_copy.py over one chunk of a CSV; exit 3 only
+# means rejected records, which are appended to <csv>.rejects. Anything else
+# (2, or 1 from a crash) fails the chunk.
+# Args: $1=script  $2=csv_file  $3=table_name  $4=offset  $5=length  [extra args]
+transcode_chunk() {
+    local script="$1"
+    local csv_file="$2"
+    local table_name="$3"
+    local offset="$4"
+    local length="$5"
+    shift 5
+    local rc=0
+    if [[ "$csv_file" == *.csv ]]; then
+        local -a range=()
+        [[ -z "$length" ]] || range=(--byte-range "${offset}:${length}")
+        python3 "${SCRIPT_DIR}/${script}" --table "$table_name" \
+            --manifest-dir "$COPY_MANIFEST_DIR" "${range[@]}" "$@" \
+            --rejects "${csv_file}.rejects.part" "$csv_file" 2>> "$LOG_FILE" || rc=$?
+    else
+        read_csv_range "$csv_file" "$offset" "$length" | decompress_csv "$csv_file" | \
+            python3 "${SCRIPT_DIR}/${script}" --table "$table_name" \
+            --manifest-dir "$COPY_MANIFEST_DIR" "$@" \
+            --rejects "${csv_file}.rejects.part" /dev/stdin 2>> "$LOG_FILE" || rc=$?
+    fi
+    if [[ -f "${csv_file}.rejects.part" ]]; then
+        cat "${csv_file}.rejects.part" >> "${csv_file}.rejects"
+        rm -f "${csv_file}.rejects.part"
+    fi
+    [[ $rc -eq 0 || $rc -eq 3 ]]
+}
+
+# Stream a CSV with the manifest's field drops and rewrites applied. Splits
+# on ',' like COPY does for unquoted bcp -c output. With --transcode the
+# transcoder does the drops/rewrites too; with COPY_BINARY the stream is
+# binary COPY from binary_copy.py.
+# Args: $1=csv_file  $2=table_name  [$3=offset  $4=length]  (one chunk)
+emit_csv() {
+    local csv_file="$1"
+    local table_name="$2"
+    local offset="${3:-0}"
+    local length="${4:-}"
+    if [[ "${COPY_BINARY}" == "true" ]]; then
+        transcode_chunk binary_copy.py "$csv_file" "$table_name" "$offset" "$length" \
+            --timezone "$BINARY_TIMEZONE"
+        return
+    fi
+    if [[ "${TRANSCODE}" == "true" ]]; then
+        transcode_chunk transcode_csv.py "$csv_file" "$table_name" "$offset" "$length"
+        return
+    fi
+    if [[ -z "${COPY_SKIP}${COPY_HEX}" ]]; then
+        read_csv_range "$csv_file" "$offset" "$length" | decompress_csv "$csv_file"
+        return
+    fi
+    read_csv_range "$csv_file" "$offset" "$length" | decompress_csv "$csv_file" | \
+    awk -F',' -v skip="$COPY_SKIP" -v hex="$COPY_HEX" '
+        BEGIN {
+            n = split(skip, s, " "); for (i = 1; i <= n; i++) drop[s[i]] = 1
+            n = split(hex, h, " "); for (i = 1; i <= n; i++) bin[h[i]] = 1
+        }
+        {
+            out = ""; sep = ""
+            for (i = 1; i <= NF; i++) {
+                if (i in drop) continue
+                v = $i
+                if ((i in bin) && v != "") v = "\\x" v
+                out = out sep v; sep = ","
+            }
+            print out
+        }'
+}
+
+# COPY options for the stream emit_csv produces
+copy_options() {
+    if [[ "${COPY_BINARY}" == "true" ]]; then
+        echo "FORMAT binary"
+    else
+        echo "FORMAT CSV, HEADER false, DELIMITER ','"
+    fi
+}
+
+# Terminate the COPY session tagged application_name=$1 while its input is
+# still open: closing stdin would end the COPY cleanly and commit the rows
+# streamed so far. Waits for the session to connect. Always returns 1.
+# Args: $1=application_name
+abort_copy() {
+    local app="$1"
+    local tries=0
+    log_error "  Producer failed mid-stream; terminating COPY session $app" >&2
+    until [[ "$(docker exec "$DB_CONTAINER" psql -U "$DB_USER" -d "$DB_NAME" -tAc \
+        "SELECT count(pg_terminate_backend(pid)) FROM pg_stat_activity WHERE application_name = '${app}';" \
+        2>/dev/null)" =~ ^[1-9] ]]; do
+        if (( ++tries >= 30 )); then
+            log_error "  COPY session $app not found; the chunk may be partially committed" >&2
+            break
+        fi
+        sleep 1
+    done
+    return 1
+}
+
+# COPY one chunk (byte range) of a CSV: one COPY, one transaction. Sets
+# COPY_ROWS from the "COPY n" command tag. A failing producer (decompressor,
+# awk or transcoder) aborts the COPY instead of committing a partial chunk;
+# SIGPIPE (141) only means psql already failed.
+# Args: $1=table_name  $2=csv_file  $3=offset  $4=length
+copy_chunk() {
+    local table_name="$1"
+    local csv_file="$2"
+    local output rc=0
+    local app="load-data-$$-${table_name}-${3:-0}"
+    # BUG 6 fix: BCP exports have NO header row — use HEADER false
+    output=$( { emit_csv "$csv_file" "$table_name" "$3" "$4" || (( $? == 141 )) || abort_copy "$app"; } | \
+        docker exec -i -e PGAPPNAME="$app" "$DB_CONTAINER" psql -U "$DB_USER" -d "$DB_NAME" \
+        -c "COPY perseus.${table_name}${COPY_COLUMNS} FROM STDIN WITH ($(copy_options));" \
+        2>&1) || rc=$?
+    echo "$output" >> "$LOG_FILE"
+    COPY_ROWS=$(sed -n 's/^COPY \([0-9][0-9]*\)$/\1/p' <<< "$output" | tail -1)
+    COPY_ROWS="${COPY_ROWS:-0}"
+    return $rc
+}
+
+# COPY one CSV into a partitioned parent over N concurrent sessions.
+# Rows are dealt round-robin into N files; the server routes each row to its
+# partition, so any split works. Assumes one row per line (bcp -c output).
+# Args: $1=table_name  $2=csv_file  $3=streams
+copy_partitioned() {
+    local table_name="$1"
+    local csv_file="$2"
+    local streams="$3"
+    local split_dir split_rc=0
+    split_dir=$(mktemp -d "${DATA_DIR}/.split-${table_name}-XXXXXX")
+
+    if [[ "${TRANSCODE}" == "true" || "${COPY_BINARY}" == "true" ]]; then
+        # Split whole CSV records: quoted fields may contain newlines (binary
+        # parts are complete binary COPY streams)
+        local -a splitter=(transcode_csv.py)
+        [[ "${COPY_BINARY}" != "true" ]] || splitter=(binary_copy.py --timezone "$BINARY_TIMEZONE")
+        if [[ "$csv_file" == *.csv ]]; then
+            python3 "${SCRIPT_DIR}/${splitter[0]}" "${splitter[@]:1}" --table "$table_name" \
+                --manifest-dir "$COPY_MANIFEST_DIR" \
+                --split "$streams" --output-dir "$split_dir" "$csv_file" 2>> "$LOG_FILE" || split_rc=$?
+        else
+            decompress_csv "$csv_file" < "$csv_file" | \
+                python3 "${SCRIPT_DIR}/${splitter[0]}" "${splitter[@]:1}" --table "$table_name" \
+                --manifest-dir "$COPY_MANIFEST_DIR" \
+                --split "$streams" --output-dir "$split_dir" /dev/stdin 2>> "$LOG_FILE" || split_rc=$?
+        fi
+        if [[ -f "${split_dir}/rejects" ]]; then
+            mv "${split_dir}/rejects" "${csv_file}.rejects"
+        fi
+        [[ $split_rc -ne 3 ]] || split_rc=0     # rejected records only
+    else
+        emit_csv "$csv_file" "$table_name" | \
+            awk -v n="$streams" -v dir="$split_dir" '{ print > (dir "/part-" (NR % n)) }' || split_rc=$?
+    fi
+    if [[ $split_rc -ne 0 ]]; then
+        log_error "  Splitting $table_name into $streams streams failed (exit $split_rc); nothing loaded"
+        rm -rf "$split_dir"
+        COPY_ROWS=0
+        return 1
+    fi
+
+    local pids=()
+    local part
+    for part in "${split_dir}"/part-*; do
+        docker exec -i "$DB_CONTAINER" psql -U "$DB_USER" -d "$DB_NAME" -v ON_ERROR_STOP=1 \
+            -c "COPY perseus.${table_name}${COPY_COLUMNS} FROM STDIN WITH ($(copy_options));" \
+            < "$part" > "${part}.log" 2>&1 &
+        pids+=($!)
+    done
+
+    local failed=0
+    local pid
+    for pid in "${pids[@]}"; do
+        wait "$pid" || failed=$((failed + 1))
+    done
+
+    # Append per-stream output in order so the log does not interleave
+    cat "${split_dir}"/*.log >> "$LOG_FILE" 2>/dev/null || true
+    COPY_ROWS=$(cat "${split_dir}"/*.log 2>/dev/null | \
+        awk '/^COPY [0-9]+$/ { n += $2 } END { print n + 0 }')
+    rm -rf "$split_dir"
+
+    if [[ $failed -gt 0 ]]; then
+        log_error "  ${failed}/${#pids[@]} COPY streams failed for $table_name"
+        return 1
+    fi
+    return 0
+}
+
 # Function to load a table from CSV
 # Args: $1=tier_number  $2=table_name
 load_table() {
     local tier_number="$1"
     local table_name="$2"
-    # BUG 2 fix: CSV files are named ##perseus_tier_{N}_{table_name}.csv
-    local csv_file="${DATA_DIR}/##perseus_tier_${tier_number}_${table_name}.csv"
+    # BUG 2 fix: CSV files are named ##perseus_tier_{N}_{table_name}.csv (or .csv.zst / .csv.gz)
+    local csv_file
+    csv_file=$(csv_for "$tier_number" "$table_name")
 
     # BUG 5 fix: missing CSV is a warning (not extracted yet), not a failure
     if [[ ! -f "$csv_file" ]]; then
@@ -133,30 +609,503 @@ load_table() {
 
     log_info "Loading: $table_name"
 
+    local started loaded_rows=0
+    started=$(date +%s)
+    local streams
+    streams=$(partition_streams "$table_name")
+    if [[ "$streams" -gt 1 && "${NO_TRUNCATE}" == "true" ]]; then
+        # Parallel streams commit separately, and without a truncate a failed
+        # attempt's rows could not be told from the rows kept: use one COPY
+        log_info "  --no-truncate: partitioned $table_name loads over one COPY stream"
+        streams=1
+    fi
+
+    # Checkpoint: first line is the state, then chunk<TAB>offset<TAB>bytes
+    # for every chunk not loaded yet
+    local plan state
+    local -a begin_flags=()
+    [[ "$streams" -le 1 ]] || begin_flags+=(--single-chunk)
+    [[ "${NO_TRUNCATE}" != "true" ]] || begin_flags+=(--no-truncate)
+    if ! plan=$(checkpoint begin "$table_name" "$csv_file" "${begin_flags[@]}" 2>> "$LOG_FILE"); then
+        log_error "  ✗ Could not checkpoint $table_name (see $LOG_FILE)"
+        return 1
+    fi
+    state="${plan%%$'\n'*}"
+    local -a chunks=()
+    mapfile -t chunks < <(tail -n +2 <<< "$plan")
+    case "$state" in
+        done)
+            log_success "  ✓ Already loaded (checkpoint), skipping"
+            return 0
+            ;;
+        resume)
+            log_info "  Resuming from checkpoint: ${#chunks[@]} chunk(s) left"
+            ;;
+        changed)
+            if [[ "${NO_TRUNCATE}" == "true" ]]; then
+                log_error "  ✗ CSV changed since its checkpoint; --no-truncate cannot clear the rows already loaded"
+                return 1
+            fi
+            log_warning "  CSV changed since its checkpoint: reloading from scratch"
+            ;;
+    esac
+
     # BUG 11 fix: truncate before load so re-runs are idempotent
-    if [[ "${NO_TRUNCATE}" != "true" ]]; then
-        docker exec "$DB_CONTAINER" psql -U "$DB_USER" -d "$DB_NAME" \
-            -c "TRUNCATE perseus.${table_name} CASCADE;" >> "$LOG_FILE" 2>&1 || true
+    # (skipped when truncate_load_set already emptied the whole load set, and
+    # when resuming: committed chunks stay)
+    if [[ "$state" != "resume" && "${NO_TRUNCATE}" != "true" && "${PRETRUNCATED}" != "true" ]]; then
+        truncate_tables "perseus.${table_name}" || true
     fi
 
-    # BUG 6 fix: BCP exports have NO header row — use HEADER false
-    if docker exec -i "$DB_CONTAINER" psql -U "$DB_USER" -d "$DB_NAME" \
-        -c "COPY perseus.${table_name} FROM STDIN WITH (FORMAT CSV, HEADER false, DELIMITER ',');" \
-        < "$csv_file" >> "$LOG_FILE" 2>&1; then
+    local copy_ok=false
+    # Anything but a resume starts from an empty table (partitioned tables
+    # are cleared below), so earlier attempts' ledger rows no longer count
+    local ledger_mode=replace
+    [[ "$state" != "resume" ]] || ledger_mode=add
+    load_copy_manifest "$table_name"
+    [[ "$state" == "resume" ]] || rm -f "${csv_file}.rejects"
+    COPY_BINARY=false
+    if binary_table "$table_name"; then
+        if python3 "${SCRIPT_DIR}/binary_copy.py" --check --table "$table_name" \
+            --manifest-dir "$COPY_MANIFEST_DIR" 2>> "$LOG_FILE"; then
+            COPY_BINARY=true
+        else
+            log_warning "  No binary COPY encoding for every column of $table_name (see $LOG_FILE); loading CSV"
+        fi
+    fi
+    if [[ "${COPY_BINARY}" == "true" ]]; then
+        log_info "  Binary COPY with binary_copy.py (timestamptz without offset: ${BINARY_TIMEZONE})"
+    elif [[ "${TRANSCODE}" == "true" ]]; then
+        log_info "  Transcoding with transcode_csv.py"
+    elif [[ -n "${COPY_SKIP}${COPY_HEX}" ]]; then
+        log_info "  Rewriting fields (skip: ${COPY_SKIP:-none}, hex→bytea: ${COPY_HEX:-none})"
+    fi
+    if [[ "$streams" -gt 1 ]]; then
+        log_info "  Partitioned table: ${streams} parallel COPY streams"
+        # The streams commit separately: clear whatever an earlier attempt
+        # left before every load (not only after a load-set TRUNCATE). FK
+        # triggers are disabled, so this DELETE does not cascade.
+        docker exec "$DB_CONTAINER" psql -U "$DB_USER" -d "$DB_NAME" -v ON_ERROR_STOP=1 \
+            -c "DELETE FROM perseus.${table_name};" >> "$LOG_FILE" 2>&1 || {
+            log_error "  ✗ Could not clear $table_name before its parallel COPY"
+            return 1
+        }
+        if copy_partitioned "$table_name" "$csv_file" "$streams"; then
+            copy_ok=true
+            loaded_rows=$COPY_ROWS
+            checkpoint mark "$table_name" 1 --status loaded --rows "$COPY_ROWS" 2>> "$LOG_FILE" || true
+        else
+            # Streams that finished stay committed until the next attempt's DELETE
+            loaded_rows=$COPY_ROWS
+            checkpoint mark "$table_name" 1 --status failed 2>> "$LOG_FILE" || true
+        fi
+    else
+        # One COPY per chunk: a failure keeps every chunk committed before it
+        copy_ok=true
+        local entry chunk offset length
+        for entry in "${chunks[@]}"; do
+            IFS=$'\t' read -r chunk offset length <<< "$entry"
+            if [[ ${#chunks[@]} -gt 1 || "$state" == "resume" ]]; then
+                log_info "  Chunk ${chunk}: ${length} bytes at offset ${offset}"
+            fi
+            if copy_chunk "$table_name" "$csv_file" "$offset" "$length"; then
+                loaded_rows=$((loaded_rows + COPY_ROWS))
+                checkpoint mark "$table_name" "$chunk" --status loaded --rows "$COPY_ROWS" 2>> "$LOG_FILE" || true
+            else
+                checkpoint mark "$table_name" "$chunk" --status failed 2>> "$LOG_FILE" || true
+                copy_ok=false
+                break
+            fi
+        done
+    fi
 
-        # Get row count
-        local row_count
-        row_count=$(docker exec "$DB_CONTAINER" psql -U "$DB_USER" -d "$DB_NAME" -t -c \
-            "SELECT COUNT(*) FROM perseus.${table_name};" 2>/dev/null | tr -d ' ')
+    if [[ -s "${csv_file}.rejects" ]]; then
+        log_warning "  $(wc -l < "${csv_file}.rejects" | tr -d ' ') malformed records skipped: ${csv_file}.rejects"
+    fi
+
+    if [[ "$copy_ok" == true ]]; then
+
+        # Source identity values were kept; move the sequences past them
+        if [[ -n "$COPY_POST_LOAD" ]]; then
+            docker exec "$DB_CONTAINER" psql -U "$DB_USER" -d "$DB_NAME" \
+                -c "$COPY_POST_LOAD" >> "$LOG_FILE" 2>&1 || \
+                log_warning "  Could not reset identity sequence for $table_name"
+        fi
 
-        log_success "  ✓ Loaded: ${row_count} rows"
+        # Rows from the COPY command tags: no COUNT(*) rescan (see --verify)
+        local total_rows
+        total_rows=$(checkpoint rows "$table_name" 2>> "$LOG_FILE" || echo "$loaded_rows")
+        record_ledger "$tier_number" "$table_name" "$csv_file" loaded "$loaded_rows" "$total_rows" "$started" \
+            "$ledger_mode"
+
+        # Throughput for comparing runs (pg_loader.py --compare reads the ledger)
+        local rate
+        rate=$(awk -v r="$loaded_rows" -v b="$(stat -f%z "$csv_file" 2>/dev/null || stat -c%s "$csv_file")" \
+            -v s="$(( $(date +%s) - started ))" \
+            'BEGIN { if (s < 1) s = 1; printf "%ds, %.0f rows/s, %.1f MB/s", s, r / s, b / 1048576 / s }')
+        if [[ "$total_rows" -ne "$loaded_rows" ]]; then
+            log_success "  ✓ Loaded: ${loaded_rows} rows (${total_rows} with earlier chunks; ${rate})"
+        else
+            log_success "  ✓ Loaded: ${loaded_rows} rows (${rate})"
+        fi
         return 0
     else
+        local total_rows="$loaded_rows"
+        if [[ "$streams" -le 1 ]]; then
+            total_rows=$(checkpoint rows "$table_name" 2>> "$LOG_FILE" || echo "$loaded_rows")
+        fi
+        record_ledger "$tier_number" "$table_name" "$csv_file" failed "$loaded_rows" "$total_rows" "$started" \
+            "$ledger_mode"
         log_error "  ✗ Failed to load $table_name"
         return 1
     fi
 }
 
+# load_table with retries: waits LOAD_RETRY_BACKOFF seconds, doubling each time.
+# Args: $1=tier_number  $2=table_name
+load_table_with_retry() {
+    local tier_number="$1"
+    local table_name="$2"
+    local attempt=1
+    local delay="$LOAD_RETRY_BACKOFF"
+    until load_table "$tier_number" "$table_name"; do
+        if [[ $attempt -gt $LOAD_RETRIES ]]; then
+            return 1
+        fi
+        log_warning "  Retry ${attempt}/${LOAD_RETRIES} for $table_name in ${delay}s"
+        sleep "$delay"
+        # Chunked tables resume at the chunk that failed; partitioned tables
+        # are cleared by load_table before every attempt
+        attempt=$((attempt + 1))
+        delay=$((delay * 2))
+    done
+}
+
+# Load "tier table..." on LOAD_WORKERS background jobs, largest CSV first.
+# Each job logs to its own file, appended to the main log when the job ends
+# so output never interleaves. Sets POOL_LOADED / POOL_FAILED.
+run_pool() {
+    local tier_number="$1"
+    shift
+    local -a queue=()
+    mapfile -t queue < <(
+        for t in "$@"; do
+            f=$(csv_for "$tier_number" "$t")
+            printf '%s\t%s\n' "$(stat -f%z "$f" 2>/dev/null || stat -c%s "$f" 2>/dev/null || echo 0)" "$t"
+        done | sort -t$'\t' -k1,1nr | cut -f2)
+
+    local job_dir
+    job_dir=$(mktemp -d "${DATA_DIR}/.pool-XXXXXX")
+    local -A pid_of=()
+    local next=0 name
+    POOL_LOADED=0
+    POOL_FAILED=0
+    while [[ $next -lt ${#queue[@]} || ${#pid_of[@]} -gt 0 ]]; do
+        while [[ $next -lt ${#queue[@]} && ${#pid_of[@]} -lt $LOAD_WORKERS ]]; do
+            name="${queue[$next]}"
+            next=$((next + 1))
+            ( LOG_FILE="${job_dir}/${name}.log"; load_table_with_retry "$tier_number" "$name" ) \
+                > /dev/null 2>&1 &
+            pid_of[$name]=$!
+        done
+
+        wait -n 2>/dev/null || true
+
+        # Reap finished jobs
+        for name in "${!pid_of[@]}"; do
+            if ! kill -0 "${pid_of[$name]}" 2>/dev/null; then
+                if wait "${pid_of[$name]}"; then
+                    POOL_LOADED=$((POOL_LOADED + 1))
+                else
+                    POOL_FAILED=$((POOL_FAILED + 1))
+                fi
+                unset "pid_of[$name]"
+                tee -a "$LOG_FILE" < "${job_dir}/${name}.log" 2>/dev/null || true
+            fi
+        done
+    done
+    rm -rf "$job_dir"
+}
+
+# Truncate every table about to be loaded in ONE statement before any COPY.
+# A per-table TRUNCATE ... CASCADE empties every referencing table, so in
+# tier order it wiped children that were already loaded (poll, goo, ...);
+# see cascade_analyzer.py. Args: "tier:table" entries; tables without a
+# non-empty CSV are left alone, as before. Without --resume the checkpoints of
+# the load set are reset; with it, only tables with nothing committed (or a
+# changed CSV) are truncated.
+truncate_load_set() {
+    local -a entries=("$@")
+    local entry tier table
+    if [[ "${RESUME}" == "true" ]]; then
+        mapfile -t entries < <(checkpoint pending --data-dir "$DATA_DIR" "$@" 2>> "$LOG_FILE")
+        log_info "Resume: $(( $# - ${#entries[@]} )) of $# tables keep their checkpointed rows"
+    elif [[ $# -gt 0 ]]; then
+        local -a names=()
+        for entry in "$@"; do
+            names+=("${entry#*:}")
+        done
+        checkpoint reset "${names[@]}" 2>> "$LOG_FILE" || true
+    fi
+
+    [[ "${NO_TRUNCATE}" != "true" ]] || return 0
+    local -a targets=()
+    for entry in "${entries[@]}"; do
+        tier="${entry%%:*}"
+        table="${entry#*:}"
+        if [[ -s "$(csv_for "$tier" "$table")" ]]; then
+            targets+=("perseus.${table}")
+        fi
+    done
+    [[ ${#targets[@]} -gt 0 ]] || return 0
+
+    local list
+    list=$(IFS=','; echo "${targets[*]}")
+    log_info "Truncating ${#targets[@]} tables in one statement before loading..."
+    if truncate_tables "$list"; then
+        PRETRUNCATED=true
+    else
+        log_warning "Load-set TRUNCATE failed; falling back to per-table TRUNCATE"
+    fi
+}
+
+# --defer-indexes: secondary indexes, PRIMARY KEY / UNIQUE constraints and FKs
+# touching the load set are captured to DEFERRED_DDL, dropped before the
+# COPYs and rebuilt afterwards. DEFERRED_DDL (phase, table, name, create,
+# validate, drop; every create is idempotent) is only removed once the
+# rebuild succeeded, so a rerun after a crash rebuilds what the catalog no
+# longer has instead of capturing an index-less schema.
+defer_indexes() {
+    [[ "${DEFER_INDEXES}" == "true" ]] || return 0
+    local captured=false
+    if [[ -s "$DEFERRED_DDL" ]]; then
+        log_warning "Reusing $DEFERRED_DDL from an earlier run (its objects are still dropped)"
+    else
+        local -a names=()
+        local entry tier table
+        for entry in "$@"; do
+            tier="${entry%%:*}"
+            table="${entry#*:}"
+            if [[ -s "$(csv_for "$tier" "$table")" ]]; then
+                names+=("$table")
+            fi
+        done
+        [[ ${#names[@]} -gt 0 ]] || return 0
+
+        if ! docker exec -i "$DB_CONTAINER" psql -U "$DB_USER" -d "$DB_NAME" -At -F $'\t' \
+            -v ON_ERROR_STOP=1 -v load_set="$(IFS=','; echo "${names[*]}")" \
+            > "${DEFERRED_DDL}.tmp" 2>> "$LOG_FILE" <<'SQLCAPTURE'
+WITH load_set AS (
+    SELECT c.oid
+    FROM pg_class c
+    WHERE c.relnamespace = 'perseus'::regnamespace
+      AND c.relname = ANY (string_to_array(:'load_set', ','))
+),
+guard AS (
+    -- ADD CONSTRAINT has no IF NOT EXISTS
+    SELECT con.oid,
+           format('DO $$ BEGIN IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conrelid = %L::regclass AND conname = %L) THEN ALTER TABLE perseus.%I ADD CONSTRAINT %I %s%s; END IF; END $$',
+                  'perseus.' || quote_ident(cl.relname), con.conname, cl.relname, con.conname,
+                  pg_get_constraintdef(con.oid),
+                  -- PostgreSQL 17 refuses NOT VALID FKs on partitioned tables
+                  CASE WHEN con.contype = 'f' AND cl.relkind <> 'p' THEN ' NOT VALID' ELSE '' END) AS create_sql
+    FROM pg_constraint con
+    JOIN pg_class cl ON cl.oid = con.conrelid
+)
+-- Phase 1: keys and secondary indexes of the load set
+SELECT 1, cl.relname, con.conname, g.create_sql, '',
+       format('ALTER TABLE perseus.%I DROP CONSTRAINT IF EXISTS %I', cl.relname, con.conname)
+FROM pg_constraint con
+JOIN pg_class cl ON cl.oid = con.conrelid
+JOIN guard g ON g.oid = con.oid
+WHERE con.conrelid IN (SELECT oid FROM load_set)
+  AND con.contype IN ('p', 'u') AND con.conparentid = 0
+UNION ALL
+SELECT 1, cl.relname, ic.relname,
+       -- a partitioned parent's definition reads ON ONLY, which would build an
+       -- invalid parent index without its partition indexes
+       regexp_replace(regexp_replace(pg_get_indexdef(i.indexrelid), ' ON ONLY ', ' ON '),
+                      '^CREATE (UNIQUE )?INDEX ', 'CREATE \1INDEX IF NOT EXISTS '),
+       '', format('DROP INDEX IF EXISTS perseus.%I', ic.relname)
+FROM pg_index i
+JOIN pg_class cl ON cl.oid = i.indrelid
+JOIN pg_class ic ON ic.oid = i.indexrelid
+WHERE i.indrelid IN (SELECT oid FROM load_set)
+  AND NOT EXISTS (SELECT 1 FROM pg_constraint c WHERE c.conindid = i.indexrelid AND c.contype IN ('p', 'u', 'x'))
+  AND NOT EXISTS (SELECT 1 FROM pg_inherits h WHERE h.inhrelid = i.indexrelid)
+UNION ALL
+-- Phase 2: FKs from or to the load set (re-added NOT VALID, then validated;
+-- FKs of partitioned tables are re-added valid in one step)
+SELECT 2, cl.relname, con.conname, g.create_sql,
+       CASE WHEN cl.relkind = 'p' THEN ''
+            ELSE format('ALTER TABLE perseus.%I VALIDATE CONSTRAINT %I', cl.relname, con.conname) END,
+       format('ALTER TABLE perseus.%I DROP CONSTRAINT IF EXISTS %I', cl.relname, con.conname)
+FROM pg_constraint con
+JOIN pg_class cl ON cl.oid = con.conrelid
+JOIN guard g ON g.oid = con.oid
+WHERE con.contype = 'f' AND con.conparentid = 0
+  AND (con.conrelid IN (SELECT oid FROM load_set) OR con.confrelid IN (SELECT oid FROM load_set))
+ORDER BY 1, 2, 3;
+SQLCAPTURE
+        then
+            rm -f "${DEFERRED_DDL}.tmp"
+            log_warning "Could not capture index/constraint DDL; loading with indexes in place"
+            return 0
+        fi
+        mv "${DEFERRED_DDL}.tmp" "$DEFERRED_DDL"
+        captured=true
+    fi
+    [[ -s "$DEFERRED_DDL" ]] || { rm -f "$DEFERRED_DDL"; return 0; }
+
+    log_info "Deferring $(awk -F'\t' '$1 == 1' "$DEFERRED_DDL" | wc -l | tr -d ' ') indexes/keys and $(awk -F'\t' '$1 == 2' "$DEFERRED_DDL" | wc -l | tr -d ' ') FKs until after the load (saved to $DEFERRED_DDL)"
+    # FKs first: they depend on the keys they reference
+    if ! { echo "BEGIN;"
+           awk -F'\t' '$1 == 2 { print $6 ";" }' "$DEFERRED_DDL"
+           awk -F'\t' '$1 == 1 { print $6 ";" }' "$DEFERRED_DDL"
+           echo "COMMIT;"; } | \
+        docker exec -i "$DB_CONTAINER" psql -U "$DB_USER" -d "$DB_NAME" -v ON_ERROR_STOP=1 >> "$LOG_FILE" 2>&1; then
+        log_warning "Could not drop deferred indexes/constraints; loading with indexes in place"
+        [[ "$captured" != true ]] || rm -f "$DEFERRED_DDL"
+    fi
+}
+
+# Run "name<TAB>sql" lines of a file on up to $3 psql sessions, in file
+# order, with the index build settings applied. Sets POOL_FAILED.
+# Args: $1=label  $2=jobs_file  $3=sessions
+run_sql_pool() {
+    local label="$1"
+    local jobs_file="$2"
+    local sessions="$3"
+    local job_dir
+    job_dir=$(mktemp -d "${DATA_DIR}/.rebuild-XXXXXX")
+    local -a jobs=()
+    local -A name_of=()
+    local i=0 n=0 name sql pid log
+    mapfile -t jobs < "$jobs_file"
+    POOL_FAILED=0
+    while [[ $i -lt ${#jobs[@]} || ${#name_of[@]} -gt 0 ]]; do
+        # Start the next job while a session is free
+        if [[ $i -lt ${#jobs[@]} && ${#name_of[@]} -lt $sessions ]]; then
+            IFS=$'\t' read -r name sql <<< "${jobs[i]}"
+            i=$((i + 1))
+            [[ -n "$sql" ]] || continue
+            n=$((n + 1))
+            docker exec "$DB_CONTAINER" psql -U "$DB_USER" -d "$DB_NAME" -v ON_ERROR_STOP=1 \
+                -c "SET maintenance_work_mem = '${INDEX_MAINTENANCE_MEM}'" \
+                -c "SET max_parallel_maintenance_workers = ${INDEX_PARALLEL_WORKERS}" \
+                -c "$sql" > "${job_dir}/${n}.log" 2>&1 < /dev/null &
+            name_of[$!]="${n}:${name}"
+            continue
+        fi
+        # All sessions busy (or no jobs left): collect the finished ones
+        wait -n 2>/dev/null || true
+        for pid in "${!name_of[@]}"; do
+            kill -0 "$pid" 2>/dev/null && continue
+            log="${job_dir}/${name_of[$pid]%%:*}.log"
+            if wait "$pid"; then
+                log_info "  ✓ ${label}: ${name_of[$pid]#*:}"
+            else
+                POOL_FAILED=$((POOL_FAILED + 1))
+                log_error "  ✗ ${label}: ${name_of[$pid]#*:} - $(grep -m1 'ERROR' "$log" || echo 'failed')"
+            fi
+            cat "$log" >> "$LOG_FILE"
+            unset "name_of[$pid]"
+        done
+    done
+    rm -rf "$job_dir"
+}
+
+# "name<TAB>sql" jobs of one DEFERRED_DDL phase, largest table first.
+# Args: $1=sizes file (table<TAB>bytes)  $2=phase  $3=DEFERRED_DDL column to run
+deferred_jobs() {
+    awk -F'\t' -v phase="$2" -v col="$3" 'NR == FNR { size[$1] = $2; next }
+        $1 == phase && $col != "" { print size[$2] + 0 "\t" $3 "\t" $col }' \
+        "$1" "$DEFERRED_DDL" | sort -t$'\t' -k1,1nr | cut -f2-
+}
+
+# Rebuild what defer_indexes dropped: keys and indexes on REBUILD_JOBS
+# sessions, largest tables first; FKs added NOT VALID (catalog only, one
+# session), then validated concurrently. FKs of partitioned tables are added
+# valid, which scans the table in that one session. Sets REBUILD_FAILED.
+rebuild_deferred_indexes() {
+    [[ "${DEFER_INDEXES}" == "true" && -s "$DEFERRED_DDL" ]] || return 0
+    log_info "========================================"
+    log_info "REBUILDING DEFERRED INDEXES (${REBUILD_JOBS} sessions, maintenance_work_mem=${INDEX_MAINTENANCE_MEM}, max_parallel_maintenance_workers=${INDEX_PARALLEL_WORKERS})"
+    log_info "========================================"
+    local start
+    start=$(date +%s)
+
+    local work_dir
+    work_dir=$(mktemp -d "${DATA_DIR}/.rebuild-plan-XXXXXX")
+    # Heap size per table, partitions summed into their parent
+    docker exec "$DB_CONTAINER" psql -U "$DB_USER" -d "$DB_NAME" -At -F $'\t' -c \
+        "SELECT c.relname, (SELECT COALESCE(sum(pg_relation_size(relid)), 0) FROM pg_partition_tree(c.oid))
+         FROM pg_class c WHERE c.relnamespace = 'perseus'::regnamespace AND c.relkind IN ('r', 'p');" \
+        > "${work_dir}/sizes" 2>> "$LOG_FILE" || true
+    [[ -s "${work_dir}/sizes" ]] || printf -- '-\t0\n' > "${work_dir}/sizes"
+    REBUILD_FAILED=0
+    deferred_jobs "${work_dir}/sizes" 1 4 > "${work_dir}/indexes"
+    run_sql_pool "index" "${work_dir}/indexes" "$REBUILD_JOBS"
+    REBUILD_FAILED=$((REBUILD_FAILED + POOL_FAILED))
+
+    deferred_jobs "${work_dir}/sizes" 2 4 > "${work_dir}/fks"
+    run_sql_pool "FK" "${work_dir}/fks" 1
+    REBUILD_FAILED=$((REBUILD_FAILED + POOL_FAILED))
+
+    deferred_jobs "${work_dir}/sizes" 2 5 > "${work_dir}/validate"
+    run_sql_pool "validate" "${work_dir}/validate" "$REBUILD_JOBS"
+    REBUILD_FAILED=$((REBUILD_FAILED + POOL_FAILED))
+    rm -rf "$work_dir"
+
+    if [[ $REBUILD_FAILED -eq 0 ]]; then
+        rm -f "$DEFERRED_DDL"
+        log_success "Deferred indexes and constraints rebuilt in $(( $(date +%s) - start ))s"
+    else
+        log_error "${REBUILD_FAILED} index/constraint rebuilds failed; rerun with --defer-indexes to retry (DDL kept in $DEFERRED_DDL)"
+    fi
+}
+
+# --verify: exact COUNT(*) of every table's latest loaded ledger row, on
+# LOAD_WORKERS sessions (largest first), stored in verified_rows and compared
+# with the rows COPY reported. Returns 1 on any mismatch or failed count.
+verify_ledger() {
+    local work_dir
+    work_dir=$(mktemp -d "${DATA_DIR}/.verify-XXXXXX")
+    docker exec "$DB_CONTAINER" psql -U "$DB_USER" -d "$DB_NAME" -At -F $'\t' -c \
+        "SELECT table_name, format('UPDATE perseus_migration.load_ledger SET verified_rows = (SELECT count(*) FROM perseus.%I), verified_at = now() WHERE run_id = %L AND table_name = %L', table_name, run_id, table_name)
+         FROM (SELECT DISTINCT ON (table_name) table_name, run_id, rows_total
+               FROM perseus_migration.load_ledger WHERE status = 'loaded'
+               ORDER BY table_name, finished_at DESC) latest
+         ORDER BY rows_total DESC;" > "${work_dir}/jobs" 2>> "$LOG_FILE" || true
+
+    if [[ ! -s "${work_dir}/jobs" ]]; then
+        rm -rf "$work_dir"
+        log_warning "No loaded tables in perseus_migration.load_ledger to verify"
+        return 0
+    fi
+    log_info "Recounting $(wc -l < "${work_dir}/jobs" | tr -d ' ') tables on ${LOAD_WORKERS} sessions..."
+    run_sql_pool "count" "${work_dir}/jobs" "$LOAD_WORKERS"
+    local count_failed=$POOL_FAILED
+    rm -rf "$work_dir"
+
+    local mismatches
+    mismatches=$(docker exec "$DB_CONTAINER" psql -U "$DB_USER" -d "$DB_NAME" -At -F $'\t' -c \
+        "SELECT table_name, rows_total, verified_rows
+         FROM (SELECT DISTINCT ON (table_name) * FROM perseus_migration.load_ledger
+               WHERE status = 'loaded' ORDER BY table_name, finished_at DESC) latest
+         WHERE verified_rows IS DISTINCT FROM rows_total ORDER BY table_name;" 2>> "$LOG_FILE")
+    local table expected actual
+    while IFS=$'\t' read -r table expected actual; do
+        [[ -n "$table" ]] || continue
+        log_error "  ✗ ${table}: COPY reported ${expected} rows, table has ${actual:-?}"
+    done <<< "$mismatches"
+
+    if [[ $count_failed -gt 0 || -n "$mismatches" ]]; then
+        return 1
+    fi
+    log_success "All ledger row counts verified"
+}
+
 # Function to load a tier of tables
 load_tier() {
     local tier_number="$1"
@@ -164,25 +1113,131 @@ load_tier() {
     local tables=("$@")
 
     log_info "========================================"
-    log_info "TIER $tier_number: Loading ${#tables[@]} tables"
+    log_info "TIER $tier_number: Loading ${#tables[@]} tables (${LOAD_WORKERS} workers)"
     log_info "========================================"
 
     local loaded=0
     local failed=0
 
-    for table in "${tables[@]}"; do
-        # BUG 2 fix: pass tier_number to load_table
-        if load_table "$tier_number" "$table"; then
-            loaded=$((loaded + 1))   # BUG 3 fix: ((x++)) exits when x=0 with set -e
-        else
-            failed=$((failed + 1))
-        fi
-    done
+    if [[ $LOAD_WORKERS -gt 1 && ${#tables[@]} -gt 1 ]]; then
+        # FK triggers are disabled for the load, so tables of a tier are independent
+        run_pool "$tier_number" "${tables[@]}"
+        loaded=$POOL_LOADED
+        failed=$POOL_FAILED
+    else
+        for table in "${tables[@]}"; do
+            # BUG 2 fix: pass tier_number to load_table
+            if load_table_with_retry "$tier_number" "$table"; then
+                loaded=$((loaded + 1))   # BUG 3 fix: ((x++)) exits when x=0 with set -e
+            else
+                failed=$((failed + 1))
+            fi
+        done
+    fi
+    LOAD_FAILED=$((LOAD_FAILED + failed))
 
     log_info "Tier $tier_number complete: $loaded loaded, $failed failed/skipped"
     echo ""
 }
 
+# Load every exported CSV following the FK DAG on N workers.
+# A table starts once all of its loaded FK ancestors have finished; if one of
+# them failed it is skipped. Each job logs to its own file, which is appended
+# to the main log when the job ends so output never interleaves.
+run_schedule() {
+    local workers="$1"
+    local plan
+    if ! plan=$(python3 "${SCRIPT_DIR}/load_plan.py" --data-dir "$DATA_DIR" \
+            --workers "$workers" --format tsv 2>> "$LOG_FILE"); then
+        log_error "load_plan.py failed (see $LOG_FILE)"
+        return 1
+    fi
+
+    local -a names=() tiers=() parents=()
+    local name tier parent_list i
+    while IFS=$'\t' read -r name tier parent_list _; do
+        [[ -n "$name" ]] || continue
+        names+=("$name")
+        tiers+=("$tier")
+        parents+=("$parent_list")
+    done <<< "$plan"
+
+    log_info "========================================"
+    log_info "FK DAG SCHEDULE: ${#names[@]} tables on $workers workers"
+    log_info "========================================"
+
+    local -a entries=()
+    for i in "${!names[@]}"; do
+        entries+=("${tiers[$i]}:${names[$i]}")
+    done
+    truncate_load_set "${entries[@]}"
+    defer_indexes "${entries[@]}"
+
+    local job_dir
+    job_dir=$(mktemp -d "${DATA_DIR}/.schedule-XXXXXX")
+    local -A state=()
+    local -A pid_of=()
+    for name in "${names[@]}"; do
+        state[$name]=pending
+    done
+
+    local running=0 loaded=0 failed=0 skipped=0
+    while true; do
+        # Start ready tables in priority (critical path first) order
+        for i in "${!names[@]}"; do
+            name="${names[$i]}"
+            [[ "${state[$name]}" == pending ]] || continue
+            local ready=true blocked=""
+            local parent
+            for parent in ${parents[$i]//,/ }; do
+                case "${state[$parent]:-done}" in
+                    done) ;;
+                    failed|skipped) blocked="$parent" ;;
+                    *) ready=false ;;
+                esac
+            done
+            if [[ -n "$blocked" ]]; then
+                state[$name]=skipped
+                skipped=$((skipped + 1))
+                log_warning "Skipping $name: parent $blocked did not load"
+                continue
+            fi
+            if [[ "$ready" == true && $running -lt $workers ]]; then
+                ( LOG_FILE="${job_dir}/${name}.log"; load_table_with_retry "${tiers[$i]}" "$name" ) \
+                    > /dev/null 2>&1 &
+                pid_of[$name]=$!
+                state[$name]=running
+                running=$((running + 1))
+            fi
+        done
+
+        [[ $running -gt 0 ]] || break
+        wait -n 2>/dev/null || true
+
+        # Reap finished jobs
+        for name in "${!pid_of[@]}"; do
+            if ! kill -0 "${pid_of[$name]}" 2>/dev/null; then
+                if wait "${pid_of[$name]}"; then
+                    state[$name]=done
+                    loaded=$((loaded + 1))
+                else
+                    state[$name]=failed
+                    failed=$((failed + 1))
+                fi
+                unset "pid_of[$name]"
+                running=$((running - 1))
+                tee -a "$LOG_FILE" < "${job_dir}/${name}.log" 2>/dev/null || true
+            fi
+        done
+    done
+
+    rm -rf "$job_dir"
+    LOAD_FAILED=$((LOAD_FAILED + failed + skipped))
+    log_info "Schedule complete: $loaded loaded, $failed failed, $skipped skipped"
+    echo ""
+    [[ $failed -eq 0 && $skipped -eq 0 ]]
+}
+
 # Define tables by tier (based on dependency order)
 TIER0_TABLES=(
     "permissions"               # BUG 4 fix: was "Permissions" (PascalCase)
@@ -275,7 +1330,8 @@ TIER4_TABLES=(
 )
 
 # BUG 9 fix: FK trigger management using ALTER TABLE (not SET session_replication_role,
-# which is session-scoped and lost between docker exec calls)
+# which is session-scoped and lost between docker exec calls; pg_loader.py --replica
+# keeps one session per worker and can use it)
 disable_fk_triggers() {
     log_info "Disabling FK triggers on all perseus tables..."
     docker exec -i "$DB_CONTAINER" psql -U "$DB_USER" -d "$DB_NAME" <<'SQLDISABLE'
@@ -306,6 +1362,48 @@ SQLENABLE
     log_success "FK triggers re-enabled"
 }
 
+# Pre-load FK check over the exports: with the triggers disabled nothing
+# stops orphans from loading, and validate-referential-integrity.sql only
+# finds them once they are in. FKs whose parent was not exported are skipped.
+# Returns: 0 when no FK has orphans, 1 otherwise (report in ORPHAN_REPORT)
+check_orphans() {
+    local -a scope=()
+    if [[ -n "$SPECIFIC_TIER" ]]; then
+        if [[ ! "$SPECIFIC_TIER" =~ ^[0-4]$ ]]; then
+            log_error "Invalid tier: $SPECIFIC_TIER (must be 0-4)"
+            return 1
+        fi
+        # Only the children being loaded; their parents are still read from
+        # DATA_DIR when exported
+        local -n tier_list="TIER${SPECIFIC_TIER}_TABLES"
+        local table
+        for table in "${tier_list[@]}"; do
+            [[ ! -s "$(csv_for "$SPECIFIC_TIER" "$table")" ]] || scope+=(--table "$table")
+        done
+        if [[ ${#scope[@]} -eq 0 ]]; then
+            log_info "No exports for tier ${SPECIFIC_TIER}; skipping the FK orphan check"
+            return 0
+        fi
+    fi
+    log_info "Checking the exports for FK orphans (${ORPHAN_CHECK_JOBS} processes${SPECIFIC_TIER:+, tier ${SPECIFIC_TIER}})..."
+    local rc=0
+    python3 "${SCRIPT_DIR}/orphan_check.py" --data-dir "$DATA_DIR" --manifest-dir "$COPY_MANIFEST_DIR" \
+        --jobs "$ORPHAN_CHECK_JOBS" --summary "$ORPHAN_REPORT" "${scope[@]}" 2>&1 | tee -a "$LOG_FILE" || rc=$?
+    case $rc in
+        0)
+            log_success "No FK orphans in the exports"
+            ;;
+        3)
+            log_error "FK orphans in the exports (per FK: $ORPHAN_REPORT); fix the extract, or load without --check-orphans and clean up with validate-referential-integrity.sql"
+            return 1
+            ;;
+        *)
+            log_error "orphan_check.py failed (exit $rc)"
+            return 1
+            ;;
+    esac
+}
+
 # Main execution
 if [ "$VALIDATE_ONLY" = true ]; then
     log_info "Validation mode: Checking data integrity only"
@@ -314,12 +1412,43 @@ if [ "$VALIDATE_ONLY" = true ]; then
     exit 0
 fi
 
+ensure_ledger || log_warning "Could not create perseus_migration.load_ledger (row counts only in $LOG_FILE)"
+
+if [[ "$VERIFY_ONLY" == true ]]; then
+    log_info "Verify mode: exact row counts against the load ledger"
+    verify_ledger || exit 1
+    exit 0
+fi
+
+# binary_copy.py reads offset-less timestamptz values in the server's TimeZone,
+# as the server does when it parses them from CSV
+if [[ -n "$BINARY_TABLES" ]]; then
+    BINARY_TIMEZONE=$(docker exec "$DB_CONTAINER" psql -U "$DB_USER" -d "$DB_NAME" -Atc "SHOW TimeZone;" \
+        2>> "$LOG_FILE" || true)
+    BINARY_TIMEZONE="${BINARY_TIMEZONE:-UTC}"
+    log_info "Binary COPY for: ${BINARY_TABLES} (server TimeZone ${BINARY_TIMEZONE})"
+fi
+
+if [[ "$CHECK_ORPHANS" == true ]]; then
+    check_orphans || exit 1
+fi
+
 # BUG 9 fix: disable FK triggers before loading to handle ordering violations
 disable_fk_triggers
 
-# Load data tier by tier
-if [ -z "$SPECIFIC_TIER" ]; then
+# Load data tier by tier, or following the FK DAG with --schedule
+if [[ -n "$SCHEDULE_WORKERS" ]]; then
+    run_schedule "$SCHEDULE_WORKERS" || log_warning "Some tables did not load (see above)"
+elif [ -z "$SPECIFIC_TIER" ]; then
     # Load all tiers
+    load_set=()
+    for t in "${TIER0_TABLES[@]}"; do load_set+=("0:$t"); done
+    for t in "${TIER1_TABLES[@]}"; do load_set+=("1:$t"); done
+    for t in "${TIER2_TABLES[@]}"; do load_set+=("2:$t"); done
+    for t in "${TIER3_TABLES[@]}"; do load_set+=("3:$t"); done
+    for t in "${TIER4_TABLES[@]}"; do load_set+=("4:$t"); done
+    truncate_load_set "${load_set[@]}"
+    defer_indexes "${load_set[@]}"
     load_tier 0 "${TIER0_TABLES[@]}"
     load_tier 1 "${TIER1_TABLES[@]}"
     load_tier 2 "${TIER2_TABLES[@]}"
@@ -328,21 +1457,29 @@ if [ -z "$SPECIFIC_TIER" ]; then
 else
     # Load specific tier
     case "$SPECIFIC_TIER" in
-        0) load_tier 0 "${TIER0_TABLES[@]}" ;;
-        1) load_tier 1 "${TIER1_TABLES[@]}" ;;
-        2) load_tier 2 "${TIER2_TABLES[@]}" ;;
-        3) load_tier 3 "${TIER3_TABLES[@]}" ;;
-        4) load_tier 4 "${TIER4_TABLES[@]}" ;;
+        0) tier_tables=("${TIER0_TABLES[@]}") ;;
+        1) tier_tables=("${TIER1_TABLES[@]}") ;;
+        2) tier_tables=("${TIER2_TABLES[@]}") ;;
+        3) tier_tables=("${TIER3_TABLES[@]}") ;;
+        4) tier_tables=("${TIER4_TABLES[@]}") ;;
         *)
             log_error "Invalid tier: $SPECIFIC_TIER (must be 0-4)"
             exit 1
             ;;
     esac
+    load_set=()
+    for t in "${tier_tables[@]}"; do load_set+=("${SPECIFIC_TIER}:$t"); done
+    truncate_load_set "${load_set[@]}"
+    defer_indexes "${load_set[@]}"
+    load_tier "$SPECIFIC_TIER" "${tier_tables[@]}"
 fi
 
 # BUG 9 fix: re-enable FK triggers after all data is loaded
 enable_fk_triggers
 
+# --defer-indexes: rebuild what was dropped before the COPYs
+rebuild_deferred_indexes
+
 # Final validation
 log_info "========================================";
 log_info "DATA LOADING COMPLETE"
@@ -366,12 +1503,24 @@ FROM information_schema.table_constraints
 WHERE constraint_schema = 'perseus' AND constraint_type = 'FOREIGN KEY';
 EOF
 
+log_info "Rows loaded this run (COPY): $(docker exec "$DB_CONTAINER" psql -U "$DB_USER" -d "$DB_NAME" -At -c \
+    "SELECT COALESCE(sum(rows_loaded), 0) FROM perseus_migration.load_ledger WHERE run_id = '${RUN_ID}';" 2>/dev/null || echo '?') (run ${RUN_ID})"
+
 log_success "Data migration complete!"
 log_info "Log file: $LOG_FILE"
 log_info ""
 log_info "Next steps:"
 log_info "  1. Run validation: ./load-data.sh --validate-only"
-log_info "  2. Check row counts: psql -c 'SELECT * FROM perseus.migration_stats;'"
+log_info "  2. Check row counts: psql -c \"SELECT * FROM perseus_migration.load_ledger WHERE run_id = '${RUN_ID}';\""
+log_info "     Exact recount (parallel): ./load-data.sh --verify --parallel 4"
 log_info "  3. Run checksums: psql -f validate-checksums.sql"
+log_info "  Checkpoints: python3 load_checkpoint.py --checkpoint-dir $CHECKPOINT_DIR summary"
 
+if [[ $LOAD_FAILED -gt 0 ]]; then
+    log_error "${LOAD_FAILED} tables failed to load"
+    exit 1
+fi
+if [[ $REBUILD_FAILED -gt 0 ]]; then
+    exit 1
+fi
 exit 0
@@ -0,0 +1,404 @@
+#!/usr/bin/env python3
+"""
+Load Checkpoints - per-table / per-chunk progress for resumable loads
+
+load-data.sh truncates and reloads every table on every run (BUG 11 fix), so
+a failure four hours in costs four hours. This helper keeps one checkpoint
+per table in CHECKPOINT_DIR (default: $DATA_DIR/.checkpoints/<table>.json):
+
+- source: CSV byte size, mtime and SHA-256
+- chunks: byte range, SHA-256, rows loaded (COPY tag) and status
+  (pending / loaded / failed) per chunk
+- status: pending / partial / done / failed for the table
+
+Chunks are the byte ranges of extract-data.sh's <table>.manifest.json when
+the CSV was exported in chunks, otherwise the whole file. Compressed exports
+(.csv.gz / .csv.zst) are tracked by their compressed bytes: each chunk's
+range is a complete gzip member / zstd frame. Each chunk is one
+COPY, i.e. one transaction, so a chunk marked loaded is committed and a
+failed chunk left nothing behind. Partitioned tables (parallel COPY streams,
+not atomic) are always one chunk.
+
+A source is unchanged when size and mtime match; otherwise it is re-hashed.
+When the hash differs, chunks whose range and hash are unchanged keep their
+state (e.g. rows appended to the last chunk); if any loaded chunk changed
+the table state is `changed` and it has to be reloaded from scratch.
+
+Usage:
+    python3 scripts/data-migration/load_checkpoint.py begin TABLE CSV [--single-chunk] [--no-truncate]
+    python3 scripts/data-migration/load_checkpoint.py mark TABLE CHUNK --status loaded --rows N
+    python3 scripts/data-migration/load_checkpoint.py pending [--data-dir DIR] TIER:TABLE ...
+    python3 scripts/data-migration/load_checkpoint.py reset TABLE ...
+    python3 scripts/data-migration/load_checkpoint.py rows TABLE
+    python3 scripts/data-migration/load_checkpoint.py summary
+
+    begin    record/refresh the checkpoint; prints the state
+             (fresh / resume / done / changed), then chunk<TAB>offset<TAB>bytes
+             for every chunk still to load
+    pending  print the TIER:TABLE entries that need an empty table before
+             loading (fresh or changed); writes nothing
+    rows     rows committed across all loaded chunks (COPY tags)
+    summary  table, status, chunks loaded, rows loaded
+
+Exit Codes:
+    0 - Success
+    1 - Unknown table / chunk, unreadable CSV
+    2 - Invalid arguments
+
+Author: Pierre Ribeiro (DBA/DBRE)
+Created: 2026-10-19
+Version: 1.0
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
+
+# ============================================================================
+# CONSTANTS
+# ============================================================================
+
+DEFAULT_DATA_DIR = os.environ.get('DATA_DIR', '/tmp/perseus-data-export')
+DEFAULT_CHECKPOINT_DIR = os.environ.get('CHECKPOINT_DIR', os.path.join(DEFAULT_DATA_DIR, '.checkpoints'))
+READ_BYTES = 1 << 20
+# extract-data.sh --compress writes <table>.csv.gz / .csv.zst (one member / frame per chunk)
+CSV_SUFFIXES = ('.csv', '.csv.zst', '.csv.gz')
+
+
+# ============================================================================
+# CHECKPOINT FILES
+# ============================================================================
+
+def checkpoint_path(checkpoint_dir: str, table: str) -> str:
+    return os.path.join(checkpoint_dir, f"{table}.json")
+
+
+def read_checkpoint(checkpoint_dir: str, table: str) -> Optional[dict]:
+    try:
+        with open(checkpoint_path(checkpoint_dir, table)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def write_checkpoint(checkpoint_dir: str, checkpoint: dict) -> None:
+    """Atomic replace, so an interrupted run never leaves half a checkpoint."""
+    os.makedirs(checkpoint_dir, exist_ok=True)
+    path = checkpoint_path(checkpoint_dir, checkpoint['table'])
+    checkpoint['updated'] = now()
+    with open(path + '.tmp', 'w') as f:
+        json.dump(checkpoint, f, indent=2)
+    os.replace(path + '.tmp', path)
+
+
+def now() -> str:
+    return datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+# ============================================================================
+# SOURCE LAYOUT
+# ============================================================================
+
+def find_csv(data_dir: str, tier: str, table: str) -> str:
+    """The table's export, compressed or not (plain .csv path when none exists)."""
+    base = os.path.join(data_dir, f"##perseus_tier_{tier}_{table}")
+    for suffix in CSV_SUFFIXES:
+        if os.path.isfile(base + suffix):
+            return base + suffix
+    return base + '.csv'
+
+
+def manifest_for(csv_path: str) -> str:
+    """<table>.manifest.json next to <table>.csv[.gz|.zst]."""
+    for suffix in sorted(CSV_SUFFIXES, key=len, reverse=True):
+        if csv_path.endswith(suffix):
+            return csv_path[:-len(suffix)] + '.manifest.json'
+    return csv_path + '.manifest.json'
+
+
+def chunk_layout(csv_path: str, chunked_by: str) -> List[Tuple[int, int]]:
+    """(byte_offset, bytes) per chunk: extract manifest ranges, else the whole file."""
+    size = os.path.getsize(csv_path)
+    if chunked_by == 'extract-manifest':
+        manifest = manifest_for(csv_path)
+        try:
+            with open(manifest) as f:
+                chunks = json.load(f)['chunks']
+            layout = [(c['byte_offset'], c['bytes']) for c in chunks if c['bytes'] > 0]
+        except (OSError, ValueError, KeyError):
+            layout = []
+        if layout and sum(b for _, b in layout) == size:
+            return layout
+    return [(0, size)]
+
+
+def default_chunking(csv_path: str) -> str:
+    return 'extract-manifest' if os.path.exists(manifest_for(csv_path)) else 'file'
+
+
+def hash_source(csv_path: str, layout: List[Tuple[int, int]]) -> Tuple[str, List[str]]:
+    """SHA-256 of the whole file and of each chunk, in one read."""
+    whole = hashlib.sha256()
+    digests = []
+    with open(csv_path, 'rb') as f:
+        for offset, length in layout:
+            f.seek(offset)
+            part = hashlib.sha256()
+            remaining = length
+            while remaining > 0:
+                block = f.read(min(READ_BYTES, remaining))
+                if not block:
+                    break
+                part.update(block)
+                whole.update(block)
+                remaining -= len(block)
+            digests.append(part.hexdigest())
+    return whole.hexdigest(), digests
+
+
+def new_checkpoint(table: str, csv_path: str, chunked_by: str) -> dict:
+    layout = chunk_layout(csv_path, chunked_by)
+    digest, chunk_digests = hash_source(csv_path, layout)
+    st = os.stat(csv_path)
+    return {
+        'table': table,
+        'csv': os.path.abspath(csv_path),
+        'source': {'bytes': st.st_size, 'mtime_ns': st.st_mtime_ns, 'sha256': digest},
+        'chunked_by': chunked_by,
+        'status': 'pending',
+        'chunks': [
+            {'chunk': i + 1, 'byte_offset': offset, 'bytes': length, 'sha256': chunk_digest,
+             'rows': None, 'status': 'pending', 'loaded_at': None}
+            for i, ((offset, length), chunk_digest) in enumerate(zip(layout, chunk_digests))
+        ],
+    }
+
+
+# ============================================================================
+# STATE
+# ============================================================================
+
+def table_status(checkpoint: dict) -> str:
+    states = [c['status'] for c in checkpoint['chunks']]
+    if all(s == 'loaded' for s in states):
+        return 'done'
+    if 'failed' in states:
+        return 'failed'
+    return 'partial' if 'loaded' in states else 'pending'
+
+
+def load_state(checkpoint: dict) -> str:
+    """fresh: nothing committed / resume: some chunks committed / done."""
+    loaded = [c['status'] == 'loaded' for c in checkpoint['chunks']]
+    if all(loaded):
+        return 'done'
+    return 'resume' if any(loaded) else 'fresh'
+
+
+def evaluate(table: str, csv_path: str, checkpoint_dir: str,
+             single_chunk: Optional[bool] = None, record: bool = True) -> Tuple[str, Optional[dict]]:
+    """
+    Compare the CSV with its checkpoint; return (state, checkpoint to keep).
+
+    record=False only answers the question: a table without a checkpoint is
+    `fresh` without hashing the CSV.
+    """
+    old = read_checkpoint(checkpoint_dir, table)
+    st = os.stat(csv_path)
+    if single_chunk:
+        chunked_by = 'file'
+    elif old and single_chunk is None:
+        chunked_by = old['chunked_by']
+    else:
+        chunked_by = default_chunking(csv_path)
+
+    if old and old['source']['bytes'] == st.st_size and old['source']['mtime_ns'] == st.st_mtime_ns \
+            and old['chunked_by'] == chunked_by:
+        return load_state(old), old
+    if not old and not record:
+        return 'fresh', None
+
+    fresh = new_checkpoint(table, csv_path, chunked_by)
+    if not old:
+        return 'fresh', fresh
+
+    # Source touched or re-exported: keep chunks whose bytes did not change
+    previous = {(c['byte_offset'], c['bytes'], c['sha256']): c for c in old['chunks']}
+    carried = 0
+    for chunk in fresh['chunks']:
+        match = previous.get((chunk['byte_offset'], chunk['bytes'], chunk['sha256']))
+        if match and match['status'] == 'loaded':
+            chunk.update(rows=match['rows'], status='loaded', loaded_at=match['loaded_at'])
+            carried += 1
+    lost = sum(1 for c in old['chunks'] if c['status'] == 'loaded') - carried
+    if lost > 0:
+        for chunk in fresh['chunks']:
+            chunk.update(rows=None, status='pending', loaded_at=None)
+        fresh['status'] = 'pending'
+        return 'changed', fresh
+    fresh['status'] = table_status(fresh)
+    return load_state(fresh), fresh
+
+
+def mark_chunk(checkpoint: dict, chunk_no: int, status: str, rows: Optional[int] = None) -> bool:
+    """Set one chunk's status (rows only count when loaded); False if there is no such chunk."""
+    for chunk in checkpoint['chunks']:
+        if chunk['chunk'] == chunk_no:
+            chunk['status'] = status
+            chunk['rows'] = rows if status == 'loaded' else None
+            chunk['loaded_at'] = now() if status == 'loaded' else None
+            break
+    else:
+        return False
+    checkpoint['status'] = table_status(checkpoint)
+    return True
+
+
+def loaded_rows(checkpoint: dict) -> int:
+    return sum(c['rows'] or 0 for c in checkpoint['chunks'] if c['status'] == 'loaded')
+
+
+# ============================================================================
+# COMMANDS
+# ============================================================================
+
+def cmd_begin(args: argparse.Namespace) -> int:
+    if not os.path.isfile(args.csv):
+        print(f"ERROR: CSV not found: {args.csv}", file=sys.stderr)
+        return 1
+    state, checkpoint = evaluate(args.table, args.csv, args.checkpoint_dir, args.single_chunk)
+    if state == 'changed' and args.no_truncate:
+        # The caller cannot clear the old rows: keep the checkpoint as evidence
+        print(state)
+        return 0
+    write_checkpoint(args.checkpoint_dir, checkpoint)
+    print(state)
+    for chunk in checkpoint['chunks']:
+        if chunk['status'] != 'loaded':
+            print(f"{chunk['chunk']}\t{chunk['byte_offset']}\t{chunk['bytes']}")
+    return 0
+
+
+def cmd_mark(args: argparse.Namespace) -> int:
+    checkpoint = read_checkpoint(args.checkpoint_dir, args.table)
+    if not checkpoint:
+        print(f"ERROR: no checkpoint for {args.table}", file=sys.stderr)
+        return 1
+    if not mark_chunk(checkpoint, args.chunk, args.status, args.rows):
+        print(f"ERROR: {args.table} has no chunk {args.chunk}", file=sys.stderr)
+        return 1
+    write_checkpoint(args.checkpoint_dir, checkpoint)
+    return 0
+
+
+def cmd_pending(args: argparse.Namespace) -> int:
+    for entry in args.entries:
+        tier, _, table = entry.partition(':')
+        csv_path = find_csv(args.data_dir, tier, table)
+        if not os.path.isfile(csv_path):
+            print(entry)
+            continue
+        state, _ = evaluate(table, csv_path, args.checkpoint_dir, record=False)
+        if state in ('fresh', 'changed'):
+            print(entry)
+    return 0
+
+
+def cmd_reset(args: argparse.Namespace) -> int:
+    for table in args.tables:
+        try:
+            os.remove(checkpoint_path(args.checkpoint_dir, table))
+        except FileNotFoundError:
+            pass
+    return 0
+
+
+def cmd_rows(args: argparse.Namespace) -> int:
+    checkpoint = read_checkpoint(args.checkpoint_dir, args.table)
+    if not checkpoint:
+        print(f"ERROR: no checkpoint for {args.table}", file=sys.stderr)
+        return 1
+    print(loaded_rows(checkpoint))
+    return 0
+
+
+def cmd_summary(args: argparse.Namespace) -> int:
+    if not os.path.isdir(args.checkpoint_dir):
+        print(f"No checkpoints in {args.checkpoint_dir}")
+        return 0
+    print(f"{'Table':<45} {'Status':<8} {'Chunks':>9} {'Rows':>14}")
+    print(f"{'-' * 45} {'-' * 8} {'-' * 9} {'-' * 14}")
+    for name in sorted(os.listdir(args.checkpoint_dir)):
+        if not name.endswith('.json'):
+            continue
+        checkpoint = read_checkpoint(args.checkpoint_dir, name[:-len('.json')])
+        if not checkpoint:
+            continue
+        chunks = checkpoint['chunks']
+        loaded = [c for c in chunks if c['status'] == 'loaded']
+        rows = sum(c['rows'] or 0 for c in loaded)
+        print(f"{checkpoint['table']:<45} {checkpoint['status']:<8} "
+              f"{len(loaded):>4}/{len(chunks):<4} {rows:>14,}")
+    return 0
+
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Per-table / per-chunk checkpoints for load-data.sh.")
+    parser.add_argument('--checkpoint-dir', default=DEFAULT_CHECKPOINT_DIR,
+                        help="Checkpoint directory (default: %(default)s)")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    begin = sub.add_parser('begin', help="Record / refresh a table checkpoint, list chunks to load")
+    begin.add_argument('table')
+    begin.add_argument('csv')
+    begin.add_argument('--single-chunk', action='store_true',
+                       help="Load the whole file as one chunk (partitioned tables)")
+    begin.add_argument('--no-truncate', action='store_true',
+                       help="The table cannot be emptied: leave a `changed` checkpoint untouched")
+    begin.set_defaults(func=cmd_begin)
+
+    mark = sub.add_parser('mark', help="Record the outcome of one chunk")
+    mark.add_argument('table')
+    mark.add_argument('chunk', type=int)
+    mark.add_argument('--status', choices=('loaded', 'failed', 'pending'), required=True)
+    mark.add_argument('--rows', type=int)
+    mark.set_defaults(func=cmd_mark)
+
+    pending = sub.add_parser('pending', help="TIER:TABLE entries that need an empty table")
+    pending.add_argument('--data-dir', default=DEFAULT_DATA_DIR,
+                         help="CSV directory (default: %(default)s)")
+    pending.add_argument('entries', nargs='*')
+    pending.set_defaults(func=cmd_pending)
+
+    reset = sub.add_parser('reset', help="Forget table checkpoints")
+    reset.add_argument('tables', nargs='*')
+    reset.set_defaults(func=cmd_reset)
+
+    rows = sub.add_parser('rows', help="Rows committed across the loaded chunks of a table")
+    rows.add_argument('table')
+    rows.set_defaults(func=cmd_rows)
+
+    summary = sub.add_parser('summary', help="Print every table checkpoint")
+    summary.set_defaults(func=cmd_summary)
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    try:
+        return args.func(args)
+    except OSError as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
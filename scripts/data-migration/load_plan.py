@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+FK-DAG Load Planner - schedule CSV loads from the FK graph instead of tiers
+
+Builds the load plan for load-data.sh --schedule N: every exported CSV
+(##perseus_tier_<N>_<table>.csv) becomes a job that may start as soon as its
+own FK parents are loaded, rather than when the whole previous tier is done.
+Jobs are weighted by source data size (docs/data-assessments row-count CSV)
+and prioritised by upward rank - the heaviest remaining chain to a leaf - so
+the critical path is always started first.
+
+Dependencies are the nearest *loaded* ancestors: if an intermediate parent
+has no CSV, its own parents are inherited, because TRUNCATE ... CASCADE on
+them would still reach the child. FKs inside a cycle and self-references do
+not constrain the order.
+
+Usage:
+    python3 scripts/data-migration/load_plan.py [--data-dir DIR] [--workers N]
+                                               [--format text|tsv|json]
+
+    text  antichains, critical path and estimated makespan vs. tiers (default)
+    tsv   table<TAB>tier<TAB>parents<TAB>weight_mb<TAB>rank, priority order
+          (consumed by load-data.sh --schedule)
+    json  full plan
+
+Exit Codes:
+    0 - Plan written
+    1 - No CSV files found
+    2 - Invalid arguments / unreadable FK DDL
+
+Author: Pierre Ribeiro (DBA/DBRE)
+Created: 2026-10-19
+Version: 1.0
+"""
+
+import argparse
+import heapq
+import json
+import os
+import re
+import sys
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SCRIPTS_DIR)
+
+from convert_tables import SIZE_CSV, load_table_sizes  # noqa: E402
+from fk_graph import PGSQL_FK_FILE, FKGraph, load_fk_constraints  # noqa: E402
+
+# ============================================================================
+# CONSTANTS
+# ============================================================================
+
+DEFAULT_DATA_DIR = os.environ.get('DATA_DIR', '/tmp/perseus-data-export')
+CSV_PATTERN = re.compile(r'^##perseus_tier_(\d+)_(\w+)\.csv(?:\.gz|\.zst)?$')  # see extract-data.sh --compress
+MIN_WEIGHT_MB = 0.01  # empty/unknown tables still cost a COPY round trip
+
+
+# ============================================================================
+# INPUTS
+# ============================================================================
+
+def discover_csvs(data_dir: str) -> Dict[str, dict]:
+    """Map table → {'tier', 'path', 'bytes'} for every exported CSV."""
+    csvs = {}
+    if not os.path.isdir(data_dir):
+        return csvs
+    for name in sorted(os.listdir(data_dir)):
+        m = CSV_PATTERN.match(name)
+        if m:
+            path = os.path.join(data_dir, name)
+            csvs[m.group(2)] = {'tier': int(m.group(1)), 'path': path,
+                                'bytes': os.path.getsize(path)}
+    return csvs
+
+
+def table_weights(tables: Dict[str, dict], sizes: Dict[str, dict]) -> Dict[str, float]:
+    """Weight in MB: assessment data size, else the CSV size."""
+    weights = {}
+    for table, info in tables.items():
+        mb = sizes.get(table, {}).get('data_mb')
+        if mb is None:
+            mb = info.get('bytes', 0) / 1048576
+        weights[table] = max(mb, MIN_WEIGHT_MB)
+    return weights
+
+
+# ============================================================================
+# PLANNING
+# ============================================================================
+
+def load_dependencies(graph: FKGraph, tables) -> Dict[str, set]:
+    """Nearest loaded ancestors of each table (walking through unloaded parents)."""
+    component_of = {t: i for i, comp in enumerate(graph.strongly_connected_components()) for t in comp}
+    deps = {}
+    for table in tables:
+        found = set()
+        seen = {table}
+        stack = list(graph.parents_of(table))
+        while stack:
+            parent = stack.pop()
+            if parent in seen:
+                continue
+            seen.add(parent)
+            if parent in tables:
+                if component_of.get(parent) != component_of.get(table):
+                    found.add(parent)
+            else:
+                stack.extend(graph.parents_of(parent))
+        deps[table] = found
+    return deps
+
+
+def build_plan(tables: Dict[str, dict], deps: Dict[str, set], weights: Dict[str, float]) -> dict:
+    """
+    Compute antichains (Kahn levels), upward ranks and the critical path.
+    Returns {'tables': {t: {...}}, 'order': [...], 'antichains': [[...]], 'critical_path': [...]}.
+    """
+    children = defaultdict(set)
+    indegree = {t: len(deps[t]) for t in tables}
+    for t, parents in deps.items():
+        for p in parents:
+            children[p].add(t)
+
+    level = {t: 0 for t in tables}
+    ready = sorted(t for t, d in indegree.items() if d == 0)
+    topo = []
+    while ready:
+        t = ready.pop(0)
+        topo.append(t)
+        for c in sorted(children[t]):
+            level[c] = max(level[c], level[t] + 1)
+            indegree[c] -= 1
+            if indegree[c] == 0:
+                ready.append(c)
+
+    # Upward rank: this table plus the heaviest chain of descendants
+    rank = {}
+    for t in reversed(topo):
+        rank[t] = weights[t] + max((rank[c] for c in children[t]), default=0.0)
+
+    antichains = defaultdict(list)
+    for t in topo:
+        antichains[level[t]].append(t)
+
+    critical = []
+    candidates = [t for t in tables if not deps[t]]
+    while candidates:
+        head = max(candidates, key=lambda t: (rank[t], t))
+        critical.append(head)
+        candidates = list(children[head])
+
+    order = sorted(tables, key=lambda t: (-rank[t], t))
+    return {
+        'tables': {t: {'tier': tables[t]['tier'],
+                       'parents': sorted(deps[t]),
+                       'weight_mb': round(weights[t], 3),
+                       'rank': round(rank[t], 3),
+                       'level': level[t]} for t in tables},
+        'order': order,
+        'antichains': [sorted(antichains[lvl], key=lambda t: -rank[t]) for lvl in sorted(antichains)],
+        'critical_path': critical,
+    }
+
+
+def simulate_schedule(plan: dict, workers: int) -> float:
+    """Makespan (MB units) of the rank-first list schedule on `workers` COPY workers."""
+    tables = plan['tables']
+    waiting = {t: set(info['parents']) for t, info in tables.items()}
+    children = defaultdict(list)
+    for t, info in tables.items():
+        for p in info['parents']:
+            children[p].append(t)
+    ready = [(-tables[t]['rank'], t) for t, p in waiting.items() if not p]
+    heapq.heapify(ready)
+    running = []
+    clock = 0.0
+    while ready or running:
+        while ready and len(running) < workers:
+            _, t = heapq.heappop(ready)
+            heapq.heappush(running, (clock + tables[t]['weight_mb'], t))
+        clock, done = heapq.heappop(running)
+        for c in children[done]:
+            waiting[c].discard(done)
+            if not waiting[c]:
+                heapq.heappush(ready, (-tables[c]['rank'], c))
+    return clock
+
+
+def simulate_tiers(plan: dict, workers: int) -> float:
+    """Makespan of loading tier by tier with a barrier between tiers."""
+    by_tier = defaultdict(list)
+    for info in plan['tables'].values():
+        by_tier[info['tier']].append(info['weight_mb'])
+    total = 0.0
+    for tier in sorted(by_tier):
+        lanes = [0.0] * max(workers, 1)
+        for w in sorted(by_tier[tier], reverse=True):
+            lanes[lanes.index(min(lanes))] += w
+        total += max(lanes)
+    return total
+
+
+# ============================================================================
+# OUTPUT
+# ============================================================================
+
+def format_text(plan: dict, workers: int) -> str:
+    tables = plan['tables']
+    serial = sum(info['weight_mb'] for info in tables.values())
+    dag = simulate_schedule(plan, workers)
+    tiered = simulate_tiers(plan, workers)
+    lines = [f"Load plan: {len(tables)} tables, {workers} workers, {serial:,.1f} MB", ""]
+    lines.append("Antichains (tables that can load at the same time):")
+    for lvl, group in enumerate(plan['antichains']):
+        mb = sum(tables[t]['weight_mb'] for t in group)
+        lines.append(f"  {lvl}: {len(group):>3} tables {mb:>10,.1f} MB  {', '.join(group)}")
+    critical_mb = sum(tables[t]['weight_mb'] for t in plan['critical_path'])
+    lines.append("")
+    lines.append(f"Critical path ({critical_mb:,.1f} MB): {' → '.join(plan['critical_path'])}")
+    lines.append("")
+    lines.append("Estimated makespan (MB of COPY work on the longest worker):")
+    lines.append(f"  serial:               {serial:>10,.1f}")
+    lines.append(f"  tiers + {workers} workers:    {tiered:>10,.1f}")
+    lines.append(f"  FK DAG + {workers} workers:   {dag:>10,.1f}  (lower bound {max(critical_mb, serial / workers):,.1f})")
+    return "\n".join(lines)
+
+
+def format_tsv(plan: dict) -> str:
+    rows = []
+    for t in plan['order']:
+        info = plan['tables'][t]
+        rows.append(f"{t}\t{info['tier']}\t{','.join(info['parents'])}\t{info['weight_mb']}\t{info['rank']}")
+    return "\n".join(rows)
+
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Plan an FK-ordered parallel CSV load.")
+    parser.add_argument('--data-dir', default=DEFAULT_DATA_DIR,
+                        help="Directory with ##perseus_tier_N_<table>.csv files (default: %(default)s)")
+    parser.add_argument('--fk-ddl', default=PGSQL_FK_FILE,
+                        help="FK DDL file or directory (default: %(default)s)")
+    parser.add_argument('--size-csv', default=SIZE_CSV,
+                        help="Row count / size assessment CSV (default: %(default)s)")
+    parser.add_argument('-w', '--workers', type=int, default=4,
+                        help="Parallel COPY workers to plan for (default: %(default)s)")
+    parser.add_argument('--format', choices=('text', 'tsv', 'json'), default='text')
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    if args.workers < 1:
+        print("ERROR: --workers must be >= 1", file=sys.stderr)
+        return 2
+
+    csvs = discover_csvs(args.data_dir)
+    if not csvs:
+        print(f"ERROR: no ##perseus_tier_*.csv files in {args.data_dir}", file=sys.stderr)
+        return 1
+    try:
+        graph = FKGraph(load_fk_constraints(args.fk_ddl), qualified=False)
+    except OSError as e:
+        print(f"ERROR: cannot read FK DDL: {e}", file=sys.stderr)
+        return 2
+    sizes = load_table_sizes(args.size_csv) if os.path.exists(args.size_csv) else {}
+
+    plan = build_plan(csvs, load_dependencies(graph, csvs), table_weights(csvs, sizes))
+    plan['cycles'] = graph.cycles()
+
+    if args.format == 'tsv':
+        print(format_tsv(plan))
+    elif args.format == 'json':
+        print(json.dumps(plan, indent=2))
+    else:
+        print(format_text(plan, args.workers))
+        for cycle in plan['cycles']:
+            print(f"WARNING: FK cycle {' ↔ '.join(cycle)} - members load without mutual ordering")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,492 @@
+#!/usr/bin/env python3
+"""
+Orphan Check - find FK orphans in the exported CSVs before they are loaded
+
+load-data.sh disables every trigger (FK enforcement included) for the load,
+so child rows whose parent was never exported (TOP 5000 sampling, partial or
+failed extracts) go in silently, and validate-referential-integrity.sql only
+finds them after gigabytes have been loaded. This checker reads the same
+CSVs first:
+
+1. every parent key an FK references (02-foreign-key-constraints.sql) is read
+   from the parent's export into a compact key set: a sorted array of 64-bit
+   values (the integer itself for a single integer column, else 64-bit
+   BLAKE2b of the key text), 8 bytes per key, probed by binary search; parents
+   estimated above --bloom-above rows get a Bloom filter at --fp-rate instead
+   (about 1.8 bytes per key at 0.1%; it can only miss orphans, never invent
+   one)
+2. each child export is streamed once and all of its FKs are probed per
+   record; a key with any NULL column is not checked (MATCH SIMPLE)
+3. orphan rows, distinct orphan keys and a few sample values are reported
+   per FK
+
+Records are parsed as transcode_csv.py does for COPY (embedded newlines,
+NULL / empty string, rejected records skipped); key values are compared as
+PostgreSQL compares them in the parent's column type (integers as numbers,
+CHAR without trailing blanks, uuid in lower case). Large plain CSVs are cut
+into --split-mb ranges and compressed exports read per extract-manifest
+chunk, as csv_digest.py does; ranges run on --jobs processes. FKs whose
+parent table was not exported are listed as not checked (the parent may
+already be loaded).
+
+Usage:
+    python3 scripts/data-migration/orphan_check.py [--data-dir DIR] [--table CHILD ...] [--jobs N]
+    python3 scripts/data-migration/orphan_check.py --summary orphans.json --samples 20
+
+Exit Codes:
+    0 - No orphans in the checked FKs
+    2 - Invalid arguments / unreadable inputs / any other failure
+    3 - Orphan rows found (1 is left to Python tracebacks)
+
+Author: Pierre Ribeiro (DBA/DBRE)
+Created: 2026-10-19
+Version: 1.0
+"""
+
+import argparse
+import hashlib
+import heapq
+import json
+import math
+import os
+import sys
+import time
+from array import array
+from bisect import bisect_left
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional, Tuple
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SCRIPTS_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from csv_digest import COMPRESSED_SUFFIXES, input_ranges, range_lines  # noqa: E402
+from fk_graph import PGSQL_FK_FILE, FKGraph, load_fk_constraints  # noqa: E402
+from load_checkpoint import DEFAULT_DATA_DIR, manifest_for  # noqa: E402
+from load_plan import discover_csvs  # noqa: E402
+from pg_loader import MB, rates  # noqa: E402
+from schema_model import PGSQL_TABLE_DIR, load_model  # noqa: E402
+from transcode_csv import (DEFAULT_FALLBACK_ENCODING, DEFAULT_MANIFEST_DIR, Transcoder,  # noqa: E402
+                           _base_type, table_spec)
+
+# ============================================================================
+# CONSTANTS
+# ============================================================================
+
+DEFAULT_JOBS = os.cpu_count() or 1
+DEFAULT_SPLIT_MB = 256
+DEFAULT_SAMPLES = 5
+DEFAULT_BLOOM_ABOVE = 50_000_000     # estimated parent rows; 8 bytes each in a sorted array
+DEFAULT_FP_RATE = 0.001
+MAX_DISTINCT = 100_000               # distinct orphan keys counted per FK
+SAMPLE_BYTES = 1 << 20               # read to estimate the rows of a CSV without an extract manifest
+COMPRESSION_GUESS = 8                # raw / compressed bytes when nothing better is known
+INTEGER_TYPES = ('SMALLINT', 'INTEGER', 'BIGINT', 'INT', 'INT2', 'INT4', 'INT8')
+CHAR_TYPES = ('CHAR', 'CHARACTER', 'BPCHAR')
+INT64_MIN, INT64_MAX = -(1 << 63), (1 << 63) - 1
+SEPARATOR = '\x1f'
+EXIT_ORPHANS = 3
+
+
+# ============================================================================
+# KEY SETS
+# ============================================================================
+
+def make_normalizer(pg_type: str):
+    """Value → the form PostgreSQL compares in a column of `pg_type`."""
+    base = _base_type(pg_type)
+    if base in INTEGER_TYPES:
+        return int
+    if base in CHAR_TYPES:
+        return lambda v: v.rstrip(' ')
+    if base == 'UUID':
+        return str.lower
+    return str
+
+
+def key_value(parts: list) -> int:
+    """One signed 64-bit value per key: the integer itself, else 64-bit BLAKE2b of the key text."""
+    if len(parts) == 1 and isinstance(parts[0], int) and INT64_MIN <= parts[0] <= INT64_MAX:
+        return parts[0]
+    text = SEPARATOR.join(str(p) for p in parts).encode('utf-8')
+    return int.from_bytes(hashlib.blake2b(text, digest_size=8).digest(), 'big', signed=True)
+
+
+class SortedKeys:
+    """Distinct keys in a sorted array('q'); membership by binary search."""
+
+    def __init__(self, keys: array):
+        self.keys = keys
+
+    @classmethod
+    def merge(cls, parts: List[array]) -> 'SortedKeys':
+        """Merge sorted arrays (one per range) into one without duplicates."""
+        keys = array('q')
+        last = None
+        for key in heapq.merge(*parts):
+            if key != last:
+                keys.append(key)
+                last = key
+        return cls(keys)
+
+    def __contains__(self, key: int) -> bool:
+        i = bisect_left(self.keys, key)
+        return i < len(self.keys) and self.keys[i] == key
+
+    def describe(self) -> str:
+        return f"sorted array, {len(self.keys):,} keys, {self.keys.itemsize * len(self.keys) / MB:,.1f} MB"
+
+
+class BloomFilter:
+    """Bit array with k positions per key (double hashing over BLAKE2b); no false negatives."""
+
+    def __init__(self, capacity: int, fp_rate: float):
+        capacity = max(capacity, 1)
+        self.size = max(64, math.ceil(-capacity * math.log(fp_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.added = 0
+
+    def _positions(self, key: int):
+        digest = hashlib.blake2b(key.to_bytes(8, 'big', signed=True), digest_size=16).digest()
+        h1, h2 = int.from_bytes(digest[:8], 'big'), int.from_bytes(digest[8:], 'big') | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, key: int) -> None:
+        for p in self._positions(key):
+            self.bits[p >> 3] |= 1 << (p & 7)
+        self.added += 1
+
+    def __contains__(self, key: int) -> bool:
+        return all(self.bits[p >> 3] & (1 << (p & 7)) for p in self._positions(key))
+
+    def union(self, other: 'BloomFilter') -> None:
+        merged = int.from_bytes(self.bits, 'little') | int.from_bytes(other.bits, 'little')
+        self.bits = bytearray(merged.to_bytes(len(self.bits), 'little'))
+        self.added += other.added
+
+    def describe(self) -> str:
+        # added counts duplicates too, so the estimate errs high
+        fp = (1 - math.exp(-self.hashes * self.added / self.size)) ** self.hashes
+        return (f"Bloom filter, {self.added:,} keys, {len(self.bits) / MB:,.1f} MB, "
+                f"{self.hashes} hashes, ~{fp:.2%} false positives")
+
+
+# ============================================================================
+# STREAMING
+# ============================================================================
+
+_MODEL = []
+_KEY_SETS: Dict[Tuple[str, tuple], object] = {}
+
+
+def model():
+    """Refactored table DDL, parsed once per process."""
+    if not _MODEL:
+        _MODEL.append(load_model([PGSQL_TABLE_DIR]))
+    return _MODEL[0]
+
+
+def column_types(table: str) -> Dict[str, str]:
+    info = model().table(table)
+    if info is None:
+        raise KeyError(f"table {table} not found in {PGSQL_TABLE_DIR}")
+    return {c['name'].lower(): c['type'] for c in info['columns']}
+
+
+def key_reader(fields: List[dict], columns: List[str], types: List[str]):
+    """record → key value, or None when a key column is NULL (or the record lacks one)."""
+    loaded = [f['name'].lower() for f in fields if not f['skip']]
+    missing = [c for c in columns if c.lower() not in loaded]
+    if missing:
+        raise KeyError(f"column(s) {', '.join(missing)} not in the export")
+    positions = [loaded.index(c.lower()) for c in columns]
+    normalizers = [make_normalizer(t) for t in types]
+
+    def read(record):
+        parts = [record[p] for p in positions]
+        if any(v is None for v in parts):
+            return None
+        return key_value([n(v) for n, v in zip(normalizers, parts)])
+    return read
+
+
+def transcoder(table: str, options: dict) -> Tuple[List[dict], Transcoder]:
+    fields = table_spec(table, model(), options['manifest_dir'])
+    return fields, Transcoder(fields, options['delimiter'], options['fallback_encoding'])
+
+
+def scan(coder: Transcoder, csv_path: str, offset: int, length: int):
+    """Records of one byte range; the ones transcode_csv.py would reject are skipped."""
+    lines = range_lines(csv_path, offset, length)
+    with open(os.devnull, 'w') as rejects:
+        try:
+            yield from coder.records(lines, rejects)
+        finally:
+            lines.close()
+
+
+def collect_keys(parent: str, csv_path: str, offset: int, length: int, keys: List[dict], options: dict) -> dict:
+    """Parent keys of one byte range: a sorted array or Bloom filter per referenced column list."""
+    started = time.monotonic()
+    fields, coder = transcoder(parent, options)
+    types = column_types(parent)
+    readers = [key_reader(fields, k['columns'], [types.get(c.lower(), 'TEXT') for c in k['columns']])
+               for k in keys]
+    found: List[object] = [BloomFilter(k['bloom'], options['fp_rate']) if k['bloom'] else set() for k in keys]
+    for record in scan(coder, csv_path, offset, length):
+        for read, target in zip(readers, found):
+            key = read(record)
+            if key is not None:
+                target.add(key)
+    sets = [target if isinstance(target, BloomFilter) else array('q', sorted(target)) for target in found]
+    return {'table': parent, 'sets': sets, 'records': coder.stats['records'], 'rejected': coder.stats['rejected'],
+            'bytes': length, 'seconds': time.monotonic() - started}
+
+
+def share_key_sets(key_sets: Dict[Tuple[str, tuple], object]) -> None:
+    """Worker initializer: parent key sets for the child scans (inherited, not pickled, on fork)."""
+    _KEY_SETS.update(key_sets)
+
+
+def check_range(child: str, csv_path: str, offset: int, length: int, fks: List[dict], options: dict) -> dict:
+    """Probe every FK of `child` for the records of one byte range."""
+    started = time.monotonic()
+    fields, coder = transcoder(child, options)
+    loaded = [f['name'].lower() for f in fields if not f['skip']]
+    probes = []
+    for fk in fks:
+        parent_types = column_types(fk['parent_table'])
+        read = key_reader(fields, fk['child_cols'], [parent_types.get(c.lower(), 'TEXT') for c in fk['parent_cols']])
+        positions = [loaded.index(c.lower()) for c in fk['child_cols']]
+        probes.append((read, positions, _KEY_SETS[(fk['parent_table'], tuple(fk['parent_cols']))],
+                       {'fk': fk['fk_name'], 'checked': 0, 'orphans': 0, 'distinct': set(), 'samples': []}))
+    for record in scan(coder, csv_path, offset, length):
+        for read, positions, keys, result in probes:
+            key = read(record)
+            if key is None:
+                continue
+            result['checked'] += 1
+            if key in keys:
+                continue
+            result['orphans'] += 1
+            if key not in result['distinct'] and len(result['distinct']) < MAX_DISTINCT:
+                result['distinct'].add(key)
+                if len(result['samples']) < options['samples']:
+                    result['samples'].append(','.join(record[p] for p in positions))
+    return {'table': child, 'fks': [p[3] for p in probes], 'records': coder.stats['records'],
+            'rejected': coder.stats['rejected'], 'bytes': length, 'seconds': time.monotonic() - started}
+
+
+# ============================================================================
+# PLANNING
+# ============================================================================
+
+def estimate_rows(csv_path: str) -> int:
+    """Rows of an export: the extract manifest's count, else bytes / mean line length of a sample."""
+    try:
+        with open(manifest_for(csv_path)) as f:
+            return int(json.load(f)['rows'])
+    except (OSError, ValueError, KeyError):
+        pass
+    size = os.path.getsize(csv_path)
+    lines = nbytes = 0
+    sample = range_lines(csv_path, 0, size)
+    try:
+        for line in sample:
+            lines += 1
+            nbytes += len(line)
+            if nbytes >= SAMPLE_BYTES:
+                break
+    finally:
+        sample.close()
+    if not lines:
+        return 0
+    raw = size * COMPRESSION_GUESS if csv_path.endswith(COMPRESSED_SUFFIXES) else size
+    return math.ceil(raw / (nbytes / lines))
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="FK orphan check over the exported CSVs, before loading.")
+    parser.add_argument('--data-dir', default=DEFAULT_DATA_DIR, help="Export directory (default: %(default)s)")
+    parser.add_argument('--table', dest='tables', action='append',
+                        help="Check the FKs of this child table (repeatable; default: every exported table)")
+    parser.add_argument('--fk-ddl', default=PGSQL_FK_FILE,
+                        help="FK DDL file or directory (default: %(default)s)")
+    parser.add_argument('-j', '--jobs', type=int, default=DEFAULT_JOBS,
+                        help="Worker processes (default: %(default)s)")
+    parser.add_argument('--split-mb', type=int, default=DEFAULT_SPLIT_MB,
+                        help="Cut plain CSVs into ranges of this size; 0 = one range per chunk "
+                             "(default: %(default)s)")
+    parser.add_argument('--bloom-above', type=int, default=DEFAULT_BLOOM_ABOVE,
+                        help="Use a Bloom filter for parents estimated above this many rows "
+                             "(default: %(default)s; 0 = always)")
+    parser.add_argument('--fp-rate', type=float, default=DEFAULT_FP_RATE,
+                        help="Bloom filter false-positive rate (default: %(default)s)")
+    parser.add_argument('--samples', type=int, default=DEFAULT_SAMPLES,
+                        help="Orphan key values shown per FK (default: %(default)s)")
+    parser.add_argument('--manifest-dir', default=DEFAULT_MANIFEST_DIR,
+                        help="copy-manifests directory from convert_tables.py (default: %(default)s)")
+    parser.add_argument('--delimiter', default=',', help="bcp field terminator (default: ',')")
+    parser.add_argument('--fallback-encoding', default=DEFAULT_FALLBACK_ENCODING,
+                        help="Decoding for values that are not valid UTF-8 (default: %(default)s)")
+    parser.add_argument('--summary', help="Write per-FK results as JSON to this file")
+    return parser.parse_args(argv)
+
+
+def format_fk(r: dict) -> str:
+    arrow = f"{r['child']}({', '.join(r['child_cols'])}) → {r['parent']}({', '.join(r['parent_cols'])})"
+    if r['status'] != 'checked':
+        return f"  - {arrow} [{r['fk']}]: not checked, {r['status']}"
+    if not r['orphans']:
+        return f"  ✓ {arrow} [{r['fk']}]: {r['checked']:,} keys, no orphans"
+    distinct = f"{r['distinct']:,}" + ('+' if r['distinct'] >= MAX_DISTINCT else '')
+    samples = ', '.join(repr(s) for s in r['samples'])
+    return (f"  ✗ {arrow} [{r['fk']}]: {r['orphans']:,} orphan rows of {r['checked']:,} "
+            f"({distinct} distinct keys)" + (f", e.g. {samples}" if samples else ''))
+
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+def main(argv: Optional[List[str]] = None) -> int:
+    try:
+        return check(parse_args(argv))
+    except Exception as e:
+        # A crash must not look like "orphans found" or "no orphans"
+        print(f"ERROR: {type(e).__name__}: {e}", file=sys.stderr)
+        return 2
+
+
+def check(args: argparse.Namespace) -> int:
+    if args.jobs < 1 or args.split_mb < 0 or args.bloom_above < 0 or not 0 < args.fp_rate < 1:
+        print("ERROR: --jobs must be >= 1, --split-mb / --bloom-above >= 0, 0 < --fp-rate < 1", file=sys.stderr)
+        return 2
+    try:
+        graph = FKGraph(load_fk_constraints(args.fk_ddl), qualified=False)
+    except OSError as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 2
+    if not os.path.isdir(args.data_dir):
+        print(f"ERROR: data directory not found: {args.data_dir}", file=sys.stderr)
+        return 2
+    csvs = {table: info['path'] for table, info in discover_csvs(args.data_dir).items()}
+    children = args.tables or sorted(t for t in csvs if graph.parents.get(t))
+    unknown = [t for t in children if t not in csvs]
+    if unknown:
+        print(f"ERROR: no export for {', '.join(unknown)} in {args.data_dir}", file=sys.stderr)
+        return 2
+
+    results: List[dict] = []
+    checks: Dict[str, List[dict]] = defaultdict(list)
+    needed: Dict[str, List[tuple]] = {}
+    for child in children:
+        for fk in graph.parents.get(child, []):
+            result = {'fk': fk['fk_name'], 'child': child, 'child_cols': fk['child_cols'],
+                      'parent': fk['parent_table'], 'parent_cols': fk['parent_cols'],
+                      'status': 'checked', 'checked': 0, 'orphans': 0, 'distinct': 0, 'samples': []}
+            results.append(result)
+            if fk['parent_table'] not in csvs:
+                result['status'] = 'parent not exported'
+                continue
+            checks[child].append(fk)
+            cols = tuple(fk['parent_cols'])
+            if cols not in needed.setdefault(fk['parent_table'], []):
+                needed[fk['parent_table']].append(cols)
+
+    options = {'manifest_dir': args.manifest_dir, 'delimiter': args.delimiter,
+               'fallback_encoding': args.fallback_encoding, 'fp_rate': args.fp_rate, 'samples': args.samples}
+    ranges = {}
+    try:
+        for table in sorted(set(needed) | set(checks)):
+            expected = len(table_spec(table, model(), args.manifest_dir))
+            ranges[table] = input_ranges(csvs[table], expected, args.delimiter.encode(), args.split_mb * MB)
+    except (KeyError, OSError) as e:
+        print(f"ERROR: {e.args[0] if isinstance(e, KeyError) else e}", file=sys.stderr)
+        return 2
+
+    # Phase 1: parent key sets
+    started = time.monotonic()
+    keys_by_parent = {}
+    for parent, column_lists in sorted(needed.items()):
+        rows = estimate_rows(csvs[parent])
+        bloom = rows if rows > args.bloom_above else 0
+        keys_by_parent[parent] = [{'columns': list(cols), 'bloom': bloom} for cols in column_lists]
+    parts: Dict[Tuple[str, tuple], list] = {}      # sorted arrays per range; Bloom filters OR-ed as they come
+    phase_rows = phase_bytes = 0
+    try:
+        with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+            futures = [pool.submit(collect_keys, parent, csvs[parent], offset, length, keys_by_parent[parent], options)
+                       for parent in sorted(needed) for offset, length in ranges[parent]]
+            for future in as_completed(futures):
+                part = future.result()
+                phase_rows += part['records']
+                phase_bytes += part['bytes']
+                for spec, found in zip(keys_by_parent[part['table']], part['sets']):
+                    ident = (part['table'], tuple(spec['columns']))
+                    if isinstance(found, BloomFilter) and ident in parts:
+                        parts[ident][0].union(found)
+                    else:
+                        parts.setdefault(ident, []).append(found)
+    except (KeyError, OSError, RuntimeError) as e:
+        print(f"ERROR: {e.args[0] if isinstance(e, KeyError) else e}", file=sys.stderr)
+        return 2
+    key_sets = {}
+    for ident, found in sorted(parts.items()):
+        key_sets[ident] = found[0] if isinstance(found[0], BloomFilter) else SortedKeys.merge(found)
+        print(f"  keys {ident[0]}({', '.join(ident[1])}): {key_sets[ident].describe()}")
+    elapsed = time.monotonic() - started
+    print(f"Parent keys: {len(needed)} tables, {phase_rows:,} rows, {phase_bytes / MB:,.1f} MB in {elapsed:.1f}s "
+          f"({rates(phase_rows, phase_bytes, elapsed)})\n")
+
+    # Phase 2: stream the children against them
+    started = time.monotonic()
+    merged: Dict[Tuple[str, str], dict] = {}
+    phase_rows = phase_bytes = 0
+    try:
+        with ProcessPoolExecutor(max_workers=args.jobs, initializer=share_key_sets, initargs=(key_sets,)) as pool:
+            futures = [pool.submit(check_range, child, csvs[child], offset, length, fks, options)
+                       for child, fks in sorted(checks.items()) for offset, length in ranges[child]]
+            for future in as_completed(futures):
+                part = future.result()
+                phase_rows += part['records']
+                phase_bytes += part['bytes']
+                for fk in part['fks']:
+                    total = merged.setdefault((part['table'], fk['fk']), {'checked': 0, 'orphans': 0,
+                                                                          'distinct': set(), 'samples': []})
+                    total['checked'] += fk['checked']
+                    total['orphans'] += fk['orphans']
+                    total['distinct'] |= fk['distinct']
+                    total['samples'] = (total['samples'] + fk['samples'])[:args.samples]
+    except (KeyError, OSError, RuntimeError) as e:
+        print(f"ERROR: {e.args[0] if isinstance(e, KeyError) else e}", file=sys.stderr)
+        return 2
+    elapsed = time.monotonic() - started
+
+    for result in results:
+        total = merged.get((result['child'], result['fk']))
+        if total:
+            result.update(checked=total['checked'], orphans=total['orphans'],
+                          distinct=min(len(total['distinct']), MAX_DISTINCT), samples=total['samples'])
+    child = None
+    for result in results:
+        if result['child'] != child:
+            child = result['child']
+            print(child)
+        print(format_fk(result))
+    bad = [r for r in results if r['orphans']]
+    skipped = [r for r in results if r['status'] != 'checked']
+    print(f"\nChild scan: {len(checks)} tables, {phase_rows:,} rows, {phase_bytes / MB:,.1f} MB in {elapsed:.1f}s "
+          f"({rates(phase_rows, phase_bytes, elapsed)})")
+    print(f"{len(results) - len(skipped)} FKs checked, {len(bad)} with orphans "
+          f"({sum(r['orphans'] for r in bad):,} rows), {len(skipped)} not checked")
+    if args.summary:
+        with open(args.summary, 'w') as f:
+            json.dump(results, f, indent=2)
+    return EXIT_ORPHANS if bad else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,731 @@
+#!/usr/bin/env python3
+"""
+Session-Pool Loader - stream CSVs into PostgreSQL over persistent connections
+
+load-data.sh starts a new `docker exec ... psql` for every statement: each
+COPY, TRUNCATE, ledger row and sequence reset pays a process spawn plus a
+connection setup, and nothing set in one statement survives to the next
+(BUG 9: session_replication_role cannot be used, so FK triggers are
+disabled with ALTER TABLE instead). This loader opens --sessions connections
+once, applies the session settings once per connection and streams every
+CSV chunk through COPY FROM STDIN from Python:
+
+- session settings: synchronous_commit = off by default, --replica for
+  session_replication_role = replica (FK and user triggers skipped; needs
+  superuser), any other GUC with --set NAME=VALUE
+- with --replica FK order does not matter, so all tables share one queue,
+  largest CSV first; otherwise every perseus table gets DISABLE TRIGGER ALL
+  for the load and ENABLE TRIGGER ALL afterwards, as load-data.sh does, and
+  tiers load in order, tables of a tier in parallel
+- the same checkpoints as load-data.sh (load_checkpoint.py): one COPY per
+  chunk, --resume skips committed chunks, TRUNCATE ... CASCADE resets the
+  checkpoints of the tables it reaches
+- the same COPY manifests (column list, dropped fields, hex → bytea,
+  identity resets) and --transcode through transcode_csv.py
+- --binary TABLES (or all): those tables go through binary_copy.py and
+  COPY ... (FORMAT binary), offset-less timestamptz values read in the
+  session TimeZone; tables with a column type it cannot encode stay CSV
+- .csv.gz / .csv.zst exports (extract-data.sh --compress) are decompressed
+  chunk by chunk on the way into COPY
+- rows from the COPY command tags, recorded in perseus_migration.load_ledger
+  with the same RUN_ID scheme as load-data.sh; rows/s and MB/s per table
+  and per run, and --compare for the last runs of either loader
+
+Connection: --dsn, else host/port from PGHOST/PGPORT (default
+localhost:5432), DB_NAME / DB_USER as in load-data.sh; the password comes
+from PGPASSWORD or ~/.pgpass. Needs psycopg (3) or psycopg2:
+    pip install -r scripts/data-migration/requirements.txt
+
+Usage:
+    python3 scripts/data-migration/pg_loader.py [--sessions N] [--replica] [--resume]
+                                               [--tier N] [--transcode] [--set NAME=VALUE]
+                                               [--binary TABLES]
+    python3 scripts/data-migration/pg_loader.py --compare [--runs N]
+
+Partitioned parents (--partition) are loaded through one session here;
+load-data.sh still splits them over parallel COPY streams.
+
+Exit Codes:
+    0 - All tables loaded (or --compare printed)
+    1 - Some tables failed to load
+    2 - Invalid arguments / no database driver / cannot connect
+
+Author: Pierre Ribeiro (DBA/DBRE)
+Created: 2026-10-19
+Version: 1.0
+"""
+
+import argparse
+import json
+import os
+import queue
+import re
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SCRIPTS_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from load_checkpoint import checkpoint_path, evaluate, loaded_rows, mark_chunk, write_checkpoint  # noqa: E402
+from binary_copy import unsupported_columns  # noqa: E402
+from load_plan import DEFAULT_DATA_DIR, discover_csvs  # noqa: E402
+from schema_model import PGSQL_TABLE_DIR, load_model  # noqa: E402
+from transcode_csv import DEFAULT_MANIFEST_DIR, EXIT_REJECTS, table_spec  # noqa: E402
+
+# ============================================================================
+# CONSTANTS
+# ============================================================================
+
+DEFAULT_DB_NAME = os.environ.get('DB_NAME', 'perseus_dev')
+DEFAULT_DB_USER = os.environ.get('DB_USER', 'perseus_admin')
+DEFAULT_SESSIONS = 4
+DEFAULT_SETTINGS = [('synchronous_commit', 'off')]
+COPY_BLOCK = 1 << 20
+MB = 1024 * 1024
+
+DECOMPRESSORS = {'.gz': ['gzip', '-dc'], '.zst': ['zstd', '-q', '-dc']}
+TRANSCODE_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'transcode_csv.py')
+BINARY_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'binary_copy.py')
+CSV_COPY_OPTIONS = "FORMAT CSV, HEADER false, DELIMITER ','"
+BINARY_COPY_OPTIONS = "FORMAT binary"
+CASCADE_NOTICE_RE = re.compile(r'truncate cascades to table "([^"]+)"')
+
+# Same loop as load-data.sh disable_fk_triggers / enable_fk_triggers
+TRIGGERS_SQL = """
+DO $$
+DECLARE r RECORD;
+BEGIN
+    FOR r IN SELECT tablename FROM pg_tables WHERE schemaname = 'perseus'
+    LOOP
+        EXECUTE format('ALTER TABLE perseus.%I {action} TRIGGER ALL', r.tablename);
+    END LOOP;
+END $$
+"""
+
+# Same table as load-data.sh ensure_ledger
+LEDGER_DDL = """
+CREATE SCHEMA IF NOT EXISTS perseus_migration;
+CREATE TABLE IF NOT EXISTS perseus_migration.load_ledger (
+    run_id        TEXT        NOT NULL,
+    table_name    TEXT        NOT NULL,
+    tier          INTEGER,
+    csv_file      TEXT,
+    csv_bytes     BIGINT,
+    rows_loaded   BIGINT      NOT NULL DEFAULT 0,
+    rows_total    BIGINT      NOT NULL DEFAULT 0,
+    rejected      BIGINT      NOT NULL DEFAULT 0,
+    attempts      INTEGER     NOT NULL DEFAULT 1,
+    status        TEXT        NOT NULL,
+    started_at    TIMESTAMPTZ NOT NULL,
+    finished_at   TIMESTAMPTZ NOT NULL DEFAULT now(),
+    verified_rows BIGINT,
+    verified_at   TIMESTAMPTZ,
+    PRIMARY KEY (run_id, table_name)
+)
+"""
+
+LEDGER_UPSERT = """
+INSERT INTO perseus_migration.load_ledger AS l
+    (run_id, table_name, tier, csv_file, csv_bytes, rows_loaded, rows_total, rejected, status, started_at)
+VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, to_timestamp(%s))
+ON CONFLICT (run_id, table_name) DO UPDATE SET
+    rows_loaded = l.rows_loaded + EXCLUDED.rows_loaded, rows_total = EXCLUDED.rows_total,
+    rejected = EXCLUDED.rejected, attempts = l.attempts + 1, status = EXCLUDED.status,
+    finished_at = now()
+"""
+
+COMPARE_SQL = """
+SELECT run_id, count(*), sum(rows_loaded), sum(csv_bytes),
+       extract(epoch FROM max(finished_at) - min(started_at))
+FROM perseus_migration.load_ledger
+WHERE status = 'loaded'
+GROUP BY run_id
+ORDER BY run_id DESC
+LIMIT %s
+"""
+
+
+# ============================================================================
+# DATABASE DRIVER
+# ============================================================================
+
+def import_driver():
+    """(name, module) for psycopg 3, else psycopg2, else (None, None)."""
+    try:
+        import psycopg
+        return 'psycopg', psycopg
+    except ImportError:
+        pass
+    try:
+        import psycopg2
+        return 'psycopg2', psycopg2
+    except ImportError:
+        return None, None
+
+
+class BlockReader:
+    """File-like view of an iterator of byte blocks (psycopg2 copy_expert)."""
+
+    def __init__(self, blocks: Iterable[bytes]):
+        self.blocks = iter(blocks)
+        self.buffer = b''
+
+    def read(self, size: int = -1) -> bytes:
+        while size < 0 or len(self.buffer) < size:
+            block = next(self.blocks, None)
+            if block is None:
+                break
+            self.buffer += block
+        if size < 0:
+            data, self.buffer = self.buffer, b''
+        else:
+            data, self.buffer = self.buffer[:size], self.buffer[size:]
+        return data
+
+
+class Session:
+    """One persistent autocommit connection with the run's settings applied."""
+
+    def __init__(self, driver: Tuple[str, object], dsn: str, settings: List[Tuple[str, str]]):
+        self.driver_name, self.driver = driver
+        self.dsn = dsn
+        self.settings = settings
+        self.conn = None
+        self.notices: List[str] = []
+
+    def open(self) -> None:
+        if self.driver_name == 'psycopg':
+            self.conn = self.driver.connect(self.dsn, autocommit=True)
+            self.conn.add_notice_handler(lambda diag: self.notices.append(diag.message_primary or ''))
+        else:
+            self.conn = self.driver.connect(self.dsn)
+            self.conn.autocommit = True
+            # psycopg2 keeps only the last 50 notices in a list; any other
+            # container is appended to without a cap
+            self.conn.notices = deque()
+        for name, value in self.settings:
+            self.execute("SELECT set_config(%s, %s, false)", (name, value))
+
+    def ensure_open(self) -> None:
+        if self.conn is None or self.conn.closed:
+            self.open()
+
+    def close(self) -> None:
+        if self.conn is not None and not self.conn.closed:
+            self.conn.close()
+
+    def _drain_notices(self) -> None:
+        if self.driver_name == 'psycopg2':
+            self.notices.extend(self.conn.notices)
+            self.conn.notices.clear()
+
+    def execute(self, sql: str, params: Optional[tuple] = None) -> list:
+        with self.conn.cursor() as cur:
+            cur.execute(sql, params)
+            rows = cur.fetchall() if cur.description else []
+        self._drain_notices()
+        return rows
+
+    def copy(self, sql: str, blocks: Iterable[bytes]) -> int:
+        """COPY ... FROM STDIN fed from `blocks`; rows from the command tag."""
+        with self.conn.cursor() as cur:
+            if self.driver_name == 'psycopg':
+                with cur.copy(sql) as copy:
+                    for block in blocks:
+                        copy.write(block)
+            else:
+                cur.copy_expert(sql, BlockReader(blocks), size=COPY_BLOCK)
+            rows = cur.rowcount
+        self._drain_notices()
+        return rows
+
+
+class SessionPool:
+    """Fixed set of sessions, opened on first use and handed out one per job."""
+
+    def __init__(self, driver, dsn: str, settings: List[Tuple[str, str]], size: int):
+        self.idle: 'queue.Queue[Session]' = queue.Queue()
+        self.sessions = [Session(driver, dsn, settings) for _ in range(size)]
+        for session in self.sessions:
+            self.idle.put(session)
+
+    @contextmanager
+    def session(self) -> Iterator[Session]:
+        session = self.idle.get()
+        try:
+            session.ensure_open()
+            yield session
+        finally:
+            self.idle.put(session)
+
+    def close(self) -> None:
+        for session in self.sessions:
+            session.close()
+
+
+# ============================================================================
+# COPY STREAMS
+# ============================================================================
+
+def read_copy_manifest(manifest_dir: str, table: str) -> dict:
+    """Column list, dropped / hex fields and post-load SQL, as load_copy_manifest in load-data.sh."""
+    path = os.path.join(manifest_dir, f"{table}.json")
+    if not os.path.exists(path):
+        return {'columns': '', 'skip': set(), 'hex': set(), 'post_load': []}
+    with open(path) as f:
+        m = json.load(f)
+    hex_columns = {name for name, t in m['rewrite'].items() if t == 'hex_to_bytea'}
+    return {
+        'columns': ' (' + ', '.join(m['copy_columns']) + ')',
+        'skip': set(m['skip_positions']),
+        'hex': {f['position'] for f in m['fields'] if f['target_name'] in hex_columns},
+        'post_load': m['post_load_sql'],
+    }
+
+
+def raw_blocks(csv_path: str, offset: int, length: int) -> Iterator[bytes]:
+    with open(csv_path, 'rb') as f:
+        f.seek(offset)
+        remaining = length
+        while remaining > 0:
+            block = f.read(min(COPY_BLOCK, remaining))
+            if not block:
+                return
+            yield block
+            remaining -= len(block)
+
+
+def piped_blocks(command: List[str], blocks: Iterator[bytes], ok: Tuple[int, ...] = (0,)) -> Iterator[bytes]:
+    """
+    Output of `command` with `blocks` written to its stdin from a thread.
+    Raises before the end of the stream when it (or the input) failed, so the
+    COPY reading it aborts instead of committing a truncated chunk.
+    """
+    errors = tempfile.TemporaryFile()
+    proc = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=errors)
+    failure: List[BaseException] = []
+
+    def feed() -> None:
+        try:
+            for block in blocks:
+                proc.stdin.write(block)
+        except BrokenPipeError:
+            pass
+        except Exception as e:          # input failed: surfaced by the reader
+            failure.append(e)
+        finally:
+            blocks.close()
+            try:
+                proc.stdin.close()
+            except OSError:
+                pass
+
+    feeder = threading.Thread(target=feed, daemon=True)
+    feeder.start()
+    finished = False
+    try:
+        while True:
+            block = proc.stdout.read(COPY_BLOCK)
+            if not block:
+                break
+            yield block
+        finished = True
+    finally:
+        if not finished:
+            proc.kill()
+        proc.stdout.close()
+        rc = proc.wait()
+        feeder.join()
+        errors.seek(0)
+        stderr = errors.read().decode(errors='replace').strip()
+        errors.close()
+    if failure:
+        raise failure[0]
+    if rc not in ok:
+        name = os.path.basename(command[1]) if command[0] == sys.executable else command[0]
+        raise RuntimeError(f"{name} failed ({rc}): {stderr}")
+
+
+def decompressed_blocks(csv_path: str, blocks: Iterator[bytes]) -> Iterator[bytes]:
+    """Plain CSVs pass through; a chunk of a .gz / .zst export is a complete member / frame."""
+    for suffix, command in DECOMPRESSORS.items():
+        if csv_path.endswith(suffix):
+            return piped_blocks(command, blocks)
+    return blocks
+
+
+def rewritten_blocks(blocks: Iterator[bytes], skip: set, hex_fields: set) -> Iterator[bytes]:
+    """Drop / \\x-prefix 1-based fields, splitting on ',' like the awk in emit_csv."""
+    rest = b''
+    for block in blocks:
+        lines = (rest + block).split(b'\n')
+        rest = lines.pop()
+        yield b''.join(rewrite_line(line, skip, hex_fields) for line in lines)
+    if rest:
+        yield rewrite_line(rest, skip, hex_fields)
+
+
+def rewrite_line(line: bytes, skip: set, hex_fields: set) -> bytes:
+    values = []
+    for i, v in enumerate(line.rstrip(b'\r').split(b','), 1):
+        if i in skip:
+            continue
+        values.append(b'\\x' + v if i in hex_fields and v else v)
+    return b','.join(values) + b'\n'
+
+
+def transcoded_blocks(blocks: Iterator[bytes], table: str, manifest_dir: str, reject_path: str) -> Iterator[bytes]:
+    """transcode_csv.py over the chunk (exit 3 only means rejected records)."""
+    return piped_blocks([sys.executable, TRANSCODE_SCRIPT, '--table', table, '--manifest-dir', manifest_dir,
+                         '--rejects', reject_path, '/dev/stdin'], blocks, ok=(0, EXIT_REJECTS))
+
+
+def binary_blocks(blocks: Iterator[bytes], table: str, manifest_dir: str, reject_path: str,
+                  zone: str) -> Iterator[bytes]:
+    """binary_copy.py over the chunk: one binary COPY stream (exit 3 only means rejected records)."""
+    return piped_blocks([sys.executable, BINARY_SCRIPT, '--table', table, '--manifest-dir', manifest_dir,
+                         '--timezone', zone, '--rejects', reject_path, '/dev/stdin'], blocks, ok=(0, EXIT_REJECTS))
+
+
+# ============================================================================
+# LOADER
+# ============================================================================
+
+class Loader:
+    def __init__(self, args: argparse.Namespace, pool: SessionPool):
+        self.args = args
+        self.pool = pool
+        self.lock = threading.Lock()
+        self.results: List[dict] = []
+
+    def log(self, message: str) -> None:
+        with self.lock:
+            print(message, flush=True)
+
+    def truncate(self, tables: List[str]) -> None:
+        """TRUNCATE ... CASCADE in one statement; reset checkpoints of cascaded tables."""
+        if not tables:
+            return
+        with self.pool.session() as session:
+            session.notices.clear()
+            session.execute("TRUNCATE " + ', '.join(f"perseus.{t}" for t in tables) + " CASCADE")
+            cascaded = {m.group(1) for n in session.notices for m in CASCADE_NOTICE_RE.finditer(n)}
+        for table in cascaded:
+            try:
+                os.remove(checkpoint_path(self.args.checkpoint_dir, table))
+            except FileNotFoundError:
+                pass
+        self.log(f"Truncated {len(tables)} tables" + (f" (cascaded to {len(cascaded)} more)" if cascaded else ""))
+
+    def set_triggers(self, enable: bool) -> None:
+        """ENABLE / DISABLE TRIGGER ALL on every perseus table (load-data.sh disable_fk_triggers)."""
+        action = 'ENABLE' if enable else 'DISABLE'
+        with self.pool.session() as session:
+            session.execute(TRIGGERS_SQL.format(action=action))
+        self.log(f"FK triggers {'re-enabled' if enable else 'disabled'} on all perseus tables")
+
+    def binary(self, table: str) -> bool:
+        """--binary selects the table and binary_copy.py can encode all of its columns."""
+        if not (self.args.binary == {'all'} or table in self.args.binary):
+            return False
+        try:
+            missing = unsupported_columns(table_spec(table, load_model([PGSQL_TABLE_DIR]), self.args.manifest_dir))
+        except KeyError as e:
+            missing = [str(e)]
+        if missing:
+            self.log(f"  {table}: no binary encoding for {', '.join(missing)}; loading CSV")
+        return not missing
+
+    def chunk_blocks(self, table: str, csv_path: str, manifest: dict, offset: int, length: int, binary: bool):
+        blocks = decompressed_blocks(csv_path, raw_blocks(csv_path, offset, length))
+        if binary:
+            return binary_blocks(blocks, table, self.args.manifest_dir, csv_path + '.rejects.part',
+                                 self.args.timezone)
+        if self.args.transcode:
+            return transcoded_blocks(blocks, table, self.args.manifest_dir, csv_path + '.rejects.part')
+        if manifest['skip'] or manifest['hex']:
+            return rewritten_blocks(blocks, manifest['skip'], manifest['hex'])
+        return blocks
+
+    def load_table(self, table: str, info: dict) -> dict:
+        """Load the pending chunks of one table on one session; retried by run_table."""
+        csv_path = info['path']
+        result = {'table': table, 'tier': info['tier'], 'bytes': 0, 'rows': 0, 'status': 'failed'}
+        state, checkpoint = evaluate(table, csv_path, self.args.checkpoint_dir)
+        write_checkpoint(self.args.checkpoint_dir, checkpoint)
+        if state == 'done':
+            result.update(status='skipped', rows_total=loaded_rows(checkpoint))
+            return result
+        manifest = read_copy_manifest(self.args.manifest_dir, table)
+        binary = self.binary(table)
+        # BUG 6 fix: BCP exports have NO header row
+        copy_sql = (f"COPY perseus.{table}{manifest['columns']} FROM STDIN "
+                    f"WITH ({BINARY_COPY_OPTIONS if binary else CSV_COPY_OPTIONS})")
+        if state != 'resume':
+            try:
+                os.remove(csv_path + '.rejects')
+            except FileNotFoundError:
+                pass
+
+        # fresh / changed tables were emptied by truncate(); resume keeps its chunks
+        with self.pool.session() as session:
+            for chunk in checkpoint['chunks']:
+                if chunk['status'] == 'loaded':
+                    continue
+                blocks = self.chunk_blocks(table, csv_path, manifest, chunk['byte_offset'], chunk['bytes'], binary)
+                try:
+                    rows = session.copy(copy_sql, blocks)
+                except Exception:
+                    mark_chunk(checkpoint, chunk['chunk'], 'failed')
+                    write_checkpoint(self.args.checkpoint_dir, checkpoint)
+                    raise
+                finally:
+                    blocks.close()
+                    self.collect_rejects(csv_path)
+                mark_chunk(checkpoint, chunk['chunk'], 'loaded', rows)
+                write_checkpoint(self.args.checkpoint_dir, checkpoint)
+                result['rows'] += rows
+                result['bytes'] += chunk['bytes']
+            for sql in manifest['post_load']:
+                session.execute(sql)
+        result.update(status='loaded', rows_total=loaded_rows(checkpoint))
+        return result
+
+    @staticmethod
+    def collect_rejects(csv_path: str) -> None:
+        part = csv_path + '.rejects.part'
+        if os.path.exists(part):
+            with open(part, 'rb') as src, open(csv_path + '.rejects', 'ab') as dst:
+                dst.write(src.read())
+            os.remove(part)
+
+    def record_ledger(self, info: dict, result: dict, started: float) -> None:
+        rejects = info['path'] + '.rejects'
+        rejected = 0
+        if os.path.exists(rejects):
+            with open(rejects, 'rb') as f:
+                rejected = sum(1 for _ in f)
+        try:
+            with self.pool.session() as session:
+                session.execute(LEDGER_UPSERT, (
+                    self.args.run_id, result['table'], info['tier'], os.path.basename(info['path']),
+                    info['bytes'], result['rows'], result.get('rows_total', result['rows']), rejected,
+                    result['status'], started))
+        except Exception as e:
+            self.log(f"  WARNING: could not record {result['table']} in the load ledger: {e}")
+
+    def run_table(self, table: str, info: dict) -> dict:
+        started = time.time()
+        backoff = self.args.retry_backoff
+        for attempt in range(self.args.retries + 1):
+            try:
+                result = self.load_table(table, info)
+                break
+            except Exception as e:
+                message = str(e).strip()
+                result = {'table': table, 'tier': info['tier'], 'bytes': 0, 'rows': 0, 'status': 'failed',
+                          'error': message.splitlines()[0] if message else type(e).__name__}
+                if attempt < self.args.retries:
+                    self.log(f"  {table}: attempt {attempt + 1} failed ({result['error']}); retrying in {backoff}s")
+                    time.sleep(backoff)
+                    backoff *= 2
+        result['seconds'] = time.time() - started
+        if result['status'] != 'skipped':
+            self.record_ledger(info, result, started)
+        self.log(format_result(result))
+        with self.lock:
+            self.results.append(result)
+        return result
+
+    def run(self, tables: Dict[str, dict]) -> None:
+        """Tables in one largest-first queue (--replica), else tier by tier."""
+        if self.args.replica:
+            groups = [sorted(tables, key=lambda t: -tables[t]['bytes'])]
+        else:
+            tiers = sorted({info['tier'] for info in tables.values()})
+            groups = [sorted((t for t in tables if tables[t]['tier'] == tier), key=lambda t: -tables[t]['bytes'])
+                      for tier in tiers]
+        with ThreadPoolExecutor(max_workers=self.args.sessions) as pool:
+            for group in groups:
+                list(pool.map(lambda t: self.run_table(t, tables[t]), group))
+
+
+def needs_truncate(tables: Dict[str, dict], checkpoint_dir: str) -> List[str]:
+    """Tables with nothing committed to keep (fresh or changed), as `pending` in load_checkpoint.py."""
+    return [t for t, info in sorted(tables.items())
+            if evaluate(t, info['path'], checkpoint_dir, record=False)[0] in ('fresh', 'changed')]
+
+
+# ============================================================================
+# OUTPUT
+# ============================================================================
+
+def rates(rows: int, nbytes: int, seconds: float) -> str:
+    seconds = max(seconds, 1e-6)
+    return f"{rows / seconds:,.0f} rows/s, {nbytes / MB / seconds:,.1f} MB/s"
+
+
+def format_result(r: dict) -> str:
+    if r['status'] == 'skipped':
+        return f"  ✓ {r['table']}: already loaded (checkpoint), {r['rows_total']:,} rows"
+    if r['status'] == 'failed':
+        return f"  ✗ {r['table']}: failed after {r['seconds']:.1f}s - {r.get('error', 'unknown error')}"
+    total = f" ({r['rows_total']:,} with earlier chunks)" if r['rows_total'] != r['rows'] else ''
+    return (f"  ✓ {r['table']}: {r['rows']:,} rows{total}, {r['bytes'] / MB:,.1f} MB in {r['seconds']:.1f}s "
+            f"({rates(r['rows'], r['bytes'], r['seconds'])})")
+
+
+def format_compare(runs: List[tuple]) -> str:
+    lines = [f"{'run_id':<20} {'tables':>6} {'rows':>14} {'MB':>10} {'seconds':>9} {'rows/s':>12} {'MB/s':>8}"]
+    for run_id, tables, rows, nbytes, seconds in runs:
+        rows, nbytes, seconds = int(rows or 0), int(nbytes or 0), float(seconds or 0)
+        per_s = max(seconds, 1e-6)
+        lines.append(f"{run_id:<20} {tables:>6} {rows:>14,} {nbytes / MB:>10,.1f} {seconds:>9,.1f} "
+                     f"{rows / per_s:>12,.0f} {nbytes / MB / per_s:>8,.1f}")
+    return "\n".join(lines)
+
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+def parse_setting(value: str) -> Tuple[str, str]:
+    name, sep, setting = value.partition('=')
+    if not sep or not name:
+        raise argparse.ArgumentTypeError(f"expected NAME=VALUE, got {value!r}")
+    return name.strip(), setting.strip()
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Load the exported CSVs over a pool of persistent sessions.")
+    parser.add_argument('--dsn', default='',
+                        help="libpq connection string (default: PGHOST/PGPORT, DB_NAME, DB_USER)")
+    parser.add_argument('--data-dir', default=DEFAULT_DATA_DIR,
+                        help="Directory with ##perseus_tier_N_<table>.csv files (default: %(default)s)")
+    parser.add_argument('--checkpoint-dir', default=None,
+                        help="Checkpoint directory (default: CHECKPOINT_DIR or DATA_DIR/.checkpoints)")
+    parser.add_argument('--manifest-dir', default=DEFAULT_MANIFEST_DIR,
+                        help="copy-manifests directory from convert_tables.py (default: %(default)s)")
+    parser.add_argument('-s', '--sessions', type=int, default=DEFAULT_SESSIONS,
+                        help="Persistent sessions = tables loaded at once (default: %(default)s)")
+    parser.add_argument('--tier', type=int, help="Load only this tier")
+    parser.add_argument('--replica', action='store_true',
+                        help="SET session_replication_role = replica: skip FK triggers, ignore tier order")
+    parser.add_argument('--set', dest='settings', action='append', type=parse_setting, default=[],
+                        metavar='NAME=VALUE', help="Extra session setting (repeatable)")
+    parser.add_argument('--transcode', action='store_true', help="Stream each chunk through transcode_csv.py")
+    parser.add_argument('--binary', type=lambda v: {t.strip() for t in v.split(',') if t.strip()},
+                        default=set(os.environ.get('BINARY_TABLES', '').replace(' ', '').split(',')) - {''},
+                        metavar='TABLES', help="Comma-separated tables (or 'all') loaded as binary COPY "
+                                               "through binary_copy.py (default: BINARY_TABLES)")
+    parser.add_argument('--resume', action='store_true', help="Keep the checkpoints of the previous run")
+    parser.add_argument('--retries', type=int, default=int(os.environ.get('LOAD_RETRIES', 2)),
+                        help="Retries per table; a retry resumes at the failed chunk (default: %(default)s)")
+    parser.add_argument('--retry-backoff', type=float, default=float(os.environ.get('LOAD_RETRY_BACKOFF', 10)),
+                        help="First retry wait in seconds, doubled each time (default: %(default)s)")
+    parser.add_argument('--run-id', default=os.environ.get('RUN_ID') or datetime.now().strftime('%Y%m%d_%H%M%S'),
+                        help="Load ledger run id (default: RUN_ID or a timestamp)")
+    parser.add_argument('--summary', help="Write per-table results as JSON to this file")
+    parser.add_argument('--compare', action='store_true',
+                        help="Print rows/s and MB/s of the last --runs runs from the load ledger and exit")
+    parser.add_argument('--runs', type=int, default=10, help="Runs shown by --compare (default: %(default)s)")
+    return parser.parse_args(argv)
+
+
+def build_dsn(args: argparse.Namespace) -> str:
+    if args.dsn:
+        return args.dsn
+    return (f"host={os.environ.get('PGHOST', 'localhost')} port={os.environ.get('PGPORT', '5432')} "
+            f"dbname={DEFAULT_DB_NAME} user={DEFAULT_DB_USER} application_name=pg_loader")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    if args.sessions < 1 or args.retries < 0:
+        print("ERROR: --sessions must be >= 1 and --retries >= 0", file=sys.stderr)
+        return 2
+    if args.checkpoint_dir is None:
+        args.checkpoint_dir = os.environ.get('CHECKPOINT_DIR') or os.path.join(args.data_dir, '.checkpoints')
+
+    driver = import_driver()
+    if driver[0] is None:
+        print('ERROR: needs psycopg or psycopg2 (pip install "psycopg[binary]")', file=sys.stderr)
+        return 2
+
+    settings = list(DEFAULT_SETTINGS)
+    if args.replica:
+        settings.append(('session_replication_role', 'replica'))
+    overrides = dict(args.settings)
+    settings = [(n, v) for n, v in settings if n not in overrides] + list(overrides.items())
+
+    pool = SessionPool(driver, build_dsn(args), settings, 1 if args.compare else args.sessions)
+    try:
+        with pool.session() as session:
+            session.execute(LEDGER_DDL)
+            args.timezone = session.execute("SHOW TimeZone")[0][0]
+            runs = session.execute(COMPARE_SQL, (args.runs,)) if args.compare else None
+    except Exception as e:
+        print(f"ERROR: cannot connect / prepare the load ledger: {e}", file=sys.stderr)
+        pool.close()
+        return 2
+    if args.compare:
+        pool.close()
+        print(format_compare(runs))
+        return 0
+
+    try:
+        tables = {t: info for t, info in discover_csvs(args.data_dir).items()
+                  if (args.tier is None or info['tier'] == args.tier) and info['bytes'] > 0}
+        if not tables:
+            print(f"ERROR: no non-empty CSV files in {args.data_dir}", file=sys.stderr)
+            return 1
+        if not args.resume:
+            for table in tables:
+                try:
+                    os.remove(checkpoint_path(args.checkpoint_dir, table))
+                except FileNotFoundError:
+                    pass
+
+        total_bytes = sum(info['bytes'] for info in tables.values())
+        print(f"Run {args.run_id}: {len(tables)} tables, {total_bytes / MB:,.1f} MB on {args.sessions} sessions "
+              f"({driver[0]}; {', '.join(f'{n}={v}' for n, v in settings)})", flush=True)
+
+        loader = Loader(args, pool)
+        started = time.time()
+        loader.truncate(needs_truncate(tables, args.checkpoint_dir))
+        if args.replica:
+            loader.run(tables)
+        else:
+            loader.set_triggers(False)
+            try:
+                loader.run(tables)
+            finally:
+                loader.set_triggers(True)
+        elapsed = time.time() - started
+    finally:
+        pool.close()
+
+    loaded = [r for r in loader.results if r['status'] == 'loaded']
+    failed = [r for r in loader.results if r['status'] == 'failed']
+    rows = sum(r['rows'] for r in loaded)
+    nbytes = sum(r['bytes'] for r in loaded)
+    print(f"Loaded {len(loaded)} tables, {rows:,} rows, {nbytes / MB:,.1f} MB in {elapsed:.1f}s "
+          f"({rates(rows, nbytes, elapsed)}); {len(failed)} failed")
+    if args.summary:
+        with open(args.summary, 'w') as f:
+            json.dump({'run_id': args.run_id, 'sessions': args.sessions, 'settings': dict(settings),
+                       'seconds': elapsed, 'tables': loader.results}, f, indent=2)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
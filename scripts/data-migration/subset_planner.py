@@ -0,0 +1,554 @@
+#!/usr/bin/env python3
+"""
+Subset Planner - referentially closed extraction from seed rows
+
+The extract-tier-*.sql scripts take a TOP 5000 sample per table, tier by
+tier, so a child's sample only partly matches its parents' samples and the
+load has orphans. This planner generates one T-SQL script that extracts a
+subset closed under every FK instead:
+
+1. seed rows: --seeds rows of the seed table (goo by default), filtered by
+   --seed-where and taken in --seed-order
+2. lineage: material_transition (material -> transition) and
+   transition_material (transition -> material) are walked from the seed
+   materials --lineage-depth rounds, downstream, upstream or both, so goo
+   and fatsmurf grow together; --max-rows caps each of them
+3. lineage edges: the edge rows whose two ends were both selected
+4. children: rows of every table below the selected goo / fatsmurf rows
+   (goo_history, fatsmurf_reading, robot_log_transfer, ...), in FK order,
+   at most --child-rows per table when set; --skip leaves a table out
+5. parents: walking the FK graph upwards from the leaves, every row any
+   selected row references (NOT EXISTS on the referenced key, so rows are
+   never added twice); one pass suffices because the graph has no cycles
+
+Each table lands in ##perseus_tier_{N}_{table}, N being its tier in
+load-data.sh, so `extract-data.sh --subset FILE` exports it and load-data.sh
+loads it like a tier extraction. The FKs, column names and keys are the SQL
+Server ones (13.create-foreign-key-constraint, 8.create-table,
+12.create-constraint). --shrink R sizes the seeds from the row-count
+assessment so the lineage tables end up about R times smaller than the
+source; the plan lists the estimated rows per table, assuming rows are spread
+evenly, and the script prints the actual ones.
+
+Usage:
+    python3 scripts/data-migration/subset_planner.py [--seeds N | --shrink R] [-o extract-subset.sql]
+                                                    [--seed-where SQL] [--seed-order SQL]
+                                                    [--lineage both|down|up|none] [--lineage-depth N]
+                                                    [--max-rows N] [--child-rows N] [--skip TABLE ...]
+    python3 scripts/data-migration/subset_planner.py --shrink 50 --plan
+    ./extract-data.sh --subset extract-subset.sql
+
+Exit Codes:
+    0 - Plan / script generated
+    2 - Invalid arguments / unreadable inputs (unknown table, FK cycle)
+
+Author: Pierre Ribeiro (DBA/DBRE)
+Created: 2026-10-19
+Version: 1.0
+"""
+
+import argparse
+import os
+import shlex
+import sys
+from collections import deque
+from typing import Dict, List, Optional
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SCRIPTS_DIR)
+
+from cascade_analyzer import LOAD_SCRIPT, tier_tables  # noqa: E402
+from convert_tables import SIZE_CSV, load_table_sizes  # noqa: E402
+from fk_graph import SQLSERVER_FK_DIR, FKGraph, load_fk_constraints  # noqa: E402
+from schema_model import REPO_ROOT, SQLSERVER_TABLE_DIR, load_model  # noqa: E402
+
+# ============================================================================
+# CONSTANTS
+# ============================================================================
+
+SQLSERVER_CONSTRAINT_DIR = os.path.join(REPO_ROOT, "source/original/sqlserver/12.create-constraint")
+
+# Lineage edge tables as (table, from column, to column), downstream direction
+LINEAGE_EDGES = (
+    ('material_transition', 'material_id', 'transition_id'),    # material consumed by a transition
+    ('transition_material', 'transition_id', 'material_id'),    # transition produces a material
+)
+DEFAULT_SEED_TABLE = 'goo'
+DEFAULT_SEEDS = 1000
+DEFAULT_LINEAGE_DEPTH = 3
+LINEAGE_GROWTH = 4          # --max-rows defaults to this many times the seeds
+TEMP_TABLE = '##perseus_tier_{tier}_{table}'
+KEY_SET = '#subset_{table}'
+
+
+# ============================================================================
+# PLAN
+# ============================================================================
+
+def lineage_edges(graph: FKGraph) -> List[dict]:
+    """LINEAGE_EDGES resolved against the FK graph: the tables and keys each end references."""
+    edges = []
+    for table, src_col, dst_col in LINEAGE_EDGES:
+        ends = {fk['child_cols'][0]: fk for fk in graph.parents.get(table, []) if len(fk['child_cols']) == 1}
+        if src_col not in ends or dst_col not in ends:
+            raise ValueError(f"lineage edge {table}({src_col}, {dst_col}) has no FK on both columns")
+        edges.append({
+            'table': table,
+            'src_col': src_col, 'src_table': ends[src_col]['parent_table'], 'src_key': ends[src_col]['parent_cols'][0],
+            'dst_col': dst_col, 'dst_table': ends[dst_col]['parent_table'], 'dst_key': ends[dst_col]['parent_cols'][0],
+        })
+    return edges
+
+
+def plan_subset(graph: FKGraph, seed_table: str, seed_key: str, lineage: str,
+                skip: List[str]) -> dict:
+    """
+    Tables of the closure and how each is reached: 'seed' / 'lineage' (key
+    sets), 'edge', 'child' (below a seed/lineage table) or 'parent' (only
+    referenced). `order` lists them parents first.
+    """
+    if graph.cycles():
+        raise ValueError(f"FK cycles are not supported: {graph.cycles()}")
+    edges = lineage_edges(graph) if lineage != 'none' else []
+    if edges and seed_table not in {t for e in edges for t in (e['src_table'], e['dst_table'])}:
+        edges = []
+    # Lineage tables are keyed by the column the edges reference (goo.uid, fatsmurf.uid)
+    lineage_keys = {}
+    for e in edges:
+        for table, key in ((e['src_table'], e['src_key']), (e['dst_table'], e['dst_key'])):
+            if lineage_keys.setdefault(table, key) != key:
+                raise ValueError(f"lineage edges reference {table} by both {lineage_keys[table]} and {key}")
+    keys = {seed_table: lineage_keys.get(seed_table, seed_key)}
+    keys.update((t, k) for t, k in lineage_keys.items() if t != seed_table)
+
+    roles = {t: 'lineage' for t in keys}
+    roles[seed_table] = 'seed'
+    roles.update({e['table']: 'edge' for e in edges})
+    if set(skip) & set(roles):
+        raise ValueError(f"cannot skip seed / lineage tables: {', '.join(sorted(set(skip) & set(roles)))}")
+
+    excluded = set(skip) | set(roles)
+    queue = deque(keys)
+    while queue:
+        for child in sorted(graph.children_of(queue.popleft())):
+            if child not in excluded:
+                excluded.add(child)
+                roles[child] = 'child'
+                queue.append(child)
+
+    # Child rows are those referencing a selected seed / lineage / child row
+    descent = {t: [fk for fk in graph.parents.get(t, []) if fk['parent_table'] in roles
+                   and roles[fk['parent_table']] != 'edge']
+               for t, role in roles.items() if role == 'child'}
+
+    order = graph.topological_order()
+    for table in reversed(order):
+        if table not in roles and any(fk['child_table'] in roles for fk in graph.children.get(table, [])):
+            roles[table] = 'parent'
+
+    return {
+        'seed_table': seed_table,
+        'keys': keys,
+        'edges': edges,
+        'roles': roles,
+        'descent': descent,
+        'order': [t for t in order if t in roles],
+        'skipped': sorted(set(skip)),
+    }
+
+
+def table_tiers(plan: dict, graph: FKGraph, loaded: Dict[str, int]) -> Dict[str, int]:
+    """load-data.sh tier per table; tables it does not load get their FK level (at most 4)."""
+    levels = graph.levels()
+    return {t: loaded.get(t, min(levels.get(t, 0), 4)) for t in plan['order']}
+
+
+def estimate_rows(plan: dict, graph: FKGraph, rows: Dict[str, int], seeds: int,
+                  max_rows: int, child_rows: int) -> Dict[str, int]:
+    """
+    Expected rows per table, assuming rows are spread evenly: the lineage
+    tables at --max-rows (the seed table at --seeds without lineage), edges
+    and children in proportion, parents at most the rows referencing them.
+    """
+    seed = plan['seed_table']
+    core = max_rows if plan['edges'] else seeds
+    fraction = min(1.0, core / rows[seed]) if rows.get(seed) else 0.0
+    estimate = {}
+    for table in plan['order']:
+        role = plan['roles'][table]
+        source = rows.get(table, 0)
+        if role in ('seed', 'lineage'):
+            estimate[table] = min(source, core)
+        elif role in ('edge', 'child'):
+            estimate[table] = round(source * fraction)
+            if role == 'child' and child_rows:
+                estimate[table] = min(estimate[table], child_rows)
+    for table in reversed(plan['order']):
+        if plan['roles'][table] == 'parent':
+            referencing = sum(estimate.get(fk['child_table'], 0) for fk in graph.children.get(table, []))
+            estimate[table] = min(rows.get(table, 0), referencing)
+    return estimate
+
+
+# ============================================================================
+# T-SQL GENERATION
+# ============================================================================
+
+class SourceTables:
+    """Schema-qualified names and key / ORDER BY columns from the SQL Server DDL."""
+
+    def __init__(self, graph: FKGraph, model):
+        self.model = model
+        self.schemas = {}
+        for fk in graph.fks:
+            self.schemas.setdefault(fk['child_table'], fk['child_schema'])
+            self.schemas.setdefault(fk['parent_table'], fk['parent_schema'])
+
+    def name(self, table: str) -> str:
+        info = self.model.table(table)
+        if info:
+            return f"{info['schema']}.{info['name']}"
+        return f"{self.schemas.get(table, 'dbo')}.{table}"
+
+    def temp_name(self, table: str) -> str:
+        info = self.model.table(table)
+        return info['name'] if info else table
+
+    def order_columns(self, table: str) -> List[str]:
+        """PRIMARY KEY columns, else the first column, for deterministic TOP."""
+        info = self.model.table(table)
+        columns = [c['name'] for c in (info or {}).get('columns', [])]
+        pk = [c for c in self.model.primary_key(table) if c in columns]
+        return pk or columns[:1]
+
+
+def _match(left: str, left_cols: List[str], right: str, right_cols: List[str]) -> str:
+    return ' AND '.join(f"{left}.{a} = {right}.{b}" for a, b in zip(left_cols, right_cols))
+
+
+def _quote(text: str) -> str:
+    return text.replace("'", "''")
+
+
+def render_sql(plan: dict, graph: FKGraph, source: SourceTables, tiers: Dict[str, int],
+               args: argparse.Namespace, command: str) -> str:
+    """The extraction script: key sets, lineage walk, then one ## table per closure table."""
+    temp = {t: TEMP_TABLE.format(tier=tiers[t], table=source.temp_name(t)) for t in plan['order']}
+    key_set = {t: KEY_SET.format(table=t) for t in plan['keys']}
+    seed = plan['seed_table']
+    out = [
+        "-- ============================================================================",
+        "-- SUBSET EXTRACTION - referentially closed subset from seed rows",
+        "-- Generated by subset_planner.py - do not edit, regenerate instead:",
+        f"--   {command}",
+        "-- Run through: ./extract-data.sh --subset <this file>",
+        "-- ============================================================================",
+        "",
+        "SET NOCOUNT ON;",
+        "",
+        "PRINT 'Session ID: ' + CAST(@@SPID AS VARCHAR(10));",
+        f"DECLARE @seeds INT = {args.seeds};",
+        f"DECLARE @max_rows INT = {args.max_rows};",
+        f"DECLARE @lineage_depth INT = {args.lineage_depth if plan['edges'] else 0};",
+        "DECLARE @round INT = 0;",
+        "DECLARE @added INT = 1;",
+        "DECLARE @room INT;",
+        "DECLARE @rows BIGINT;",
+        "DECLARE @total_rows BIGINT = 0;",
+        "",
+        "-- ============================================================================",
+        "-- 1. SEED ROWS",
+        "-- Key sets start empty; SELECT INTO ... UNION ALL drops the IDENTITY property",
+        "-- so keys (and below, rows) can be inserted with their source values.",
+        "-- ============================================================================",
+    ]
+    for table, key in plan['keys'].items():
+        out += [
+            f"IF OBJECT_ID('tempdb..{key_set[table]}') IS NOT NULL DROP TABLE {key_set[table]};",
+            f"SELECT s.{key} AS k INTO {key_set[table]} FROM {source.name(table)} s WHERE 1 = 0",
+            f"UNION ALL SELECT s.{key} FROM {source.name(table)} s WHERE 1 = 0;",
+            f"CREATE CLUSTERED INDEX ix_subset_{table} ON {key_set[table]} (k);",
+        ]
+    out += [
+        "",
+        f"INSERT INTO {key_set[seed]} (k)",
+        f"SELECT TOP (@seeds) s.{plan['keys'][seed]}",
+        f"FROM {source.name(seed)} s WITH (NOLOCK)",
+    ]
+    if args.seed_where:
+        out.append(f"WHERE {args.seed_where}")
+    out += [
+        f"ORDER BY {args.seed_order or ', '.join('s.' + c for c in source.order_columns(seed))};",
+        f"PRINT 'Seed rows ({seed}): ' + CAST(@@ROWCOUNT AS VARCHAR(12));",
+        "",
+    ]
+
+    if plan['edges']:
+        out += [
+            "-- ============================================================================",
+            f"-- 2. LINEAGE WALK ({args.lineage}, at most @lineage_depth rounds, @max_rows per table)",
+            "-- ============================================================================",
+            "WHILE @round < @lineage_depth AND @added > 0",
+            "BEGIN",
+            "    SET @round = @round + 1;",
+            "    SET @added = 0;",
+        ]
+        steps = []
+        for e in plan['edges']:
+            if args.lineage in ('down', 'both'):
+                steps.append((e, 'src', 'dst'))
+            if args.lineage in ('up', 'both'):
+                steps.append((e, 'dst', 'src'))
+        for e, frm, to in steps:
+            target = e[f'{to}_table']
+            out += [
+                "",
+                f"    -- {e['table']}: {e[frm + '_table']} -> {target}",
+                f"    SET @room = @max_rows - (SELECT COUNT(*) FROM {key_set[target]});",
+                "    IF @room > 0",
+                "    BEGIN",
+                f"        INSERT INTO {key_set[target]} (k)",
+                f"        SELECT DISTINCT TOP (@room) e.{e[to + '_col']}",
+                f"        FROM {source.name(e['table'])} e WITH (NOLOCK)",
+                f"        WHERE EXISTS (SELECT 1 FROM {key_set[e[frm + '_table']]} x WHERE x.k = e.{e[frm + '_col']})",
+                f"          AND e.{e[to + '_col']} IS NOT NULL",
+                f"          AND NOT EXISTS (SELECT 1 FROM {key_set[target]} x WHERE x.k = e.{e[to + '_col']})",
+                f"        ORDER BY e.{e[to + '_col']};",
+                "        SET @added = @added + @@ROWCOUNT;",
+                "    END",
+            ]
+        out += [
+            "",
+            "    PRINT 'Lineage round ' + CAST(@round AS VARCHAR(10)) + ': +' + CAST(@added AS VARCHAR(12)) + ' keys';",
+            "END",
+            "",
+        ]
+
+    out += [
+        "-- ============================================================================",
+        "-- 3. EXPORT TABLES (empty copies of the source tables, parents first)",
+        "-- ============================================================================",
+    ]
+    for table in plan['order']:
+        out += [
+            f"IF OBJECT_ID('tempdb..{temp[table]}') IS NOT NULL DROP TABLE {temp[table]};",
+            f"SELECT s.* INTO {temp[table]} FROM {source.name(table)} s WHERE 1 = 0",
+            f"UNION ALL SELECT s.* FROM {source.name(table)} s WHERE 1 = 0;",
+        ]
+    out.append("")
+
+    def insert(table: str, where: List[str], label: str, top: int = 0):
+        out.append(f"INSERT INTO {temp[table]}")
+        out.append(f"SELECT {'TOP (' + str(top) + ') ' if top else ''}s.*")
+        out.append(f"FROM {source.name(table)} s WITH (NOLOCK)")
+        out.append(f"WHERE {where[0]}")
+        out.extend(f"  {line}" for line in where[1:])
+        if top:
+            out.append(f"ORDER BY {', '.join('s.' + c for c in source.order_columns(table))}")
+        out[-1] += ';'
+        out.append(f"PRINT '  {table}: +' + CAST(@@ROWCOUNT AS VARCHAR(12)) + ' rows ({_quote(label)})';")
+
+    out += [
+        "-- ============================================================================",
+        "-- 4. SEED / LINEAGE ROWS AND LINEAGE EDGES",
+        "-- ============================================================================",
+        "PRINT 'Extracting seed / lineage rows...';",
+    ]
+    for table, key in plan['keys'].items():
+        insert(table, [f"EXISTS (SELECT 1 FROM {key_set[table]} x WHERE x.k = s.{key})"], plan['roles'][table])
+    for e in plan['edges']:
+        insert(e['table'], [f"EXISTS (SELECT 1 FROM {key_set[e['src_table']]} x WHERE x.k = s.{e['src_col']})",
+                            f"AND EXISTS (SELECT 1 FROM {key_set[e['dst_table']]} x WHERE x.k = s.{e['dst_col']})"],
+               'edge')
+    out.append("")
+
+    children = [t for t in plan['order'] if plan['roles'][t] == 'child']
+    if children:
+        out += [
+            "-- ============================================================================",
+            "-- 5. CHILD ROWS (rows below the selected ones, parents first)",
+            "-- ============================================================================",
+            "PRINT 'Extracting child rows...';",
+        ]
+        for table in children:
+            fks = plan['descent'][table]
+            where = [f"EXISTS (SELECT 1 FROM {temp[fk['parent_table']]} p "
+                     f"WHERE {_match('p', fk['parent_cols'], 's', fk['child_cols'])})" for fk in fks]
+            insert(table, [where[0]] + [f"OR {w}" for w in where[1:]], 'child', args.child_rows)
+        out.append("")
+
+    out += [
+        "-- ============================================================================",
+        "-- 6. PARENT ROWS (every referenced row, children first)",
+        "-- ============================================================================",
+        "PRINT 'Closing over FK parents...';",
+    ]
+    edge_tables = {e['table'] for e in plan['edges']}
+    for table in reversed(plan['order']):
+        for fk in graph.children.get(table, []):
+            child = fk['child_table']
+            if child not in plan['roles'] or child == table:
+                continue
+            # Already satisfied: edges only reference key-set rows, and a child
+            # selected through this FK alone references selected rows only
+            if child in edge_tables or plan['descent'].get(child) == [fk]:
+                continue
+            insert(table, [f"EXISTS (SELECT 1 FROM {temp[child]} c "
+                           f"WHERE {_match('c', fk['child_cols'], 's', fk['parent_cols'])})",
+                           f"AND NOT EXISTS (SELECT 1 FROM {temp[table]} p "
+                           f"WHERE {_match('p', fk['parent_cols'], 's', fk['parent_cols'])})"],
+                   f"parent of {child}.{', '.join(fk['child_cols'])}")
+        for fk in graph.self_references:
+            if fk['table'] != table:
+                continue
+            # Self-reference: repeat until no referenced row is missing
+            out += [
+                "WHILE 1 = 1",
+                "BEGIN",
+                f"    INSERT INTO {temp[table]}",
+                "    SELECT s.*",
+                f"    FROM {source.name(table)} s WITH (NOLOCK)",
+                f"    WHERE EXISTS (SELECT 1 FROM {temp[table]} c "
+                f"WHERE {_match('c', fk['child_cols'], 's', fk['parent_cols'])})",
+                f"      AND NOT EXISTS (SELECT 1 FROM {temp[table]} p "
+                f"WHERE {_match('p', fk['parent_cols'], 's', fk['parent_cols'])});",
+                "    IF @@ROWCOUNT = 0 BREAK;",
+                "END",
+            ]
+    out.append("")
+
+    out += [
+        "-- ============================================================================",
+        "-- SUMMARY",
+        "-- ============================================================================",
+        "PRINT '';",
+        "PRINT 'Subset rows per table:';",
+    ]
+    for table in plan['order']:
+        out += [
+            f"SELECT @rows = COUNT_BIG(*) FROM {temp[table]};",
+            "SET @total_rows = @total_rows + @rows;",
+            f"PRINT '  {temp[table]}: ' + CAST(@rows AS VARCHAR(20));",
+        ]
+    out += [
+        f"PRINT 'Total: ' + CAST(@total_rows AS VARCHAR(20)) + ' rows in {len(plan['order'])} tables';",
+        "GO",
+        "",
+    ]
+    return '\n'.join(out)
+
+
+# ============================================================================
+# CLI
+# ============================================================================
+
+def format_plan(plan: dict, args: argparse.Namespace, tiers: Dict[str, int], loaded: Dict[str, int],
+                rows: Dict[str, int], estimate: Dict[str, int]) -> str:
+    lineage = (f"lineage {args.lineage} x{args.lineage_depth}, at most {args.max_rows:,} rows per lineage table"
+               if plan['edges'] else "no lineage")
+    lines = [f"Seeds: {args.seeds:,} {plan['seed_table']} rows, {lineage}",
+             "",
+             f"{'Table':<40} {'role':<8} {'tier':>4} {'source rows':>14} {'est. rows':>12}",
+             f"{'-' * 40} {'-' * 8} {'-' * 4} {'-' * 14} {'-' * 12}"]
+    for table in plan['order']:
+        lines.append(f"{table:<40} {plan['roles'][table]:<8} {tiers[table]:>4} "
+                     f"{rows.get(table, 0):>14,} {estimate.get(table, 0):>12,}")
+    source = sum(rows.get(t, 0) for t in plan['order'])
+    total = sum(estimate.values())
+    lines.append("")
+    lines.append(f"Closure: {len(plan['order'])} tables, ~{total:,} of {source:,} source rows"
+                 + (f" (~{source / total:,.0f}x smaller)" if total else ""))
+    if plan['skipped']:
+        lines.append(f"Skipped (and the tables only below them): {', '.join(plan['skipped'])}")
+    unloaded = [t for t in plan['order'] if t not in loaded]
+    if unloaded:
+        lines.append(f"WARNING: not in load-data.sh tiers (exported, not loaded): {', '.join(unloaded)}")
+    return '\n'.join(lines)
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Generate T-SQL extracting an FK-closed subset grown from seed rows.")
+    size = parser.add_mutually_exclusive_group()
+    size.add_argument('--seeds', type=int,
+                      help=f"Seed rows of the seed table (default: {DEFAULT_SEEDS})")
+    size.add_argument('--shrink', type=float,
+                      help="Size the subset to about 1/R of the source (from --size-csv)")
+    parser.add_argument('--seed-table', default=DEFAULT_SEED_TABLE,
+                        help="Table the seed rows come from (default: %(default)s)")
+    parser.add_argument('--seed-where',
+                        help="Filter on the seed table, alias s (e.g. \"s.goo_type_id = 8\")")
+    parser.add_argument('--seed-order',
+                        help="ORDER BY for the seed rows, alias s (default: primary key; NEWID() = random)")
+    parser.add_argument('--lineage', choices=('both', 'down', 'up', 'none'), default='both',
+                        help="Lineage directions to walk from the seeds (default: %(default)s)")
+    parser.add_argument('--lineage-depth', type=int, default=DEFAULT_LINEAGE_DEPTH,
+                        help="Lineage rounds (default: %(default)s)")
+    parser.add_argument('--max-rows', type=int,
+                        help=f"Cap per lineage table (default: {LINEAGE_GROWTH} x seeds)")
+    parser.add_argument('--child-rows', type=int, default=0,
+                        help="At most N rows per child table, 0 = all (default: %(default)s)")
+    parser.add_argument('--skip', nargs='+', default=[], metavar='TABLE',
+                        help="Child tables to leave out, with the tables below them")
+    parser.add_argument('--fk-ddl', default=SQLSERVER_FK_DIR,
+                        help="SQL Server FK DDL file or directory (default: %(default)s)")
+    parser.add_argument('--size-csv', default=SIZE_CSV,
+                        help="Row count / size assessment CSV (default: %(default)s)")
+    parser.add_argument('--plan', action='store_true',
+                        help="Print the plan and size estimate only")
+    parser.add_argument('-o', '--output',
+                        help="Write the script here and print the plan (default: script to stdout)")
+    args = parser.parse_args(argv)
+    for option in ('seeds', 'shrink', 'max_rows', 'lineage_depth'):
+        value = getattr(args, option)
+        if value is not None and value <= 0:
+            parser.error(f"--{option.replace('_', '-')} must be positive")
+    if args.child_rows < 0:
+        parser.error("--child-rows must be >= 0")
+    return args
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    command = ' '.join(shlex.quote(a) for a in ['subset_planner.py'] + list(argv if argv is not None else sys.argv[1:]))
+    try:
+        graph = FKGraph(load_fk_constraints(args.fk_ddl), qualified=False)
+        source = SourceTables(graph, load_model([SQLSERVER_TABLE_DIR, SQLSERVER_CONSTRAINT_DIR]))
+        rows = {t: v['rows'] for t, v in load_table_sizes(args.size_csv).items()} \
+            if os.path.exists(args.size_csv) else {}
+        unknown = [t for t in [args.seed_table] + args.skip if t not in graph.tables]
+        if unknown:
+            raise ValueError(f"not in the FK graph: {', '.join(unknown)}")
+        if args.shrink:
+            if not rows.get(args.seed_table):
+                raise ValueError(f"--shrink needs the source row count of {args.seed_table} ({args.size_csv})")
+            args.max_rows = args.max_rows or max(1, int(rows[args.seed_table] / args.shrink))
+            args.seeds = max(1, args.max_rows // LINEAGE_GROWTH) if args.lineage != 'none' else args.max_rows
+        args.seeds = args.seeds or DEFAULT_SEEDS
+        args.max_rows = args.max_rows or args.seeds * LINEAGE_GROWTH
+        plan = plan_subset(graph, args.seed_table, source.order_columns(args.seed_table)[0],
+                           args.lineage, args.skip)
+        loaded = {t: n for n, tables in tier_tables(LOAD_SCRIPT) for t in tables}
+        tiers = table_tiers(plan, graph, loaded)
+    except (OSError, ValueError) as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 2
+
+    estimate = estimate_rows(plan, graph, rows, args.seeds, args.max_rows, args.child_rows)
+    if args.plan:
+        print(format_plan(plan, args, tiers, loaded, rows, estimate))
+        return 0
+
+    script = render_sql(plan, graph, source, tiers, args, command)
+    if not args.output:
+        sys.stdout.write(script)
+        return 0
+    with open(args.output, 'w') as f:
+        f.write(script)
+    print(f"Wrote {args.output} ({script.count(chr(10)):,} lines)")
+    print(format_plan(plan, args, tiers, loaded, rows, estimate))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,503 @@
+#!/usr/bin/env python3
+"""
+bcp → COPY Transcoder - stream-convert bcp -c exports into clean PostgreSQL CSV
+
+extract-data.sh exports with `bcp ... -c -t ',' -r '\\n'`: unquoted fields, NULL
+as an empty field, empty strings as a single NUL byte, and whatever code page
+the server used. One stray comma, newline or NUL in a text column makes COPY
+reject the whole multi-GB file. This stage sits between the export and the
+COPY in load-data.sh and rewrites each file one record at a time (constant
+memory), using the column types of the refactored DDL (14.create-table) and
+the bcp field order of copy-manifests/<table>.json:
+
+- BIT 0/1 → t/f, SQL Server datetime/datetime2/datetimeoffset text → ISO 8601
+  (fractional seconds rounded to microseconds), hex → \\x bytea
+- NULL stays an unquoted empty field; bcp's NUL-for-empty-string becomes ""
+- NUL bytes inside values are dropped; values that are not valid UTF-8 are
+  decoded with --fallback-encoding (counted per column)
+- records with too few fields are rejoined with the next line (embedded
+  newline); records with too many are repaired when one text column can
+  absorb the extra delimiters and every other field validates (ties go to
+  the column where the delimiter is followed by a space, as in prose)
+- values longer than VARCHAR(n)/CHAR(n) are rejected here, not by COPY
+- anything still malformed goes to <output>.rejects (line number + raw
+  record) instead of failing the load
+
+Usage:
+    python3 scripts/data-migration/transcode_csv.py CSV [CSV ...] --output-dir DIR [--jobs N]
+    python3 scripts/data-migration/transcode_csv.py CSV --table goo > goo.pgcsv
+    python3 scripts/data-migration/transcode_csv.py CSV --split 4 --output-dir DIR
+    python3 scripts/data-migration/transcode_csv.py CSV --byte-range 0:1048576 --rejects R
+
+Output is FORMAT CSV with the manifest's copy_columns in order (no header).
+With --split N records are dealt round-robin into DIR/part-0..N-1 (whole
+records, so quoted newlines never straddle two COPY streams). --byte-range
+reads one chunk of a chunked export (see extract-data.sh manifests); line
+numbers in its rejects are relative to the chunk.
+
+Exit Codes:
+    0 - All files transcoded, no rejected records
+    2 - Invalid arguments / unknown table / unreadable input / any other failure
+    3 - Some records rejected (see *.rejects); every other record was written
+
+Author: Pierre Ribeiro (DBA/DBRE)
+Created: 2026-10-19
+Version: 1.0
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SCRIPTS_DIR)
+
+from convert_tables import COPY_MANIFEST_DIR, TARGET_DIR  # noqa: E402
+from load_plan import CSV_PATTERN  # noqa: E402
+from schema_model import PGSQL_TABLE_DIR, load_model  # noqa: E402
+
+# ============================================================================
+# CONSTANTS
+# ============================================================================
+
+DEFAULT_MANIFEST_DIR = os.environ.get('COPY_MANIFEST_DIR', os.path.join(TARGET_DIR, COPY_MANIFEST_DIR))
+DEFAULT_FALLBACK_ENCODING = 'cp1252'
+MAX_MERGE_LINES = 64          # physical lines one record may span before it is rejected
+EXIT_REJECTS = 3              # output complete but some records rejected (1 is a Python crash)
+
+TEXT_TYPES = ('VARCHAR', 'CHARACTER VARYING', 'TEXT', 'CHAR', 'CHARACTER', 'BPCHAR')
+INTEGER_RE = re.compile(r'^[+-]?\d+$')
+NUMERIC_RE = re.compile(r'^[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?$')
+UUID_RE = re.compile(r'^[0-9A-Fa-f]{8}-[0-9A-Fa-f]{4}-[0-9A-Fa-f]{4}-[0-9A-Fa-f]{4}-[0-9A-Fa-f]{12}$')
+HEX_RE = re.compile(r'^(\\x|0x)?[0-9A-Fa-f]*$')
+DATE_RE = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+DATETIME_RE = re.compile(
+    r'^(\d{4})-(\d{2})-(\d{2})[ T](\d{2}):(\d{2})(?::(\d{2}))?(?:\.(\d+))?\s*(Z|[+-]\d{2}:?\d{2})?$')
+LEGACY_DATETIME_FORMATS = ('%b %d %Y %I:%M%p', '%b %d %Y %I:%M:%S:%f%p')
+BOOLEAN_VALUES = {'1': 't', '0': 'f', 'true': 't', 'false': 'f', 't': 't', 'f': 'f'}
+
+
+class Reject(ValueError):
+    """A field that cannot be converted to its column type."""
+
+
+# ============================================================================
+# FIELD CONVERSION
+# ============================================================================
+
+def _base_type(pg_type: str) -> str:
+    return re.sub(r'\(.*', '', pg_type or 'TEXT').strip().upper()
+
+
+def convert_datetime(value: str, with_zone: bool) -> str:
+    """
+    ISO 8601 text for PostgreSQL. An offset is kept for TIMESTAMPTZ; for
+    TIMESTAMP the value is shifted to UTC first (PostgreSQL would silently
+    drop the offset). Impossible dates (2024-13-01) are a Reject.
+    """
+    m = DATETIME_RE.match(value)
+    if m:
+        year, month, day, hour, minute, second, frac, zone = m.groups()
+        try:
+            dt = datetime(int(year), int(month), int(day), int(hour), int(minute), int(second or 0))
+            if frac:
+                # datetime2(7) carries 100 ns ticks; PostgreSQL keeps microseconds.
+                # Half a microsecond rounds up, as CAST(... AS DATETIME2(6)) does.
+                scale = 10 ** max(len(frac) - 6, 0)
+                micro, rest = divmod(int(frac.ljust(6, '0')), scale)
+                dt += timedelta(microseconds=micro + (2 * rest >= scale))
+            if zone and not with_zone and zone != 'Z':
+                sign = -1 if zone[0] == '-' else 1
+                digits = zone[1:].replace(':', '')
+                dt -= sign * timedelta(hours=int(digits[:2]), minutes=int(digits[2:]))
+        except (ValueError, OverflowError) as e:
+            raise Reject(f"not a datetime: {value!r} ({e})") from None
+    else:
+        for fmt in LEGACY_DATETIME_FORMATS:
+            try:
+                dt = datetime.strptime(' '.join(value.split()), fmt)
+                break
+            except ValueError:
+                continue
+        else:
+            raise Reject(f"not a datetime: {value!r}")
+        zone = None
+    text = dt.isoformat(sep=' ', timespec='microseconds' if dt.microsecond else 'seconds')
+    if zone and with_zone:
+        text += zone if zone == 'Z' or ':' in zone else f"{zone[:3]}:{zone[3:]}"
+    return text
+
+
+def make_converter(pg_type: str, transform: Optional[str]):
+    """Return value → converted text (raises Reject) for one column."""
+    base = _base_type(pg_type)
+    if transform == 'hex_to_bytea' or base == 'BYTEA':
+        def bytea(v):
+            if not HEX_RE.match(v):
+                raise Reject(f"not hex: {v[:40]!r}")
+            return '\\x' + v[2:] if v[:2] in ('\\x', '0x') else '\\x' + v
+        return bytea
+    if base == 'BOOLEAN':
+        def boolean(v):
+            try:
+                return BOOLEAN_VALUES[v.strip().lower()]
+            except KeyError:
+                raise Reject(f"not a bit: {v!r}") from None
+        return boolean
+    if base in ('SMALLINT', 'INTEGER', 'BIGINT', 'INT', 'INT2', 'INT4', 'INT8'):
+        def integer(v):
+            v = v.strip()
+            if not INTEGER_RE.match(v):
+                raise Reject(f"not an integer: {v!r}")
+            return v
+        return integer
+    if base in ('NUMERIC', 'DECIMAL', 'REAL', 'DOUBLE PRECISION', 'FLOAT', 'MONEY'):
+        def numeric(v):
+            v = v.strip()
+            if not NUMERIC_RE.match(v):
+                raise Reject(f"not a number: {v!r}")
+            return v
+        return numeric
+    if base in ('TIMESTAMP', 'TIMESTAMPTZ', 'TIMESTAMP WITH TIME ZONE', 'TIMESTAMP WITHOUT TIME ZONE'):
+        with_zone = base in ('TIMESTAMPTZ', 'TIMESTAMP WITH TIME ZONE')
+        return lambda v: convert_datetime(v.strip(), with_zone)
+    if base == 'DATE':
+        def date(v):
+            v = v.strip()
+            if DATE_RE.match(v):
+                try:
+                    datetime.strptime(v, '%Y-%m-%d')
+                except ValueError:
+                    raise Reject(f"not a date: {v!r}") from None
+                return v
+            return convert_datetime(v, True)[:10]   # the calendar date as written
+        return date
+    if base == 'UUID':
+        def uuid(v):
+            v = v.strip().strip('{}')
+            if not UUID_RE.match(v):
+                raise Reject(f"not a uuid: {v!r}")
+            return v.lower()
+        return uuid
+    length = re.search(r'\((\d+)\)', pg_type or '')
+    if base in TEXT_TYPES and length:
+        limit = int(length.group(1))
+
+        def bounded(v):
+            if len(v) > limit:
+                raise Reject(f"{len(v)} characters, column allows {limit}")
+            return v
+        return bounded
+    return None  # unbounded text: no conversion beyond decoding
+
+
+def csv_field(value: Optional[str]) -> str:
+    """One PostgreSQL CSV field: NULL unquoted empty, everything else quoted when needed."""
+    if value is None:
+        return ''
+    if value == '' or value == '\\.' or any(c in value for c in ',"\n\r'):
+        return '"' + value.replace('"', '""') + '"'
+    return value
+
+
+# ============================================================================
+# TABLE SPEC
+# ============================================================================
+
+def table_from_path(path: str) -> Optional[str]:
+    m = CSV_PATTERN.match(os.path.basename(path))
+    return m.group(2) if m else None
+
+
+def table_spec(table: str, model, manifest_dir: str) -> List[dict]:
+    """
+    bcp fields in file order: [{'name', 'type', 'skip', 'transform', 'text'}].
+    Field order/skips from the COPY manifest, types from 14.create-table.
+    """
+    info = model.table(table)
+    if info is None:
+        raise KeyError(f"table {table} not found in {PGSQL_TABLE_DIR}")
+    types = {c['name'].lower(): c['type'] for c in info['columns']}
+
+    manifest_path = os.path.join(manifest_dir, f"{table}.json")
+    if os.path.exists(manifest_path):
+        with open(manifest_path, 'r') as f:
+            manifest = json.load(f)
+        fields = [{'name': fld['target_name'],
+                   'type': types.get((fld['target_name'] or '').lower(), fld.get('target_type')),
+                   'skip': fld['skip'],
+                   'transform': fld.get('transform')} for fld in manifest['fields']]
+    else:
+        fields = [{'name': c['name'], 'type': c['type'], 'skip': False, 'transform': None}
+                  for c in info['columns']]
+    for fld in fields:
+        fld['text'] = _base_type(fld['type']) in TEXT_TYPES
+    return fields
+
+
+# ============================================================================
+# STREAMING
+# ============================================================================
+
+class Transcoder:
+    """Convert one bcp file record by record."""
+
+    def __init__(self, fields: List[dict], delimiter: str = ',', fallback_encoding: str = DEFAULT_FALLBACK_ENCODING):
+        self.fields = fields
+        self.delimiter = delimiter.encode()
+        self.fallback_encoding = fallback_encoding
+        self.converters = [make_converter(f['type'], f['transform']) for f in fields]
+        self.text_positions = [i for i, f in enumerate(fields) if f['text']]
+        self.stats = {'records': 0, 'written': 0, 'rejected': 0, 'merged_lines': 0,
+                      'repaired_delimiters': 0, 'nul_bytes': 0, 'recoded': {}}
+
+    def _decode(self, raw: bytes, position: int) -> Optional[str]:
+        if raw == b'':
+            return None                    # bcp -c NULL
+        if raw == b'\x00':
+            return ''                      # bcp -c empty string
+        if b'\x00' in raw:
+            self.stats['nul_bytes'] += raw.count(b'\x00')
+            raw = raw.replace(b'\x00', b'')
+        try:
+            return raw.decode('utf-8')
+        except UnicodeDecodeError:
+            name = self.fields[position]['name']
+            self.stats['recoded'][name] = self.stats['recoded'].get(name, 0) + 1
+            return raw.decode(self.fallback_encoding, errors='replace')
+
+    def _convert(self, parts: List[bytes]) -> List[Optional[str]]:
+        out = []
+        for i, raw in enumerate(parts):
+            if self.fields[i]['skip']:
+                continue
+            value = self._decode(raw, i)
+            if value is not None and self.converters[i] is not None:
+                value = self.converters[i](value)
+            out.append(value)
+        return out
+
+    def _repair_delimiters(self, parts: List[bytes]) -> List[Optional[str]]:
+        """
+        Fold surplus fields into the one text column that makes every other
+        field valid. When several columns fit, prefer the one whose absorbed
+        delimiters read like prose (followed by a space); otherwise reject.
+        """
+        extra = len(parts) - len(self.fields)
+        valid = []
+        for pos in self.text_positions:
+            absorbed = parts[pos:pos + extra + 1]
+            candidate = parts[:pos] + [self.delimiter.join(absorbed)] + parts[pos + extra + 1:]
+            try:
+                converted = self._convert(candidate)
+            except Reject:
+                continue
+            prose = sum(1 for piece in absorbed[1:] if piece[:1].isspace())
+            valid.append((prose, converted))
+        best = max((prose for prose, _ in valid), default=None)
+        winners = [converted for prose, converted in valid if prose == best]
+        if not winners:
+            raise Reject(f"{len(parts)} fields, expected {len(self.fields)}")
+        if len(winners) > 1:
+            raise Reject(f"{extra} extra delimiter(s) fit more than one text column")
+        self.stats['repaired_delimiters'] += 1
+        return winners[0]
+
+    def records(self, stream, rejects):
+        """Yield converted records (lists of str/None) from a binary bcp stream."""
+        expected = len(self.fields)
+        line_no = 0
+        pending = None
+        pending_start = 0
+        pending_lines = 0
+        for line in stream:
+            line_no += 1
+            line = line.rstrip(b'\n').rstrip(b'\r')
+            if line_no == 1 and line.startswith(b'\xef\xbb\xbf'):
+                line = line[3:]
+            if pending is not None and len(line.split(self.delimiter)) == expected:
+                # A complete record: whatever was pending was short, not continued
+                self.stats['records'] += 1
+                self.stats['rejected'] += 1
+                rejects.write(f"{pending_start}\t{len(pending.split(self.delimiter))} fields, expected "
+                              f"{expected}\t{pending.decode('utf-8', errors='replace')!r}\n")
+                pending = None
+            if pending is None:
+                pending, pending_start, pending_lines = line, line_no, 1
+            else:
+                pending += b'\n' + line
+                pending_lines += 1
+            parts = pending.split(self.delimiter)
+            if len(parts) < expected and pending_lines < MAX_MERGE_LINES:
+                continue   # embedded newline: the record continues on the next line
+            record, pending = pending, None
+            self.stats['records'] += 1
+            self.stats['merged_lines'] += pending_lines - 1
+            try:
+                if len(parts) == expected:
+                    yield self._convert(parts)
+                elif len(parts) > expected and self.text_positions:
+                    yield self._repair_delimiters(parts)
+                else:
+                    raise Reject(f"{len(parts)} fields, expected {expected}")
+            except Reject as e:
+                self.stats['rejected'] += 1
+                rejects.write(f"{pending_start}\t{e}\t{record.decode('utf-8', errors='replace')!r}\n")
+        if pending is not None:
+            self.stats['records'] += 1
+            self.stats['rejected'] += 1
+            rejects.write(f"{pending_start}\ttruncated record at end of file\t"
+                          f"{pending.decode('utf-8', errors='replace')!r}\n")
+
+
+def read_range(stream, offset: int, length: Optional[int]):
+    """Lines of a binary stream from `offset`, stopping after `length` bytes."""
+    if offset:
+        stream.seek(offset)             # offset 0 also works on a pipe (/dev/stdin)
+    if length is None:
+        yield from stream
+        return
+    remaining = length
+    for line in stream:
+        if remaining <= 0:
+            return
+        yield line[:remaining]
+        remaining -= len(line)
+
+
+def transcode_file(csv_path: str, output: Optional[str], table: Optional[str], split: int,
+                   manifest_dir: str, delimiter: str, fallback_encoding: str,
+                   byte_range: Tuple[int, Optional[int]] = (0, None),
+                   reject_path: Optional[str] = None) -> dict:
+    """Transcode one file to `output` (file, directory for --split, or None = stdout)."""
+    table = table or table_from_path(csv_path)
+    if not table:
+        raise KeyError(f"cannot tell the table from {os.path.basename(csv_path)} (use --table)")
+    fields = table_spec(table, load_model([PGSQL_TABLE_DIR]), manifest_dir)
+    coder = Transcoder(fields, delimiter, fallback_encoding)
+
+    if split > 1:
+        os.makedirs(output, exist_ok=True)
+        outs = [open(os.path.join(output, f"part-{i}"), 'w', encoding='utf-8', newline='') for i in range(split)]
+        reject_path = reject_path or os.path.join(output, 'rejects')
+    elif output:
+        outs = [open(output, 'w', encoding='utf-8', newline='')]
+        reject_path = reject_path or output + '.rejects'
+    else:
+        outs = [sys.stdout]
+        reject_path = reject_path or csv_path + '.rejects'
+
+    try:
+        with open(csv_path, 'rb') as src, open(reject_path, 'w', encoding='utf-8') as rejects:
+            for n, record in enumerate(coder.records(read_range(src, *byte_range), rejects)):
+                outs[n % len(outs)].write(','.join(csv_field(v) for v in record) + '\n')
+                coder.stats['written'] += 1
+    finally:
+        for out in outs:
+            if out is not sys.stdout:
+                out.close()
+    if coder.stats['rejected'] == 0:
+        os.remove(reject_path)
+        reject_path = None
+    return {'table': table, 'input': csv_path, 'output': output, 'rejects': reject_path, **coder.stats}
+
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Stream-convert bcp -c CSV exports for PostgreSQL COPY.")
+    parser.add_argument('csv', nargs='+', help="bcp CSV file(s)")
+    parser.add_argument('-o', '--output-dir',
+                        help="Write <name>.csv per input here (default with one input: stdout)")
+    parser.add_argument('--table', help="Target table when the file name is not ##perseus_tier_N_<table>.csv")
+    parser.add_argument('--split', type=int, default=1,
+                        help="Deal records round-robin into N part files in --output-dir")
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1,
+                        help="Files transcoded in parallel (default: %(default)s)")
+    parser.add_argument('--manifest-dir', default=DEFAULT_MANIFEST_DIR,
+                        help="copy-manifests directory from convert_tables.py (default: %(default)s)")
+    parser.add_argument('--delimiter', default=',', help="bcp field terminator (default: ',')")
+    parser.add_argument('--fallback-encoding', default=DEFAULT_FALLBACK_ENCODING,
+                        help="Decoding for values that are not valid UTF-8 (default: %(default)s)")
+    parser.add_argument('--byte-range', metavar='OFFSET:LENGTH',
+                        help="Only transcode LENGTH bytes from OFFSET (one chunk; one CSV only)")
+    parser.add_argument('--rejects', help="Rejects file (default: <output>.rejects, or <csv>.rejects "
+                                          "on stdout; one CSV only)")
+    parser.add_argument('--summary', help="Write per-file statistics as JSON to this file")
+    return parser.parse_args(argv)
+
+
+def parse_byte_range(value: Optional[str]) -> Tuple[int, Optional[int]]:
+    """'OFFSET:LENGTH' → (offset, length); None → whole file."""
+    if not value:
+        return 0, None
+    offset, _, length = value.partition(':')
+    return int(offset), int(length)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    if args.split > 1 and (len(args.csv) != 1 or not args.output_dir):
+        print("ERROR: --split needs exactly one CSV and --output-dir", file=sys.stderr)
+        return 2
+    if len(args.csv) > 1 and not args.output_dir:
+        print("ERROR: several CSVs need --output-dir", file=sys.stderr)
+        return 2
+    if len(args.csv) > 1 and (args.byte_range or args.rejects):
+        print("ERROR: --byte-range / --rejects need exactly one CSV", file=sys.stderr)
+        return 2
+    try:
+        byte_range = parse_byte_range(args.byte_range)
+    except ValueError:
+        print(f"ERROR: --byte-range must be OFFSET:LENGTH, got {args.byte_range!r}", file=sys.stderr)
+        return 2
+
+    jobs: List[Tuple[str, Optional[str]]] = []
+    for path in args.csv:
+        if args.split > 1:
+            jobs.append((path, args.output_dir))
+        elif args.output_dir:
+            os.makedirs(args.output_dir, exist_ok=True)
+            jobs.append((path, os.path.join(args.output_dir, os.path.basename(path))))
+        else:
+            jobs.append((path, None))
+
+    common = (args.table, args.split, args.manifest_dir, args.delimiter, args.fallback_encoding)
+    results: List[Dict] = []
+    try:
+        if len(jobs) > 1 and args.jobs > 1:
+            with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+                futures = [pool.submit(transcode_file, path, out, *common) for path, out in jobs]
+                results = [f.result() for f in futures]
+        else:
+            results = [transcode_file(path, out, *common, byte_range, args.rejects) for path, out in jobs]
+    except (KeyError, OSError) as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 2
+    except Exception as e:
+        # Never exit 1 (what an uncaught exception would do) on a half-written output
+        print(f"ERROR: {type(e).__name__}: {e}", file=sys.stderr)
+        return 2
+
+    for r in results:
+        recoded = sum(r['recoded'].values())
+        print(f"{r['table']}: {r['written']:,}/{r['records']:,} records, {r['rejected']:,} rejected, "
+              f"{r['merged_lines']:,} newline merges, {r['repaired_delimiters']:,} delimiter repairs, "
+              f"{r['nul_bytes']:,} NUL bytes dropped, {recoded:,} values recoded", file=sys.stderr)
+        if r['rejects']:
+            print(f"  rejects: {r['rejects']}", file=sys.stderr)
+    if args.summary:
+        with open(args.summary, 'w') as f:
+            json.dump(results, f, indent=2)
+    return EXIT_REJECTS if any(r['rejected'] for r in results) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
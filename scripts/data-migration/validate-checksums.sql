@@ -5,6 +5,8 @@
 -- Purpose: Validate data integrity via MD5 checksums (sample-based)
 -- Prerequisites: Data loaded via load-data.sh, identical data exported from SQL Server
 -- Usage: psql -U perseus_admin -d perseus_dev -f validate-checksums.sql
+-- Full coverage: checksum_validator.py hashes every row on both PostgreSQL and
+--   SQL Server, compares per key-range bucket and reports the rows that differ
 -- ============================================================================
 
 \set ON_ERROR_STOP on
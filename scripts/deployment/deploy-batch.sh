@@ -15,7 +15,7 @@
 #   <files>           One or more SQL files to deploy
 #   --dir <path>      Deploy all .sql files in directory (recursive)
 #   --list <file>     Deploy files listed in text file (one per line)
-#   --all             Deploy all SQL files in dependency order (0-21)
+#   --all             Deploy all SQL files in dependency order (11-21)
 #   --continue        Continue on error (default: stop on first failure)
 #   --skip-syntax     Skip syntax validation (not recommended)
 #   --skip-deps       Skip dependency validation (not recommended)
@@ -75,6 +75,12 @@ DB_PORT="${DB_PORT:-5432}"
 #PGPASSWORD_FILE="${PGPASSWORD_FILE:-${PROJECT_ROOT}/infra/database/.secrets/postgres_password.txt}"
 PGPASSWORD_FILE="${PGPASSWORD_FILE:-/Users/pierre.ribeiro/workspace/sharing/sqlserver-to-postgresql-migration/perseus-database/.secrets/postgres_password.txt}"
 DOCKER_CONTAINER="${DOCKER_CONTAINER:-perseus-postgres-dev}"
+# Partitioned tables (convert_tables.py --partition). --all deploys their
+# generated DDL before 14.create-table, whose CREATE TABLE IF NOT EXISTS then
+# keeps the partitioned parent, and their keys/indexes after the primary keys
+# and before the foreign keys of 17.create-constraint
+GENERATED_TABLE_DIR="${GENERATED_TABLE_DIR:-${PROJECT_ROOT}/source/building/pgsql/generated/14.create-table}"
+PARTITION_INDEX_DIR="${PARTITION_INDEX_DIR:-${GENERATED_TABLE_DIR}/partition-indexes}"
 
 # Execution mode
 USE_DOCKER=false
@@ -172,7 +178,7 @@ Options:
   <files>           One or more SQL files to deploy
   --dir <path>      Deploy all .sql files in directory (recursive)
   --list <file>     Deploy files listed in text file (one per line)
-  --all             Deploy all SQL files in dependency order (0-21)
+  --all             Deploy all SQL files in dependency order (11-21)
   --continue        Continue on error (default: stop on first failure)
   --skip-syntax     Skip syntax validation (not recommended)
   --skip-deps       Skip dependency validation (not recommended)
@@ -564,28 +570,55 @@ collect_all_files_in_order() {
 
     log_info "Collecting all SQL files in dependency order"
 
-    # Deployment order (0-21 directories)
+    # Deployment order (refactored/ directories; the drop-* steps are not part of --all)
     local order_dirs=(
-        "10. create-extension"
-        "11. create-schema"
-        "12. create-type"
-        "13. create-domain"
-        "14. create-table"
-        "15. create-view"
-        "16. create-index"
-        "17. create-constraint-pk"
-        "18. create-constraint-fk"
-        "19. create-function"
-        "20. create-procedure"
-        "21. create-trigger"
+        "11.create-database"
+        "12.create-type"
+        "13.create-domain"
+        "14.create-table"
+        "15.create-view"
+        "16.create-index"
+        "17.create-constraint"
+        "18.create-foreign-key-constraint"
+        "19.create-function"
+        "20.create-procedure"
+        "21.create-trigger"
     )
 
+    local partition_indexes=()
+    if [[ -d "${PARTITION_INDEX_DIR}" ]]; then
+        while IFS= read -r -d '' file; do
+            partition_indexes+=("${file}")
+        done < <(find "${PARTITION_INDEX_DIR}" -type f -name "*.sql" -print0 | sort -z)
+    fi
+
     for order_dir in "${order_dirs[@]}"; do
         local full_path="${refactored_dir}/${order_dir}"
+        if [[ "${order_dir}" == "14.create-table" && ${#partition_indexes[@]} -gt 0 ]]; then
+            log_info "Processing: partitioned tables (${GENERATED_TABLE_DIR})"
+            for file in "${partition_indexes[@]}"; do
+                local table_ddl="${GENERATED_TABLE_DIR}/$(basename "${file}")"
+                if [[ -f "${table_ddl}" ]]; then
+                    files_array+=("${table_ddl}")
+                else
+                    log_warning "Partitioned table DDL not found (skipping): ${table_ddl}"
+                fi
+            done
+        fi
         if [[ -d "${full_path}" ]]; then
             log_info "Processing: ${order_dir}"
             while IFS= read -r -d '' file; do
+                case "$(basename "${file}")" in
+                    *test-cases.sql)
+                        continue            # expected to fail: TEST environment only
+                        ;;
+                esac
                 files_array+=("${file}")
+                if [[ "${order_dir}" == "17.create-constraint" && "$(basename "${file}")" == *primary-key* \
+                      && ${#partition_indexes[@]} -gt 0 ]]; then
+                    log_info "Processing: partition indexes (${PARTITION_INDEX_DIR})"
+                    files_array+=("${partition_indexes[@]}")
+                fi
             done < <(find "${full_path}" -type f -name "*.sql" -print0 | sort -z)
         fi
     done
@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+FK dependency graph for the Perseus schema.
+
+Loads foreign keys straight from DDL, either the SQL Server originals
+(source/original/sqlserver/13.create-foreign-key-constraint/*.sql) or the
+refactored PostgreSQL file
+(source/building/pgsql/refactored/17.create-constraint/02-foreign-key-constraints.sql),
+and answers ordering questions in O(V + E):
+- Kahn topological leveling (level = longest parent chain)
+- Tarjan strongly connected components, so FK cycles are reported instead
+  of silently mislevelled; self-references are tracked separately
+- parent → children reverse index
+- weighted critical path (e.g. by row count) through the load order
+
+Usage:
+    import fk_graph
+    graph = fk_graph.FKGraph(fk_graph.load_fk_constraints(path))
+    graph.levels(), graph.cycles(), graph.critical_path(weights)
+
+    python3 scripts/fk_graph.py [FK_DDL_PATH]   # print a short summary
+"""
+
+import os
+import re
+import sys
+from collections import defaultdict, deque
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SQLSERVER_FK_DIR = os.path.join(REPO_ROOT, "source/original/sqlserver/13.create-foreign-key-constraint")
+PGSQL_FK_FILE = os.path.join(
+    REPO_ROOT, "source/building/pgsql/refactored/17.create-constraint/02-foreign-key-constraints.sql")
+
+_NAME = r'\[?"?(\w+)"?\]?'
+FK_STATEMENT = re.compile(
+    rf'ALTER\s+TABLE\s+(?:ONLY\s+)?(?:{_NAME}\.)?{_NAME}\s+'
+    r'(?:WITH\s+(?:NO)?CHECK\s+)?'
+    rf'ADD\s+(?:CONSTRAINT\s+{_NAME}\s+)?'
+    r'FOREIGN\s+KEY\s*\(([^)]+)\)\s*'
+    rf'REFERENCES\s+(?:{_NAME}\.)?{_NAME}\s*\(([^)]+)\)'
+    r'((?:\s+ON\s+(?:DELETE|UPDATE)\s+(?:CASCADE|SET\s+NULL|SET\s+DEFAULT|NO\s+ACTION|RESTRICT))*)',
+    re.IGNORECASE)
+FK_ACTION = re.compile(r'ON\s+(DELETE|UPDATE)\s+(CASCADE|SET\s+NULL|SET\s+DEFAULT|NO\s+ACTION|RESTRICT)',
+                       re.IGNORECASE)
+
+
+def _strip_comments(sql):
+    """Remove -- and /* */ comments so commented-out FKs are not loaded."""
+    sql = re.sub(r'/\*.*?\*/', ' ', sql, flags=re.DOTALL)
+    return re.sub(r'--[^\n]*', '', sql)
+
+
+def _columns(col_list):
+    return [c.strip().strip('[]"') for c in col_list.split(',')]
+
+
+def parse_fk_sql(sql, default_schema='dbo'):
+    """Extract every FOREIGN KEY constraint from a block of T-SQL or PostgreSQL DDL."""
+    fks = []
+    for m in FK_STATEMENT.finditer(_strip_comments(sql)):
+        actions = {kind.upper(): ' '.join(action.upper().split())
+                   for kind, action in FK_ACTION.findall(m.group(8))}
+        fks.append({
+            'child_schema': m.group(1) or default_schema,
+            'child_table': m.group(2),
+            'parent_schema': m.group(5) or default_schema,
+            'parent_table': m.group(6),
+            'fk_name': m.group(3),
+            'child_cols': _columns(m.group(4)),
+            'parent_cols': _columns(m.group(7)),
+            'on_delete': actions.get('DELETE'),
+            'on_update': actions.get('UPDATE'),
+        })
+    return fks
+
+
+def load_fk_constraints(path=PGSQL_FK_FILE):
+    """Load FKs from one DDL file or from every *.sql file in a directory."""
+    if os.path.isdir(path):
+        files = sorted(os.path.join(path, f) for f in os.listdir(path) if f.endswith('.sql'))
+    else:
+        files = [path]
+    fks = []
+    for filepath in files:
+        with open(filepath, 'r', encoding='utf-8-sig') as f:
+            fks.extend(parse_fk_sql(f.read()))
+    return fks
+
+
+def table_key(schema, table, qualified=True):
+    """Graph node name for a table: 'schema.table' or just 'table'."""
+    return f"{schema}.{table}" if qualified else table
+
+
+class FKGraph:
+    """
+    Directed graph with an edge parent → child for every FK between two
+    different tables. `parents` is the adjacency list keyed by child (the
+    fk_adjacency_list.json shape), `children` the reverse index.
+    """
+
+    def __init__(self, fks, qualified=True, tables=()):
+        self.fks = list(fks)
+        self.parents = defaultdict(list)
+        self.children = defaultdict(list)
+        self.self_references = []
+        self.tables = set(tables)
+        self._parent_set = defaultdict(set)
+        self._child_set = defaultdict(set)
+
+        for fk in self.fks:
+            child = table_key(fk['child_schema'], fk['child_table'], qualified)
+            parent = table_key(fk['parent_schema'], fk['parent_table'], qualified)
+            self.tables.update((child, parent))
+            self.parents[child].append({**fk, 'parent_table': parent, 'child_table': child})
+            self.children[parent].append({**fk, 'parent_table': parent, 'child_table': child})
+            if child == parent:
+                self.self_references.append({**fk, 'table': child})
+            else:
+                self._parent_set[child].add(parent)
+                self._child_set[parent].add(child)
+
+    @classmethod
+    def from_adjacency(cls, adjacency_list):
+        """Build from fk_adjacency_list.json ({child: [{parent_table, ...}]})."""
+        fks = []
+        for child, fk_list in adjacency_list.items():
+            c_schema, _, c_table = child.rpartition('.')
+            for fk in fk_list:
+                p_schema, _, p_table = fk['parent_table'].rpartition('.')
+                fks.append({**fk, 'child_schema': c_schema, 'child_table': c_table,
+                            'parent_schema': p_schema, 'parent_table': p_table})
+        return cls(fks, qualified=all('.' in t for t in adjacency_list))
+
+    def parents_of(self, table):
+        """Distinct parent tables (self-references excluded)."""
+        return self._parent_set.get(table, set())
+
+    def children_of(self, table):
+        """Distinct child tables (self-references excluded)."""
+        return self._child_set.get(table, set())
+
+    def roots(self):
+        """Tables with no FK to another table."""
+        return sorted(t for t in self.tables if not self._parent_set.get(t))
+
+    def leaves(self):
+        """Tables no other table references."""
+        return sorted(t for t in self.tables if not self._child_set.get(t))
+
+    def strongly_connected_components(self):
+        """Tarjan's algorithm (iterative). Returns components in reverse topological order."""
+        index = {}
+        lowlink = {}
+        on_stack = set()
+        stack = []
+        components = []
+        counter = 0
+
+        for start in sorted(self.tables):
+            if start in index:
+                continue
+            work = [(start, iter(sorted(self._child_set.get(start, ()))))]
+            index[start] = lowlink[start] = counter
+            counter += 1
+            stack.append(start)
+            on_stack.add(start)
+            while work:
+                node, successors = work[-1]
+                advanced = False
+                for succ in successors:
+                    if succ not in index:
+                        index[succ] = lowlink[succ] = counter
+                        counter += 1
+                        stack.append(succ)
+                        on_stack.add(succ)
+                        work.append((succ, iter(sorted(self._child_set.get(succ, ())))))
+                        advanced = True
+                        break
+                    if succ in on_stack:
+                        lowlink[node] = min(lowlink[node], index[succ])
+                if advanced:
+                    continue
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+                if lowlink[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(sorted(component))
+        return components
+
+    def cycles(self):
+        """FK cycles between different tables (SCCs with more than one table)."""
+        return [c for c in self.strongly_connected_components() if len(c) > 1]
+
+    def _condensation(self):
+        """Map each table to its SCC id and build the acyclic component graph."""
+        components = self.strongly_connected_components()
+        component_of = {t: i for i, comp in enumerate(components) for t in comp}
+        comp_children = defaultdict(set)
+        for parent, kids in self._child_set.items():
+            for child in kids:
+                if component_of[parent] != component_of[child]:
+                    comp_children[component_of[parent]].add(component_of[child])
+        return components, component_of, comp_children
+
+    def topological_components(self):
+        """
+        Kahn's algorithm over the condensation: returns (components in load
+        order, {component id: level}). Tables in one cycle share a component.
+        """
+        components, _, comp_children = self._condensation()
+        indegree = [0] * len(components)
+        for kids in comp_children.values():
+            for k in kids:
+                indegree[k] += 1
+        level = {i: 0 for i in range(len(components))}
+        queue = deque(sorted((i for i, d in enumerate(indegree) if d == 0),
+                             key=lambda i: components[i]))
+        order = []
+        while queue:
+            comp = queue.popleft()
+            order.append(comp)
+            for kid in sorted(comp_children.get(comp, ()), key=lambda i: components[i]):
+                level[kid] = max(level[kid], level[comp] + 1)
+                indegree[kid] -= 1
+                if indegree[kid] == 0:
+                    queue.append(kid)
+        return [components[i] for i in order], {tuple(components[i]): level[i] for i in order}
+
+    def levels(self):
+        """{table: level}; level 0 has no parents, level n is one past its deepest parent."""
+        _, comp_levels = self.topological_components()
+        return {t: lvl for comp, lvl in comp_levels.items() for t in comp}
+
+    def topological_order(self):
+        """Tables with every parent before its children (cycle members kept together)."""
+        order, _ = self.topological_components()
+        return [t for comp in order for t in comp]
+
+    def critical_path(self, weights=None):
+        """
+        Heaviest root-to-leaf chain: the sequence of loads that can never run
+        in parallel. `weights` maps table → cost (default 1 per table).
+        Returns (total weight, [tables in load order]).
+        """
+        weights = weights or {}
+        order, _ = self.topological_components()
+        best = {}
+        via = {}
+        for comp in order:
+            cost = sum(weights.get(t, 1) for t in comp)
+            head = comp[0]
+            prev = max((best[p] for p in self._parents_of_component(comp)), default=None,
+                       key=lambda item: item[0])
+            best_parent = None
+            if prev is not None:
+                best_parent = prev[1]
+            total = cost + (prev[0] if prev else 0)
+            for t in comp:
+                best[t] = (total, head)
+            via[head] = (comp, best_parent)
+        if not best:
+            return 0, []
+        total, head = max(best.values(), key=lambda item: item[0])
+        path = []
+        while head is not None:
+            comp, parent_head = via[head]
+            path[:0] = comp
+            head = parent_head
+        return total, path
+
+    def _parents_of_component(self, comp):
+        members = set(comp)
+        return {p for t in comp for p in self._parent_set.get(t, ()) if p not in members}
+
+    def descendants(self, table):
+        """Every table reachable through child FKs (transitive, excluding `table`)."""
+        seen = set()
+        queue = deque([table])
+        while queue:
+            for child in self._child_set.get(queue.popleft(), ()):
+                if child not in seen and child != table:
+                    seen.add(child)
+                    queue.append(child)
+        return seen
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    path = argv[0] if argv else PGSQL_FK_FILE
+    graph = FKGraph(load_fk_constraints(path))
+    levels = graph.levels()
+    total, path_tables = graph.critical_path()
+    print(f"FKs: {len(graph.fks)}  Tables: {len(graph.tables)}  "
+          f"Levels: 0-{max(levels.values(), default=0)}")
+    print(f"Self-references: {', '.join(sorted({s['table'] for s in graph.self_references})) or 'none'}")
+    for cycle in graph.cycles():
+        print(f"CYCLE: {' ↔ '.join(cycle)}")
+    print(f"Critical path ({total} tables): {' → '.join(path_tables)}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
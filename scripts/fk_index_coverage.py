@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+FK index coverage report.
+
+Cross-references FK child columns with every index PostgreSQL will have:
+CREATE [UNIQUE] INDEX statements in 16.create-index and PRIMARY KEY / UNIQUE
+constraints in 17.create-constraint. An FK is covered when its columns are
+the leading columns (in any order) of some index; otherwise every DELETE or
+key UPDATE on the parent - and every ON DELETE CASCADE - scans the child.
+
+Uncovered FKs are ranked by child table row count (assessment CSV) and the
+heap pages a parent-side check has to scan, and candidate
+CREATE INDEX CONCURRENTLY statements are emitted.
+
+Usage:
+    python3 scripts/fk_index_coverage.py [--fk-ddl PATH] [--index-ddl PATH ...]
+                                        [--output-sql FILE] [--format text|json]
+"""
+
+import argparse
+import json
+import os
+import sys
+
+from convert_tables import SIZE_CSV, load_table_sizes
+from fk_graph import PGSQL_FK_FILE, load_fk_constraints
+from schema_model import PGSQL_CONSTRAINT_DIR, PGSQL_INDEX_DIR, load_model
+
+INDEX_DIRS = [PGSQL_INDEX_DIR, PGSQL_CONSTRAINT_DIR]
+PAGE_BYTES = 8192
+
+
+def load_indexes(paths):
+    """Indexes, PRIMARY KEY and UNIQUE constraints from the cached schema model."""
+    return load_model(paths).indexes
+
+
+def covering_index(fk_cols, indexes):
+    """First non-partial index whose leading columns are exactly the FK columns (any order)."""
+    wanted = {c.lower() for c in fk_cols}
+    for index in indexes:
+        if not index['partial'] and set(index['columns'][:len(wanted)]) == wanted:
+            return index
+    return None
+
+
+def coverage(fks, indexes, sizes):
+    """Split FKs into covered / uncovered; uncovered ones carry a cost estimate."""
+    by_table = {}
+    for index in indexes:
+        by_table.setdefault(index['table'], []).append(index)
+
+    covered, uncovered = [], []
+    for fk in fks:
+        child = fk['child_table'].lower()
+        index = covering_index(fk['child_cols'], by_table.get(child, []))
+        entry = {
+            'fk_name': fk['fk_name'],
+            'child': child,
+            'child_cols': [c.lower() for c in fk['child_cols']],
+            'parent': fk['parent_table'].lower(),
+            'on_delete': fk.get('on_delete') or 'NO ACTION',
+        }
+        if index:
+            covered.append({**entry, 'index': index['name']})
+            continue
+        size = sizes.get(child, {'rows': 0, 'data_mb': 0.0})
+        pages = int(size['data_mb'] * 1048576 / PAGE_BYTES)
+        uncovered.append({
+            **entry,
+            'child_rows': size['rows'],
+            'child_mb': size['data_mb'],
+            # Every parent DELETE / key UPDATE re-checks the child; CASCADE and
+            # SET NULL also write to it, so weigh those double
+            'scan_pages_per_parent_change': pages,
+            'cost': pages * (2 if entry['on_delete'] in ('CASCADE', 'SET NULL') else 1),
+        })
+    uncovered.sort(key=lambda e: (-e['child_rows'], -e['cost'], e['child'], e['child_cols']))
+    return covered, uncovered
+
+
+def candidate_ddl(uncovered):
+    """One CREATE INDEX CONCURRENTLY per distinct uncovered (table, columns)."""
+    seen = set()
+    lines = []
+    for e in uncovered:
+        key = (e['child'], tuple(e['child_cols']))
+        if key in seen:
+            continue
+        seen.add(key)
+        name = f"idx_{e['child']}_{'_'.join(e['child_cols'])}"[:63]
+        lines.append(f"-- {e['fk_name']}: {e['child_rows']:,} rows, ON DELETE {e['on_delete']} → {e['parent']}")
+        lines.append(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name}")
+        lines.append(f"  ON perseus.{e['child']} ({', '.join(e['child_cols'])});")
+        lines.append("")
+    return "\n".join(lines)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Report FKs without a supporting index.")
+    parser.add_argument('--fk-ddl', default=PGSQL_FK_FILE,
+                        help="FK DDL file or directory (default: %(default)s)")
+    parser.add_argument('--index-ddl', nargs='+', default=INDEX_DIRS,
+                        help="Index / constraint DDL files or directories (default: 16.create-index "
+                             "and 17.create-constraint)")
+    parser.add_argument('--size-csv', default=SIZE_CSV,
+                        help="Row count / size assessment CSV (default: %(default)s)")
+    parser.add_argument('--output-sql',
+                        help="Write candidate CREATE INDEX CONCURRENTLY statements to this file")
+    parser.add_argument('--format', choices=('text', 'json'), default='text')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    fks = load_fk_constraints(args.fk_ddl)
+    indexes = load_indexes(args.index_ddl)
+    sizes = load_table_sizes(args.size_csv) if os.path.exists(args.size_csv) else {}
+    covered, uncovered = coverage(fks, indexes, sizes)
+    ddl = candidate_ddl(uncovered)
+
+    if args.output_sql:
+        with open(args.output_sql, 'w') as f:
+            f.write("-- Candidate FK indexes generated by scripts/fk_index_coverage.py\n")
+            f.write("-- CONCURRENTLY: run outside a transaction block, one statement at a time\n\n")
+            f.write(ddl)
+
+    if args.format == 'json':
+        print(json.dumps({'covered': covered, 'uncovered': uncovered}, indent=2))
+        return 0
+
+    print(f"FKs: {len(fks)}  Indexes parsed: {len(indexes)}  "
+          f"Covered: {len(covered)}  Uncovered: {len(uncovered)}")
+    print()
+    print(f"{'Child (columns)':<58} {'Rows':>13} {'MB':>10} {'ON DELETE':<10} Parent")
+    print(f"{'-' * 58} {'-' * 13} {'-' * 10} {'-' * 10} {'-' * 20}")
+    for e in uncovered:
+        label = f"{e['child']} ({', '.join(e['child_cols'])})"
+        print(f"{label:<58} {e['child_rows']:>13,} {e['child_mb']:>10,.1f} {e['on_delete']:<10} {e['parent']}")
+    if not args.output_sql and uncovered:
+        print()
+        print(ddl)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -4,15 +4,16 @@ Generate comprehensive PostgreSQL data dictionary for Perseus database migration
 Reads all table DDL files, constraints, and indexes to create complete documentation.
 """
 
-import re
 from pathlib import Path
 from typing import Dict
 
+import schema_model
+
 # Base paths
-BASE_DIR = Path("/Users/pierre.ribeiro/.claude-worktrees/US3-table-structures")
-TABLE_DIR = BASE_DIR / "source/building/pgsql/refactored/14. create-table"
-CONSTRAINT_DIR = BASE_DIR / "source/building/pgsql/refactored/17. create-constraint"
-INDEX_FILE = BASE_DIR / "source/building/pgsql/refactored/16. create-index/00-all-sqlserver-indexes-master.sql"
+BASE_DIR = Path(schema_model.REPO_ROOT)
+TABLE_DIR = Path(schema_model.PGSQL_TABLE_DIR)
+CONSTRAINT_DIR = Path(schema_model.PGSQL_CONSTRAINT_DIR)
+INDEX_FILE = Path(schema_model.PGSQL_INDEX_DIR) / "00-all-sqlserver-indexes-master.sql"
 OUTPUT_FILE = BASE_DIR / "docs/db-design/pgsql/perseus-data-dictionary.md"
 
 # Tier classification from dependency graph
@@ -54,57 +55,31 @@ FDW_DEMETER = ['demeter_barcodes', 'demeter_seed_vials']
 UTILITY_TABLES = ['perseus_table_and_row_counts', 'demeter_fdw_setup', 'hermes_fdw_setup']
 
 
-def parse_table_ddl(file_path: Path) -> Dict:
-    """Parse table DDL file to extract columns and metadata."""
-    with open(file_path, 'r') as f:
-        content = f.read()
-
-    table_name = file_path.stem
-    columns = []
+def load_model() -> schema_model.SchemaModel:
+    """Parsed tables, constraints and indexes (cached; only changed files are re-parsed)."""
+    return schema_model.load_model([TABLE_DIR, CONSTRAINT_DIR, INDEX_FILE])
 
-    # Extract columns from CREATE TABLE statement
-    in_table = False
-    for line in content.split('\n'):
-        line = line.strip()
 
-        if 'CREATE TABLE' in line:
-            in_table = True
-            continue
-
-        if in_table and line.startswith(');'):
-            break
-
-        if in_table and line and not line.startswith('--'):
-            # Parse column definition
-            match = re.match(r'(\w+)\s+(.+?)(?:,\s*)?$', line)
-            if match:
-                col_name = match.group(1)
-                col_def = match.group(2).rstrip(',')
-                columns.append((col_name, col_def))
-
-    return {
-        'name': table_name,
-        'columns': columns,
-        'file': file_path
-    }
-
-
-def read_all_tables() -> Dict[str, Dict]:
-    """Read all table DDL files."""
+def read_all_tables(model: schema_model.SchemaModel) -> Dict[str, Dict]:
+    """Tables keyed by DDL file name, with (column, definition) pairs."""
     tables = {}
 
-    for sql_file in sorted(TABLE_DIR.glob('*.sql')):
-        if sql_file.stem.startswith('.'):
+    for table in model.tables.values():
+        if Path(table['file']).parent != TABLE_DIR.relative_to(BASE_DIR):
             continue
 
-        table_data = parse_table_ddl(sql_file)
-        tables[table_data['name']] = table_data
+        name = Path(table['file']).stem
+        tables[name] = {
+            'name': name,
+            'columns': [(col['name'], col['definition']) for col in table['columns']],
+            'file': BASE_DIR / table['file']
+        }
 
-    return tables
+    return dict(sorted(tables.items()))
 
 
-def parse_constraints() -> Dict:
-    """Parse constraint files to extract PK, FK, UNIQUE, CHECK constraints."""
+def parse_constraints(model: schema_model.SchemaModel) -> Dict:
+    """PK, FK, UNIQUE and CHECK constraints from the constraint DDL."""
     constraints = {
         'pk': {},
         'fk': {},
@@ -112,53 +87,34 @@ def parse_constraints() -> Dict:
         'check': {}
     }
 
-    # Read primary keys
-    pk_file = CONSTRAINT_DIR / "01-primary-key-constraints.sql"
-    if pk_file.exists():
-        with open(pk_file, 'r') as f:
-            content = f.read()
-
-        for match in re.finditer(r'ALTER TABLE perseus\.(\w+)\s+ADD CONSTRAINT (\w+) PRIMARY KEY \(([^)]+)\)', content):
-            table_name = match.group(1)
-            constraint_name = match.group(2)
-            columns = match.group(3)
-            constraints['pk'][table_name] = {
-                'name': constraint_name,
-                'columns': columns
+    for index in model.indexes:
+        if index['kind'] == 'PRIMARY KEY':
+            constraints['pk'][index['table']] = {
+                'name': index['name'],
+                'columns': ', '.join(index['columns'])
             }
-
-    # Read foreign keys (sample - file is large)
-    fk_file = CONSTRAINT_DIR / "02-foreign-key-constraints.sql"
-    if fk_file.exists():
-        with open(fk_file, 'r') as f:
-            content = f.read()
-
-        # Parse FK constraints
-        for match in re.finditer(
-            r'ALTER TABLE perseus\.(\w+)\s+ADD CONSTRAINT (\w+)\s+FOREIGN KEY \(([^)]+)\)\s+'
-            r'REFERENCES perseus\.(\w+) \(([^)]+)\)\s+ON DELETE (\w+(?:\s+\w+)?)\s+ON UPDATE (\w+(?:\s+\w+)?)',
-            content
-        ):
-            child_table = match.group(1)
-            constraint_name = match.group(2)
-            child_col = match.group(3)
-            parent_table = match.group(4)
-            parent_col = match.group(5)
-            on_delete = match.group(6)
-            on_update = match.group(7)
-
-            if child_table not in constraints['fk']:
-                constraints['fk'][child_table] = []
-
-            constraints['fk'][child_table].append({
-                'name': constraint_name,
-                'column': child_col,
-                'parent_table': parent_table,
-                'parent_column': parent_col,
-                'on_delete': on_delete,
-                'on_update': on_update
+        elif index['kind'] == 'UNIQUE':
+            constraints['unique'].setdefault(index['table'], []).append({
+                'name': index['name'],
+                'columns': ', '.join(index['columns'])
             })
 
+    for fk in model.foreign_keys:
+        constraints['fk'].setdefault(fk['child_table'], []).append({
+            'name': fk['fk_name'],
+            'column': ', '.join(fk['child_cols']),
+            'parent_table': fk['parent_table'],
+            'parent_column': ', '.join(fk['parent_cols']),
+            'on_delete': fk['on_delete'] or 'NO ACTION',
+            'on_update': fk['on_update'] or 'NO ACTION'
+        })
+
+    for check in model.checks:
+        constraints['check'].setdefault(check['table'], []).append({
+            'name': check['name'],
+            'expression': check['expression']
+        })
+
     return constraints
 
 
@@ -167,12 +123,16 @@ def main():
     print("Generating Perseus PostgreSQL Data Dictionary...")
     print(f"Reading tables from: {TABLE_DIR}")
 
-    tables = read_all_tables()
-    constraints = parse_constraints()
+    model = load_model()
+    tables = read_all_tables(model)
+    constraints = parse_constraints(model)
 
     print(f"Found {len(tables)} tables")
     print(f"Found {len(constraints['pk'])} primary key constraints")
     print(f"Found {sum(len(v) for v in constraints['fk'].values())} foreign key constraints")
+    print(f"Found {sum(len(v) for v in constraints['unique'].values())} unique constraints")
+    print(f"Found {sum(len(v) for v in constraints['check'].values())} check constraints")
+    print(f"Found {len(model.indexes)} indexes ({model.parsed_files} DDL files re-parsed)")
 
     # Generate basic structure report
     print("\nTable counts by tier:")
@@ -1,120 +1,87 @@
 #!/usr/bin/env python3
 """
 Generate FK dependency tree showing parent-child relationships.
-Identifies root tables, leaf tables, and dependency levels.
+Identifies root tables, leaf tables, dependency levels, FK cycles and the
+critical path. Graph algorithms live in fk_graph.py (O(V + E)).
+
+Usage:
+    python3 scripts/generate_fk_dependency_tree.py [--fk-ddl PATH | --adjacency JSON] [--output MD]
 """
 
+import argparse
 import json
 from pathlib import Path
-from collections import defaultdict, deque
+from collections import defaultdict
+
+from fk_graph import REPO_ROOT, SQLSERVER_FK_DIR, FKGraph, load_fk_constraints
 
-def load_adjacency_list():
-    """Load FK adjacency list from JSON."""
-    filepath = Path('/Users/pierre.ribeiro/.claude-worktrees/US3-table-structures/fk_adjacency_list.json')
+def load_adjacency_list(filepath):
+    """Load FK adjacency list from JSON (written by parse_fk_constraints.py)."""
     with open(filepath, 'r') as f:
         return json.load(f)
 
-def build_reverse_index(adjacency_list):
+def build_reverse_index(graph):
     """Build reverse index: parent → [children]."""
-    reverse = defaultdict(list)
-    for child, fk_list in adjacency_list.items():
-        for fk in fk_list:
-            parent = fk['parent_table']
-            reverse[parent].append({
-                'child_table': child,
-                'fk_name': fk['fk_name'],
-                'child_cols': fk['child_cols'],
-                'parent_cols': fk['parent_cols'],
-                'on_delete': fk['on_delete'],
-                'on_update': fk['on_update']
-            })
-    return dict(reverse)
-
-def find_root_tables(adjacency_list, all_tables):
-    """Find tables with no FK dependencies (root tables)."""
-    child_tables = set(adjacency_list.keys())
-    return sorted(all_tables - child_tables)
+    return {parent: [{'child_table': fk['child_table'],
+                      'fk_name': fk['fk_name'],
+                      'child_cols': fk['child_cols'],
+                      'parent_cols': fk['parent_cols'],
+                      'on_delete': fk['on_delete'],
+                      'on_update': fk['on_update']} for fk in fks]
+            for parent, fks in graph.children.items()}
+
+def find_root_tables(graph):
+    """Find tables with no FK dependencies (root tables); self-references do not count."""
+    return graph.roots()
 
 def find_leaf_tables(reverse_index, all_tables):
     """Find tables that are never referenced (leaf tables)."""
     parent_tables = set(reverse_index.keys())
     return sorted(all_tables - parent_tables)
 
-def calculate_dependency_levels(adjacency_list, root_tables):
-    """Calculate dependency level for each table using BFS."""
-    levels = {}
-    queue = deque()
-
-    # Initialize with root tables at level 0
-    for root in root_tables:
-        levels[root] = 0
-        queue.append(root)
-
-    visited = set(root_tables)
-
-    while queue:
-        current = queue.popleft()
-        current_level = levels[current]
-
-        # Check if current table is a child of any table
-        if current in adjacency_list:
-            for fk in adjacency_list[current]:
-                parent = fk['parent_table']
-
-                # Calculate new level (max of parent's level + 1)
-                new_level = max(levels.get(parent, 0) + 1, current_level)
-
-                if current in levels:
-                    levels[current] = max(levels[current], new_level)
-                else:
-                    levels[current] = new_level
-
-    # Second pass: propagate levels correctly
-    changed = True
-    max_iterations = 100
-    iteration = 0
-
-    while changed and iteration < max_iterations:
-        changed = False
-        iteration += 1
-
-        for child, fk_list in adjacency_list.items():
-            max_parent_level = -1
-            for fk in fk_list:
-                parent = fk['parent_table']
-                if parent in levels:
-                    max_parent_level = max(max_parent_level, levels[parent])
-
-            new_level = max_parent_level + 1
-            if child not in levels or levels[child] < new_level:
-                levels[child] = new_level
-                changed = True
-
-    return levels
+def calculate_dependency_levels(graph):
+    """Dependency level per table (Kahn leveling; FK cycles share a level)."""
+    return graph.levels()
 
 def count_fk_references(reverse_index):
     """Count how many tables reference each parent."""
     return {parent: len(children) for parent, children in reverse_index.items()}
 
-def main():
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate the FK dependency tree report.")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument('--fk-ddl', default=SQLSERVER_FK_DIR,
+                        help="FK DDL directory or file to load directly (default: %(default)s)")
+    source.add_argument('--adjacency',
+                        help="fk_adjacency_list.json from parse_fk_constraints.py instead of DDL")
+    parser.add_argument('--output', default=str(Path(REPO_ROOT) / 'FK_DEPENDENCY_TREE.md'),
+                        help="Markdown report path (default: %(default)s)")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+
     # Load data
-    adjacency_list = load_adjacency_list()
+    if args.adjacency:
+        graph = FKGraph.from_adjacency(load_adjacency_list(args.adjacency))
+    else:
+        graph = FKGraph(load_fk_constraints(args.fk_ddl))
+    adjacency_list = graph.parents
 
     # Build reverse index
-    reverse_index = build_reverse_index(adjacency_list)
+    reverse_index = build_reverse_index(graph)
 
     # Get all unique tables
-    all_tables = set(adjacency_list.keys())
-    for fk_list in adjacency_list.values():
-        for fk in fk_list:
-            all_tables.add(fk['parent_table'])
+    all_tables = set(graph.tables)
 
     # Find root and leaf tables
-    root_tables = find_root_tables(adjacency_list, all_tables)
+    root_tables = find_root_tables(graph)
     leaf_tables = find_leaf_tables(reverse_index, all_tables)
 
     # Calculate dependency levels
-    levels = calculate_dependency_levels(adjacency_list, root_tables)
+    levels = calculate_dependency_levels(graph)
+    cycles = graph.cycles()
+    critical_length, critical_path = graph.critical_path()
 
     # Count references
     reference_counts = count_fk_references(reverse_index)
@@ -179,6 +146,29 @@ def main():
                 output.append(f"  - Cascades: {', '.join(cascades)}")
             output.append("")
 
+    # Cycles and self-references
+    output.append("## FK Cycles")
+    output.append(f"**Count:** {len(cycles)}")
+    output.append("")
+    for cycle in cycles:
+        output.append(f"- {' ↔ '.join(cycle)} (Level {levels[cycle[0]]}; load together, "
+                      f"one FK must be deferred or added after the load)")
+    output.append("")
+    self_refs = sorted({fk['table'] for fk in graph.self_references})
+    output.append("## Self-Referencing Tables")
+    output.append(f"**Count:** {len(self_refs)}")
+    output.append("")
+    for table in self_refs:
+        output.append(f"- **{table}** (rows must load parent-first, or add the FK after the load)")
+    output.append("")
+
+    # Critical path
+    output.append("## Critical Path (Longest Dependency Chain)")
+    output.append(f"**Length:** {critical_length} tables")
+    output.append("")
+    output.append(" → ".join(critical_path))
+    output.append("")
+
     # Leaf tables
     output.append("## Leaf Tables (Never Referenced)")
     output.append(f"**Count:** {len(leaf_tables)}")
@@ -203,7 +193,7 @@ def main():
         output.append(f"{i}. **{table}** - {count} FK references (Level {level})")
 
     # Write to file
-    output_file = Path('/Users/pierre.ribeiro/.claude-worktrees/US3-table-structures/FK_DEPENDENCY_TREE.md')
+    output_file = Path(args.output)
     with open(output_file, 'w') as f:
         f.write('\n'.join(output))
 
@@ -211,6 +201,8 @@ def main():
     print(f"✓ Root tables (Level 0): {len(root_tables)}")
     print(f"✓ Dependency levels: 0 to {max_level}")
     print(f"✓ Leaf tables: {len(leaf_tables)}")
+    print(f"✓ FK cycles: {len(cycles)}")
+    print(f"✓ Critical path: {critical_length} tables")
     print(f"✓ Total tables: {len(all_tables)}")
 
 if __name__ == '__main__':
@@ -2,72 +2,37 @@
 """
 Parse all FK constraint files and build adjacency list.
 Extracts child table, parent table, FK name, columns, and CASCADE actions.
+Parsing is shared with fk_graph.py (T-SQL and PostgreSQL DDL).
+
+Usage:
+    python3 scripts/parse_fk_constraints.py [FK_DIR_OR_FILE] [--output-dir DIR]
 """
 
-import os
-import re
+import argparse
 import json
 from pathlib import Path
 from collections import defaultdict
 
-def parse_fk_file(filepath):
-    """Parse a single FK constraint file and extract metadata."""
-    with open(filepath, 'r') as f:
-        content = f.read()
-
-    # Extract table name from ALTER TABLE
-    alter_match = re.search(r'ALTER TABLE\s+\[?(\w+)\]?\.\[?(\w+)\]?', content, re.IGNORECASE)
-    if not alter_match:
-        return None
-
-    child_schema = alter_match.group(1)
-    child_table = alter_match.group(2)
-
-    # Extract FK constraint name (may be unnamed)
-    constraint_match = re.search(r'ADD\s+(?:CONSTRAINT\s+\[?(\w+)\]?\s+)?FOREIGN KEY', content, re.IGNORECASE)
-    fk_name = constraint_match.group(1) if constraint_match and constraint_match.group(1) else None
-
-    # Extract child columns
-    child_cols_match = re.search(r'FOREIGN KEY\s+\(([^)]+)\)', content, re.IGNORECASE)
-    if not child_cols_match:
-        return None
-    child_cols = [col.strip().strip('[]') for col in child_cols_match.group(1).split(',')]
-
-    # Extract parent table and columns
-    references_match = re.search(r'REFERENCES\s+\[?(\w+)\]?\.\[?(\w+)\]?\s+\(([^)]+)\)', content, re.IGNORECASE)
-    if not references_match:
-        return None
-
-    parent_schema = references_match.group(1)
-    parent_table = references_match.group(2)
-    parent_cols = [col.strip().strip('[]') for col in references_match.group(3).split(',')]
-
-    # Extract CASCADE actions
-    on_delete = None
-    on_update = None
-
-    delete_match = re.search(r'ON DELETE\s+(CASCADE|SET NULL|SET DEFAULT|NO ACTION|RESTRICT)', content, re.IGNORECASE)
-    if delete_match:
-        on_delete = delete_match.group(1).upper()
-
-    update_match = re.search(r'ON UPDATE\s+(CASCADE|SET NULL|SET DEFAULT|NO ACTION|RESTRICT)', content, re.IGNORECASE)
-    if update_match:
-        on_update = update_match.group(1).upper()
-
-    return {
-        'child_schema': child_schema,
-        'child_table': child_table,
-        'parent_schema': parent_schema,
-        'parent_table': parent_table,
-        'fk_name': fk_name,
-        'child_cols': child_cols,
-        'parent_cols': parent_cols,
-        'on_delete': on_delete,
-        'on_update': on_update
-    }
+from fk_graph import REPO_ROOT, SQLSERVER_FK_DIR, load_fk_constraints, parse_fk_sql
 
-def main():
-    fk_dir = Path('/Users/pierre.ribeiro/.claude-worktrees/US3-table-structures/source/original/sqlserver/13. create-foreign-key-constraint')
+def parse_fk_file(filepath):
+    """Parse a single FK constraint file and extract metadata (first FK in the file)."""
+    with open(filepath, 'r', encoding='utf-8-sig') as f:
+        fks = parse_fk_sql(f.read())
+    return fks[0] if fks else None
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Parse FK constraint DDL into an adjacency list.")
+    parser.add_argument('fk_path', nargs='?', default=SQLSERVER_FK_DIR,
+                        help="FK DDL directory or file, SQL Server or PostgreSQL (default: %(default)s)")
+    parser.add_argument('--output-dir', default=REPO_ROOT,
+                        help="Where fk_adjacency_list.json and fk_summary.json go (default: %(default)s)")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    fk_path = Path(args.fk_path)
+    output_dir = Path(args.output_dir)
 
     # Build adjacency list
     adjacency_list = defaultdict(list)
@@ -75,15 +40,16 @@ def main():
     cross_schema_fks = []
     self_referencing_fks = []
 
-    # Process all FK files
-    sql_files = sorted(fk_dir.glob('*.sql'))
-
+    # Process all FK files (a single file may hold many FKs)
+    sql_files = sorted(fk_path.glob('*.sql')) if fk_path.is_dir() else [fk_path]
+    fk_list = []
     for filepath in sql_files:
-        fk_info = parse_fk_file(filepath)
-        if not fk_info:
+        fks = load_fk_constraints(str(filepath))
+        if not fks:
             print(f"Warning: Could not parse {filepath.name}")
-            continue
+        fk_list.extend(fks)
 
+    for fk_info in fk_list:
         child_full = f"{fk_info['child_schema']}.{fk_info['child_table']}"
         parent_full = f"{fk_info['parent_schema']}.{fk_info['parent_table']}"
 
@@ -134,12 +100,13 @@ def main():
     }
 
     # Write adjacency list to JSON
-    output_file = Path('/Users/pierre.ribeiro/.claude-worktrees/US3-table-structures/fk_adjacency_list.json')
+    output_dir.mkdir(parents=True, exist_ok=True)
+    output_file = output_dir / 'fk_adjacency_list.json'
     with open(output_file, 'w') as f:
         json.dump(adjacency_list_dict, f, indent=2)
 
     # Write summary to JSON
-    summary_file = Path('/Users/pierre.ribeiro/.claude-worktrees/US3-table-structures/fk_summary.json')
+    summary_file = output_dir / 'fk_summary.json'
     with open(summary_file, 'w') as f:
         json.dump(summary, f, indent=2)
 
@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+Parsed schema model shared by the documentation and analysis scripts.
+
+Parses DDL once into tables (columns, types, nullability, defaults, inline
+constraints), foreign keys, indexes / PRIMARY KEY / UNIQUE, CHECK constraints
+and COMMENT ON statements, for both the SQL Server originals and the
+refactored PostgreSQL files. Results are cached per file in a JSON model
+(.cache/schema-model.json) keyed by size/mtime and SHA-256, so after a
+one-line DDL change only that file is parsed again.
+
+Usage:
+    import schema_model
+    model = schema_model.load_model()              # refactored PostgreSQL DDL
+    model = schema_model.load_model([SQLSERVER_TABLE_DIR])
+    model.tables['perseus.goo']['columns'], model.foreign_keys, model.indexes
+
+    python3 scripts/schema_model.py [PATH ...] [--cache FILE] [--rebuild]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+
+from fk_graph import parse_fk_sql
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SQLSERVER_TABLE_DIR = os.path.join(REPO_ROOT, "source/original/sqlserver/8.create-table")
+PGSQL_DIR = os.path.join(REPO_ROOT, "source/building/pgsql/refactored")
+PGSQL_TABLE_DIR = os.path.join(PGSQL_DIR, "14.create-table")
+PGSQL_INDEX_DIR = os.path.join(PGSQL_DIR, "16.create-index")
+PGSQL_CONSTRAINT_DIR = os.path.join(PGSQL_DIR, "17.create-constraint")
+DEFAULT_PATHS = [PGSQL_TABLE_DIR, PGSQL_INDEX_DIR, PGSQL_CONSTRAINT_DIR]
+DEFAULT_CACHE = os.path.join(REPO_ROOT, ".cache/schema-model.json")
+
+# Bump when the parsed shape changes; cached entries from other versions are dropped
+MODEL_VERSION = "1"
+
+_NAME = r'\[?"?(\w+)"?\]?'
+CREATE_TABLE = re.compile(
+    rf'CREATE\s+(FOREIGN\s+)?TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?(?:{_NAME}\.)?{_NAME}\s*\(',
+    re.IGNORECASE)
+INDEX_HEADER = re.compile(
+    rf'CREATE\s+(UNIQUE\s+)?(?:CLUSTERED\s+|NONCLUSTERED\s+)?INDEX\s+(?:CONCURRENTLY\s+)?'
+    rf'(?:IF\s+NOT\s+EXISTS\s+)?{_NAME}\s+ON\s+(?:ONLY\s+)?(?:{_NAME}\.)?{_NAME}\s*(?:USING\s+\w+\s*)?\(',
+    re.IGNORECASE)
+CONSTRAINT_INDEX = re.compile(
+    rf'ALTER\s+TABLE\s+(?:ONLY\s+)?(?:IF\s+EXISTS\s+)?(?:{_NAME}\.)?{_NAME}\s+'
+    rf'(?:WITH\s+(?:NO)?CHECK\s+)?ADD\s+CONSTRAINT\s+{_NAME}\s+(PRIMARY\s+KEY|UNIQUE)\s*'
+    r'(?:CLUSTERED\s*|NONCLUSTERED\s*)?\(([^)]+)\)',
+    re.IGNORECASE)
+CHECK_HEADER = re.compile(
+    rf'ALTER\s+TABLE\s+(?:ONLY\s+)?(?:{_NAME}\.)?{_NAME}\s+(?:WITH\s+(?:NO)?CHECK\s+)?'
+    rf'ADD\s+CONSTRAINT\s+{_NAME}\s+CHECK\s*\(',
+    re.IGNORECASE)
+COMMENT_ON = re.compile(
+    r"COMMENT\s+ON\s+(TABLE|COLUMN|INDEX|VIEW|FUNCTION|PROCEDURE|CONSTRAINT)\s+(.+?)\s+IS\s+'((?:[^']|'')*)'",
+    re.IGNORECASE | re.DOTALL)
+INLINE_KEY = re.compile(
+    rf'(?:CONSTRAINT\s+{_NAME}\s+)?(PRIMARY\s+KEY|UNIQUE)\s*(?:CLUSTERED|NONCLUSTERED)?\s*\(([^)]*)\)',
+    re.IGNORECASE)
+COLUMN_CLAUSE = re.compile(
+    r'\s+(?:NOT\s+NULL|NULL|DEFAULT|GENERATED|IDENTITY|CONSTRAINT|PRIMARY\s+KEY|UNIQUE|CHECK|'
+    r'REFERENCES|COLLATE|COMPRESSION|ROWGUIDCOL|SPARSE)\b',
+    re.IGNORECASE)
+
+
+# ============================================================================
+# PARSING
+# ============================================================================
+
+def strip_comments(sql):
+    """Remove /* */ and -- comments (string literals are not special-cased)."""
+    sql = re.sub(r'/\*.*?\*/', ' ', sql, flags=re.DOTALL)
+    return re.sub(r'--[^\n]*', '', sql)
+
+
+def split_top_level(text):
+    """Split on commas outside parentheses."""
+    parts, depth, current = [], 0, ''
+    for ch in text:
+        if ch == '(':
+            depth += 1
+        elif ch == ')':
+            depth -= 1
+        elif ch == ',' and depth == 0:
+            parts.append(current.strip())
+            current = ''
+            continue
+        current += ch
+    if current.strip():
+        parts.append(current.strip())
+    return parts
+
+
+def _balanced(sql, start):
+    """Index just past the ')' closing the '(' before `start`."""
+    depth, end = 1, start
+    while end < len(sql) and depth:
+        depth += {'(': 1, ')': -1}.get(sql[end], 0)
+        end += 1
+    return end
+
+
+def _key_columns(col_list):
+    return [re.sub(r'\s+(ASC|DESC)$', '', c.strip(), flags=re.IGNORECASE).strip('[]"').lower()
+            for c in col_list.split(',') if c.strip()]
+
+
+def index_column(element):
+    """Column name of an index element, or the raw expression if it is not a plain column."""
+    element = re.sub(r'\s+(ASC|DESC|NULLS\s+(FIRST|LAST)|COLLATE\s+\S+|\w+_ops)\b', '', element,
+                     flags=re.IGNORECASE).strip()
+    return element.strip('[]"').lower() if re.fullmatch(r'\[?"?\w+"?\]?', element) else element
+
+
+def parse_column(element):
+    """Parse one column definition; None if the element is a table constraint."""
+    if re.match(r'(CONSTRAINT|PRIMARY\s+KEY|UNIQUE|FOREIGN\s+KEY|CHECK|EXCLUDE|INDEX|PERIOD)\b',
+                element, re.IGNORECASE):
+        return None
+    m = re.match(r'\[?"?(\w+)"?\]?\s+(.*)$', element, re.DOTALL)
+    if not m:
+        return None
+    definition = ' '.join(m.group(2).split())
+    computed = re.match(r'AS\s*\(', definition, re.IGNORECASE) is not None
+    clause = COLUMN_CLAUSE.search(' ' + definition)
+    type_text = definition if computed or not clause else definition[:clause.start()].strip()
+    default = re.search(r'\bDEFAULT\s+(\((?:[^()]|\([^()]*\))*\)|\'[^\']*\'|\S+)', definition, re.IGNORECASE)
+    return {
+        'name': m.group(1),
+        'definition': definition,
+        'type': None if computed else re.sub(r'[\[\]]', '', type_text).upper(),
+        'not_null': bool(re.search(r'\bNOT\s+NULL\b|\bPRIMARY\s+KEY\b', definition, re.IGNORECASE)),
+        'default': default.group(1) if default else None,
+        'identity': bool(re.search(r'\bIDENTITY\b', definition, re.IGNORECASE)),
+        'generated': computed or bool(re.search(r'GENERATED\s+ALWAYS\s+AS\s*\(', definition, re.IGNORECASE)),
+    }
+
+
+def parse_ddl(sql):
+    """Everything the model knows about one block of DDL."""
+    sql = strip_comments(sql)
+    result = {'tables': [], 'foreign_keys': parse_fk_sql(sql), 'indexes': [], 'checks': [], 'comments': []}
+
+    for m in CREATE_TABLE.finditer(sql):
+        end = _balanced(sql, m.end())
+        columns, constraints = [], []
+        for element in split_top_level(sql[m.end():end - 1]):
+            col = parse_column(element)
+            if col:
+                columns.append(col)
+                continue
+            key = INLINE_KEY.match(element)
+            if key:
+                constraints.append({'name': key.group(1), 'type': ' '.join(key.group(2).upper().split()),
+                                    'columns': _key_columns(key.group(3))})
+        for col in columns:
+            if re.search(r'\bPRIMARY\s+KEY\b', col['definition'], re.IGNORECASE):
+                constraints.append({'name': None, 'type': 'PRIMARY KEY', 'columns': [col['name'].lower()]})
+        result['tables'].append({
+            'schema': (m.group(2) or 'dbo'),
+            'name': m.group(3),
+            'foreign': bool(m.group(1)),
+            'columns': columns,
+            'constraints': constraints,
+        })
+
+    for m in INDEX_HEADER.finditer(sql):
+        end = _balanced(sql, m.end())
+        stop = sql.find(';', end)
+        tail = sql[end:stop if stop >= 0 else len(sql)]
+        include = re.search(r'\bINCLUDE\s*\(([^)]*)\)', tail, re.IGNORECASE)
+        result['indexes'].append({
+            'name': m.group(2),
+            'table': m.group(4).lower(),
+            'columns': [index_column(e) for e in split_top_level(sql[m.end():end - 1])],
+            'include': _key_columns(include.group(1)) if include else [],
+            'unique': bool(m.group(1)),
+            'partial': bool(re.search(r'\bWHERE\b', tail, re.IGNORECASE)),
+            'kind': 'index',
+        })
+    for m in CONSTRAINT_INDEX.finditer(sql):
+        result['indexes'].append({
+            'name': m.group(3),
+            'table': m.group(2).lower(),
+            'columns': _key_columns(m.group(5)),
+            'include': [],
+            'unique': True,
+            'partial': False,
+            'kind': ' '.join(m.group(4).upper().split()),
+        })
+    for m in CHECK_HEADER.finditer(sql):
+        end = _balanced(sql, m.end())
+        result['checks'].append({'name': m.group(3), 'table': m.group(2).lower(),
+                                 'expression': ' '.join(sql[m.end():end - 1].split())})
+    for m in COMMENT_ON.finditer(sql):
+        result['comments'].append({'object_type': m.group(1).upper(), 'target': m.group(2).strip(),
+                                   'comment': m.group(3).replace("''", "'")})
+    return result
+
+
+# ============================================================================
+# CACHED MODEL
+# ============================================================================
+
+def _sql_files(paths):
+    files = []
+    for path in paths:
+        if os.path.isfile(path):
+            files.append(os.path.abspath(path))
+            continue
+        for root, dirs, names in os.walk(path):
+            dirs.sort()
+            files.extend(os.path.join(root, n) for n in sorted(names) if n.endswith('.sql'))
+    return files
+
+
+def _parser_fingerprint():
+    with open(os.path.abspath(__file__), 'rb') as f:
+        return f"{MODEL_VERSION}+{hashlib.sha256(f.read()).hexdigest()[:12]}"
+
+
+class SchemaModel:
+    """Parsed DDL for a set of files, merged across files."""
+
+    def __init__(self, files):
+        self.files = files
+        self.tables = {}
+        self.foreign_keys = []
+        self.indexes = []
+        self.checks = []
+        self.comments = []
+        for rel_path, entry in sorted(files.items()):
+            for table in entry['tables']:
+                key = f"{table['schema']}.{table['name']}".lower()
+                self.tables[key] = {**table, 'file': rel_path}
+            for kind in ('foreign_keys', 'indexes', 'checks', 'comments'):
+                getattr(self, kind).extend({**item, 'file': rel_path} for item in entry[kind])
+
+    def table(self, name):
+        """Look a table up by 'schema.table' or bare table name (case-insensitive)."""
+        name = name.lower()
+        if name in self.tables:
+            return self.tables[name]
+        matches = [t for key, t in self.tables.items() if key.split('.', 1)[1] == name]
+        return matches[0] if len(matches) == 1 else None
+
+    def primary_key(self, table):
+        """Columns of the table's PRIMARY KEY (constraint DDL or inline), or []."""
+        for index in self.indexes:
+            if index['table'] == table.lower() and index['kind'] == 'PRIMARY KEY':
+                return index['columns']
+        info = self.table(table)
+        for constraint in (info or {}).get('constraints', []):
+            if constraint['type'] == 'PRIMARY KEY':
+                return constraint['columns']
+        return []
+
+
+def load_model(paths=None, cache_path=DEFAULT_CACHE, rebuild=False):
+    """
+    Return a SchemaModel for the *.sql files under `paths`, parsing only files
+    whose content changed since the cached model was written.
+    """
+    paths = paths or DEFAULT_PATHS
+    fingerprint = _parser_fingerprint()
+    cache = {}
+    if cache_path and not rebuild and os.path.exists(cache_path):
+        try:
+            with open(cache_path, 'r') as f:
+                stored = json.load(f)
+            if stored.get('model_version') == fingerprint:
+                cache = stored.get('files', {})
+        except (OSError, ValueError):
+            cache = {}
+
+    files = {}
+    parsed = 0
+    for filepath in _sql_files(paths):
+        rel_path = os.path.relpath(filepath, REPO_ROOT)
+        stat = os.stat(filepath)
+        entry = cache.get(rel_path)
+        if entry and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+            files[rel_path] = entry
+            continue
+        with open(filepath, 'rb') as f:
+            raw = f.read()
+        digest = hashlib.sha256(raw).hexdigest()
+        if entry and entry['sha256'] == digest:
+            entry = {**entry, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+        else:
+            entry = {'sha256': digest, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns,
+                     **parse_ddl(raw.decode('utf-8-sig', errors='replace'))}
+            parsed += 1
+        files[rel_path] = entry
+
+    # Keep entries for files outside `paths` so other callers stay warm; drop deleted files
+    merged = {k: v for k, v in cache.items() if os.path.exists(os.path.join(REPO_ROOT, k))}
+    merged.update(files)
+    if cache_path and merged != cache:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        with open(cache_path, 'w') as f:
+            json.dump({'model_version': fingerprint, 'files': merged}, f, sort_keys=True)
+
+    model = SchemaModel(files)
+    model.parsed_files = parsed
+    return model
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build or refresh the cached schema model.")
+    parser.add_argument('paths', nargs='*', help="DDL files/directories (default: refactored PostgreSQL DDL)")
+    parser.add_argument('--cache', default=DEFAULT_CACHE, help="Model cache file (default: %(default)s)")
+    parser.add_argument('--rebuild', action='store_true', help="Ignore the cache and parse every file")
+    args = parser.parse_args(argv)
+    model = load_model(args.paths or None, args.cache, args.rebuild)
+    print(f"Files: {len(model.files)} ({model.parsed_files} parsed, "
+          f"{len(model.files) - model.parsed_files} cached)")
+    print(f"Tables: {len(model.tables)}  Columns: {sum(len(t['columns']) for t in model.tables.values())}  "
+          f"FKs: {len(model.foreign_keys)}  Indexes: {len(model.indexes)}  "
+          f"Checks: {len(model.checks)}  Comments: {len(model.comments)}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
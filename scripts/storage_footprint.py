@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+"""
+Row-width and disk-footprint estimator for the refactored PostgreSQL schema.
+
+Combines the parsed DDL (schema_model: column types, nullability, indexes)
+with the SQL Server row counts / DataSizeMB assessment to estimate, per table:
+- tuple width: 24-byte header + null bitmap, MAXALIGN, column alignment
+  padding (same model as convert_tables --optimize-layout)
+- heap size at a given fillfactor, and the TOAST share once a tuple exceeds
+  the ~2 kB toast threshold (uncompressed, so an upper bound)
+- B-tree size of every index / PRIMARY KEY / UNIQUE constraint
+- COPY and index-build duration at configurable throughputs
+
+Variable-width columns (VARCHAR, TEXT, BYTEA) have no width in the DDL. When
+the table was exported (--data-dir), their average width is measured on the
+first --sample-rows records of the CSV, converted as transcode_csv.py does for
+COPY; otherwise half the declared length (64 bytes for unbounded types) is
+assumed. Neither uses DataSizeMB, so the PG/Src ratio against it is a real
+cross-check. The exception is an unexported table whose DataSizeMB cannot be
+explained without large unbounded TEXT/BYTEA values (blobs): those columns
+share what DataSizeMB leaves per row, and the table is marked as sized from
+DataSizeMB rather than silently undercounted.
+
+Usage:
+    python3 scripts/storage_footprint.py [--ddl PATH ...] [--fillfactor N]
+                                        [--copy-mbps N] [--index-mbps N]
+                                        [--data-dir DIR] [--sample-rows N]
+                                        [--top N] [--format text|json]
+"""
+
+import argparse
+import json
+import math
+import os
+import re
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data-migration'))
+
+from convert_tables import SIZE_CSV, TYPE_STORAGE, alignment_padding, column_storage, load_table_sizes  # noqa: E402
+from csv_digest import range_lines  # noqa: E402
+from load_plan import DEFAULT_DATA_DIR, discover_csvs  # noqa: E402
+from schema_model import DEFAULT_PATHS, load_model  # noqa: E402
+from transcode_csv import DEFAULT_MANIFEST_DIR, Transcoder, table_spec  # noqa: E402
+
+PAGE_BYTES = 8192
+PAGE_HEADER = 24
+BTREE_SPECIAL = 16
+ITEM_ID = 4
+MAXALIGN = 8
+TUPLE_HEADER = 23
+INDEX_TUPLE_HEADER = 8
+TOAST_THRESHOLD = 2032       # TOAST_TUPLE_THRESHOLD for 8 kB pages
+TOAST_CHUNK = 1996           # TOAST_MAX_CHUNK_SIZE
+TOAST_CHUNK_OVERHEAD = 40    # chunk tuple header + chunk_id/seq + item id
+TOAST_POINTER = 18
+BTREE_LEAF_FILL = 0.90
+BTREE_INTERNAL_SHARE = 0.01
+UNBOUNDED_WIDTH = 64         # assumed average for TEXT/BYTEA without source data
+VARCHAR_FILL = 0.5           # assumed average fill of VARCHAR(n) without source data
+EXPRESSION_WIDTH = 8         # index expression keys
+DEFAULT_SAMPLE_ROWS = 100000
+
+# Output mark and accepted PG/Src ratio range per width basis (see column_widths)
+BASIS_MARKS = {'fixed': '', 'csv': '', 'source': '~', 'declared': '*'}
+CHECK_RATIOS = {'fixed': (0.5, 2), 'csv': (0.5, 2), 'source': (0, math.inf), 'declared': (0.1, 10)}
+
+VARIABLE_TYPES = ('VARCHAR', 'CHARACTER VARYING', 'TEXT', 'BYTEA')
+
+
+def maxalign(n):
+    return (int(n) + MAXALIGN - 1) // MAXALIGN * MAXALIGN
+
+
+def _base_type(pg_type):
+    return re.sub(r'\(.*', '', pg_type or '').strip()
+
+
+def _type_args(pg_type):
+    m = re.search(r'\((\d+)(?:\s*,\s*(\d+))?\)', pg_type or '')
+    return (int(m.group(1)), int(m.group(2) or 0)) if m else (None, 0)
+
+
+def declared_width(pg_type):
+    """Average on-disk bytes of a non-null value, from the declared type alone."""
+    base = _base_type(pg_type)
+    if base in TYPE_STORAGE:
+        return TYPE_STORAGE[base][0]
+    length, scale = _type_args(pg_type)
+    if base in ('CHAR', 'CHARACTER', 'BPCHAR'):
+        length = length or 1
+        return length + (1 if length < 127 else 4)
+    if base == 'NUMERIC':
+        # Header plus one 2-byte base-10000 digit per 4 decimal digits on each side
+        precision = length or 18
+        groups = math.ceil((precision - scale) / 4) + math.ceil(scale / 4)
+        return 3 + 2 * groups
+    if base in VARIABLE_TYPES:
+        data = length * VARCHAR_FILL if length else UNBOUNDED_WIDTH
+        return data + (1 if data < 127 else 4)
+    return UNBOUNDED_WIDTH
+
+
+def varlena_bytes(value, pg_type):
+    """Stored bytes of one non-null transcoded value: 1-byte header up to 126 bytes, else 4."""
+    if _base_type(pg_type) == 'BYTEA':
+        data = max(0, len(value) - 2) // 2          # \x + two hex digits per byte
+    else:
+        data = len(value.encode('utf-8'))
+    return data + (1 if data < 127 else 4)
+
+
+def sample_widths(model, table, csv_path, manifest_dir, sample_rows):
+    """
+    {column: average stored bytes per row, NULL counting 0} of the variable
+    columns, over the first sample_rows records of one export.
+    """
+    fields = table_spec(table, model, manifest_dir)
+    loaded = [f for f in fields if not f['skip']]
+    variable = [(i, f['name'].lower(), f['type']) for i, f in enumerate(loaded)
+                if _base_type(f['type']) in VARIABLE_TYPES]
+    if not variable:
+        return {}
+    totals = [0] * len(variable)
+    records = 0
+    lines = range_lines(csv_path, 0, os.path.getsize(csv_path))
+    with open(os.devnull, 'w') as rejects:
+        try:
+            for record in Transcoder(fields).records(lines, rejects):
+                for n, (i, _, pg_type) in enumerate(variable):
+                    if record[i] is not None:
+                        totals[n] += varlena_bytes(record[i], pg_type)
+                records += 1
+                if records >= sample_rows:
+                    break
+        finally:
+            lines.close()
+    if not records:
+        return {}
+    return {name: totals[n] / records for n, (_, name, _) in enumerate(variable)}
+
+
+def column_widths(table, measured=None, size=None):
+    """
+    {column: average bytes} and the basis ('fixed', 'csv', 'source' or
+    'declared'): variable columns take the widths measured on the export when
+    there are any; otherwise unbounded TEXT/BYTEA columns take what DataSizeMB
+    leaves per row after the other columns, when that exceeds the default.
+    """
+    columns = table['columns']
+    widths = {c['name'].lower(): declared_width(c['type']) for c in columns}
+    variable = [c['name'].lower() for c in columns if _base_type(c['type']) in VARIABLE_TYPES]
+    if not variable:
+        return widths, 'fixed'
+    if measured:
+        for name in variable:
+            if name in measured:
+                widths[name] = measured[name]
+        return widths, 'csv'
+    unbounded = [c['name'].lower() for c in columns
+                 if _base_type(c['type']) in VARIABLE_TYPES and _type_args(c['type'])[0] is None]
+    if unbounded and size and size['rows'] and size['data_mb']:
+        per_row = size['data_mb'] * 1048576 / size['rows']
+        rest = per_row - sum(w for name, w in widths.items() if name not in unbounded)
+        if rest > len(unbounded) * widths[unbounded[0]]:
+            for name in unbounded:
+                widths[name] = rest / len(unbounded)
+            return widths, 'source'
+    return widths, 'declared'
+
+
+def toast_split(widths, storage_cols, header):
+    """
+    Move the widest variable values out of line until the tuple fits under the
+    toast threshold. Returns (in-line data bytes, toast bytes per row).
+    """
+    inline = dict(widths)
+    toast = 0.0
+    candidates = sorted((c for c in storage_cols if inline[c] > TOAST_POINTER), key=lambda c: -inline[c])
+    for name in candidates:
+        if header + sum(inline.values()) <= TOAST_THRESHOLD:
+            break
+        value = inline[name]
+        toast += value + math.ceil(value / TOAST_CHUNK) * TOAST_CHUNK_OVERHEAD
+        inline[name] = TOAST_POINTER
+    return sum(inline.values()), toast
+
+
+def table_footprint(table, indexes, size, fillfactor, measured=None):
+    """Estimated tuple width, heap/toast/index bytes for one table."""
+    columns = table['columns']
+    rows = size['rows'] if size else 0
+    widths, basis = column_widths(table, measured, size)
+    nullable = any(not c['not_null'] for c in columns)
+    header = maxalign(TUPLE_HEADER + (math.ceil(len(columns) / 8) if nullable else 0))
+    storage = [column_storage({'name': c['name'], 'type': c['type'] or 'TEXT'}) for c in columns]
+    variable = [c['name'].lower() for c, s in zip(columns, storage) if s[0] < 0]
+
+    data, toast_per_row = toast_split(widths, variable, header)
+    tuple_bytes = maxalign(header + data + alignment_padding(storage))
+    per_page = max(1, int((PAGE_BYTES - PAGE_HEADER) * fillfactor / 100 // (tuple_bytes + ITEM_ID)))
+    heap_pages = math.ceil(rows / per_page)
+    toast_bytes = rows * toast_per_row
+    toast_pages = math.ceil(toast_bytes / (PAGE_BYTES - PAGE_HEADER)) if toast_bytes else 0
+
+    index_entries = []
+    for index in indexes:
+        keys = index['columns'] + index.get('include', [])
+        key_bytes = sum(min(widths.get(k, EXPRESSION_WIDTH), TOAST_THRESHOLD) for k in keys)
+        itup = maxalign(INDEX_TUPLE_HEADER + key_bytes)
+        per_leaf = max(1, int((PAGE_BYTES - PAGE_HEADER - BTREE_SPECIAL) * BTREE_LEAF_FILL // (itup + ITEM_ID)))
+        leaves = math.ceil(rows / per_leaf)
+        pages = 1 + leaves + math.ceil(leaves * BTREE_INTERNAL_SHARE)
+        index_entries.append({'name': index['name'], 'kind': index['kind'], 'columns': keys,
+                              'tuple_bytes': itup, 'bytes': pages * PAGE_BYTES})
+
+    return {
+        'rows': rows,
+        'basis': basis,
+        'tuple_bytes': tuple_bytes,
+        'heap_bytes': heap_pages * PAGE_BYTES,
+        'toast_bytes': toast_pages * PAGE_BYTES,
+        'index_bytes': sum(i['bytes'] for i in index_entries),
+        'indexes': index_entries,
+        'source_mb': size['data_mb'] if size else None,
+    }
+
+
+def estimate(model, sizes, fillfactor=100, copy_mbps=40.0, index_mbps=60.0, measured=None):
+    """Per-table footprint and timing, keyed by table name (largest first)."""
+    measured = measured or {}
+    by_table = {}
+    for index in model.indexes:
+        by_table.setdefault(index['table'], []).append(index)
+
+    report = {}
+    for table in model.tables.values():
+        if table['foreign']:
+            continue
+        name = table['name'].lower()
+        fp = table_footprint(table, by_table.get(name, []), sizes.get(name), fillfactor, measured.get(name))
+        mb = 1048576
+        data_mb = (fp['heap_bytes'] + fp['toast_bytes']) / mb
+        fp['total_bytes'] = fp['heap_bytes'] + fp['toast_bytes'] + fp['index_bytes']
+        fp['toast_share'] = fp['toast_bytes'] / (fp['heap_bytes'] + fp['toast_bytes']) if data_mb else 0.0
+        fp['ratio_to_source'] = round(data_mb / fp['source_mb'], 2) if fp['source_mb'] else None
+        fp['copy_seconds'] = data_mb / copy_mbps
+        # Each index build scans the heap and writes its own pages
+        fp['index_build_seconds'] = sum((data_mb + i['bytes'] / mb) / index_mbps for i in fp['indexes'])
+        report[name] = fp
+    return dict(sorted(report.items(), key=lambda kv: -kv[1]['total_bytes']))
+
+
+def _hms(seconds):
+    seconds = int(round(seconds))
+    return f"{seconds // 3600}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+
+def format_text(report, top, copy_mbps, index_mbps):
+    mb = 1048576
+    lines = [f"{'Table':<34} {'Rows':>13} {'Tuple B':>7} {'Heap MB':>10} {'TOAST MB':>10} "
+             f"{'Index MB':>10} {'Total MB':>10} {'Src MB':>10} {'PG/Src':>6} {'COPY':>8} {'Index':>8}",
+             f"{'-' * 34} {'-' * 13} {'-' * 7} {'-' * 10} {'-' * 10} {'-' * 10} {'-' * 10} "
+             f"{'-' * 10} {'-' * 6} {'-' * 8} {'-' * 8}"]
+    for name, fp in list(report.items())[:top]:
+        ratio = f"{fp['ratio_to_source']:.2f}" if fp['ratio_to_source'] is not None else '-'
+        source = f"{fp['source_mb']:,.1f}" if fp['source_mb'] is not None else '-'
+        label = f"{name} {BASIS_MARKS[fp['basis']]}".rstrip()
+        lines.append(f"{label:<34} {fp['rows']:>13,} {fp['tuple_bytes']:>7} {fp['heap_bytes'] / mb:>10,.1f} "
+                     f"{fp['toast_bytes'] / mb:>10,.1f} {fp['index_bytes'] / mb:>10,.1f} "
+                     f"{fp['total_bytes'] / mb:>10,.1f} {source:>10} {ratio:>6} "
+                     f"{_hms(fp['copy_seconds']):>8} {_hms(fp['index_build_seconds']):>8}")
+
+    gb = 1024 ** 3
+    heap = sum(fp['heap_bytes'] for fp in report.values())
+    toast = sum(fp['toast_bytes'] for fp in report.values())
+    index = sum(fp['index_bytes'] for fp in report.values())
+    source = sum(fp['source_mb'] or 0 for fp in report.values()) / 1024
+    copy_s = sum(fp['copy_seconds'] for fp in report.values())
+    index_s = sum(fp['index_build_seconds'] for fp in report.values())
+    fallback = [fp for fp in report.values() if fp['basis'] == 'source']
+    fallback_gb = sum(fp['heap_bytes'] + fp['toast_bytes'] for fp in fallback) / gb
+    lines += [
+        "",
+        f"Tables: {len(report)}  (* = variable widths from declared types, no export sampled; "
+        f"~ = TEXT/BYTEA widths from DataSizeMB, no export sampled)",
+        f"Heap {heap / gb:,.1f} GB + TOAST {toast / gb:,.1f} GB + indexes {index / gb:,.1f} GB "
+        f"= {(heap + toast + index) / gb:,.1f} GB  (SQL Server DataSizeMB: {source:,.1f} GB)",
+    ]
+    if fallback:
+        lines.append(f"  of which {fallback_gb:,.1f} GB heap + TOAST in {len(fallback)} table(s) "
+                     f"sized from DataSizeMB (~)")
+    lines += [
+        f"Serial COPY at {copy_mbps:g} MB/s: {_hms(copy_s)}   "
+        f"index builds at {index_mbps:g} MB/s: {_hms(index_s)}   total {_hms(copy_s + index_s)}",
+    ]
+    # Declared widths are a guess: only an order-of-magnitude miss is worth a
+    # CHECK. DataSizeMB-sized tables match the source by construction.
+    for name, fp in report.items():
+        low, high = CHECK_RATIOS[fp['basis']]
+        if fp['ratio_to_source'] is not None and fp['source_mb'] >= 1 and not low <= fp['ratio_to_source'] <= high:
+            lines.append(f"  CHECK: {name} estimate is {fp['ratio_to_source']:.2f}x its SQL Server size")
+    return "\n".join(lines)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Estimate PostgreSQL disk footprint and load duration.")
+    parser.add_argument('--ddl', nargs='+', default=DEFAULT_PATHS,
+                        help="Table / index / constraint DDL files or directories "
+                             "(default: 14.create-table, 16.create-index, 17.create-constraint)")
+    parser.add_argument('--size-csv', default=SIZE_CSV,
+                        help="Row count / size assessment CSV (default: %(default)s)")
+    parser.add_argument('--data-dir', default=DEFAULT_DATA_DIR,
+                        help="Exported CSVs whose variable-width columns are measured (default: %(default)s)")
+    parser.add_argument('--manifest-dir', default=DEFAULT_MANIFEST_DIR,
+                        help="copy-manifests directory from convert_tables.py (default: %(default)s)")
+    parser.add_argument('--sample-rows', type=int, default=DEFAULT_SAMPLE_ROWS,
+                        help="Records read from the start of each export (default: %(default)s)")
+    parser.add_argument('--fillfactor', type=int, default=100,
+                        help="Heap fillfactor in percent (default: %(default)s)")
+    parser.add_argument('--copy-mbps', type=float, default=40.0,
+                        help="COPY throughput in MB/s of heap written (default: %(default)s)")
+    parser.add_argument('--index-mbps', type=float, default=60.0,
+                        help="Index build throughput in MB/s of heap scanned + index written "
+                             "(default: %(default)s)")
+    parser.add_argument('--top', type=int, default=25, help="Tables to list (default: %(default)s)")
+    parser.add_argument('--format', choices=('text', 'json'), default='text')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if (not 10 <= args.fillfactor <= 100 or args.copy_mbps <= 0 or args.index_mbps <= 0
+            or args.sample_rows < 1):
+        print("ERROR: --fillfactor must be 10-100, throughputs positive and --sample-rows >= 1", file=sys.stderr)
+        return 2
+    sizes = load_table_sizes(args.size_csv) if os.path.exists(args.size_csv) else {}
+    model = load_model(args.ddl)
+    measured = {}
+    for table, info in discover_csvs(args.data_dir).items():
+        if model.table(table) is None or not info['bytes']:
+            continue
+        try:
+            measured[table] = sample_widths(model, table, info['path'], args.manifest_dir, args.sample_rows)
+        except (KeyError, OSError, RuntimeError) as e:
+            print(f"WARNING: {table}: export not sampled ({e})", file=sys.stderr)
+    report = estimate(model, sizes, args.fillfactor, args.copy_mbps, args.index_mbps, measured)
+    if args.format == 'json':
+        print(json.dumps(report, indent=2))
+    else:
+        print(format_text(report, args.top, args.copy_mbps, args.index_mbps))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -14,6 +14,8 @@
 --       * material_transition: Composite PK on (material_id, transition_id)
 --       * transition_material: Composite PK on (transition_id, material_id)
 --       * material_inventory_threshold_notify_user: Composite PK on (threshold_id, user_id)
+--       * m_upstream / m_downstream: skipped on partitioned tables (keys come from
+--         the generated 14.create-table/partition-indexes/, deployed after this file)
 --
 -- Execution Order: Run after all CREATE TABLE statements (14. create-table/)
 -- Dependencies: All perseus schema tables must exist
@@ -93,14 +95,28 @@ ALTER TABLE perseus.goo_type
 ALTER TABLE perseus.history_type
     ADD CONSTRAINT pk_history_type PRIMARY KEY (id);
 
-ALTER TABLE perseus.m_downstream
-    ADD CONSTRAINT pk_m_downstream PRIMARY KEY (id);
+-- m_downstream has no id column: a path is unique per (start_point, end_point, path).
+-- Skipped when partitioned (convert_tables.py --partition): the same key is then
+-- built per partition by partition-indexes/m_downstream.sql
+DO $$ BEGIN
+    IF (SELECT relkind FROM pg_class WHERE oid = 'perseus.m_downstream'::regclass) <> 'p' THEN
+        ALTER TABLE perseus.m_downstream
+            ADD CONSTRAINT pk_m_downstream PRIMARY KEY (start_point, end_point, path);
+    END IF;
+END $$;
 
 ALTER TABLE perseus.m_number
     ADD CONSTRAINT pk_m_number PRIMARY KEY (id);
 
-ALTER TABLE perseus.m_upstream
-    ADD CONSTRAINT pk_m_upstream PRIMARY KEY (id);
+-- m_upstream has no id column: a path is unique per (start_point, end_point, path).
+-- Skipped when partitioned (convert_tables.py --partition): the same key is then
+-- built per partition by partition-indexes/m_upstream.sql
+DO $$ BEGIN
+    IF (SELECT relkind FROM pg_class WHERE oid = 'perseus.m_upstream'::regclass) <> 'p' THEN
+        ALTER TABLE perseus.m_upstream
+            ADD CONSTRAINT pk_m_upstream PRIMARY KEY (start_point, end_point, path);
+    END IF;
+END $$;
 
 ALTER TABLE perseus.m_upstream_dirty_leaves
     ADD CONSTRAINT pk_m_upstream_dirty_leaves PRIMARY KEY (id);
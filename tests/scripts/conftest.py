@@ -0,0 +1,20 @@
+"""pytest setup for the Python tooling under scripts/ (run: python -m pytest tests/scripts)."""
+
+import os
+import sys
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+SCRIPTS_DIR = os.path.join(REPO_DIR, 'scripts')
+DATA_MIGRATION_DIR = os.path.join(SCRIPTS_DIR, 'data-migration')
+
+# The scripts import each other the same way (SCRIPTS_DIR on sys.path)
+for path in (SCRIPTS_DIR, DATA_MIGRATION_DIR):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+
+def fk(child, parent, child_cols=('parent_id',), parent_cols=('id',), schema='dbo'):
+    """One FK as fk_graph.parse_fk_sql returns it."""
+    return {'child_schema': schema, 'child_table': child, 'parent_schema': schema, 'parent_table': parent,
+            'fk_name': f"fk_{child}_{'_'.join(child_cols)}", 'child_cols': list(child_cols),
+            'parent_cols': list(parent_cols), 'on_delete': None, 'on_update': None}
@@ -0,0 +1,64 @@
+"""binary_copy: numeric_send encoding and the binary field encoders."""
+
+import struct
+from datetime import timezone
+from decimal import Decimal
+
+import pytest
+
+from binary_copy import NUMERIC_NAN, NUMERIC_NEG, NUMERIC_POS, binary_tuple, encode_numeric, make_encoder
+from transcode_csv import Reject
+
+
+def decode_numeric(data):
+    """numeric_recv, enough to check the round trip."""
+    ndigits, weight, sign, dscale = struct.unpack('>hhHh', data[:8])
+    digits = struct.unpack(f'>{ndigits}h', data[8:])
+    value = sum(Decimal(d) * Decimal(10000) ** (weight - i) for i, d in enumerate(digits))
+    value = -value if sign == NUMERIC_NEG else value
+    return value.quantize(Decimal(1).scaleb(-dscale)), dscale
+
+
+@pytest.mark.parametrize('text, header, digits', [
+    ('12345.678', (3, 1, NUMERIC_POS, 3), (1, 2345, 6780)),
+    ('-1.5', (2, 0, NUMERIC_NEG, 1), (1, 5000)),
+    ('0.0001', (1, -1, NUMERIC_POS, 4), (1,)),
+    ('100000', (1, 1, NUMERIC_POS, 0), (10,)),
+    ('0', (0, 0, NUMERIC_POS, 0), ()),
+    ('-0.00', (0, 0, NUMERIC_POS, 2), ()),
+])
+def test_encode_numeric_layout(text, header, digits):
+    data = encode_numeric(text)
+    assert struct.unpack('>hhHh', data[:8]) == header
+    assert struct.unpack(f'>{len(digits)}h', data[8:]) == digits
+
+
+@pytest.mark.parametrize('text', ['3.14159265358979', '-987654321.000100', '1E+5', '0.000000012', '99999999'])
+def test_encode_numeric_round_trip(text):
+    value, dscale = decode_numeric(encode_numeric(text))
+    assert value == Decimal(text)
+    assert dscale == max(0, -Decimal(text).as_tuple().exponent)
+
+
+def test_encode_numeric_special_values():
+    assert encode_numeric('NaN') == struct.pack('>hhHh', 0, 0, NUMERIC_NAN, 0)
+    for text in ('Infinity', 'abc', ''):
+        with pytest.raises(Reject):
+            encode_numeric(text)
+
+
+def test_field_encoders():
+    utc = timezone.utc
+    assert make_encoder('INTEGER', None, utc)('42') == struct.pack('>i', 42)
+    with pytest.raises(Reject):
+        make_encoder('SMALLINT', None, utc)('40000')
+    assert make_encoder('BOOLEAN', None, utc)('1') == b'\x01'
+    assert make_encoder('DATE', None, utc)('2000-01-02') == struct.pack('>i', 1)
+    assert make_encoder('TIMESTAMP', None, utc)('2000-01-01 00:00:01') == struct.pack('>q', 1_000_000)
+    assert make_encoder('BYTEA', 'hex_to_bytea', utc)('0xCAFE') == b'\xca\xfe'
+    with pytest.raises(ValueError):
+        make_encoder('INTERVAL', None, utc)
+
+
+def test_binary_tuple():
+    assert binary_tuple([b'ab', None]) == struct.pack('>hi', 2, 2) + b'ab' + struct.pack('>i', -1)
@@ -0,0 +1,108 @@
+"""csv_digest: canonical text of boundary values, next to the PostgreSQL expressions it must match."""
+
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from checksum_validator import CANONICAL
+from csv_digest import NULL, main, make_canonical
+from transcode_csv import make_converter
+
+# The PostgreSQL side of the contract: csv_digest's Python must give the same text
+PG_EXPRESSIONS = {
+    'integer': "{c}::text",
+    'bit': "CASE WHEN {c} THEN '1' ELSE '0' END",
+    'decimal': "{c}::text",
+    'money': "{c}::numeric(19, 4)::text",
+    'float': "round({c}::float8::numeric, 6)::text",
+    'datetime': "to_char({c}::timestamp, 'YYYY-MM-DD HH24:MI:SS.MS')",
+    'datetime2': "to_char({c}::timestamp, 'YYYY-MM-DD HH24:MI:SS.US')",
+    'datetimeoffset': "to_char({c} AT TIME ZONE 'UTC', 'YYYY-MM-DD HH24:MI:SS.US')",
+    'date': "to_char({c}::date, 'YYYY-MM-DD')",
+    'char': "rtrim({c}::text, ' ')",
+    'uuid': "lower({c}::text)",
+    'binary': "encode({c}, 'hex')",
+    'text': "{c}::text",
+}
+
+
+def canonical(kind, pg_type, raw, zone='UTC'):
+    """A bcp field through transcode_csv.py's conversion, then csv_digest's canonical text."""
+    convert = make_converter(pg_type, None)
+    value = convert(raw) if convert and raw is not None else raw
+    return make_canonical({'kind': kind, 'pg_type': pg_type}, ZoneInfo(zone))(value)
+
+
+def test_pg_expressions_are_pinned():
+    assert {kind: exprs[0] for kind, exprs in CANONICAL.items()} == PG_EXPRESSIONS
+
+
+@pytest.mark.parametrize('pg_type, raw, expected', [
+    ('DOUBLE PRECISION', '1e20', '100000000000000000000.000000'),
+    ('DOUBLE PRECISION', '-0', '0.000000'),                      # numeric has no negative zero
+    ('DOUBLE PRECISION', '0.0000005', '0.000001'),               # round() is half away from zero
+    ('DOUBLE PRECISION', '-0.0000005', '-0.000001'),
+    ('DOUBLE PRECISION', '1.2345675', '1.234568'),               # 1.23456749999... at 15 digits
+    ('DOUBLE PRECISION', '123456789.123456789', '123456789.123457'),
+    ('REAL', '0.1', '0.100000'),                                 # float4 0.100000001490116
+])
+def test_float(pg_type, raw, expected):
+    assert canonical('float', pg_type, raw) == expected
+
+
+@pytest.mark.parametrize('kind, pg_type, raw, expected', [
+    ('decimal', 'NUMERIC(10,2)', '2.345', '2.35'),
+    ('decimal', 'NUMERIC(10,2)', '-2.345', '-2.35'),
+    ('decimal', 'NUMERIC(10,2)', '-0.001', '0.00'),
+    ('decimal', 'NUMERIC(10,2)', '5', '5.00'),
+    ('decimal', 'NUMERIC', '1E+3', '1000'),
+    ('money', 'NUMERIC(19,4)', '1.23455', '1.2346'),
+    ('money', 'NUMERIC(19,4)', '-0.00004', '0.0000'),
+    ('integer', 'INTEGER', '-007', '-7'),
+])
+def test_exact_numbers(kind, pg_type, raw, expected):
+    assert canonical(kind, pg_type, raw) == expected
+
+
+@pytest.mark.parametrize('kind, pg_type, raw, expected', [
+    ('datetime', 'TIMESTAMP', '2024-01-05 10:00:00.9999', '2024-01-05 10:00:00.999'),     # .MS truncates
+    ('datetime', 'TIMESTAMP', 'Jan  5 2024  3:07PM', '2024-01-05 15:07:00.000'),
+    ('datetime2', 'TIMESTAMP', '2024-01-05 10:00:00.1234565', '2024-01-05 10:00:00.123457'),
+    ('datetime2', 'TIMESTAMP', '2024-12-31 23:59:59.9999995', '2025-01-01 00:00:00.000000'),
+    ('datetime2', 'TIMESTAMP', '2024-01-05 10:00:00', '2024-01-05 10:00:00.000000'),
+    ('datetimeoffset', 'TIMESTAMPTZ', '2024-01-05 10:00:00.5 +02:00', '2024-01-05 08:00:00.500000'),
+    ('datetimeoffset', 'TIMESTAMPTZ', '2024-01-05 00:30:00 -05:30', '2024-01-05 06:00:00.000000'),
+    ('date', 'DATE', '2024-02-29', '2024-02-29'),
+])
+def test_timestamps(kind, pg_type, raw, expected):
+    assert canonical(kind, pg_type, raw) == expected
+
+
+def test_timestamptz_follows_the_session_zone():
+    # A value without offset is loaded in the session TimeZone: wall clock as written, UTC shifted
+    assert canonical('datetime', 'TIMESTAMPTZ', '2024-07-05 10:00:00',
+                     'America/New_York') == '2024-07-05 10:00:00.000'
+    assert canonical('datetimeoffset', 'TIMESTAMPTZ', '2024-07-05 10:00:00',
+                     'America/New_York') == '2024-07-05 14:00:00.000000'
+
+
+@pytest.mark.parametrize('kind, pg_type, raw, expected', [
+    ('bit', 'BOOLEAN', '1', '1'),
+    ('bit', 'BOOLEAN', '0', '0'),
+    ('char', 'CHAR(5)', 'ab   ', 'ab'),
+    ('uuid', 'UUID', '{6F9619FF-8B86-D011-B42D-00C04FC964FF}', '6f9619ff-8b86-d011-b42d-00c04fc964ff'),
+    ('binary', 'BYTEA', '0xDEADbeef', 'deadbeef'),
+    ('text', 'TEXT', None, NULL),
+    ('float', 'DOUBLE PRECISION', None, NULL),
+])
+def test_other_kinds_and_null(kind, pg_type, raw, expected):
+    assert canonical(kind, pg_type, raw) == expected
+
+
+def test_print_sql_uses_the_pinned_expressions(capsys):
+    assert main(['--table', 'material_inventory', '--table', 'scraper', '--print-sql']) == 0
+    sql = capsys.readouterr().out
+    for kind, column in [('float', '"current_volume_l"'), ('bit', '"is_active"'), ('datetime', '"created_on"'),
+                         ('date', '"expiration_date"'), ('binary', '"file"'), ('char', '"file_type"')]:
+        assert f"COALESCE({PG_EXPRESSIONS[kind].format(c=column)}, '\\N')" in sql
+    assert 'FROM perseus."material_inventory"' in sql and 'FROM perseus."scraper"' in sql
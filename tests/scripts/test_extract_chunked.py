@@ -0,0 +1,165 @@
+"""extract-data.sh export_chunked against stand-in sqlcmd / bcp: manifest byte ranges, bcp row counts and the CSV."""
+
+import gzip
+import json
+import os
+import shutil
+import stat
+import subprocess
+
+import pytest
+
+from conftest import DATA_MIGRATION_DIR
+
+EXTRACT_SCRIPT = os.path.join(DATA_MIGRATION_DIR, 'extract-data.sh')
+TABLE = '##perseus_tier_1_sample'
+
+# Skewed, repeated keys: NTILE buckets share upper bounds and must fold together
+KEYS = [1, 1, 1, 1, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89, 144, 233, 377]
+# Row text per key index; one value spans two lines, so lines != rows
+TEXTS = [f"row{i}" if i != 9 else "row9\nmore" for i in range(len(KEYS))]
+
+# Stand-ins for sqlcmd and bcp over a temp table of (id, name) rows built from STUB_KEYS / STUB_TEXTS;
+# bcp reports "N rows copied." as the real one does unless STUB_SILENT is set
+SQLCMD_STUB = '''#!/usr/bin/env python3
+import json, os, sys
+query = sys.argv[sys.argv.index('-Q') + 1]
+keys = json.loads(os.environ['STUB_KEYS'])
+if 'QUOTENAME(name) FROM tempdb.sys.columns' in query:
+    print('[id]'); print('[name]')
+elif 'SELECT TOP 1 QUOTENAME(c.name)' in query:
+    if os.environ['STUB_KEY_COLUMN'] == '1':
+        print('[id]')
+elif 'NTILE(' in query and 'GROUP BY b' in query:
+    n = int(query.split('NTILE(')[1].split(')')[0])
+    ordered = sorted(keys)
+    base, extra = divmod(len(ordered), n)
+    start = 0
+    for b in range(n):
+        size = base + (1 if b < extra else 0)
+        if size:
+            print(f"{ordered[start + size - 1]}|{size}")
+        start += size
+'''
+
+BCP_STUB = '''#!/usr/bin/env python3
+import json, os, re, sys
+query, out = sys.argv[1], sys.argv[3]
+keys = json.loads(os.environ['STUB_KEYS'])
+rows = sorted(zip(keys, json.loads(os.environ['STUB_TEXTS'])))
+where = query.rsplit(' WHERE ', 1)[1]
+m = re.search(r'perseus_chunk = (\\d+)', where)
+if m:
+    n = int(re.search(r'NTILE\\((\\d+)\\)', query).group(1))
+    base, extra = divmod(len(rows), n)
+    sizes = [base + (1 if b < extra else 0) for b in range(n)]
+    start = sum(sizes[:int(m.group(1)) - 1])
+    rows = rows[start:start + sizes[int(m.group(1)) - 1]]
+else:
+    lo = re.search(r'> (-?\\d+)', where)
+    hi = re.search(r'<= (-?\\d+)', where)
+    rows = [r for r in rows if (not lo or r[0] > int(lo.group(1))) and (not hi or r[0] <= int(hi.group(1)))]
+with open(out, 'w') as f:
+    for key, text in rows:
+        f.write(f"{key},{text}\\n")
+if not os.environ.get('STUB_SILENT'):
+    print(f"\\nStarting copy...\\n{len(rows)} rows copied.\\nNetwork packet size (bytes): 4096")
+'''
+
+HARNESS = '''
+source "$EXTRACT_SCRIPT"
+trap - EXIT INT TERM
+DATA_DIR="$STUB_DATA_DIR"
+LOG_FILE="$STUB_DATA_DIR/extract.log"
+TIMEOUT=60
+EXTRACT_STREAMS=2
+CHUNK_ROWS=4
+COMPRESS="$STUB_COMPRESS"
+COMPRESS_LEVEL=1
+SQLCMD_CMD="$STUB_DIR/sqlcmd"
+BCP_CMD="$STUB_DIR/bcp"
+SQL_SERVER=stub
+SQL_USER=stub
+SQL_PASSWORD=stub
+export_chunked "$1" "$2"
+'''
+
+
+def write_stub(path, source):
+    with open(path, 'w') as f:
+        f.write(source)
+    os.chmod(path, os.stat(path).st_mode | stat.S_IXUSR)
+
+
+def decompress(data, compress):
+    return gzip.decompress(data) if compress == 'gzip' else data
+
+
+def run_export(tmp_path, compress='none', key_column=True, **stub_env):
+    stub_dir, data_dir = tmp_path / 'bin', tmp_path / 'data'
+    stub_dir.mkdir()
+    data_dir.mkdir()
+    write_stub(stub_dir / 'sqlcmd', SQLCMD_STUB)
+    write_stub(stub_dir / 'bcp', BCP_STUB)
+    env = dict(os.environ, EXTRACT_SCRIPT=EXTRACT_SCRIPT, STUB_DIR=str(stub_dir), STUB_DATA_DIR=str(data_dir),
+               STUB_COMPRESS=compress, STUB_KEYS=json.dumps(KEYS), STUB_TEXTS=json.dumps(TEXTS),
+               STUB_KEY_COLUMN='1' if key_column else '0', **stub_env)
+    proc = subprocess.run(['bash', '-c', HARNESS, 'harness', TABLE, str(len(KEYS))],
+                          env=env, capture_output=True, text=True)
+    return proc, data_dir
+
+
+@pytest.mark.skipif(shutil.which('bash') is None, reason="needs bash")
+@pytest.mark.parametrize('compress', ['none', 'gzip'])
+@pytest.mark.parametrize('key_column', [True, False], ids=['key_range', 'ntile'])
+def test_export_chunked_manifest_ranges(tmp_path, compress, key_column):
+    proc, data_dir = run_export(tmp_path, compress, key_column)
+    assert proc.returncode == 0, proc.stdout + proc.stderr
+
+    ext = '.csv.gz' if compress == 'gzip' else '.csv'
+    with open(data_dir / f"{TABLE}.manifest.json") as f:
+        manifest = json.load(f)
+    with open(data_dir / f"{TABLE}{ext}", 'rb') as f:
+        data = f.read()
+    expected = ''.join(f"{k},{text}\n" for k, text in sorted(zip(KEYS, TEXTS)))
+
+    assert manifest['strategy'] == ('key_range' if key_column else 'ntile')
+    assert manifest['rows'] == manifest['source_rows'] == len(KEYS)
+    assert manifest['bytes'] == len(data)
+    assert len(manifest['chunks']) > 1
+    # planned_rows come from NTILE, which splits ties anywhere; only the total is exact
+    assert sum(c['planned_rows'] for c in manifest['chunks']) == len(KEYS)
+    assert not os.path.exists(data_dir / f".chunks-{TABLE}")
+
+    # Byte ranges tile the file in order, and each decodes on its own to its rows
+    offset = 0
+    pieces = []
+    for chunk in manifest['chunks']:
+        assert chunk['byte_offset'] == offset
+        piece = data[offset:offset + chunk['bytes']]
+        text = decompress(piece, compress).decode() if piece else ''
+        # rows are bcp's record counts, not lines
+        assert chunk['rows'] == text.count('\n') - text.count('\nmore')
+        assert chunk['raw_bytes'] == len(text.encode())
+        pieces.append(text)
+        offset += chunk['bytes']
+    assert offset == len(data)
+    assert ''.join(pieces) == expected
+    assert decompress(data, compress).decode() == expected
+
+    if key_column:
+        # Repeated keys never straddle two chunks
+        seen = {}
+        for n, text in enumerate(pieces):
+            for line in text.splitlines():
+                if line != 'more':
+                    assert seen.setdefault(line.split(',')[0], n) == n
+
+
+@pytest.mark.skipif(shutil.which('bash') is None, reason="needs bash")
+def test_export_chunked_needs_bcp_row_counts(tmp_path):
+    proc, data_dir = run_export(tmp_path, STUB_SILENT='1')
+    assert proc.returncode != 0
+    assert 'rows copied' in proc.stdout + proc.stderr
+    assert not os.path.exists(data_dir / f"{TABLE}.manifest.json")
+    assert os.listdir(data_dir / f".chunks-{TABLE}")
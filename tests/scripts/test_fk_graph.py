@@ -0,0 +1,62 @@
+"""fk_graph.FKGraph: parsing, Tarjan cycles, Kahn levels and the critical path."""
+
+from conftest import fk
+from fk_graph import FKGraph, parse_fk_sql
+
+
+def test_parse_fk_sql_tsql_and_postgres():
+    sql = """
+    ALTER TABLE [dbo].[coa] WITH CHECK ADD CONSTRAINT [coa_FK_1] FOREIGN KEY([goo_type_id])
+        REFERENCES [dbo].[goo_type] ([id]) ON DELETE CASCADE
+    -- ALTER TABLE dbo.x ADD CONSTRAINT gone FOREIGN KEY (a) REFERENCES dbo.y (id)
+    ALTER TABLE ONLY perseus.goo ADD CONSTRAINT fk_goo_container FOREIGN KEY (container_id, site)
+        REFERENCES perseus.container (id, site) ON DELETE SET NULL ON UPDATE NO ACTION;
+    """
+    fks = parse_fk_sql(sql)
+    assert [(f['child_schema'], f['child_table'], f['parent_table']) for f in fks] == [
+        ('dbo', 'coa', 'goo_type'), ('perseus', 'goo', 'container')]
+    assert fks[0]['child_cols'] == ['goo_type_id'] and fks[0]['on_delete'] == 'CASCADE'
+    assert fks[1]['child_cols'] == ['container_id', 'site'] and fks[1]['parent_cols'] == ['id', 'site']
+    assert (fks[1]['on_delete'], fks[1]['on_update']) == ('SET NULL', 'NO ACTION')
+
+
+def test_levels_follow_the_longest_parent_chain():
+    graph = FKGraph([fk('b', 'a'), fk('c', 'b'), fk('c', 'a'), fk('d', 'a')], qualified=False)
+    assert graph.levels() == {'a': 0, 'b': 1, 'd': 1, 'c': 2}
+    assert graph.roots() == ['a']
+    assert graph.leaves() == ['c', 'd']
+    order = graph.topological_order()
+    for child, parents in graph.parents.items():
+        assert all(order.index(p['parent_table']) < order.index(child) for p in parents)
+
+
+def test_cycle_members_share_a_level_and_self_references_are_separate():
+    fks = [fk('b', 'a'), fk('c', 'b'), fk('b', 'c'), fk('d', 'c'), fk('a', 'a')]
+    graph = FKGraph(fks, qualified=False)
+    assert graph.cycles() == [['b', 'c']]
+    assert [s['table'] for s in graph.self_references] == ['a']
+    levels = graph.levels()
+    assert levels['a'] == 0 and levels['b'] == levels['c'] == 1 and levels['d'] == 2
+    order = graph.topological_order()
+    assert abs(order.index('b') - order.index('c')) == 1
+
+
+def test_strongly_connected_components_are_reverse_topological():
+    graph = FKGraph([fk('b', 'a'), fk('c', 'b'), fk('a', 'c'), fk('d', 'a')], qualified=False)
+    components = graph.strongly_connected_components()
+    assert components == [['d'], ['a', 'b', 'c']]
+
+
+def test_critical_path_is_the_heaviest_chain():
+    graph = FKGraph([fk('b', 'a'), fk('c', 'b'), fk('d', 'a')], qualified=False)
+    assert graph.critical_path() == (3, ['a', 'b', 'c'])
+    assert graph.critical_path({'a': 1, 'b': 1, 'c': 1, 'd': 10}) == (11, ['a', 'd'])
+    assert FKGraph([]).critical_path() == (0, [])
+
+
+def test_qualified_names_descendants_and_adjacency_round_trip():
+    graph = FKGraph([fk('b', 'a'), fk('c', 'b')])
+    assert graph.tables == {'dbo.a', 'dbo.b', 'dbo.c'}
+    assert graph.descendants('dbo.a') == {'dbo.b', 'dbo.c'}
+    rebuilt = FKGraph.from_adjacency(graph.parents)
+    assert rebuilt.levels() == graph.levels()
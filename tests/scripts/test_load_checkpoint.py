@@ -0,0 +1,138 @@
+"""load_checkpoint: chunk layout, resume / done / changed states and the CLI used by load-data.sh."""
+
+import json
+import os
+
+import pytest
+
+from load_checkpoint import (checkpoint_path, chunk_layout, evaluate, find_csv, loaded_rows, main, mark_chunk,
+                             read_checkpoint, write_checkpoint)
+
+CHUNKS = [b'1,a\n2,b\n', b'3,c\n4,d\n', b'5,e\n']
+
+
+def write_export(directory, chunks, table='goo', tier=2):
+    """A chunked export as extract-data.sh writes it: CSV plus manifest byte ranges."""
+    csv_path = os.path.join(directory, f"##perseus_tier_{tier}_{table}.csv")
+    with open(csv_path, 'wb') as f:
+        f.write(b''.join(chunks))
+    offset, entries = 0, []
+    for n, data in enumerate(chunks, 1):
+        entries.append({'chunk': n, 'rows': data.count(b'\n'), 'byte_offset': offset, 'bytes': len(data)})
+        offset += len(data)
+    with open(os.path.join(directory, f"##perseus_tier_{tier}_{table}.manifest.json"), 'w') as f:
+        json.dump({'table': table, 'chunks': entries}, f)
+    return csv_path
+
+
+def touch_later(path):
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+@pytest.fixture
+def export(tmp_path):
+    return str(tmp_path), write_export(str(tmp_path), CHUNKS), str(tmp_path / '.checkpoints')
+
+
+def load_chunks(checkpoint_dir, checkpoint, numbers):
+    for n in numbers:
+        assert mark_chunk(checkpoint, n, 'loaded', CHUNKS[n - 1].count(b'\n'))
+    write_checkpoint(checkpoint_dir, checkpoint)
+
+
+def test_chunk_layout_uses_manifest_ranges_only_when_they_cover_the_file(export):
+    data_dir, csv_path, _ = export
+    assert chunk_layout(csv_path, 'extract-manifest') == [(0, 8), (8, 8), (16, 4)]
+    assert chunk_layout(csv_path, 'file') == [(0, 20)]
+    with open(csv_path, 'ab') as f:
+        f.write(b'6,f\n')
+    assert chunk_layout(csv_path, 'extract-manifest') == [(0, 24)]
+    assert find_csv(data_dir, '2', 'goo') == csv_path
+
+
+def test_fresh_resume_done(export):
+    _, csv_path, checkpoint_dir = export
+    state, checkpoint = evaluate('goo', csv_path, checkpoint_dir)
+    assert state == 'fresh' and len(checkpoint['chunks']) == 3
+    load_chunks(checkpoint_dir, checkpoint, [1])
+    state, checkpoint = evaluate('goo', csv_path, checkpoint_dir)
+    assert state == 'resume' and checkpoint['status'] == 'partial'
+    assert [c['status'] for c in checkpoint['chunks']] == ['loaded', 'pending', 'pending']
+    load_chunks(checkpoint_dir, checkpoint, [2, 3])
+    state, checkpoint = evaluate('goo', csv_path, checkpoint_dir)
+    assert state == 'done' and loaded_rows(checkpoint) == 5
+
+
+def test_failed_chunk_rows_do_not_count(export):
+    _, csv_path, checkpoint_dir = export
+    _, checkpoint = evaluate('goo', csv_path, checkpoint_dir)
+    mark_chunk(checkpoint, 1, 'loaded', 2)
+    mark_chunk(checkpoint, 2, 'failed', 2)
+    assert checkpoint['status'] == 'failed' and loaded_rows(checkpoint) == 2
+    assert not mark_chunk(checkpoint, 9, 'loaded', 1)
+
+
+def test_reexport_keeps_unchanged_chunks(export):
+    data_dir, csv_path, checkpoint_dir = export
+    _, checkpoint = evaluate('goo', csv_path, checkpoint_dir)
+    load_chunks(checkpoint_dir, checkpoint, [1, 2])
+    write_export(data_dir, CHUNKS[:2] + [b'5,e\n6,f\n'])     # rows appended to the last chunk only
+    touch_later(csv_path)
+    state, checkpoint = evaluate('goo', csv_path, checkpoint_dir)
+    assert state == 'resume'
+    assert [c['status'] for c in checkpoint['chunks']] == ['loaded', 'loaded', 'pending']
+    assert loaded_rows(checkpoint) == 4
+
+
+def test_changed_loaded_chunk_resets_the_table(export):
+    data_dir, csv_path, checkpoint_dir = export
+    _, checkpoint = evaluate('goo', csv_path, checkpoint_dir)
+    load_chunks(checkpoint_dir, checkpoint, [1, 2, 3])
+    write_export(data_dir, [b'1,A\n2,b\n'] + CHUNKS[1:])
+    touch_later(csv_path)
+    state, checkpoint = evaluate('goo', csv_path, checkpoint_dir)
+    assert state == 'changed'
+    assert all(c['status'] == 'pending' and c['rows'] is None for c in checkpoint['chunks'])
+
+
+def test_unchanged_source_is_not_rehashed(export, monkeypatch):
+    _, csv_path, checkpoint_dir = export
+    _, checkpoint = evaluate('goo', csv_path, checkpoint_dir)
+    load_chunks(checkpoint_dir, checkpoint, [1])
+    monkeypatch.setattr('load_checkpoint.hash_source', lambda *a: pytest.fail("re-hashed an unchanged CSV"))
+    assert evaluate('goo', csv_path, checkpoint_dir)[0] == 'resume'
+
+
+def test_question_only_evaluation_writes_nothing(export):
+    _, csv_path, checkpoint_dir = export
+    assert evaluate('goo', csv_path, checkpoint_dir, record=False) == ('fresh', None)
+    assert not os.path.exists(checkpoint_path(checkpoint_dir, 'goo'))
+
+
+def test_cli_begin_mark_rows_pending(export, capsys):
+    data_dir, csv_path, checkpoint_dir = export
+    base = ['--checkpoint-dir', checkpoint_dir]
+    assert main(base + ['begin', 'goo', csv_path]) == 0
+    assert capsys.readouterr().out.splitlines() == ['fresh', '1\t0\t8', '2\t8\t8', '3\t16\t4']
+    assert main(base + ['mark', 'goo', '1', '--status', 'loaded', '--rows', '2']) == 0
+    assert main(base + ['begin', 'goo', csv_path]) == 0
+    assert capsys.readouterr().out.splitlines() == ['resume', '2\t8\t8', '3\t16\t4']
+    assert main(base + ['rows', 'goo']) == 0
+    assert capsys.readouterr().out.strip() == '2'
+    assert main(base + ['pending', '--data-dir', data_dir, '2:goo', '1:missing']) == 0
+    assert capsys.readouterr().out.splitlines() == ['1:missing']
+    assert main(base + ['mark', 'goo', '7', '--status', 'loaded', '--rows', '1']) == 1
+
+
+def test_cli_begin_no_truncate_keeps_a_changed_checkpoint(export, capsys):
+    data_dir, csv_path, checkpoint_dir = export
+    base = ['--checkpoint-dir', checkpoint_dir]
+    main(base + ['begin', 'goo', csv_path])
+    main(base + ['mark', 'goo', '1', '--status', 'loaded', '--rows', '2'])
+    write_export(data_dir, [b'9,z\n2,b\n'] + CHUNKS[1:])
+    touch_later(csv_path)
+    capsys.readouterr()
+    assert main(base + ['begin', 'goo', csv_path, '--no-truncate']) == 0
+    assert capsys.readouterr().out.splitlines() == ['changed']
+    assert read_checkpoint(checkpoint_dir, 'goo')['chunks'][0]['status'] == 'loaded'
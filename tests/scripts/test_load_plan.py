@@ -0,0 +1,58 @@
+"""load_plan: export discovery, nearest loaded ancestors, ranks and the simulated makespans."""
+
+import pytest
+
+from conftest import fk
+from fk_graph import FKGraph
+from load_plan import (MIN_WEIGHT_MB, build_plan, discover_csvs, format_tsv, load_dependencies,
+                       simulate_schedule, simulate_tiers, table_weights)
+
+
+def tables_of(*names, tier=0):
+    return {name: {'tier': tier, 'path': f"/x/{name}.csv", 'bytes': 0} for name in names}
+
+
+def test_discover_csvs_matches_plain_and_compressed_exports(tmp_path):
+    for name in ('##perseus_tier_0_goo_type.csv', '##perseus_tier_2_goo.csv.gz', '##perseus_tier_3_fatsmurf.csv.zst',
+                 'goo.csv', '##perseus_tier_1_coa.csv.bak'):
+        (tmp_path / name).write_bytes(b'1,x\n')
+    found = discover_csvs(str(tmp_path))
+    assert {t: info['tier'] for t, info in found.items()} == {'goo_type': 0, 'goo': 2, 'fatsmurf': 3}
+    assert found['goo']['bytes'] == 4
+    assert discover_csvs(str(tmp_path / 'missing')) == {}
+
+
+def test_table_weights_prefer_the_assessment_size():
+    tables = {'a': {'bytes': 2 * 1048576}, 'b': {'bytes': 2 * 1048576}, 'c': {'bytes': 0}}
+    weights = table_weights(tables, {'a': {'data_mb': 50.0}})
+    assert weights == {'a': 50.0, 'b': 2.0, 'c': MIN_WEIGHT_MB}
+
+
+def test_dependencies_walk_through_unloaded_parents_and_ignore_cycles():
+    # a → (b not exported) → c; d ↔ e cycle, e → f
+    graph = FKGraph([fk('b', 'a'), fk('c', 'b'), fk('d', 'e'), fk('e', 'd'), fk('f', 'e')], qualified=False)
+    deps = load_dependencies(graph, tables_of('a', 'c', 'd', 'e', 'f'))
+    assert deps == {'a': set(), 'c': {'a'}, 'd': set(), 'e': set(), 'f': {'e'}}
+
+
+def test_build_plan_ranks_levels_and_critical_path():
+    tables = tables_of('a', 'b', 'c', 'd')
+    deps = {'a': set(), 'b': {'a'}, 'c': {'b'}, 'd': set()}
+    weights = {'a': 1.0, 'b': 2.0, 'c': 3.0, 'd': 5.0}
+    plan = build_plan(tables, deps, weights)
+    assert {t: info['rank'] for t, info in plan['tables'].items()} == {'a': 6.0, 'b': 5.0, 'c': 3.0, 'd': 5.0}
+    assert {t: info['level'] for t, info in plan['tables'].items()} == {'a': 0, 'b': 1, 'c': 2, 'd': 0}
+    assert plan['antichains'] == [['a', 'd'], ['b'], ['c']]
+    assert plan['critical_path'] == ['a', 'b', 'c']
+    assert plan['order'] == ['a', 'b', 'd', 'c']
+    assert format_tsv(plan).splitlines()[1] == "b\t0\ta\t2.0\t5.0"
+
+
+def test_dag_schedule_beats_tier_barriers():
+    # Tier 1 child of a small tier-0 parent can overlap the large tier-0 table
+    tables = {'big': {'tier': 0}, 'small': {'tier': 0}, 'child': {'tier': 1}}
+    deps = {'big': set(), 'small': set(), 'child': {'small'}}
+    plan = build_plan(tables, deps, {'big': 10.0, 'small': 1.0, 'child': 8.0})
+    assert simulate_schedule(plan, 2) == pytest.approx(10.0)
+    assert simulate_tiers(plan, 2) == pytest.approx(18.0)
+    assert simulate_schedule(plan, 1) == pytest.approx(19.0)
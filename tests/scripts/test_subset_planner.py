@@ -0,0 +1,98 @@
+"""subset_planner: the FK closure of a seeded subset, its roles and order, and the row estimates."""
+
+import pytest
+
+from conftest import fk
+from fk_graph import SQLSERVER_FK_DIR, FKGraph, load_fk_constraints
+from subset_planner import estimate_rows, main, plan_subset
+
+
+FKS = [
+    fk('material_transition', 'goo', ['material_id'], ['uid']),
+    fk('material_transition', 'fatsmurf', ['transition_id'], ['uid']),
+    fk('transition_material', 'fatsmurf', ['transition_id'], ['uid']),
+    fk('transition_material', 'goo', ['material_id'], ['uid']),
+    fk('goo', 'goo_type', ['goo_type_id']),
+    fk('goo_history', 'goo', ['goo_id']),
+    fk('goo_history', 'perseus_user', ['added_by']),
+    fk('fatsmurf_reading', 'fatsmurf', ['fatsmurf_id']),
+    fk('poll', 'fatsmurf_reading', ['fatsmurf_reading_id']),
+    fk('robot_log', 'goo', ['goo_id']),
+    fk('coa', 'goo_type', ['goo_type_id']),
+]
+
+
+def assert_closed(plan, graph):
+    """Every table of the plan has its parents in the plan, and they come first."""
+    order = plan['order']
+    for table in order:
+        for parent in graph.parents.get(table, []):
+            if parent['parent_table'] != table:
+                assert parent['parent_table'] in plan['roles'], (table, parent['parent_table'])
+                assert order.index(parent['parent_table']) < order.index(table)
+
+
+def test_roles_with_lineage():
+    graph = FKGraph(FKS, qualified=False)
+    plan = plan_subset(graph, 'goo', 'id', 'both', skip=['robot_log'])
+    assert plan['keys'] == {'goo': 'uid', 'fatsmurf': 'uid'}
+    assert plan['roles'] == {
+        'goo': 'seed', 'fatsmurf': 'lineage',
+        'material_transition': 'edge', 'transition_material': 'edge',
+        'goo_history': 'child', 'fatsmurf_reading': 'child', 'poll': 'child',
+        'goo_type': 'parent', 'perseus_user': 'parent',
+    }
+    assert plan['skipped'] == ['robot_log']
+    assert_closed(plan, graph)
+
+
+def test_children_descend_only_through_selected_rows():
+    plan = plan_subset(FKGraph(FKS, qualified=False), 'goo', 'id', 'both', skip=[])
+    assert [f['parent_table'] for f in plan['descent']['goo_history']] == ['goo']
+    assert [f['parent_table'] for f in plan['descent']['poll']] == ['fatsmurf_reading']
+    assert plan['roles']['robot_log'] == 'child'
+    assert 'coa' not in plan['roles']     # references a parent only, never a selected row
+
+
+def test_without_lineage_the_other_end_is_a_parent():
+    graph = FKGraph(FKS, qualified=False)
+    plan = plan_subset(graph, 'goo', 'id', 'none', skip=[])
+    assert plan['edges'] == [] and plan['keys'] == {'goo': 'id'}
+    assert plan['roles']['material_transition'] == 'child'
+    assert plan['roles']['fatsmurf'] == 'parent'
+    assert 'fatsmurf_reading' not in plan['roles']
+    assert_closed(plan, graph)
+
+
+def test_invalid_plans():
+    graph = FKGraph(FKS, qualified=False)
+    with pytest.raises(ValueError, match='cannot skip'):
+        plan_subset(graph, 'goo', 'id', 'both', skip=['fatsmurf'])
+    cyclic = FKGraph(FKS + [fk('goo_type', 'goo', ['default_goo_id'])], qualified=False)
+    with pytest.raises(ValueError, match='cycles'):
+        plan_subset(cyclic, 'goo', 'id', 'both', skip=[])
+
+
+def test_estimate_rows():
+    graph = FKGraph(FKS, qualified=False)
+    plan = plan_subset(graph, 'goo', 'id', 'both', skip=[])
+    rows = {'goo': 1000, 'fatsmurf': 500, 'material_transition': 2000, 'transition_material': 1000,
+            'goo_history': 4000, 'fatsmurf_reading': 100, 'poll': 300, 'robot_log': 10,
+            'goo_type': 50, 'perseus_user': 5}
+    estimate = estimate_rows(plan, graph, rows, seeds=25, max_rows=100, child_rows=200)
+    assert estimate['goo'] == 100 and estimate['fatsmurf'] == 100
+    assert estimate['material_transition'] == 200        # 10% of the seed table, edges in proportion
+    assert estimate['goo_history'] == 200                # capped by --child-rows
+    assert estimate['robot_log'] == 1
+    assert estimate['goo_type'] == 50                    # at most the source rows
+    assert estimate['perseus_user'] == 5
+
+
+def test_repository_graph_is_closed(capsys):
+    graph = FKGraph(load_fk_constraints(SQLSERVER_FK_DIR), qualified=False)
+    plan = plan_subset(graph, 'goo', 'id', 'both', skip=[])
+    assert plan['roles']['goo'] == 'seed' and plan['roles']['fatsmurf'] == 'lineage'
+    assert_closed(plan, graph)
+    assert main(['--plan', '--seeds', '10']) == 0
+    assert 'goo' in capsys.readouterr().out
+    assert main(['--plan', '--seed-table', 'no_such_table']) == 2
@@ -0,0 +1,99 @@
+"""transcode_csv: field conversion, NULL/empty handling, record repair and the rejects exit code."""
+
+import io
+
+import pytest
+
+from transcode_csv import EXIT_REJECTS, Reject, Transcoder, convert_datetime, csv_field, main, make_converter
+
+
+def field(name, pg_type, text=False, skip=False, transform=None):
+    return {'name': name, 'type': pg_type, 'skip': skip, 'transform': transform, 'text': text}
+
+
+FIELDS = [field('id', 'INTEGER'), field('name', 'VARCHAR(50)', text=True), field('active', 'BOOLEAN')]
+
+
+def run(coder, data):
+    rejects = io.StringIO()
+    records = list(coder.records(io.BytesIO(data), rejects))
+    return records, rejects.getvalue()
+
+
+def test_bcp_null_and_empty_string():
+    records, rejects = run(Transcoder(FIELDS), b'1,,1\n2,\x00,0\n')
+    assert records == [['1', None, 't'], ['2', '', 'f']]
+    assert rejects == ''
+    assert csv_field(None) == '' and csv_field('') == '""'
+
+
+def test_bit_and_hex_conversion():
+    assert make_converter('BOOLEAN', None)('1') == 't'
+    with pytest.raises(Reject):
+        make_converter('BOOLEAN', None)('2')
+    assert make_converter('BYTEA', 'hex_to_bytea')('0xCAFE') == '\\xCAFE'
+    with pytest.raises(Reject):
+        make_converter('BYTEA', 'hex_to_bytea')('0xZZ')
+
+
+def test_convert_datetime():
+    assert convert_datetime('Jan  5 2024  3:07PM', False) == '2024-01-05 15:07:00'
+    assert convert_datetime('2024-01-05 10:00:00 +02:00', False) == '2024-01-05 08:00:00'
+    assert convert_datetime('2024-01-05 10:00:00 +0200', True) == '2024-01-05 10:00:00+02:00'
+    assert convert_datetime('2024-01-05 10:00:00.1234567', False) == '2024-01-05 10:00:00.123457'
+    # Half a microsecond rounds up, as SQL Server's CAST(... AS DATETIME2(6))
+    assert convert_datetime('2024-01-05 10:00:00.1234565', False) == '2024-01-05 10:00:00.123457'
+    assert convert_datetime('2024-12-31 23:59:59.9999995', False) == '2025-01-01 00:00:00'
+    with pytest.raises(Reject):
+        convert_datetime('2024-13-01 00:00:00', False)
+    with pytest.raises(Reject):
+        make_converter('DATE', None)('2024-02-30')
+
+
+def test_embedded_newline_is_merged():
+    coder = Transcoder(FIELDS)
+    records, rejects = run(coder, b'1,first\nsecond,1\n2,b,0\n')
+    assert records == [['1', 'first\nsecond', 't'], ['2', 'b', 'f']]
+    assert coder.stats['merged_lines'] == 1 and rejects == ''
+
+
+def test_surplus_delimiters_fold_into_the_text_column():
+    coder = Transcoder(FIELDS)
+    records, _ = run(coder, b'1,Smith, John,1\n')
+    assert records == [['1', 'Smith, John', 't']]
+    assert coder.stats['repaired_delimiters'] == 1
+
+
+def test_ambiguous_repair_is_rejected():
+    fields = [field('a', 'TEXT', text=True), field('b', 'TEXT', text=True)]
+    coder = Transcoder(fields)
+    records, rejects = run(coder, b'x,y,z\n')
+    assert records == [] and coder.stats['rejected'] == 1
+    assert 'more than one text column' in rejects
+
+
+def test_bad_value_goes_to_rejects():
+    coder = Transcoder(FIELDS)
+    records, rejects = run(coder, b'1,a,1\nx,b,0\n')
+    assert records == [['1', 'a', 't']]
+    assert rejects.startswith('2\tnot an integer')
+    assert coder.stats['records'] == 2 and coder.stats['rejected'] == 1
+
+
+def test_skipped_fields_are_dropped():
+    fields = [field('id', 'INTEGER'), field('legacy', 'TEXT', text=True, skip=True)]
+    records, _ = run(Transcoder(fields), b'1,old\n')
+    assert records == [['1']]
+
+
+def test_main_exits_with_rejects(tmp_path):
+    csv_path = tmp_path / '##perseus_tier_0_unit.csv'
+    csv_path.write_bytes(b'1,mg,milligram,1,0.001,0\nbad,g,gram,1,1,0\n')
+    manifests = tmp_path / 'manifests'
+    manifests.mkdir()
+    rc = main([str(csv_path), '--table', 'unit', '--manifest-dir', str(manifests),
+               '--rejects', str(tmp_path / 'rejects'), '-o', str(tmp_path / 'out')])
+    assert rc == EXIT_REJECTS
+    assert (tmp_path / 'out' / csv_path.name).read_text() == '1,mg,milligram,1,0.001,0\n'
+    assert 'not an integer' in (tmp_path / 'rejects').read_text()
+    assert main([str(tmp_path / 'missing.csv'), '--table', 'unit', '--manifest-dir', str(manifests)]) == 2